@@ -1,19 +1,97 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
-from functools import lru_cache
+import re
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Iterable, Literal
+
+from pydantic import BaseModel, ConfigDict, Field, create_model
 
 
 TOOL_SPECS_DIR = Path(__file__).resolve().parent / "tool_specs"
+_PATH_PARAM_PATTERN = re.compile(r"{([a-zA-Z0-9_]+)}")
 
 
 class ToolSpecValidationError(ValueError):
     pass
 
 
+@dataclass(frozen=True)
+class PathTemplate:
+    """A tool path split once into literal text and ``{param}`` slots."""
+
+    # (literal, param) pairs; ``param`` is "" for the trailing literal.
+    parts: tuple[tuple[str, str], ...]
+    params: tuple[str, ...]
+
+
+@lru_cache(maxsize=1024)
+def path_template(path: str) -> PathTemplate:
+    parts: list[tuple[str, str]] = []
+    params: list[str] = []
+    cursor = 0
+    for match in _PATH_PARAM_PATTERN.finditer(path):
+        parts.append((path[cursor : match.start()], match.group(1)))
+        if match.group(1) not in params:
+            params.append(match.group(1))
+        cursor = match.end()
+    parts.append((path[cursor:], ""))
+    return PathTemplate(parts=tuple(parts), params=tuple(params))
+
+
+def _schema_to_python_type(spec: dict[str, Any]):
+    expected = spec.get("type")
+    enum_values = spec.get("enum")
+    if isinstance(enum_values, list) and enum_values:
+        # pydantic literal handles enum constraints with clear error categories.
+        return Literal[tuple(enum_values)]  # type: ignore[misc,valid-type]
+    if expected == "string":
+        return str
+    if expected == "integer":
+        return int
+    if expected == "number":
+        return float
+    if expected == "boolean":
+        return bool
+    if expected == "array":
+        return list[Any]
+    if expected == "object":
+        return dict[str, Any]
+    return Any
+
+
+def build_payload_model(tool_name: str, input_schema: dict[str, Any] | None) -> type[BaseModel]:
+    schema = input_schema or {}
+    properties = schema.get("properties", {})
+    required_fields = set(schema.get("required", []))
+    fields: dict[str, tuple[Any, Any]] = {}
+    for key, raw_spec in properties.items():
+        spec = raw_spec if isinstance(raw_spec, dict) else {}
+        py_type = _schema_to_python_type(spec)
+        if key in required_fields:
+            annotation = py_type
+            default = ...
+        else:
+            annotation = py_type | None
+            default = None
+        constraints: dict[str, Any] = {}
+        if spec.get("type") in {"integer", "number"}:
+            if spec.get("minimum") is not None:
+                constraints["ge"] = spec.get("minimum")
+            if spec.get("maximum") is not None:
+                constraints["le"] = spec.get("maximum")
+        fields[key] = (annotation, Field(default=default, **constraints))
+
+    return create_model(  # type: ignore[call-overload]
+        f"ToolPayloadModel_{tool_name}",
+        __base__=BaseModel,
+        __config__=ConfigDict(extra="ignore"),
+        **fields,
+    )
+
+
 @dataclass(frozen=True)
 class ToolDefinition:
     service: str
@@ -27,6 +105,23 @@ class ToolDefinition:
     required_scopes: tuple[str, ...]
     idempotency_key_policy: str
     error_map: dict[str, str]
+    read_only: bool = False
+    cache_ttl_seconds: int = 0
+    limits: dict[str, Any] = field(default_factory=dict)
+    deadline_ms: int = 0
+
+    @property
+    def path_template(self) -> PathTemplate:
+        return path_template(self.path)
+
+    @property
+    def path_params(self) -> tuple[str, ...]:
+        return path_template(self.path).params
+
+    @cached_property
+    def payload_model(self) -> type[BaseModel]:
+        # Built once per tool (at registry load for spec tools); create_model is far too slow per call.
+        return build_payload_model(self.tool_name, self.input_schema)
 
     def to_llm_tool(self) -> dict[str, Any]:
         return {
@@ -59,6 +154,29 @@ def _validate_service_spec(spec: dict[str, Any], path: Path) -> None:
         raise ToolSpecValidationError(f"{path}: 'auth' must be an object")
     if not isinstance(auth.get("required_scopes", []), list):
         raise ToolSpecValidationError(f"{path}: 'auth.required_scopes' must be an array")
+    limits = spec.get("limits", {})
+    if not isinstance(limits, dict):
+        raise ToolSpecValidationError(f"{path}: 'limits' must be an object")
+    for key in (
+        "max_concurrency",
+        "requests_per_second",
+        "burst",
+        "queue_timeout_ms",
+        "max_connections",
+        "max_keepalive_connections",
+        "keepalive_expiry_ms",
+        "fanout_concurrency",
+        "fanout_timeout_ms",
+        "max_response_bytes",
+    ):
+        value = limits.get(key, 0)
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+            raise ToolSpecValidationError(f"{path}: 'limits.{key}' must be a non-negative number")
+    for key in ("max_connections", "fanout_concurrency", "max_response_bytes"):
+        if key in limits and limits[key] < 1:
+            raise ToolSpecValidationError(f"{path}: 'limits.{key}' must be at least 1")
+    if "http2" in limits and not isinstance(limits["http2"], bool):
+        raise ToolSpecValidationError(f"{path}: 'limits.http2' must be a boolean")
     tools = spec.get("tools")
     if not isinstance(tools, list) or not tools:
         raise ToolSpecValidationError(f"{path}: 'tools' must be a non-empty array")
@@ -72,6 +190,21 @@ def _validate_service_spec(spec: dict[str, Any], path: Path) -> None:
         required_scopes = tool.get("required_scopes", [])
         if not isinstance(required_scopes, list):
             raise ToolSpecValidationError(f"{path}: tools[{idx}].required_scopes must be an array")
+        if "read_only" in tool and not isinstance(tool["read_only"], bool):
+            raise ToolSpecValidationError(f"{path}: tools[{idx}].read_only must be a boolean")
+        ttl = tool.get("cache_ttl_seconds", 0)
+        if isinstance(ttl, bool) or not isinstance(ttl, int) or ttl < 0:
+            raise ToolSpecValidationError(f"{path}: tools[{idx}].cache_ttl_seconds must be a non-negative integer")
+        if ttl and not _is_read_only(tool):
+            raise ToolSpecValidationError(f"{path}: tools[{idx}].cache_ttl_seconds requires a read-only tool")
+        deadline_ms = tool.get("deadline_ms", 0)
+        if isinstance(deadline_ms, bool) or not isinstance(deadline_ms, int) or deadline_ms < 0:
+            raise ToolSpecValidationError(f"{path}: tools[{idx}].deadline_ms must be a non-negative integer")
+
+
+def _is_read_only(tool: dict[str, Any]) -> bool:
+    # GET tools are reads; POST-based reads (GraphQL, search) opt in with "read_only": true.
+    return bool(tool.get("read_only", str(tool.get("method", "")).strip().upper() == "GET"))
 
 
 class ToolRegistry:
@@ -102,8 +235,19 @@ class ToolRegistry:
                         required_scopes=tuple(item.get("required_scopes", [])),
                         idempotency_key_policy=item.get("idempotency_key_policy", "none"),
                         error_map=item.get("error_map", {}),
+                        read_only=_is_read_only(item),
+                        cache_ttl_seconds=int(item.get("cache_ttl_seconds", 0)),
+                        limits=dict(spec.get("limits") or {}),
+                        deadline_ms=int(item.get("deadline_ms", 0)),
                     )
                 )
+        for tool in tools:
+            # Compile validators and path templates up front so a bad schema fails startup, not a call.
+            try:
+                tool.payload_model
+                tool.path_template
+            except Exception as exc:
+                raise ToolSpecValidationError(f"{tool.tool_name}: cannot compile input_schema ({exc})") from exc
         return cls(tools)
 
     @classmethod
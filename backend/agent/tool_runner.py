@@ -1,22 +1,32 @@
 from __future__ import annotations
 
+import asyncio
 import base64
+import codecs
 import logging
 import re
-from html import unescape
+from functools import lru_cache
+from html.parser import HTMLParser
 from json import JSONDecodeError
 from datetime import datetime, timezone
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
-from typing import Any, Awaitable, Callable, Literal
+from typing import Any, Awaitable, Callable
 
 import httpx
 from fastapi import HTTPException
-from pydantic import BaseModel, ConfigDict, Field, ValidationError, create_model
-from supabase import create_client
+from pydantic import ValidationError
 
-from agent.registry import ToolDefinition, load_registry
+from agent.registry import ToolDefinition, load_registry, path_template
+from app.core.circuit_breaker import circuit_breaker_enabled, get_circuit_breakers
 from app.core.config import get_settings
 from app.core.connector_jobs import record_connector_job_run
+from app.core.db import get_supabase_client
+from app.core.deadline import deadline_error, deadline_exceeded, run_within_deadline, upstream_timeout
+from app.core.http_pool import upstream_client
+from app.core.oauth_token_cache import get_oauth_token_cache, invalidate_oauth_token
+from app.core.tool_result_cache import get_tool_result_cache
+from app.core.upstream_bulkhead import UpstreamLimits, get_upstream_bulkheads, upstream_bulkheads_enabled
+from app.core.upstream_errors import UpstreamError
 from app.routes.canva import load_canva_access_token_for_user
 from app.security.token_vault import TokenVault
 
@@ -100,9 +110,50 @@ def _filter_google_events_by_time_range(
     return data
 
 
+_GOOGLE_FALLBACK_MAX_CALENDARS = 10
+_GOOGLE_CALENDAR_LIST_TTL_SECONDS = 300
+# Internal cache namespace: entries hold the raw fallback listing, not a tool response, so they
+# must never collide with a real google_calendar_list_calendars tool call's cached result.
+_GOOGLE_CALENDAR_LIST_CACHE_NAME = "_internal.google_calendar_fallback_calendar_list"
+_DEFAULT_FANOUT_CONCURRENCY = 4
+_DEFAULT_FANOUT_TIMEOUT_MS = 5000
+
+
+async def _load_google_calendar_list(
+    *,
+    client: httpx.AsyncClient,
+    user_id: str,
+    tool: ToolDefinition,
+    headers: dict[str, str],
+) -> list[Any]:
+    list_url = f"{tool.base_url}/users/me/calendarList"
+    list_params = {"maxResults": 50, "showDeleted": False, "showHidden": False}
+
+    async def _load() -> dict[str, Any]:
+        response = await client.get(list_url, headers=headers, params=list_params)
+        if response.status_code >= 400:
+            return {"ok": False}
+        return _parse_response_data(response)
+
+    # Calendar lists rarely change; reuse them across "what's on today" calls for the same user.
+    listed = await get_tool_result_cache().read_through(
+        user_id=user_id,
+        service=tool.service,
+        tool_name=_GOOGLE_CALENDAR_LIST_CACHE_NAME,
+        ttl_seconds=_GOOGLE_CALENDAR_LIST_TTL_SECONDS,
+        payload=list_params,
+        load=_load,
+        record_status=False,
+    )
+    listed_data = listed.get("data") if isinstance(listed, dict) else None
+    calendar_items = listed_data.get("items") if isinstance(listed_data, dict) else None
+    return calendar_items if isinstance(calendar_items, list) else []
+
+
 async def _fetch_google_calendar_events_with_primary_fallback(
     *,
     client: httpx.AsyncClient,
+    user_id: str,
     tool: ToolDefinition,
     headers: dict[str, str],
     payload: dict[str, Any],
@@ -120,19 +171,9 @@ async def _fetch_google_calendar_events_with_primary_fallback(
         return parsed
 
     # Fallback: primary is empty, so scan visible calendars and aggregate today's events.
-    list_url = f"{tool.base_url}/users/me/calendarList"
-    list_params = {"maxResults": 50, "showDeleted": False, "showHidden": False}
-    list_response = await client.get(list_url, headers=headers, params=list_params)
-    if list_response.status_code >= 400:
-        return parsed
-    listed = _parse_response_data(list_response)
-    listed_data = listed.get("data") if isinstance(listed, dict) else None
-    calendar_items = (listed_data or {}).get("items") if isinstance(listed_data, dict) else None
-    if not isinstance(calendar_items, list) or not calendar_items:
-        return parsed
-
-    merged: list[dict[str, Any]] = []
-    for cal in calendar_items[:10]:
+    calendar_items = await _load_google_calendar_list(client=client, user_id=user_id, tool=tool, headers=headers)
+    calendar_ids: list[str] = []
+    for cal in calendar_items[:_GOOGLE_FALLBACK_MAX_CALENDARS]:
         if not isinstance(cal, dict):
             continue
         cal_id = str(cal.get("id") or "").strip()
@@ -141,21 +182,39 @@ async def _fetch_google_calendar_events_with_primary_fallback(
         selected = cal.get("selected")
         if selected is False:
             continue
-        path = _build_path(tool.path, {"calendar_id": cal_id})
-        url = f"{tool.base_url}{path}"
-        response = await client.get(url, headers=headers, params=query_params)
+        calendar_ids.append(cal_id)
+    if not calendar_ids:
+        return parsed
+
+    limits = tool.limits or {}
+    semaphore = asyncio.Semaphore(max(1, int(limits.get("fanout_concurrency", _DEFAULT_FANOUT_CONCURRENCY))))
+    timeout_seconds = float(limits.get("fanout_timeout_ms", _DEFAULT_FANOUT_TIMEOUT_MS)) / 1000.0
+
+    async def _fetch_calendar(cal_id: str) -> list[dict[str, Any]]:
+        url = f"{tool.base_url}{_build_path(tool.path, {'calendar_id': cal_id})}"
+        async with semaphore:
+            try:
+                response = await asyncio.wait_for(
+                    client.get(url, headers=headers, params=query_params),
+                    timeout=upstream_timeout(timeout_seconds),
+                )
+            except asyncio.TimeoutError:
+                # One slow calendar must not hold the whole answer; the request deadline still applies.
+                return []
         if response.status_code >= 400:
-            continue
+            return []
         extra = _parse_response_data(response)
         if extra.get("ok") is not True or not isinstance(extra.get("data"), dict):
-            continue
+            return []
         filtered = _filter_google_events_by_time_range(payload, query_params, dict(extra.get("data") or {}))
         sub_items = filtered.get("items") or []
         if not isinstance(sub_items, list):
-            continue
-        for item in sub_items:
-            if isinstance(item, dict):
-                merged.append(item)
+            return []
+        return [item for item in sub_items if isinstance(item, dict)]
+
+    # Each calendar is parsed as its response lands; the merge keeps calendar order so output is stable.
+    fetched = await asyncio.gather(*(_fetch_calendar(cal_id) for cal_id in calendar_ids))
+    merged = [item for sub_items in fetched for item in sub_items]
 
     if not merged:
         return parsed
@@ -180,9 +239,26 @@ async def _fetch_google_calendar_events_with_primary_fallback(
     return {"ok": True, "data": data}
 
 
+@lru_cache(maxsize=8)
+def _token_vault(raw_key: str | None) -> TokenVault:
+    return TokenVault(raw_key)
+
+
 def _load_oauth_access_token(user_id: str, provider: str) -> str:
+    return get_oauth_token_cache().get_or_load(
+        user_id, provider, lambda: _fetch_oauth_access_token(user_id=user_id, provider=provider)
+    )
+
+
+def _reload_oauth_access_token(user_id: str, provider: str) -> str:
+    # The cached token was rejected (e.g. revoked on reconnect); go back to the table.
+    invalidate_oauth_token(user_id, provider)
+    return _load_oauth_access_token(user_id=user_id, provider=provider)
+
+
+def _fetch_oauth_access_token(user_id: str, provider: str) -> str:
     settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     result = (
         supabase.table("oauth_tokens")
         .select("access_token_encrypted")
@@ -203,7 +279,7 @@ def _load_oauth_access_token(user_id: str, provider: str) -> str:
     # NOTE:
     # Current prototype stores encrypted token in a shared column; notion key is used as vault key.
     # When provider-specific keys are introduced, switch this branch by provider.
-    return TokenVault(settings.notion_token_encryption_key).decrypt(encrypted)
+    return _token_vault(settings.notion_token_encryption_key).decrypt(encrypted)
 
 
 def _notion_headers(token: str) -> dict[str, str]:
@@ -245,21 +321,25 @@ def _parse_response_data(response: httpx.Response) -> dict[str, Any]:
 
 
 def _extract_path_params(path: str) -> list[str]:
-    return re.findall(r"{([a-zA-Z0-9_]+)}", path)
+    return list(path_template(path).params)
 
 
 def _build_path(path: str, payload: dict[str, Any]) -> str:
-    rendered = path
-    for key in _extract_path_params(path):
+    template = path_template(path)
+    rendered: list[str] = []
+    for literal, key in template.parts:
+        rendered.append(literal)
+        if not key:
+            continue
         value = payload.get(key)
         if value is None or value == "":
             raise HTTPException(status_code=400, detail=f"missing_path_param:{key}")
-        rendered = rendered.replace(f"{{{key}}}", str(value))
-    return rendered
+        rendered.append(str(value))
+    return "".join(rendered)
 
 
 def _strip_path_params(path: str, payload: dict[str, Any]) -> dict[str, Any]:
-    used = set(_extract_path_params(path))
+    used = path_template(path).params
     return {k: v for k, v in payload.items() if k not in used}
 
 
@@ -269,62 +349,9 @@ def _split_idempotency_key(payload: dict[str, Any]) -> tuple[dict[str, Any], str
     return body, key
 
 
-def _schema_to_python_type(spec: dict[str, Any]):
-    expected = spec.get("type")
-    enum_values = spec.get("enum")
-    if isinstance(enum_values, list) and enum_values:
-        # pydantic literal handles enum constraints with clear error categories.
-        return Literal[tuple(enum_values)]  # type: ignore[misc,valid-type]
-    if expected == "string":
-        return str
-    if expected == "integer":
-        return int
-    if expected == "number":
-        return float
-    if expected == "boolean":
-        return bool
-    if expected == "array":
-        return list[Any]
-    if expected == "object":
-        return dict[str, Any]
-    return Any
-
-
-def _build_payload_model(tool: ToolDefinition):
-    schema = tool.input_schema or {}
-    properties = schema.get("properties", {})
-    required_fields = set(schema.get("required", []))
-    fields: dict[str, tuple[Any, Any]] = {}
-    for key, raw_spec in properties.items():
-        spec = raw_spec if isinstance(raw_spec, dict) else {}
-        py_type = _schema_to_python_type(spec)
-        if key in required_fields:
-            annotation = py_type
-            default = ...
-        else:
-            annotation = py_type | None
-            default = None
-        constraints: dict[str, Any] = {}
-        if spec.get("type") in {"integer", "number"}:
-            if spec.get("minimum") is not None:
-                constraints["ge"] = spec.get("minimum")
-            if spec.get("maximum") is not None:
-                constraints["le"] = spec.get("maximum")
-        fields[key] = (annotation, Field(default=default, **constraints))
-
-    model = create_model(  # type: ignore[call-overload]
-        f"ToolPayloadModel_{tool.tool_name}",
-        __base__=BaseModel,
-        __config__=ConfigDict(extra="ignore"),
-        **fields,
-    )
-    return model
-
-
 def _validate_payload_by_schema(tool: ToolDefinition, payload: dict[str, Any]) -> None:
-    model = _build_payload_model(tool)
     try:
-        model.model_validate(payload)
+        tool.payload_model.model_validate(payload)
         return
     except ValidationError as exc:
         issues = exc.errors()
@@ -405,7 +432,7 @@ async def _execute_notion_http(user_id: str, tool: ToolDefinition, payload: dict
         headers = _notion_headers(token)
         if idempotency_key:
             headers["Idempotency-Key"] = idempotency_key
-        async with httpx.AsyncClient(timeout=20) as client:
+        async with upstream_client(tool.service, tool.limits) as client:
             if method == "GET":
                 return await client.get(url, headers=headers, params=body_or_query)
             if method == "DELETE":
@@ -419,7 +446,7 @@ async def _execute_notion_http(user_id: str, tool: ToolDefinition, payload: dict
         mapped = tool.error_map.get(str(response.status_code), "TOOL_FAILED")
         if mapped == "AUTH_REQUIRED":
             # Reconnect 직후 토큰 반영 race 완화: 최신 토큰으로 1회 재시도.
-            token = _load_oauth_access_token(user_id=user_id, provider="notion")
+            token = _reload_oauth_access_token(user_id=user_id, provider="notion")
             response = await _request_with_token(token)
 
     if response.status_code >= 400:
@@ -444,18 +471,26 @@ async def _execute_notion_http(user_id: str, tool: ToolDefinition, payload: dict
             f"|message={upstream_message}"
             f"|request_id={upstream_request_id}"
         )
-        raise HTTPException(status_code=400, detail=f"{tool.tool_name}:{mapped}{extra}")
+        raise UpstreamError.from_response(
+            response,
+            tool_name=tool.tool_name,
+            code=mapped,
+            message=upstream_message,
+            upstream_code=upstream_code,
+            request_id=upstream_request_id,
+            detail=f"{tool.tool_name}:{mapped}{extra}",
+        )
     return _parse_response_data(response)
 
 
 async def _execute_notion_oauth_http(tool: ToolDefinition, payload: dict[str, Any]) -> dict[str, Any]:
     url = f"{tool.base_url}{tool.path}"
     headers = _notion_oauth_headers()
-    async with httpx.AsyncClient(timeout=20) as client:
+    async with upstream_client(tool.service, tool.limits) as client:
         response = await client.post(url, headers=headers, json=payload)
     if response.status_code >= 400:
         mapped = tool.error_map.get(str(response.status_code), "TOOL_FAILED")
-        raise HTTPException(status_code=400, detail=f"{tool.tool_name}:{mapped}|status={response.status_code}")
+        raise UpstreamError.from_response(response, tool_name=tool.tool_name, code=mapped)
     return _parse_response_data(response)
 
 
@@ -471,7 +506,7 @@ async def _execute_spotify_http(user_id: str, tool: ToolDefinition, payload: dic
     if idempotency_key:
         headers["Idempotency-Key"] = idempotency_key
     method = tool.method.upper()
-    async with httpx.AsyncClient(timeout=20) as client:
+    async with upstream_client(tool.service, tool.limits) as client:
         if method == "GET":
             response = await client.get(url, headers=headers, params=body_or_query)
         elif method == "DELETE":
@@ -488,10 +523,7 @@ async def _execute_spotify_http(user_id: str, tool: ToolDefinition, payload: dic
             upstream_message = str(err_payload.get("error", {}).get("message", "") or "")
         except JSONDecodeError:
             upstream_message = response.text[:300]
-        raise HTTPException(
-            status_code=400,
-            detail=f"{tool.tool_name}:{mapped}|status={response.status_code}|message={upstream_message}",
-        )
+        raise UpstreamError.from_response(response, tool_name=tool.tool_name, code=mapped, message=upstream_message)
     return _parse_response_data(response)
 
 
@@ -713,7 +745,7 @@ async def _execute_linear_http(user_id: str, tool: ToolDefinition, payload: dict
         }
         if idempotency_key:
             headers["Idempotency-Key"] = idempotency_key
-        async with httpx.AsyncClient(timeout=20) as client:
+        async with upstream_client(tool.service, tool.limits) as client:
             return await client.post(url, headers=headers, json={"query": query, "variables": variables})
 
     token = _load_oauth_access_token(user_id=user_id, provider="linear")
@@ -722,7 +754,7 @@ async def _execute_linear_http(user_id: str, tool: ToolDefinition, payload: dict
     if response.status_code >= 400:
         mapped = tool.error_map.get(str(response.status_code), "TOOL_FAILED")
         if mapped == "AUTH_REQUIRED":
-            token = _load_oauth_access_token(user_id=user_id, provider="linear")
+            token = _reload_oauth_access_token(user_id=user_id, provider="linear")
             response = await _request_with_token(token)
             if response.status_code < 400:
                 try:
@@ -740,10 +772,7 @@ async def _execute_linear_http(user_id: str, tool: ToolDefinition, payload: dict
             sorted(payload.keys()),
             response.text[:500],
         )
-        raise HTTPException(
-            status_code=400,
-            detail=f"{tool.tool_name}:{mapped}|status={response.status_code}|message={response.text[:300]}",
-        )
+        raise UpstreamError.from_response(response, tool_name=tool.tool_name, code=mapped, message=response.text[:300])
 
     try:
         data = response.json()
@@ -760,7 +789,7 @@ async def _execute_linear_http(user_id: str, tool: ToolDefinition, payload: dict
             code = str((first.get("extensions") or {}).get("code") or "")
             if code == "AUTHENTICATION_ERROR":
                 mapped = "AUTH_REQUIRED"
-                token = _load_oauth_access_token(user_id=user_id, provider="linear")
+                token = _reload_oauth_access_token(user_id=user_id, provider="linear")
                 retry_response = await _request_with_token(token)
                 if retry_response.status_code < 400:
                     try:
@@ -785,23 +814,131 @@ async def _execute_linear_http(user_id: str, tool: ToolDefinition, payload: dict
     return {"ok": True, "data": data.get("data", {})}
 
 
-def _extract_html_title(html: str) -> str:
-    match = re.search(r"(?is)<title[^>]*>(.*?)</title>", html or "")
-    if not match:
+_WEB_FETCH_MAX_BYTES = 2 * 1024 * 1024
+_WEB_FETCH_SNIFF_BYTES = 1024
+_WEB_TEXT_CONTENT_MARKERS = ("text/", "html", "xml", "json", "javascript", "ecmascript")
+# Magic numbers for common binaries served as application/octet-stream or with no content type.
+_BINARY_SIGNATURES = (b"%PDF", b"\x89PNG", b"GIF8", b"\xff\xd8\xff", b"PK\x03\x04", b"\x1f\x8b", b"RIFF", b"\x00\x00\x01\x00")
+
+
+_TRAILING_WORD = re.compile(r"\S+\Z")
+
+
+class _TextBudget:
+    """Collects whitespace-collapsed text until ``max_chars`` are in hand."""
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self._pieces: list[str] = []
+        self._length = 0
+        self._carry = ""
+
+    @property
+    def done(self) -> bool:
+        return self._length >= self.max_chars
+
+    def add_text(self, data: str) -> None:
+        # A word can straddle two network chunks; hold its head back until the next whitespace or tag.
+        data = self._carry + data
+        match = _TRAILING_WORD.search(data)
+        self._carry = match.group(0) if match else ""
+        self._append(data[: match.start()] if match else data)
+
+    def end_word(self) -> None:
+        carry, self._carry = self._carry, ""
+        self._append(carry)
+
+    def _append(self, data: str) -> None:
+        words = data.split()
+        if words:
+            piece = " ".join(words)
+            self._pieces.append(piece)
+            self._length += len(piece) + 1
+
+    def title(self) -> str:
         return ""
-    return re.sub(r"\s+", " ", unescape(match.group(1))).strip()
 
+    def text(self) -> str:
+        return " ".join(self._pieces)[: self.max_chars]
+
+
+class _PlainTextExtractor(_TextBudget):
+    def feed(self, data: str) -> None:
+        self.add_text(data)
+
+    def close(self) -> None:
+        self.end_word()
 
-def _extract_readable_text(html: str) -> str:
-    raw = html or ""
-    # Remove script/style/noscript blocks first.
-    raw = re.sub(r"(?is)<script[^>]*>.*?</script>", " ", raw)
-    raw = re.sub(r"(?is)<style[^>]*>.*?</style>", " ", raw)
-    raw = re.sub(r"(?is)<noscript[^>]*>.*?</noscript>", " ", raw)
-    # Remove all tags.
-    raw = re.sub(r"(?is)<[^>]+>", " ", raw)
-    raw = unescape(raw)
-    return re.sub(r"\s+", " ", raw).strip()
+
+class _ReadableTextExtractor(HTMLParser, _TextBudget):
+    """Incremental HTML-to-text: tags and comments become word breaks, script/style/noscript
+    bodies are dropped and the first <title> is kept. Feed it chunks as they arrive."""
+
+    _SKIPPED_TAGS = frozenset({"script", "style", "noscript"})
+
+    def __init__(self, max_chars: int):
+        HTMLParser.__init__(self, convert_charrefs=True)
+        _TextBudget.__init__(self, max_chars)
+        self._skip_depth = 0
+        self._title: list[str] | None = None
+        self._title_closed = False
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        self.end_word()
+        if tag in self._SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag == "title" and self._title is None:
+            self._title = []
+
+    def handle_endtag(self, tag: str) -> None:
+        self.end_word()
+        if tag in self._SKIPPED_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == "title" and self._title is not None:
+            self._title_closed = True
+
+    def handle_comment(self, data: str) -> None:
+        self.end_word()
+
+    def handle_data(self, data: str) -> None:
+        if self._skip_depth:
+            return
+        if self._title is not None and not self._title_closed:
+            self._title.append(data)
+        self.add_text(data)
+
+    def close(self) -> None:
+        HTMLParser.close(self)
+        self.end_word()
+
+    def title(self) -> str:
+        return " ".join("".join(self._title or []).split())
+
+
+def _is_text_content_type(content_type: str) -> bool | None:
+    """True/False from the header alone; None when only the body can tell (missing or octet-stream)."""
+    media_type = content_type.split(";", 1)[0].strip()
+    if not media_type or media_type == "application/octet-stream":
+        return None
+    return any(marker in media_type for marker in _WEB_TEXT_CONTENT_MARKERS)
+
+
+def _looks_binary(prefix: bytes) -> bool:
+    return prefix.startswith(_BINARY_SIGNATURES) or b"\x00" in prefix[:_WEB_FETCH_SNIFF_BYTES]
+
+
+def _looks_like_html(prefix: str) -> bool:
+    head = prefix.lstrip()[:64].lower()
+    return head.startswith("<!doctype html") or head.startswith("<html")
+
+
+async def _read_prefix(response: httpx.Response, limit: int) -> bytes:
+    prefix = b""
+    async for chunk in response.aiter_bytes():
+        prefix += chunk
+        if len(prefix) >= limit:
+            break
+    return prefix[:limit]
 
 
 def _match_canva_folder_result(item: dict[str, Any], query: str) -> bool:
@@ -828,36 +965,68 @@ async def _execute_web_http(_user_id: str, _tool: ToolDefinition, payload: dict[
     max_chars = int(payload.get("max_chars", 8000))
     max_chars = max(500, min(20000, max_chars))
 
-    async with httpx.AsyncClient(timeout=20, follow_redirects=True) as client:
-        response = await client.get(url, headers={"User-Agent": "metel/1.0 (+https://metel.app)"})
-
-    if response.status_code >= 400:
-        raise HTTPException(
-            status_code=400,
-            detail=f"http_fetch_url_text:TOOL_FAILED|status={response.status_code}|message={response.text[:200]}",
-        )
-
-    content_type = str(response.headers.get("content-type", "")).lower()
-    body = response.text or ""
-    if "html" in content_type:
-        title = _extract_html_title(body)
-        text = _extract_readable_text(body)
-    else:
-        title = ""
-        text = re.sub(r"\s+", " ", body).strip()
+    max_bytes = max(1, int((_tool.limits or {}).get("max_response_bytes", _WEB_FETCH_MAX_BYTES)))
+    unsupported = HTTPException(status_code=400, detail="http_fetch_url_text:BAD_REQUEST|message=unsupported_content_type")
+
+    async with upstream_client(_tool.service, _tool.limits, follow_redirects=True) as client:
+        async with client.stream("GET", url, headers={"User-Agent": "metel/1.0 (+https://metel.app)"}) as response:
+            if response.status_code >= 400:
+                preview = await _read_prefix(response, _WEB_FETCH_SNIFF_BYTES)
+                raise UpstreamError.from_response(
+                    response,
+                    tool_name="http_fetch_url_text",
+                    code="TOOL_FAILED",
+                    message=preview.decode(response.encoding or "utf-8", errors="replace")[:200],
+                )
 
+            content_type = str(response.headers.get("content-type", "")).lower()
+            is_text = _is_text_content_type(content_type)
+            if is_text is False:
+                # Images, archives, media: refuse before downloading a single body byte.
+                raise unsupported
+            try:
+                decoder = codecs.getincrementaldecoder(response.charset_encoding or "utf-8")(errors="replace")
+            except LookupError:
+                decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+            extractor: _TextBudget | None = None
+            received = 0
+            truncated = False
+            async for chunk in response.aiter_bytes():
+                if received + len(chunk) > max_bytes:
+                    chunk = chunk[: max_bytes - received]
+                    truncated = True
+                received += len(chunk)
+                decoded = decoder.decode(chunk)
+                if extractor is None:
+                    if is_text is None and _looks_binary(chunk):
+                        raise unsupported
+                    is_html = "html" in content_type or (is_text is None and _looks_like_html(decoded))
+                    extractor = _ReadableTextExtractor(max_chars) if is_html else _PlainTextExtractor(max_chars)
+                extractor.feed(decoded)
+                if truncated or extractor.done:
+                    # Closing the stream early drops the rest of the body instead of downloading it.
+                    truncated = True
+                    break
+            final_url = str(response.url)
+
+    if extractor is None:
+        raise HTTPException(status_code=400, detail="http_fetch_url_text:NOT_FOUND|message=empty_text")
+    extractor.feed(decoder.decode(b"", final=True))
+    extractor.close()
+    text = extractor.text()
     if not text:
         raise HTTPException(status_code=400, detail="http_fetch_url_text:NOT_FOUND|message=empty_text")
 
-    text = text[:max_chars]
     return {
         "ok": True,
         "data": {
             "url": url,
-            "final_url": str(response.url),
-            "title": title,
+            "final_url": final_url,
+            "title": extractor.title(),
             "text": text,
             "content_type": content_type,
+            "truncated": truncated,
         },
     }
 
@@ -884,7 +1053,7 @@ async def _execute_canva_http(user_id: str, tool: ToolDefinition, payload: dict[
         headers["Idempotency-Key"] = idempotency_key
     method = tool.method.upper()
 
-    async with httpx.AsyncClient(timeout=20) as client:
+    async with upstream_client(tool.service, tool.limits) as client:
         if method == "GET":
             response = await client.get(url, headers=headers, params=body_or_query)
         elif method == "DELETE":
@@ -895,10 +1064,7 @@ async def _execute_canva_http(user_id: str, tool: ToolDefinition, payload: dict[
 
     if response.status_code >= 400:
         mapped = tool.error_map.get(str(response.status_code), "TOOL_FAILED")
-        raise HTTPException(
-            status_code=400,
-            detail=f"{tool.tool_name}:{mapped}|status={response.status_code}|message={response.text[:300]}",
-        )
+        raise UpstreamError.from_response(response, tool_name=tool.tool_name, code=mapped, message=response.text[:300])
     parsed = _parse_response_data(response)
     data = parsed.get("data") if isinstance(parsed, dict) else None
     if isinstance(data, dict):
@@ -1114,7 +1280,7 @@ async def _execute_generic_http(user_id: str, tool: ToolDefinition, payload: dic
         headers["Idempotency-Key"] = idempotency_key
     method = tool.method.upper()
 
-    async with httpx.AsyncClient(timeout=20) as client:
+    async with upstream_client(tool.service, tool.limits) as client:
         if method == "GET":
             response = await client.get(url, headers=headers, params=body_or_query)
         elif method == "DELETE":
@@ -1123,27 +1289,30 @@ async def _execute_generic_http(user_id: str, tool: ToolDefinition, payload: dic
             headers["Content-Type"] = "application/json"
             response = await client.request(method, url, headers=headers, json=body_or_query)
 
-    if response.status_code >= 400:
-        mapped = tool.error_map.get(str(response.status_code), "TOOL_FAILED")
-        raise HTTPException(status_code=400, detail=f"{tool.tool_name}:{mapped}")
-    parsed = _parse_response_data(response)
-    if (
-        tool.service == "google"
-        and tool.tool_name == "google_calendar_list_events"
-        and parsed.get("ok") is True
-        and isinstance(parsed.get("data"), dict)
-    ):
-        if method == "GET":
-            async with httpx.AsyncClient(timeout=20) as client:
+        if response.status_code >= 400:
+            mapped = tool.error_map.get(str(response.status_code), "TOOL_FAILED")
+            # detail stays status-free as before; the retry engine reads the status from the error itself.
+            raise UpstreamError.from_response(
+                response, tool_name=tool.tool_name, code=mapped, detail=f"{tool.tool_name}:{mapped}"
+            )
+        parsed = _parse_response_data(response)
+        if (
+            tool.service == "google"
+            and tool.tool_name == "google_calendar_list_events"
+            and parsed.get("ok") is True
+            and isinstance(parsed.get("data"), dict)
+        ):
+            if method == "GET":
                 parsed = await _fetch_google_calendar_events_with_primary_fallback(
                     client=client,
+                    user_id=user_id,
                     tool=tool,
                     headers=headers,
                     payload=payload,
                     query_params=body_or_query,
                     parsed=parsed,
                 )
-        parsed["data"] = _filter_google_events_by_time_range(payload, body_or_query, dict(parsed["data"]))
+            parsed["data"] = _filter_google_events_by_time_range(payload, body_or_query, dict(parsed["data"]))
     return parsed
 
 
@@ -1175,12 +1344,90 @@ def _normalize_payload_for_tool(tool: ToolDefinition, payload: dict[str, Any]) -
     return normalized
 
 
+def _upstream_limits(tool: ToolDefinition) -> UpstreamLimits:
+    limits = tool.limits or {}
+    return UpstreamLimits(
+        max_concurrency=int(limits.get("max_concurrency", 0)),
+        requests_per_second=float(limits.get("requests_per_second", 0)),
+        burst=int(limits.get("burst", 0)),
+        queue_timeout_ms=int(limits.get("queue_timeout_ms", 10000)),
+    )
+
+
+async def _dispatch_tool(user_id: str, tool: ToolDefinition, payload: dict[str, Any]) -> dict[str, Any]:
+    executor = _SERVICE_EXECUTORS.get(tool.service)
+
+    async def _call() -> dict[str, Any]:
+        try:
+            if executor:
+                return await executor(user_id, tool, payload)
+            return await _execute_generic_http(user_id=user_id, tool=tool, payload=payload)
+        except httpx.TimeoutException as exc:
+            # A timeout shrunk to the request deadline is the deadline, not an upstream outage.
+            if deadline_exceeded():
+                raise deadline_error(tool.tool_name) from exc
+            raise
+        except UpstreamError as exc:
+            # A rejected token must not be served from cache to the caller's next retry.
+            if exc.code == "AUTH_REQUIRED":
+                invalidate_oauth_token(user_id, tool.service)
+            raise
+
+    async def _queued() -> dict[str, Any]:
+        if not upstream_bulkheads_enabled():
+            return await _call()
+        return await get_upstream_bulkheads().run(
+            user_id=user_id,
+            service=tool.service,
+            limits=_upstream_limits(tool),
+            operation=_call,
+        )
+
+    async def _guarded() -> dict[str, Any]:
+        # The breaker sits outside the bulkhead so an open circuit fails fast instead of queueing.
+        if not circuit_breaker_enabled():
+            return await _queued()
+        return await get_circuit_breakers().call(
+            service=tool.service,
+            user_id=user_id,
+            tool_name=tool.tool_name,
+            operation=_queued,
+        )
+
+    return await run_within_deadline(tool.tool_name, _guarded)
+
+
 async def execute_tool(user_id: str, tool_name: str, payload: dict[str, Any]) -> dict[str, Any]:
     registry = load_registry()
     tool = registry.get_tool(tool_name)
     payload = _normalize_payload_for_tool(tool, payload)
     _validate_payload_by_schema(tool, payload)
-    executor = _SERVICE_EXECUTORS.get(tool.service)
-    if executor:
-        return await executor(user_id, tool, payload)
-    return await _execute_generic_http(user_id=user_id, tool=tool, payload=payload)
+    cache = get_tool_result_cache()
+    result = await cache.read_through(
+        user_id=user_id,
+        service=tool.service,
+        tool_name=tool.tool_name,
+        ttl_seconds=tool.cache_ttl_seconds,
+        payload=payload,
+        load=lambda: _dispatch_tool(user_id, tool, payload),
+    )
+    if not tool.read_only:
+        cache.invalidate(user_id=user_id, service=tool.service)
+    return result
+
+
+def next_page_payload(tool_name: str, payload: dict[str, Any], result: dict[str, Any]) -> dict[str, Any] | None:
+    """Payload for the next page of a cursor-paginated result, or None when it was the last page.
+
+    Only Notion list endpoints (``has_more`` / ``next_cursor`` -> ``start_cursor``) paginate this way today.
+    """
+    tool = load_registry().get_tool(tool_name)
+    if tool.service != "notion" or "start_cursor" not in (tool.input_schema.get("properties") or {}):
+        return None
+    data = result.get("data") if isinstance(result, dict) else None
+    if not isinstance(data, dict) or not data.get("has_more"):
+        return None
+    cursor = data.get("next_cursor")
+    if not isinstance(cursor, str) or not cursor.strip():
+        return None
+    return {**payload, "start_cursor": cursor}
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+from app.core.api_key_cache import InMemoryInvalidationChannel, InvalidationChannel
+from app.core.config import get_settings
+
+_AGENTS_TOPIC = "agents"
+_DEFAULT_TTL_SECONDS = 300.0
+_DEFAULT_MAX_TEAMS = 4096
+
+
+def _as_int(value: Any) -> int | None:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class DefaultAgentIndex:
+    """In-memory team -> default agent (oldest active agent) map used to stamp tool_calls.agent_id.
+
+    The team comes from the authenticated api_keys row, so resolving never looks
+    the key up. Each team's agent is loaded on first use with a query scoped to that
+    team, kept for ``ttl_seconds`` in a bounded LRU, and dropped on agent changes;
+    a load that was in flight during an invalidation is not stored.
+    """
+
+    def __init__(self, *, ttl_seconds: float = _DEFAULT_TTL_SECONDS, max_teams: int = _DEFAULT_MAX_TEAMS, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self.max_teams = max(1, int(max_teams))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._team_agent: OrderedDict[str, tuple[float, int | None]] = OrderedDict()
+        self._generation = 0
+        self.hits = 0
+        self.loads = 0
+
+    def resolve(self, supabase, *, team_id: int | str | None) -> int | None:
+        if team_id is None or str(team_id) == "":
+            return None
+        team_key = str(team_id)
+        now = self._clock()
+        with self._lock:
+            generation = self._generation
+            entry = self._team_agent.get(team_key)
+            if entry is not None and entry[0] > now:
+                self._team_agent.move_to_end(team_key)
+                self.hits += 1
+                return entry[1]
+        agent_id = self._load_team_agent(supabase, team_key)
+        with self._lock:
+            self.loads += 1
+            if self._generation == generation and self.ttl_seconds > 0:
+                self._team_agent[team_key] = (self._clock() + self.ttl_seconds, agent_id)
+                self._team_agent.move_to_end(team_key)
+                while len(self._team_agent) > self.max_teams:
+                    self._team_agent.popitem(last=False)
+        return agent_id
+
+    def invalidate_agents(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._team_agent.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "teams": len(self._team_agent),
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "loads": self.loads,
+            }
+
+    def _load_team_agent(self, supabase, team_key: str) -> int | None:
+        rows = (
+            supabase.table("agents")
+            .select("id")
+            .eq("team_id", team_key)
+            .eq("is_active", True)
+            .order("created_at", desc=False)
+            .limit(1)
+            .execute()
+        ).data or []
+        return _as_int(rows[0].get("id")) if rows else None
+
+    def _on_invalidation(self, _topic: str) -> None:
+        self.invalidate_agents()
+
+
+_lock = threading.Lock()
+_index: DefaultAgentIndex | None = None
+_channel: InvalidationChannel | None = None
+
+
+def get_default_agent_index() -> DefaultAgentIndex:
+    global _index, _channel
+    index = _index
+    if index is not None:
+        return index
+    with _lock:
+        if _index is None:
+            try:
+                settings = get_settings()
+            except Exception:
+                settings = None
+            _index = DefaultAgentIndex(
+                ttl_seconds=float(getattr(settings, "agent_index_ttl_seconds", _DEFAULT_TTL_SECONDS)),
+                max_teams=int(getattr(settings, "agent_index_max_teams", _DEFAULT_MAX_TEAMS)),
+            )
+            if _channel is None:
+                _channel = InMemoryInvalidationChannel()
+            _channel.subscribe(_index._on_invalidation)
+        return _index
+
+
+def set_agent_index_invalidation_channel(channel: InvalidationChannel) -> None:
+    global _channel
+    with _lock:
+        _channel = channel
+        if _index is not None:
+            channel.subscribe(_index._on_invalidation)
+
+
+def _publish(topic: str) -> None:
+    get_default_agent_index()
+    channel = _channel
+    if channel is not None:
+        channel.publish(topic)
+
+
+def resolve_default_agent_id(*, supabase, team_id: int | str | None) -> int | None:
+    return get_default_agent_index().resolve(supabase, team_id=team_id)
+
+
+def invalidate_team_agents() -> None:
+    """Call after agents are created, updated or removed."""
+    _publish(_AGENTS_TOPIC)
+
+
+def invalidate_default_agent_index() -> None:
+    _publish("all")
+
+
+def reset_default_agent_index() -> None:
+    global _index, _channel
+    with _lock:
+        _index = None
+        _channel = None
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Protocol
+
+from app.core.config import get_settings
+
+_DEFAULT_TTL_SECONDS = 30.0
+_DEFAULT_MAX_ENTRIES = 2048
+
+
+class InvalidationChannel(Protocol):
+    """Fan-out for api_keys invalidations so every worker drops its cached row."""
+
+    def publish(self, key_id: str) -> None: ...
+
+    def subscribe(self, callback: Callable[[str], None]) -> None: ...
+
+
+class InMemoryInvalidationChannel:
+    """Single-process channel; swap in a Redis/Postgres NOTIFY backed one for multi-worker deployments."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subscribers: list[Callable[[str], None]] = []
+
+    def publish(self, key_id: str) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            callback(key_id)
+
+    def subscribe(self, callback: Callable[[str], None]) -> None:
+        with self._lock:
+            self._subscribers.append(callback)
+
+
+class ApiKeyAuthCache:
+    """TTL + LRU cache of api_keys rows keyed by key_hash, invalidated by key id.
+
+    The key id is only known once the row is loaded, so every invalidation bumps a
+    cache-wide generation; a row loaded across an invalidation (e.g. a revoke racing
+    an auth miss) is not stored.
+    """
+
+    def __init__(self, *, ttl_seconds: float, max_entries: int, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self.max_entries = max(1, int(max_entries))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._hash_by_key_id: dict[str, str] = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def get(self, key_hash: str) -> dict[str, Any] | None:
+        return self.lookup(key_hash)[0]
+
+    def lookup(self, key_hash: str) -> tuple[dict[str, Any] | None, int]:
+        """Return ``(row or None, generation)``; pass the generation back to ``put``."""
+        if not self.enabled:
+            return None, 0
+        now = self._clock()
+        with self._lock:
+            generation = self._generation
+            entry = self._entries.get(key_hash)
+            if entry is None:
+                self.misses += 1
+                return None, generation
+            expires_at, row = entry
+            if expires_at <= now:
+                self._drop(key_hash)
+                self.misses += 1
+                return None, generation
+            self._entries.move_to_end(key_hash)
+            self.hits += 1
+            return dict(row), generation
+
+    def put(self, key_hash: str, row: dict[str, Any], *, generation: int | None = None) -> None:
+        if not self.enabled:
+            return
+        key_id = str(row.get("id") or "")
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            if key_hash in self._entries:
+                self._drop(key_hash)
+            self._entries[key_hash] = (self._clock() + self.ttl_seconds, dict(row))
+            if key_id:
+                self._hash_by_key_id[key_id] = key_hash
+            while len(self._entries) > self.max_entries:
+                oldest, _ = next(iter(self._entries.items()))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def invalidate_key_id(self, key_id: str | int) -> None:
+        with self._lock:
+            self._generation += 1
+            key_hash = self._hash_by_key_id.get(str(key_id))
+            if key_hash is not None:
+                self._drop(key_hash)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._hash_by_key_id.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            size = len(self._entries)
+        return {
+            "size": size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def _drop(self, key_hash: str) -> None:
+        entry = self._entries.pop(key_hash, None)
+        if entry is None:
+            return
+        key_id = str(entry[1].get("id") or "")
+        if key_id and self._hash_by_key_id.get(key_id) == key_hash:
+            self._hash_by_key_id.pop(key_id, None)
+
+
+_lock = threading.Lock()
+_cache: ApiKeyAuthCache | None = None
+_channel: InvalidationChannel | None = None
+
+
+def _cache_settings() -> tuple[float, int]:
+    try:
+        settings = get_settings()
+    except Exception:
+        return _DEFAULT_TTL_SECONDS, _DEFAULT_MAX_ENTRIES
+    return (
+        float(getattr(settings, "mcp_api_key_cache_ttl_seconds", _DEFAULT_TTL_SECONDS)),
+        int(getattr(settings, "mcp_api_key_cache_max_entries", _DEFAULT_MAX_ENTRIES)),
+    )
+
+
+def get_api_key_cache() -> ApiKeyAuthCache:
+    global _cache, _channel
+    cache = _cache
+    if cache is not None:
+        return cache
+    with _lock:
+        if _cache is None:
+            ttl_seconds, max_entries = _cache_settings()
+            _cache = ApiKeyAuthCache(ttl_seconds=ttl_seconds, max_entries=max_entries)
+            if _channel is None:
+                _channel = InMemoryInvalidationChannel()
+            _channel.subscribe(_cache.invalidate_key_id)
+        return _cache
+
+
+def set_invalidation_channel(channel: InvalidationChannel) -> None:
+    """Route invalidations through ``channel`` (e.g. a shared pub/sub) instead of the in-memory default."""
+    global _channel
+    with _lock:
+        _channel = channel
+        if _cache is not None:
+            channel.subscribe(_cache.invalidate_key_id)
+
+
+def invalidate_api_key(key_id: str | int | None) -> None:
+    if key_id is None or str(key_id) == "":
+        return
+    get_api_key_cache()
+    channel = _channel
+    if channel is not None:
+        channel.publish(str(key_id))
+
+
+def reset_api_key_cache() -> None:
+    global _cache, _channel
+    with _lock:
+        _cache = None
+        _channel = None
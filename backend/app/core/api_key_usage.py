@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any
+
+from app.core.config import get_settings
+from app.core.db import get_supabase_client, run_db
+
+logger = logging.getLogger("metel-backend.api_key_usage")
+
+_DEFAULT_FLUSH_SECONDS = 5.0
+_DEFAULT_MAX_PENDING = 10000
+
+
+class LastUsedWriteBehind:
+    """Coalesces api_keys.last_used_at touches and writes them back in bulk."""
+
+    def __init__(self, *, max_pending: int = _DEFAULT_MAX_PENDING):
+        self.max_pending = max(1, int(max_pending))
+        self._lock = threading.Lock()
+        self._pending: dict[str, datetime] = {}
+        self.touched = 0
+        self.coalesced = 0
+        self.flushed = 0
+        self.dropped = 0
+        self.flush_errors = 0
+
+    def touch(self, key_id: str | int, when: datetime | None = None) -> None:
+        stamp = when or datetime.now(timezone.utc)
+        key = str(key_id)
+        with self._lock:
+            self.touched += 1
+            current = self._pending.get(key)
+            if current is not None:
+                self.coalesced += 1
+                if stamp > current:
+                    self._pending[key] = stamp
+                return
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return
+            self._pending[key] = stamp
+
+    def flush(self, supabase, *, final: bool = False) -> int:
+        with self._lock:
+            batch = self._pending
+            self._pending = {}
+        if not batch:
+            return 0
+        # Partial-row upserts trip api_keys NOT NULL columns, so write one
+        # `update ... where id in (...)` per distinct second instead.
+        groups: dict[str, list[str]] = {}
+        for key_id, stamp in batch.items():
+            groups.setdefault(stamp.replace(microsecond=0).isoformat(), []).append(key_id)
+        written = 0
+        for stamp_iso, key_ids in sorted(groups.items()):
+            try:
+                supabase.table("api_keys").update({"last_used_at": stamp_iso}).in_("id", key_ids).execute()
+                written += len(key_ids)
+            except Exception:
+                logger.exception("api_key_last_used_flush_failed keys=%s", len(key_ids))
+                with self._lock:
+                    self.flush_errors += 1
+                    if final:
+                        self.dropped += len(key_ids)
+                        continue
+                    for key_id in key_ids:
+                        stamp = batch[key_id]
+                        current = self._pending.get(key_id)
+                        if current is None or current < stamp:
+                            self._pending[key_id] = stamp
+        with self._lock:
+            self.flushed += written
+        return written
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "pending": pending,
+            "touched": self.touched,
+            "coalesced": self.coalesced,
+            "flushed": self.flushed,
+            "dropped": self.dropped,
+            "flush_errors": self.flush_errors,
+        }
+
+
+def _writer_settings() -> tuple[float, int]:
+    try:
+        settings = get_settings()
+    except Exception:
+        return _DEFAULT_FLUSH_SECONDS, _DEFAULT_MAX_PENDING
+    return (
+        float(getattr(settings, "mcp_last_used_flush_seconds", _DEFAULT_FLUSH_SECONDS)),
+        int(getattr(settings, "mcp_last_used_max_pending", _DEFAULT_MAX_PENDING)),
+    )
+
+
+_writer = LastUsedWriteBehind(max_pending=_writer_settings()[1])
+_flush_task: asyncio.Task | None = None
+
+
+def record_api_key_use(key_id: str | int) -> None:
+    _writer.touch(key_id)
+
+
+def last_used_writer_stats() -> dict[str, Any]:
+    return _writer.stats()
+
+
+async def _flush_loop(interval_seconds: float) -> None:
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await run_db(_writer.flush, get_supabase_client())
+        except Exception:
+            logger.exception("api_key_last_used_flush_loop_error")
+
+
+def start_last_used_writer() -> None:
+    global _flush_task
+    if _flush_task is not None and not _flush_task.done():
+        return
+    interval_seconds, _ = _writer_settings()
+    _flush_task = asyncio.get_running_loop().create_task(_flush_loop(max(0.5, interval_seconds)))
+
+
+async def stop_last_used_writer() -> None:
+    global _flush_task
+    task = _flush_task
+    _flush_task = None
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    await run_db(_writer.flush, get_supabase_client(), final=True)
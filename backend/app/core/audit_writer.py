@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import deque
+from typing import Any
+
+from app.core.agent_index import resolve_default_agent_id
+from app.core.config import get_settings
+from app.core.db import get_supabase_client, run_db
+
+logger = logging.getLogger("metel-backend.audit_writer")
+
+_DEFAULT_BATCH_SIZE = 100
+_DEFAULT_FLUSH_SECONDS = 1.0
+_DEFAULT_MAX_QUEUE = 10000
+
+
+def _default_spill_path() -> str:
+    return os.path.join(tempfile.gettempdir(), "metel_tool_calls_spill.jsonl")
+
+
+def write_tool_call_rows(supabase, rows: list[dict[str, Any]]) -> None:
+    """Fill in default agent ids from each row's team and insert ``rows`` in a single request.
+
+    ``rows`` are left untouched, so a batch that fails and is spilled keeps its
+    ``team_id`` and can still have its agent resolved on replay.
+    """
+    if not rows:
+        return
+    query = supabase.table("tool_calls")
+    if not hasattr(query, "insert"):
+        return
+    payload: list[dict[str, Any]] = []
+    for row in rows:
+        # team_id rides along from the authenticated key row; tool_calls has no such column.
+        item = {key: value for key, value in row.items() if key != "team_id"}
+        if item.get("agent_id") is None:
+            item["agent_id"] = resolve_default_agent_id(supabase=supabase, team_id=row.get("team_id"))
+        payload.append(item)
+    query.insert(payload if len(payload) > 1 else payload[0]).execute()
+
+
+class ToolCallAuditWriter:
+    """Bounded queue of tool_calls rows flushed in batches by a background task.
+
+    Rows that cannot be queued (queue full) or written (DB error) are appended
+    to a JSONL spill file and replayed after the next successful flush.
+    """
+
+    def __init__(self, *, batch_size: int, flush_seconds: float, max_queue: int, spill_path: str):
+        self.batch_size = max(1, int(batch_size))
+        self.flush_seconds = max(0.05, float(flush_seconds))
+        self.max_queue = max(1, int(max_queue))
+        self.spill_path = spill_path
+        self.replay_path = f"{spill_path}.replay"
+        self.bad_path = f"{spill_path}.bad"
+        self._lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._replay_lock = threading.Lock()
+        self._rows: deque[dict[str, Any]] = deque()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.dropped = 0
+        self.corrupt = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def submit(self, row: dict[str, Any]) -> bool:
+        """Queue ``row``; returns False when no worker is running and the caller should write inline."""
+        if not self.running:
+            return False
+        with self._lock:
+            full = len(self._rows) >= self.max_queue
+            if not full:
+                self._rows.append(row)
+                self.enqueued += 1
+            size = len(self._rows)
+        if full:
+            self._spill([row])
+            return True
+        if size >= self.batch_size and self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+        return True
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = self._loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        task = self._task
+        self._task = None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await self._drain()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            queued = len(self._rows)
+        return {
+            "running": self.running,
+            "queued": queued,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "spilled": self.spilled,
+            "replayed": self.replayed,
+            "dropped": self.dropped,
+            "corrupt": self.corrupt,
+        }
+
+    async def _run(self) -> None:
+        assert self._wake is not None
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self._drain()
+            except Exception:
+                logger.exception("tool_call_audit_flush_loop_error")
+
+    async def _drain(self) -> None:
+        supabase = None
+        flushed_ok = True
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                break
+            supabase = supabase or get_supabase_client()
+            flushed_ok = await run_db(self._write_batch, supabase, batch) and flushed_ok
+        if flushed_ok and (os.path.exists(self.spill_path) or os.path.exists(self.replay_path)):
+            await run_db(self._replay_spill, supabase or get_supabase_client())
+
+    def _take_batch(self) -> list[dict[str, Any]]:
+        with self._lock:
+            count = min(self.batch_size, len(self._rows))
+            return [self._rows.popleft() for _ in range(count)]
+
+    def _write_batch(self, supabase, rows: list[dict[str, Any]]) -> bool:
+        try:
+            write_tool_call_rows(supabase, rows)
+        except Exception:
+            logger.exception("tool_call_audit_batch_failed rows=%s", len(rows))
+            with self._lock:
+                self.failed_batches += 1
+            self._spill(rows)
+            return False
+        with self._lock:
+            self.batches += 1
+            self.written += len(rows)
+        return True
+
+    def _spill(self, rows: list[dict[str, Any]]) -> bool:
+        try:
+            with self._spill_lock, open(self.spill_path, "a", encoding="utf-8") as handle:
+                for row in rows:
+                    handle.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+        except OSError:
+            logger.exception("tool_call_audit_spill_failed rows=%s path=%s", len(rows), self.spill_path)
+            with self._lock:
+                self.dropped += len(rows)
+            return False
+        with self._lock:
+            self.spilled += len(rows)
+        return True
+
+    def _replay_spill(self, supabase) -> None:
+        # A stop() drain can overlap a replay still running on the cancelled worker's thread.
+        if not self._replay_lock.acquire(blocking=False):
+            return
+        try:
+            with self._spill_lock:
+                # A leftover replay file is from an interrupted replay; finish it before taking new spills.
+                if not os.path.exists(self.replay_path):
+                    if not os.path.exists(self.spill_path):
+                        return
+                    os.replace(self.spill_path, self.replay_path)
+            rows = self._read_replay_rows()
+            for start in range(0, len(rows), self.batch_size):
+                chunk = rows[start : start + self.batch_size]
+                if not self._write_batch(supabase, chunk):
+                    # _write_batch already re-spilled this chunk; keep the rest with it. If that
+                    # fails too, leave the replay file in place so no row is lost.
+                    if not self._spill(rows[start + self.batch_size :]):
+                        return
+                    break
+                with self._lock:
+                    self.replayed += len(chunk)
+            os.remove(self.replay_path)
+        finally:
+            self._replay_lock.release()
+
+    def _read_replay_rows(self) -> list[dict[str, Any]]:
+        rows: list[dict[str, Any]] = []
+        bad_lines: list[str] = []
+        with open(self.replay_path, encoding="utf-8") as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    row = None
+                if isinstance(row, dict):
+                    rows.append(row)
+                else:
+                    # e.g. a line truncated by a crash mid-append; set it aside rather than block the replay.
+                    bad_lines.append(line if line.endswith("\n") else line + "\n")
+        if bad_lines:
+            logger.error("tool_call_audit_spill_corrupt_lines lines=%s path=%s", len(bad_lines), self.bad_path)
+            try:
+                with open(self.bad_path, "a", encoding="utf-8") as handle:
+                    handle.writelines(bad_lines)
+            except OSError:
+                logger.exception("tool_call_audit_spill_bad_write_failed path=%s", self.bad_path)
+            with self._lock:
+                self.corrupt += len(bad_lines)
+        return rows
+
+
+def _writer_settings() -> dict[str, Any]:
+    try:
+        settings = get_settings()
+    except Exception:
+        settings = None
+    spill_path = str(getattr(settings, "mcp_audit_spill_path", "") or "").strip()
+    return {
+        "batch_size": int(getattr(settings, "mcp_audit_batch_size", _DEFAULT_BATCH_SIZE)),
+        "flush_seconds": float(getattr(settings, "mcp_audit_flush_seconds", _DEFAULT_FLUSH_SECONDS)),
+        "max_queue": int(getattr(settings, "mcp_audit_max_queue", _DEFAULT_MAX_QUEUE)),
+        "spill_path": spill_path or _default_spill_path(),
+    }
+
+
+_writer = ToolCallAuditWriter(**_writer_settings())
+
+
+def submit_tool_call(supabase, row: dict[str, Any]) -> None:
+    """Queue a tool_calls row for the background writer, or insert it inline when none is running."""
+    if _writer.submit(row):
+        return
+    write_tool_call_rows(supabase, [row])
+
+
+def audit_writer_stats() -> dict[str, Any]:
+    return _writer.stats()
+
+
+def start_audit_writer() -> None:
+    _writer.start()
+
+
+async def stop_audit_writer() -> None:
+    await _writer.stop()
@@ -1,13 +1,14 @@
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass
 from enum import Enum
 
 from fastapi import HTTPException, Request
-from supabase import create_client
 
 from app.core.auth import get_authenticated_user_id
 from app.core.config import get_settings
+from app.core.db import execute_async, get_supabase_client
 
 
 class Role(str, Enum):
@@ -119,6 +120,13 @@ def _resolve_role(*, org_roles: list[str], team_roles: list[str]) -> Role:
     return Role.MEMBER
 
 
+async def _load_membership_rows(supabase, *, table: str, columns: str, user_id: str) -> list[dict]:
+    try:
+        return (await execute_async(supabase.table(table).select(columns).eq("user_id", user_id))).data or []
+    except Exception:
+        return []
+
+
 async def get_authz_context(
     request: Request,
     *,
@@ -131,49 +139,33 @@ async def get_authz_context(
 
     resolved_user_id = user_id or await get_authenticated_user_id(request)
     if supabase is None:
-        settings = get_settings()
-        supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+        supabase = get_supabase_client()
 
     org_ids: set[int] = set()
     team_ids: set[int] = set()
     org_roles: list[str] = []
     team_roles: list[str] = []
 
-    try:
-        org_rows = (
-            supabase.table("org_memberships")
-            .select("organization_id,role")
-            .eq("user_id", resolved_user_id)
-            .execute()
-        ).data or []
-        for row in org_rows:
-            org_id = row.get("organization_id")
-            if org_id is not None:
-                try:
-                    org_ids.add(int(org_id))
-                except (TypeError, ValueError):
-                    pass
-            org_roles.append(_normalize_role(row.get("role")))
-    except Exception:
-        org_rows = []
-
-    try:
-        team_rows = (
-            supabase.table("team_memberships")
-            .select("team_id,role")
-            .eq("user_id", resolved_user_id)
-            .execute()
-        ).data or []
-        for row in team_rows:
-            team_id = row.get("team_id")
-            if team_id is not None:
-                try:
-                    team_ids.add(int(team_id))
-                except (TypeError, ValueError):
-                    pass
-            team_roles.append(_normalize_role(row.get("role")))
-    except Exception:
-        team_rows = []
+    org_rows, team_rows = await asyncio.gather(
+        _load_membership_rows(supabase, table="org_memberships", columns="organization_id,role", user_id=resolved_user_id),
+        _load_membership_rows(supabase, table="team_memberships", columns="team_id,role", user_id=resolved_user_id),
+    )
+    for row in org_rows:
+        org_id = row.get("organization_id")
+        if org_id is not None:
+            try:
+                org_ids.add(int(org_id))
+            except (TypeError, ValueError):
+                pass
+        org_roles.append(_normalize_role(row.get("role")))
+    for row in team_rows:
+        team_id = row.get("team_id")
+        if team_id is not None:
+            try:
+                team_ids.add(int(team_id))
+            except (TypeError, ValueError):
+                pass
+        team_roles.append(_normalize_role(row.get("role")))
 
     role = _resolve_role(org_roles=org_roles, team_roles=team_roles)
     ctx = AuthzContext(user_id=resolved_user_id, role=role, org_ids=org_ids, team_ids=team_ids)
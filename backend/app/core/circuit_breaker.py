@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+import httpx
+from fastapi import HTTPException
+
+from app.core.config import get_settings
+from app.core.upstream_errors import UpstreamError, upstream_status_of
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+SCOPE_SERVICE = "service"
+SCOPE_USER = "user"
+
+# Failures raised by the gateway itself rather than the upstream; they say nothing about its health.
+_LOCAL_MARKERS = (":QUEUE_TIMEOUT", ":CIRCUIT_OPEN", ":DEADLINE_EXCEEDED")
+
+
+@dataclass
+class _Circuit:
+    outcomes: deque[bool]
+    state: str = STATE_CLOSED
+    opened_at: float = 0.0
+    probing: bool = False
+    trips: int = 0
+    rejected: int = 0
+
+
+@dataclass(frozen=True)
+class CircuitBreakerConfig:
+    window: int = 20
+    min_calls: int = 10
+    failure_ratio: float = 0.5
+    open_seconds: float = 30.0
+    scope: str = SCOPE_SERVICE
+
+
+def is_upstream_outage(exc: BaseException) -> bool | None:
+    """True for upstream 5xx / transport failures, False when the upstream answered, None to ignore."""
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if isinstance(exc, HTTPException):
+        detail = str(exc.detail or "")
+        if any(marker in detail for marker in _LOCAL_MARKERS):
+            return None
+        status = upstream_status_of(exc)
+        return status is not None and status >= 500
+    return None
+
+
+class CircuitBreakers:
+    """Per-connector circuit breakers over a sliding window of call outcomes.
+
+    A circuit opens once at least ``min_calls`` of the last ``window`` calls were seen
+    and ``failure_ratio`` of them were upstream outages. While open, calls fail at once
+    with ``<service>:CIRCUIT_OPEN`` and a retry hint. After ``open_seconds`` one probe
+    is let through (half-open); its success closes the circuit, its failure reopens it.
+    With the ``user`` scope each (service, user) pair gets its own circuit, so one
+    broken token does not cut off everyone else.
+    """
+
+    def __init__(self, config: CircuitBreakerConfig, *, clock: Callable[[], float] = time.monotonic):
+        self.config = config
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._circuits: dict[tuple[str, str], _Circuit] = {}
+
+    def _key(self, service: str, user_id: str) -> tuple[str, str]:
+        return (service, str(user_id) if self.config.scope == SCOPE_USER else "")
+
+    def _circuit(self, key: tuple[str, str]) -> _Circuit:
+        circuit = self._circuits.get(key)
+        if circuit is None:
+            circuit = _Circuit(outcomes=deque(maxlen=max(1, self.config.window)))
+            self._circuits[key] = circuit
+        return circuit
+
+    def _retry_after(self, circuit: _Circuit, now: float) -> float:
+        return max(0.0, circuit.opened_at + self.config.open_seconds - now)
+
+    def _admit(self, key: tuple[str, str]) -> tuple[bool, float]:
+        """Return ``(is_probe, retry_after)``; a positive ``retry_after`` means the call is rejected."""
+        with self._lock:
+            circuit = self._circuit(key)
+            now = self._clock()
+            if circuit.state == STATE_OPEN and self._retry_after(circuit, now) <= 0:
+                circuit.state = STATE_HALF_OPEN
+            if circuit.state == STATE_CLOSED:
+                return False, 0.0
+            if circuit.state == STATE_HALF_OPEN and not circuit.probing:
+                circuit.probing = True
+                return True, 0.0
+            circuit.rejected += 1
+            # A probe is already out; ask callers to come back shortly rather than after a full period.
+            retry_after = self._retry_after(circuit, now) if circuit.state == STATE_OPEN else 1.0
+            return False, max(retry_after, 0.001)
+
+    def _record(self, key: tuple[str, str], *, outage: bool | None, probe: bool) -> None:
+        with self._lock:
+            circuit = self._circuit(key)
+            if probe:
+                circuit.probing = False
+                if outage is None:
+                    return
+                if outage:
+                    circuit.state = STATE_OPEN
+                    circuit.opened_at = self._clock()
+                    circuit.trips += 1
+                else:
+                    circuit.state = STATE_CLOSED
+                    circuit.outcomes.clear()
+                return
+            if outage is None or circuit.state != STATE_CLOSED:
+                return
+            circuit.outcomes.append(bool(outage))
+            calls = len(circuit.outcomes)
+            failures = sum(circuit.outcomes)
+            if calls >= self.config.min_calls and failures / calls >= self.config.failure_ratio:
+                circuit.state = STATE_OPEN
+                circuit.opened_at = self._clock()
+                circuit.trips += 1
+                circuit.outcomes.clear()
+
+    async def call(
+        self,
+        *,
+        service: str,
+        user_id: str,
+        tool_name: str,
+        operation: Callable[[], Awaitable[Any]],
+    ):
+        key = self._key(service, user_id)
+        probe, retry_after = self._admit(key)
+        if retry_after > 0:
+            raise UpstreamError(
+                tool_name=tool_name,
+                code="CIRCUIT_OPEN",
+                status=None,
+                retry_after_seconds=retry_after,
+                detail=f"{service}:CIRCUIT_OPEN|retry_after_ms={int(retry_after * 1000)}",
+            )
+        try:
+            result = await operation()
+        except asyncio.CancelledError:
+            self._record(key, outage=None, probe=probe)
+            raise
+        except Exception as exc:
+            self._record(key, outage=is_upstream_outage(exc), probe=probe)
+            raise
+        self._record(key, outage=False, probe=probe)
+        return result
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Per-service view; with the user scope, the worst circuit for the service wins."""
+        rank = {STATE_CLOSED: 0, STATE_HALF_OPEN: 1, STATE_OPEN: 2}
+        now = self._clock()
+        result: dict[str, dict[str, Any]] = {}
+        with self._lock:
+            for (service, _user), circuit in self._circuits.items():
+                state = circuit.state
+                if state == STATE_OPEN and self._retry_after(circuit, now) <= 0:
+                    state = STATE_HALF_OPEN
+                item = result.setdefault(
+                    service,
+                    {"state": STATE_CLOSED, "open_circuits": 0, "retry_after_ms": 0, "trips": 0, "rejected": 0},
+                )
+                if rank[state] > rank[item["state"]]:
+                    item["state"] = state
+                if state != STATE_CLOSED:
+                    item["open_circuits"] += 1
+                if state == STATE_OPEN:
+                    item["retry_after_ms"] = max(item["retry_after_ms"], int(self._retry_after(circuit, now) * 1000))
+                item["trips"] += circuit.trips
+                item["rejected"] += circuit.rejected
+        return dict(sorted(result.items()))
+
+
+_lock = threading.Lock()
+_breakers: CircuitBreakers | None = None
+
+
+def get_circuit_breakers() -> CircuitBreakers:
+    global _breakers
+    breakers = _breakers
+    if breakers is not None:
+        return breakers
+    with _lock:
+        if _breakers is None:
+            try:
+                settings = get_settings()
+            except Exception:
+                settings = None
+            scope = str(getattr(settings, "circuit_breaker_scope", SCOPE_SERVICE) or SCOPE_SERVICE).strip().lower()
+            _breakers = CircuitBreakers(
+                CircuitBreakerConfig(
+                    window=int(getattr(settings, "circuit_breaker_window", 20)),
+                    min_calls=int(getattr(settings, "circuit_breaker_min_calls", 10)),
+                    failure_ratio=float(getattr(settings, "circuit_breaker_failure_ratio", 0.5)),
+                    open_seconds=float(getattr(settings, "circuit_breaker_open_seconds", 30.0)),
+                    scope=SCOPE_USER if scope == SCOPE_USER else SCOPE_SERVICE,
+                )
+            )
+        return _breakers
+
+
+def circuit_breaker_enabled() -> bool:
+    try:
+        settings = get_settings()
+    except Exception:
+        return True
+    return bool(getattr(settings, "circuit_breaker_enabled", True))
+
+
+def reset_circuit_breakers() -> None:
+    global _breakers
+    with _lock:
+        _breakers = None
@@ -8,6 +8,12 @@ class Settings(BaseSettings):
 
     supabase_url: str
     supabase_service_role_key: str
+    supabase_http_max_connections: int = 100
+    supabase_http_max_keepalive_connections: int = 100
+    supabase_http_keepalive_expiry_seconds: float = 30.0
+    supabase_http_timeout_seconds: float = 30.0
+    supabase_http_pool_timeout_seconds: float = 5.0
+    supabase_db_offload_workers: int = 100
 
     notion_client_id: str
     notion_client_secret: str
@@ -125,11 +131,54 @@ class Settings(BaseSettings):
     auto_fill_no_question_enabled: bool = True
     mcp_retry_max_retries: int = 1
     mcp_retry_backoff_ms: int = 250
+    mcp_retry_max_backoff_ms: int = 5000
+    mcp_retry_budget_ratio: float = 0.2
+    mcp_retry_budget_max_tokens: float = 10.0
+    mcp_default_deadline_ms: int = 30000
+    mcp_max_deadline_ms: int = 120000
     mcp_quota_per_key_daily: int = 0
     mcp_quota_per_user_daily: int = 0
+    mcp_quota_reconcile_seconds: float = 60.0
+    mcp_rate_limit_per_minute: int = 30
+    mcp_batch_max_items: int = 20
+    mcp_batch_max_concurrency: int = 8
+    mcp_batch_per_service_concurrency: int = 4
+    mcp_stream_max_pages: int = 50
+    mcp_server_timing_enabled: bool = True
+    mcp_idempotency_ttl_seconds: float = 300.0
+    mcp_idempotency_max_entries: int = 10000
+    tool_result_cache_enabled: bool = True
+    tool_result_cache_max_entries: int = 5000
+    upstream_bulkheads_enabled: bool = True
+    circuit_breaker_enabled: bool = True
+    circuit_breaker_scope: str = "service"
+    circuit_breaker_window: int = 20
+    circuit_breaker_min_calls: int = 10
+    circuit_breaker_failure_ratio: float = 0.5
+    circuit_breaker_open_seconds: float = 30.0
+    oauth_token_cache_ttl_seconds: float = 60.0
+    oauth_token_cache_max_entries: int = 10000
+    agent_index_ttl_seconds: float = 300.0
+    agent_index_max_teams: int = 4096
+    mcp_list_tools_cache_ttl_seconds: float = 300.0
+    mcp_list_tools_cache_max_entries: int = 1024
+    mcp_api_key_cache_ttl_seconds: float = 30.0
+    mcp_api_key_cache_max_entries: int = 2048
+    mcp_policy_cache_ttl_seconds: float = 30.0
+    mcp_policy_cache_max_entries: int = 4096
+    mcp_last_used_flush_seconds: float = 5.0
+    mcp_last_used_max_pending: int = 10000
+    mcp_audit_batch_size: int = 100
+    mcp_audit_flush_seconds: float = 1.0
+    mcp_audit_max_queue: int = 10000
+    mcp_audit_spill_path: str | None = None
     webhook_retry_max_retries: int = 5
     webhook_retry_base_backoff_seconds: int = 30
     webhook_retry_max_backoff_seconds: int = 900
+    webhook_dispatch_workers: int = 4
+    webhook_dispatch_max_queue: int = 5000
+    webhook_dispatch_drain_seconds: float = 5.0
+    webhook_dispatch_lease_seconds: float = 120.0
     dead_letter_alert_webhook_url: str | None = None
     dead_letter_alert_min_count: int = 1
     dead_letter_alert_dedupe_seconds: int = 300
@@ -3,14 +3,7 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Any
 
-from supabase import create_client
-
-from app.core.config import get_settings
-
-
-def _connector_jobs_client():
-    settings = get_settings()
-    return create_client(settings.supabase_url, settings.supabase_service_role_key)
+from app.core.db import get_supabase_client
 
 
 def _load_existing_job(*, supabase, provider: str, job_type: str, external_job_id: str) -> dict[str, Any] | None:
@@ -40,7 +33,7 @@ def record_connector_job_run(
     download_urls: list[str] | None = None,
     error_message: str | None = None,
 ) -> dict[str, Any] | None:
-    supabase = _connector_jobs_client()
+    supabase = get_supabase_client()
     now = datetime.now(timezone.utc).isoformat()
     provider_value = str(provider or "").strip().lower()
     job_type_value = str(job_type or "").strip().lower()
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+import httpx
+from supabase import Client, ClientOptions, create_client
+
+from app.core.config import get_settings
+
+T = TypeVar("T")
+
+# Sized to the per-process concurrency target: every in-flight call holds a worker for
+# the whole PostgREST round trip, so a smaller pool queues calls and p99 grows with latency.
+_DEFAULT_OFFLOAD_WORKERS = 100
+
+
+class _PoolStatsTransport(httpx.BaseTransport):
+    """Counts in-flight PostgREST requests against the connection pool size."""
+
+    def __init__(self, transport: httpx.BaseTransport, *, max_connections: int):
+        self._transport = transport
+        self._lock = threading.Lock()
+        self.max_connections = max_connections
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests_total = 0
+        self.saturated_total = 0
+        self.errors_total = 0
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        with self._lock:
+            if self.in_flight >= self.max_connections:
+                self.saturated_total += 1
+            self.in_flight += 1
+            self.requests_total += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            return self._transport.handle_request(request)
+        except Exception:
+            with self._lock:
+                self.errors_total += 1
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+_client_lock = threading.Lock()
+_client: Client | None = None
+_http_client: httpx.Client | None = None
+_transport: _PoolStatsTransport | None = None
+_executor: ThreadPoolExecutor | None = None
+_executor_workers = 0
+_offload_pending = 0
+
+
+def _build_http_client() -> tuple[httpx.Client, _PoolStatsTransport]:
+    settings = get_settings()
+    max_connections = max(1, int(settings.supabase_http_max_connections))
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max(0, min(max_connections, int(settings.supabase_http_max_keepalive_connections))),
+        keepalive_expiry=max(0.0, float(settings.supabase_http_keepalive_expiry_seconds)),
+    )
+    timeout = httpx.Timeout(
+        float(settings.supabase_http_timeout_seconds),
+        pool=float(settings.supabase_http_pool_timeout_seconds),
+    )
+    transport = _PoolStatsTransport(httpx.HTTPTransport(limits=limits), max_connections=max_connections)
+    return httpx.Client(transport=transport, timeout=timeout, follow_redirects=True), transport
+
+
+def get_supabase_client() -> Client:
+    """Return the process-wide Supabase client backed by a keep-alive connection pool."""
+    global _client, _http_client, _transport
+    client = _client
+    if client is not None:
+        return client
+    with _client_lock:
+        if _client is None:
+            settings = get_settings()
+            http_client, transport = _build_http_client()
+            _client = create_client(
+                settings.supabase_url,
+                settings.supabase_service_role_key,
+                options=ClientOptions(httpx_client=http_client),
+            )
+            _http_client = http_client
+            _transport = transport
+        return _client
+
+
+def _offload_workers() -> int:
+    try:
+        return max(1, int(get_settings().supabase_db_offload_workers))
+    except Exception:
+        return _DEFAULT_OFFLOAD_WORKERS
+
+
+def _db_executor() -> ThreadPoolExecutor:
+    global _executor, _executor_workers
+    executor = _executor
+    if executor is not None:
+        return executor
+    with _client_lock:
+        if _executor is None:
+            _executor_workers = _offload_workers()
+            _executor = ThreadPoolExecutor(max_workers=_executor_workers, thread_name_prefix="supabase-db")
+        return _executor
+
+
+def _track_offload(delta: int) -> None:
+    global _offload_pending
+    with _client_lock:
+        _offload_pending += delta
+
+
+async def run_db(fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """Run a blocking PostgREST call on the bounded DB thread pool instead of the event loop."""
+    loop = asyncio.get_running_loop()
+    _track_offload(1)
+    try:
+        return await loop.run_in_executor(_db_executor(), functools.partial(fn, *args, **kwargs))
+    finally:
+        _track_offload(-1)
+
+
+async def execute_async(query) -> Any:
+    return await run_db(query.execute)
+
+
+def close_supabase_client() -> None:
+    global _client, _http_client, _transport, _executor
+    with _client_lock:
+        http_client = _http_client
+        executor = _executor
+        _client = None
+        _http_client = None
+        _transport = None
+        _executor = None
+    if executor is not None:
+        executor.shutdown(wait=True)
+    if http_client is not None:
+        http_client.close()
+
+
+def supabase_pool_stats() -> dict[str, Any]:
+    transport = _transport
+    offload = {
+        "workers": _executor_workers if _executor is not None else 0,
+        "pending": _offload_pending,
+        "queued": max(0, _offload_pending - _executor_workers) if _executor is not None else 0,
+    }
+    if transport is None:
+        return {"initialized": False, "offload": offload}
+    in_flight = transport.in_flight
+    return {
+        "initialized": True,
+        "offload": offload,
+        "max_connections": transport.max_connections,
+        "in_flight": in_flight,
+        "peak_in_flight": transport.peak_in_flight,
+        "requests_total": transport.requests_total,
+        "saturated_total": transport.saturated_total,
+        "errors_total": transport.errors_total,
+        "utilization": round(in_flight / transport.max_connections, 4) if transport.max_connections else 0.0,
+    }
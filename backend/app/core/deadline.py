@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from contextvars import ContextVar, Token
+from typing import Any, Awaitable, Callable
+
+from fastapi import HTTPException
+
+# Absolute time.monotonic() deadline for the current request, if one is in force.
+_deadline: ContextVar[float | None] = ContextVar("request_deadline", default=None)
+
+# Never hand httpx a timeout smaller than this; wait_for enforces the real cut-off.
+_MIN_UPSTREAM_TIMEOUT_SECONDS = 0.05
+
+
+class DeadlineScope:
+    """Bounds everything awaited inside the block to ``budget_ms`` from entry.
+
+    Scopes nest by only ever shrinking the deadline, so an inner default cannot
+    extend a tighter budget the client asked for. ``None`` or ``<= 0`` leaves the
+    current deadline (if any) untouched.
+    """
+
+    def __init__(self, budget_ms: float | None):
+        self._budget_ms = budget_ms
+        self._token: Token | None = None
+
+    def __enter__(self) -> DeadlineScope:
+        if self._budget_ms is not None and self._budget_ms > 0:
+            deadline = time.monotonic() + self._budget_ms / 1000.0
+            current = _deadline.get()
+            self._token = _deadline.set(deadline if current is None else min(current, deadline))
+        return self
+
+    def __exit__(self, *_exc_info) -> bool:
+        if self._token is not None:
+            _deadline.reset(self._token)
+            self._token = None
+        return False
+
+
+def remaining_seconds() -> float | None:
+    """Seconds left before the current deadline (may be negative), or None without one."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def deadline_exceeded() -> bool:
+    remaining = remaining_seconds()
+    return remaining is not None and remaining <= 0
+
+
+def upstream_timeout(default_seconds: float) -> float:
+    """``default_seconds`` shrunk to whatever is left of the request deadline."""
+    remaining = remaining_seconds()
+    if remaining is None:
+        return default_seconds
+    return max(_MIN_UPSTREAM_TIMEOUT_SECONDS, min(default_seconds, remaining))
+
+
+def deadline_error(label: str) -> HTTPException:
+    return HTTPException(status_code=504, detail=f"{label}:DEADLINE_EXCEEDED")
+
+
+async def run_within_deadline(label: str, operation: Callable[[], Awaitable[Any]]):
+    """Await ``operation``, cancelling it and raising ``<label>:DEADLINE_EXCEEDED`` once the deadline passes."""
+    remaining = remaining_seconds()
+    if remaining is None:
+        return await operation()
+    if remaining <= 0:
+        raise deadline_error(label)
+    try:
+        return await asyncio.wait_for(operation(), timeout=remaining)
+    except asyncio.TimeoutError:
+        left = remaining_seconds()
+        # The event loop may fire the timeout a clock tick early; a TimeoutError raised
+        # by the operation itself well before the deadline is passed through.
+        if left is not None and left > 0.01:
+            raise
+        raise deadline_error(label) from None
@@ -10,13 +10,22 @@ ERR_ACCESS_DENIED = "access_denied"
 ERR_SERVICE_NOT_ALLOWED = "service_not_allowed"
 ERR_POLICY_OVERRIDE_ALLOWED = "policy_override_allowed"
 ERR_POLICY_CONFLICT = "policy_conflict"
+ERR_IDEMPOTENT_REPLAY = "idempotent_replay"
+ERR_IDEMPOTENCY_KEY_REUSED = "idempotency_key_reused"
+ERR_RESULT_CACHE_HIT = "result_cache_hit"
+ERR_DEADLINE_EXCEEDED = "deadline_exceeded"
+ERR_INTERNAL_ERROR = "internal_error"
 
 CODE_TOOL_NOT_ALLOWED = 4031
 CODE_POLICY_BLOCKED = 4032
 CODE_ACCESS_DENIED = 4033
 CODE_SERVICE_NOT_ALLOWED = 4034
 CODE_POLICY_CONFLICT = 4091
+CODE_IDEMPOTENCY_KEY_REUSED = 4092
 CODE_RESOLVE_NOT_FOUND = 4221
 CODE_RESOLVE_AMBIGUOUS = 4222
 CODE_QUOTA_EXCEEDED = 4291
 CODE_UPSTREAM_TEMPORARY_FAILURE = 5031
+CODE_DEADLINE_EXCEEDED = 5041
+# JSON-RPC 2.0 reserved "Internal error".
+CODE_INTERNAL_ERROR = -32603
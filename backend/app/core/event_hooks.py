@@ -8,6 +8,8 @@ from typing import Any
 
 import httpx
 
+from app.core.db import execute_async
+
 STATUS_PENDING = "pending"
 STATUS_RETRYING = "retrying"
 STATUS_SUCCESS = "success"
@@ -100,7 +102,7 @@ async def _attempt_delivery(
             "next_retry_at": None,
             "delivered_at": None,
         }
-        supabase.table("webhook_deliveries").update(update_payload).eq("id", delivery_id).execute()
+        await execute_async(supabase.table("webhook_deliveries").update(update_payload).eq("id", delivery_id))
         return update_payload
 
     status, http_status, error_message = await _deliver_http(
@@ -118,8 +120,8 @@ async def _attempt_delivery(
             "next_retry_at": None,
             "retry_count": retry_count,
         }
-        supabase.table("webhook_deliveries").update(update_payload).eq("id", delivery_id).execute()
-        supabase.table("webhook_subscriptions").update({"last_delivery_at": now_iso, "updated_at": now_iso}).eq("id", subscription.get("id")).execute()
+        await execute_async(supabase.table("webhook_deliveries").update(update_payload).eq("id", delivery_id))
+        await execute_async(supabase.table("webhook_subscriptions").update({"last_delivery_at": now_iso, "updated_at": now_iso}).eq("id", subscription.get("id")))
         return update_payload
 
     next_retry_count = retry_count + 1
@@ -146,32 +148,41 @@ async def _attempt_delivery(
             "next_retry_at": None,
             "delivered_at": None,
         }
-    supabase.table("webhook_deliveries").update(update_payload).eq("id", delivery_id).execute()
+    await execute_async(supabase.table("webhook_deliveries").update(update_payload).eq("id", delivery_id))
     return update_payload
 
 
-async def emit_webhook_event(
+async def record_webhook_event(
     *,
     supabase,
     user_id: str,
     event_type: str,
     payload: dict[str, Any],
-    max_retries: int = 5,
-    base_backoff_seconds: int = 30,
-    max_backoff_seconds: int = 900,
-) -> None:
+    lease_seconds: float = 0.0,
+) -> list[dict[str, Any]]:
+    """Insert one pending webhook_deliveries row per matching subscription.
+
+    The pending rows are the outbox: anything not delivered right away is picked
+    up later by ``process_pending_webhook_retries``. ``lease_seconds`` sets
+    ``next_retry_at`` that far ahead so the retry processor leaves rows alone while
+    a dispatcher worker still holds them in its queue.
+    """
     try:
         subscriptions = (
-            supabase.table("webhook_subscriptions")
-            .select("id,endpoint_url,secret,event_types,is_active")
-            .eq("user_id", user_id)
-            .eq("is_active", True)
-            .execute()
+            await execute_async(
+                supabase.table("webhook_subscriptions")
+                .select("id,endpoint_url,secret,event_types,is_active")
+                .eq("user_id", user_id)
+                .eq("is_active", True)
+            )
         ).data or []
     except Exception:
-        return
+        return []
 
-    now_iso = datetime.now(timezone.utc).isoformat()
+    now = datetime.now(timezone.utc)
+    now_iso = now.isoformat()
+    leased_until = (now + timedelta(seconds=lease_seconds)).isoformat() if lease_seconds > 0 else None
+    pending: list[dict[str, Any]] = []
     for sub in subscriptions:
         event_types = sub.get("event_types")
         allowed = event_types if isinstance(event_types, list) else []
@@ -186,30 +197,45 @@ async def emit_webhook_event(
             "payload": payload,
         }
         delivery = (
-            supabase.table("webhook_deliveries")
-            .insert(
-                {
-                    "subscription_id": sub.get("id"),
-                    "user_id": user_id,
-                    "event_type": event_type,
-                    "payload": delivery_payload,
-                    "status": STATUS_PENDING,
-                    "retry_count": 0,
-                    "next_retry_at": None,
-                    "created_at": now_iso,
-                }
+            await execute_async(
+                supabase.table("webhook_deliveries")
+                .insert(
+                    {
+                        "subscription_id": sub.get("id"),
+                        "user_id": user_id,
+                        "event_type": event_type,
+                        "payload": delivery_payload,
+                        "status": STATUS_PENDING,
+                        "retry_count": 0,
+                        "next_retry_at": leased_until,
+                        "created_at": now_iso,
+                    }
+                )
             )
-            .execute()
         ).data or []
         delivery_id = delivery[0].get("id") if delivery else None
         if delivery_id is None:
             continue
+        pending.append({"delivery_id": delivery_id, "subscription": sub, "payload": delivery_payload})
+    return pending
+
+
+async def deliver_recorded_webhooks(
+    *,
+    supabase,
+    event_type: str,
+    pending: list[dict[str, Any]],
+    max_retries: int = 5,
+    base_backoff_seconds: int = 30,
+    max_backoff_seconds: int = 900,
+) -> None:
+    for item in pending:
         await _attempt_delivery(
             supabase=supabase,
-            delivery_id=delivery_id,
-            subscription=sub,
+            delivery_id=item["delivery_id"],
+            subscription=item["subscription"],
             event_type=event_type,
-            delivery_payload=delivery_payload,
+            delivery_payload=item["payload"],
             retry_count=0,
             max_retries=max_retries,
             base_backoff_seconds=base_backoff_seconds,
@@ -217,6 +243,27 @@ async def emit_webhook_event(
         )
 
 
+async def emit_webhook_event(
+    *,
+    supabase,
+    user_id: str,
+    event_type: str,
+    payload: dict[str, Any],
+    max_retries: int = 5,
+    base_backoff_seconds: int = 30,
+    max_backoff_seconds: int = 900,
+) -> None:
+    pending = await record_webhook_event(supabase=supabase, user_id=user_id, event_type=event_type, payload=payload)
+    await deliver_recorded_webhooks(
+        supabase=supabase,
+        event_type=event_type,
+        pending=pending,
+        max_retries=max_retries,
+        base_backoff_seconds=base_backoff_seconds,
+        max_backoff_seconds=max_backoff_seconds,
+    )
+
+
 async def retry_webhook_delivery(
     *,
     supabase,
@@ -227,30 +274,32 @@ async def retry_webhook_delivery(
     max_backoff_seconds: int = 900,
 ) -> dict[str, Any] | None:
     rows = (
-        supabase.table("webhook_deliveries")
-        .select("id,subscription_id,event_type,payload,retry_count")
-        .eq("id", delivery_id)
-        .eq("user_id", user_id)
-        .limit(1)
-        .execute()
+        await execute_async(
+            supabase.table("webhook_deliveries")
+            .select("id,subscription_id,event_type,payload,retry_count")
+            .eq("id", delivery_id)
+            .eq("user_id", user_id)
+            .limit(1)
+        )
     ).data or []
     if not rows:
         return None
     row = rows[0]
     subscription_rows = (
-        supabase.table("webhook_subscriptions")
-        .select("id,endpoint_url,secret,is_active")
-        .eq("id", row.get("subscription_id"))
-        .eq("user_id", user_id)
-        .limit(1)
-        .execute()
+        await execute_async(
+            supabase.table("webhook_subscriptions")
+            .select("id,endpoint_url,secret,is_active")
+            .eq("id", row.get("subscription_id"))
+            .eq("user_id", user_id)
+            .limit(1)
+        )
     ).data or []
     if not subscription_rows:
         return None
     subscription = subscription_rows[0]
     if not bool(subscription.get("is_active")):
         update_payload = {"status": STATUS_DEAD_LETTER, "error_message": ERR_SUBSCRIPTION_INACTIVE, "next_retry_at": None}
-        supabase.table("webhook_deliveries").update(update_payload).eq("id", delivery_id).eq("user_id", user_id).execute()
+        await execute_async(supabase.table("webhook_deliveries").update(update_payload).eq("id", delivery_id).eq("user_id", user_id))
         return update_payload
     payload = row.get("payload")
     if not isinstance(payload, dict):
@@ -287,7 +336,7 @@ async def process_pending_webhook_retries(
     )
     if user_id:
         query = query.eq("user_id", user_id)
-    rows = query.execute().data or []
+    rows = (await execute_async(query)).data or []
 
     processed = 0
     succeeded = 0
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import threading
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+
+from app.core.deadline import upstream_timeout
+
+_DEFAULT_TIMEOUT_SECONDS = 20.0
+_DEFAULT_MAX_CONNECTIONS = 20
+_DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 10
+_DEFAULT_KEEPALIVE_EXPIRY_SECONDS = 30.0
+
+# HTTP/2 needs the optional ``h2`` package (httpx[http2]); without it pools stay on HTTP/1.1.
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+@dataclass(frozen=True)
+class UpstreamPoolConfig:
+    timeout_seconds: float = _DEFAULT_TIMEOUT_SECONDS
+    max_connections: int = _DEFAULT_MAX_CONNECTIONS
+    max_keepalive_connections: int = _DEFAULT_MAX_KEEPALIVE_CONNECTIONS
+    keepalive_expiry_seconds: float = _DEFAULT_KEEPALIVE_EXPIRY_SECONDS
+    http2: bool = True
+    follow_redirects: bool = False
+
+    @classmethod
+    def from_limits(cls, limits: dict[str, Any] | None, *, follow_redirects: bool = False) -> UpstreamPoolConfig:
+        """Read pool settings from a tool spec ``limits`` block."""
+        limits = limits or {}
+        max_connections = max(1, int(limits.get("max_connections", _DEFAULT_MAX_CONNECTIONS)))
+        return cls(
+            timeout_seconds=max(1.0, float(limits.get("timeout_ms", _DEFAULT_TIMEOUT_SECONDS * 1000)) / 1000.0),
+            max_connections=max_connections,
+            max_keepalive_connections=max(
+                0, min(max_connections, int(limits.get("max_keepalive_connections", _DEFAULT_MAX_KEEPALIVE_CONNECTIONS)))
+            ),
+            keepalive_expiry_seconds=max(
+                0.0, float(limits.get("keepalive_expiry_ms", _DEFAULT_KEEPALIVE_EXPIRY_SECONDS * 1000)) / 1000.0
+            ),
+            http2=bool(limits.get("http2", True)),
+            follow_redirects=follow_redirects,
+        )
+
+
+@dataclass
+class _PoolStats:
+    requests: int = 0
+    new_connections: int = 0
+    http2_requests: int = 0
+
+
+@dataclass
+class _Pool:
+    loop: asyncio.AbstractEventLoop
+    client: httpx.AsyncClient
+    config: UpstreamPoolConfig
+
+
+class UpstreamClientPools:
+    """One keep-alive ``httpx.AsyncClient`` per upstream service, shared by every tool call.
+
+    Clients are created lazily with the service's spec limits and closed on app
+    shutdown. Per-request timeouts are shrunk to the request deadline in a request
+    hook, and an httpcore trace hook counts new TCP connections so reuse is visible.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pools: dict[str, _Pool] = {}
+        self._stats: dict[str, _PoolStats] = {}
+
+    def _build(self, service: str, config: UpstreamPoolConfig) -> httpx.AsyncClient:
+        stats = self._stats.setdefault(service, _PoolStats())
+
+        async def _trace(event_name: str, _info: dict[str, Any]) -> None:
+            if event_name == "connection.connect_tcp.complete":
+                with self._lock:
+                    stats.new_connections += 1
+            elif event_name == "http2.send_request_headers.started":
+                with self._lock:
+                    stats.http2_requests += 1
+
+        async def _on_request(request: httpx.Request) -> None:
+            with self._lock:
+                stats.requests += 1
+            timeout = upstream_timeout(config.timeout_seconds)
+            if timeout < config.timeout_seconds:
+                request.extensions["timeout"] = httpx.Timeout(timeout).as_dict()
+            request.extensions["trace"] = _trace
+
+        return httpx.AsyncClient(
+            timeout=config.timeout_seconds,
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry_seconds,
+            ),
+            http2=config.http2 and HTTP2_AVAILABLE,
+            follow_redirects=config.follow_redirects,
+            event_hooks={"request": [_on_request]},
+        )
+
+    def client(self, service: str, config: UpstreamPoolConfig) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            pool = self._pools.get(service)
+            # Connections belong to the loop that opened them; a new loop (tests, reloads) gets a new pool.
+            if pool is None or pool.loop is not loop:
+                pool = _Pool(loop=loop, client=self._build(service, config), config=config)
+                self._pools[service] = pool
+            return pool.client
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            result: dict[str, dict[str, Any]] = {}
+            for service, item in sorted(self._stats.items()):
+                pool = self._pools.get(service)
+                reused = max(0, item.requests - item.new_connections)
+                result[service] = {
+                    "open": pool is not None,
+                    "http2": bool(pool and pool.config.http2 and HTTP2_AVAILABLE),
+                    "max_connections": pool.config.max_connections if pool else 0,
+                    "requests": item.requests,
+                    "new_connections": item.new_connections,
+                    "reused_connections": reused,
+                    "reuse_ratio": round(reused / item.requests, 4) if item.requests else 0.0,
+                    "http2_requests": item.http2_requests,
+                }
+            return result
+
+    async def aclose(self) -> None:
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            if pool.loop is asyncio.get_running_loop():
+                await pool.client.aclose()
+
+
+class _Lease:
+    # ``async with upstream_client(...) as client`` keeps the executors' shape while
+    # leaving the shared client open on exit.
+    def __init__(self, service: str, config: UpstreamPoolConfig):
+        self._service = service
+        self._config = config
+
+    async def __aenter__(self) -> httpx.AsyncClient:
+        return get_upstream_client_pools().client(self._service, self._config)
+
+    async def __aexit__(self, *_exc_info) -> bool:
+        return False
+
+
+def upstream_client(service: str, limits: dict[str, Any] | None = None, *, follow_redirects: bool = False) -> _Lease:
+    return _Lease(service, UpstreamPoolConfig.from_limits(limits, follow_redirects=follow_redirects))
+
+
+_lock = threading.Lock()
+_pools: UpstreamClientPools | None = None
+
+
+def get_upstream_client_pools() -> UpstreamClientPools:
+    global _pools
+    pools = _pools
+    if pools is not None:
+        return pools
+    with _lock:
+        if _pools is None:
+            _pools = UpstreamClientPools()
+        return _pools
+
+
+async def close_upstream_clients() -> None:
+    global _pools
+    with _lock:
+        pools = _pools
+        _pools = None
+    if pools is not None:
+        await pools.aclose()
+
+
+def reset_upstream_client_pools() -> None:
+    global _pools
+    with _lock:
+        _pools = None
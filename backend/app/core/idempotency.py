@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+from app.core.config import get_settings
+
+_DEFAULT_TTL_SECONDS = 300.0
+_DEFAULT_MAX_ENTRIES = 10000
+
+OUTCOME_EXECUTED = "executed"
+OUTCOME_REPLAYED = "replayed"
+OUTCOME_JOINED = "joined"
+
+
+class IdempotencyKeyReused(Exception):
+    """An idempotency key was reused with different arguments."""
+
+
+class IdempotencyCache:
+    """Replays responses for repeated idempotency keys and collapses concurrent duplicates.
+
+    The first caller for a key runs the operation; callers arriving while it is in
+    flight await the same result (singleflight). Results accepted by ``cacheable``
+    are kept for ``ttl_seconds`` and replayed to later duplicates without running
+    the operation again. A duplicate whose ``fingerprint`` differs from the first
+    caller's raises ``IdempotencyKeyReused``. If the leader is cancelled, a waiting
+    duplicate takes over and runs the operation itself.
+    """
+
+    def __init__(self, *, ttl_seconds: float, max_entries: int, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self.max_entries = max(1, int(max_entries))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[float, Hashable, Any]] = OrderedDict()
+        self._inflight: dict[Hashable, tuple[asyncio.Future, Hashable]] = {}
+        self.executed = 0
+        self.replayed = 0
+        self.joined = 0
+        self.conflicts = 0
+
+    async def run(
+        self,
+        key: Hashable,
+        operation: Callable[[], Awaitable[Any]],
+        *,
+        fingerprint: Hashable = None,
+        cacheable: Callable[[Any], bool] = lambda _value: True,
+    ) -> tuple[Any, str]:
+        """Return ``(value, outcome)`` where outcome is executed, replayed or joined."""
+        while True:
+            now = self._clock()
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    if entry[0] > now:
+                        self._check_fingerprint(entry[1], fingerprint)
+                        self._entries.move_to_end(key)
+                        self.replayed += 1
+                        return entry[2], OUTCOME_REPLAYED
+                    del self._entries[key]
+                inflight = self._inflight.get(key)
+                if inflight is None:
+                    future = asyncio.get_running_loop().create_future()
+                    self._inflight[key] = (future, fingerprint)
+                    self.executed += 1
+                    break
+                self._check_fingerprint(inflight[1], fingerprint)
+                self.joined += 1
+            leader = inflight[0]
+            try:
+                # Shielded so a cancelled follower does not cancel the leader's result.
+                return await asyncio.shield(leader), OUTCOME_JOINED
+            except asyncio.CancelledError:
+                task = asyncio.current_task()
+                if not leader.cancelled() or (task is not None and task.cancelling()):
+                    raise
+                # The leader was cancelled, not this caller: retry, possibly as the new leader.
+
+        try:
+            value = await operation()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark retrieved; followers (if any) still receive the exception.
+            future.exception()
+            raise
+        else:
+            if self.ttl_seconds > 0 and cacheable(value):
+                with self._lock:
+                    self._entries[key] = (self._clock() + self.ttl_seconds, fingerprint, value)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            future.set_result(value)
+            return value, OUTCOME_EXECUTED
+        finally:
+            with self._lock:
+                inflight = self._inflight.get(key)
+                if inflight is not None and inflight[0] is future:
+                    del self._inflight[key]
+
+    def _check_fingerprint(self, stored: Hashable, fingerprint: Hashable) -> None:
+        if stored != fingerprint:
+            self.conflicts += 1
+            raise IdempotencyKeyReused()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "inflight": len(self._inflight),
+                "executed": self.executed,
+                "replayed": self.replayed,
+                "joined": self.joined,
+                "conflicts": self.conflicts,
+            }
+
+
+_lock = threading.Lock()
+_cache: IdempotencyCache | None = None
+
+
+def get_idempotency_cache() -> IdempotencyCache:
+    global _cache
+    cache = _cache
+    if cache is not None:
+        return cache
+    with _lock:
+        if _cache is None:
+            try:
+                settings = get_settings()
+            except Exception:
+                settings = None
+            _cache = IdempotencyCache(
+                ttl_seconds=float(getattr(settings, "mcp_idempotency_ttl_seconds", _DEFAULT_TTL_SECONDS)),
+                max_entries=int(getattr(settings, "mcp_idempotency_max_entries", _DEFAULT_MAX_ENTRIES)),
+            )
+        return _cache
+
+
+def reset_idempotency_cache() -> None:
+    global _cache
+    with _lock:
+        _cache = None
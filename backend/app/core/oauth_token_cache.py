@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+from app.core.api_key_cache import InMemoryInvalidationChannel, InvalidationChannel
+from app.core.config import get_settings
+
+_DEFAULT_TTL_SECONDS = 60.0
+_DEFAULT_MAX_ENTRIES = 10000
+# Channel messages are "<user_id>" (all providers) or "<user_id>/<provider>".
+_SEPARATOR = "/"
+
+
+class _Secret:
+    """Holds a decrypted token; ``repr``/``str`` never show it, so stray logging stays safe."""
+
+    __slots__ = ("_value",)
+
+    def __init__(self, value: str):
+        self._value = value
+
+    def reveal(self) -> str:
+        return self._value
+
+    def __repr__(self) -> str:
+        return "<redacted>"
+
+    __str__ = __repr__
+
+
+class OAuthTokenCache:
+    """Short-lived cache of decrypted OAuth access tokens keyed by (user_id, provider).
+
+    Saves the oauth_tokens query and Fernet decrypt on every tool call. OAuth
+    callbacks, refreshes and disconnects invalidate the entry; a load that was in
+    flight when that happened is not stored, so a revoked token cannot be put back.
+    """
+
+    def __init__(self, *, ttl_seconds: float, max_entries: int, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self.max_entries = max(1, int(max_entries))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, str], tuple[float, _Secret]] = OrderedDict()
+        self._generations: dict[tuple[str, str], int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def lookup(self, user_id: str, provider: str) -> tuple[str | None, int]:
+        """Return ``(token or None, generation)``; pass the generation back to ``store``."""
+        key = (str(user_id), provider)
+        now = self._clock()
+        with self._lock:
+            generation = self._generations.get(key, 0)
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1].reveal(), generation
+                del self._entries[key]
+            self.misses += 1
+            return None, generation
+
+    def store(self, user_id: str, provider: str, token: str, *, generation: int, ttl_seconds: float | None = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else min(self.ttl_seconds, ttl_seconds)
+        if ttl <= 0 or not token:
+            return
+        key = (str(user_id), provider)
+        with self._lock:
+            if self._generations.get(key, 0) != generation:
+                return
+            self._entries[key] = (self._clock() + ttl, _Secret(token))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, user_id: str, provider: str, load: Callable[[], str]) -> str:
+        token, generation = self.lookup(user_id, provider)
+        if token is not None:
+            return token
+        token = load()
+        self.store(user_id, provider, token, generation=generation)
+        return token
+
+    def invalidate(self, user_id: str, provider: str | None = None) -> None:
+        user_id = str(user_id)
+        with self._lock:
+            keys = [key for key in self._entries if key[0] == user_id and (provider is None or key[1] == provider)]
+            if provider is not None and (user_id, provider) not in keys:
+                keys.append((user_id, provider))
+            if provider is None:
+                keys.extend(key for key in self._generations if key[0] == user_id and key not in keys)
+            for key in keys:
+                self._entries.pop(key, None)
+                self._generations[key] = self._generations.get(key, 0) + 1
+            self.invalidations += 1
+
+    def handle_invalidation(self, message: str) -> None:
+        user_id, _, provider = str(message).partition(_SEPARATOR)
+        self.invalidate(user_id, provider or None)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+
+_lock = threading.Lock()
+_cache: OAuthTokenCache | None = None
+_channel: InvalidationChannel | None = None
+
+
+def get_oauth_token_cache() -> OAuthTokenCache:
+    global _cache, _channel
+    cache = _cache
+    if cache is not None:
+        return cache
+    with _lock:
+        if _cache is None:
+            try:
+                settings = get_settings()
+            except Exception:
+                settings = None
+            _cache = OAuthTokenCache(
+                ttl_seconds=float(getattr(settings, "oauth_token_cache_ttl_seconds", _DEFAULT_TTL_SECONDS)),
+                max_entries=int(getattr(settings, "oauth_token_cache_max_entries", _DEFAULT_MAX_ENTRIES)),
+            )
+            if _channel is None:
+                _channel = InMemoryInvalidationChannel()
+            _channel.subscribe(_cache.handle_invalidation)
+        return _cache
+
+
+def set_oauth_token_invalidation_channel(channel: InvalidationChannel) -> None:
+    global _channel
+    with _lock:
+        _channel = channel
+        if _cache is not None:
+            channel.subscribe(_cache.handle_invalidation)
+
+
+def invalidate_oauth_token(user_id: str | None, provider: str | None = None) -> None:
+    """Call after a user's OAuth token is issued, refreshed or removed."""
+    if not user_id:
+        return
+    get_oauth_token_cache()
+    channel = _channel
+    if channel is not None:
+        channel.publish(f"{user_id}{_SEPARATOR}{provider}" if provider else str(user_id))
+
+
+def reset_oauth_token_cache() -> None:
+    global _cache, _channel
+    with _lock:
+        _cache = None
+        _channel = None
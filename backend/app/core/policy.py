@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Callable
+
+from app.core.api_key_cache import InMemoryInvalidationChannel, InvalidationChannel
+from app.core.config import get_settings
+
+_DEFAULT_TTL_SECONDS = 30.0
+_DEFAULT_MAX_ENTRIES = 4096
+
+
+@dataclass(frozen=True)
+class EffectivePolicy:
+    """Team + API key policy merged once into immutable lookup sets."""
+
+    allow_high_risk: bool | None = None
+    allowed_services: frozenset[str] | None = None
+    deny_tools: frozenset[str] = frozenset()
+    allowed_linear_team_ids: frozenset[str] | None = None
+    rate_limit_per_minute: int | None = None
+
+    # An empty allowlist (e.g. a disjoint team/key intersection) is stored but treated as unrestricted.
+    def allows_service(self, service: str) -> bool:
+        return not self.allowed_services or service in self.allowed_services
+
+    def denies_tool(self, tool_name: str) -> bool:
+        return tool_name in self.deny_tools
+
+    def allows_linear_team(self, team_id: str) -> bool:
+        return not self.allowed_linear_team_ids or team_id in self.allowed_linear_team_ids
+
+    @cached_property
+    def policy_json(self) -> dict[str, Any]:
+        """Merged policy in the stored JSON shape, for the risk gate and API responses."""
+        out: dict[str, Any] = {}
+        if self.allow_high_risk is not None:
+            out["allow_high_risk"] = self.allow_high_risk
+        if self.allowed_services is not None:
+            out["allowed_services"] = sorted(self.allowed_services)
+        if self.allowed_linear_team_ids is not None:
+            out["allowed_linear_team_ids"] = sorted(self.allowed_linear_team_ids)
+        if self.deny_tools:
+            out["deny_tools"] = sorted(self.deny_tools)
+        if self.rate_limit_per_minute is not None:
+            out["rate_limit_per_minute"] = self.rate_limit_per_minute
+        return out
+
+
+EMPTY_POLICY = EffectivePolicy()
+
+
+def _positive_int(value: Any) -> int | None:
+    if isinstance(value, bool):
+        return None
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number > 0 else None
+
+
+def _normalized_policy(policy: dict[str, Any] | None) -> dict[str, Any]:
+    if not isinstance(policy, dict):
+        return {}
+    out: dict[str, Any] = {}
+    if "allow_high_risk" in policy:
+        out["allow_high_risk"] = bool(policy.get("allow_high_risk"))
+    for key in ("allowed_services", "deny_tools", "allowed_linear_team_ids"):
+        raw = policy.get(key)
+        if not isinstance(raw, list):
+            continue
+        values = {str(item).strip() for item in raw if str(item).strip()}
+        if key == "allowed_services":
+            values = {item.lower() for item in values}
+        out[key] = frozenset(values)
+    rate_limit = _positive_int(policy.get("rate_limit_per_minute"))
+    if rate_limit is not None:
+        out["rate_limit_per_minute"] = rate_limit
+    return out
+
+
+def compile_policy(team_policy: dict[str, Any] | None, key_policy: dict[str, Any] | None) -> EffectivePolicy:
+    team = _normalized_policy(team_policy)
+    key = _normalized_policy(key_policy)
+    if not team and not key:
+        return EMPTY_POLICY
+
+    allow_high_risk: bool | None = None
+    if "allow_high_risk" in key:
+        allow_high_risk = key["allow_high_risk"]
+    elif "allow_high_risk" in team:
+        allow_high_risk = team["allow_high_risk"]
+
+    def _merge_allowlist(field: str) -> frozenset[str] | None:
+        team_values = team.get(field)
+        key_values = key.get(field)
+        if team_values is not None and key_values is not None:
+            return team_values & key_values
+        return key_values if key_values is not None else team_values
+
+    # The stricter of the team and key rate limits wins.
+    rate_limits = [item["rate_limit_per_minute"] for item in (team, key) if "rate_limit_per_minute" in item]
+
+    return EffectivePolicy(
+        allow_high_risk=allow_high_risk,
+        allowed_services=_merge_allowlist("allowed_services"),
+        deny_tools=team.get("deny_tools", frozenset()) | key.get("deny_tools", frozenset()),
+        allowed_linear_team_ids=_merge_allowlist("allowed_linear_team_ids"),
+        rate_limit_per_minute=min(rate_limits) if rate_limits else None,
+    )
+
+
+@dataclass(frozen=True)
+class _TeamPolicyEntry:
+    version: str | None
+    policy_json: dict[str, Any] | None
+    expires_at: float
+
+
+@dataclass(frozen=True)
+class _CompiledEntry:
+    key_policy: dict[str, Any] | None
+    policy: EffectivePolicy
+
+
+class EffectivePolicyCache:
+    """Caches team_policies rows by team id and compiled policies by (team_id, policy version, key id).
+
+    A team_policies read that was in flight when ``invalidate_team`` ran is not
+    stored, so a policy update or rollback cannot be undone by a racing load.
+    """
+
+    def __init__(self, *, ttl_seconds: float, max_entries: int, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self.max_entries = max(1, int(max_entries))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._teams: dict[str, _TeamPolicyEntry] = {}
+        self._team_generations: dict[str, int] = {}
+        self._compiled: OrderedDict[tuple[str, str | None, str], _CompiledEntry] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.team_loads = 0
+
+    def resolve(self, supabase, *, api_key: dict[str, Any]) -> EffectivePolicy:
+        raw_key_policy = api_key.get("policy_json")
+        key_policy = raw_key_policy if isinstance(raw_key_policy, dict) else None
+        team_id = api_key.get("team_id")
+        team_key = str(team_id) if team_id else ""
+        version, team_policy, generation = self._team_policy(supabase, team_key) if team_key else (None, None, 0)
+        if self.ttl_seconds <= 0:
+            return compile_policy(team_policy, key_policy)
+
+        cache_key = (team_key, version, str(api_key.get("id") or ""))
+        with self._lock:
+            entry = self._compiled.get(cache_key)
+            if entry is not None and (entry.key_policy is key_policy or entry.key_policy == key_policy):
+                self._compiled.move_to_end(cache_key)
+                self.hits += 1
+                return entry.policy
+            self.misses += 1
+
+        policy = compile_policy(team_policy, key_policy)
+        with self._lock:
+            if self._team_generations.get(team_key, 0) != generation:
+                return policy
+            self._compiled[cache_key] = _CompiledEntry(key_policy=key_policy, policy=policy)
+            self._compiled.move_to_end(cache_key)
+            while len(self._compiled) > self.max_entries:
+                self._compiled.popitem(last=False)
+        return policy
+
+    def invalidate_team(self, team_id: str | int) -> None:
+        team_key = str(team_id)
+        with self._lock:
+            self._teams.pop(team_key, None)
+            self._team_generations[team_key] = self._team_generations.get(team_key, 0) + 1
+            for cache_key in [item for item in self._compiled if item[0] == team_key]:
+                self._compiled.pop(cache_key, None)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "teams": len(self._teams),
+                "compiled": len(self._compiled),
+                "hits": self.hits,
+                "misses": self.misses,
+                "team_loads": self.team_loads,
+            }
+
+    def _team_policy(self, supabase, team_key: str) -> tuple[str | None, dict[str, Any] | None, int]:
+        """Return ``(version, policy_json, generation)`` with the generation read before any DB load."""
+        now = self._clock()
+        with self._lock:
+            generation = self._team_generations.get(team_key, 0)
+            entry = self._teams.get(team_key)
+        if entry is not None and entry.expires_at > now:
+            return entry.version, entry.policy_json, generation
+
+        rows = (
+            supabase.table("team_policies")
+            .select("policy_json,updated_at")
+            .eq("team_id", team_key)
+            .limit(1)
+            .execute()
+        ).data or []
+        raw = rows[0].get("policy_json") if rows else None
+        version = str(rows[0].get("updated_at") or "") if rows else None
+        policy_json = raw if isinstance(raw, dict) else None
+        with self._lock:
+            self.team_loads += 1
+            if self.ttl_seconds > 0 and self._team_generations.get(team_key, 0) == generation:
+                self._teams[team_key] = _TeamPolicyEntry(version=version, policy_json=policy_json, expires_at=now + self.ttl_seconds)
+        return version, policy_json, generation
+
+
+_lock = threading.Lock()
+_cache: EffectivePolicyCache | None = None
+_channel: InvalidationChannel | None = None
+
+
+def _cache_settings() -> tuple[float, int]:
+    try:
+        settings = get_settings()
+    except Exception:
+        return _DEFAULT_TTL_SECONDS, _DEFAULT_MAX_ENTRIES
+    return (
+        float(getattr(settings, "mcp_policy_cache_ttl_seconds", _DEFAULT_TTL_SECONDS)),
+        int(getattr(settings, "mcp_policy_cache_max_entries", _DEFAULT_MAX_ENTRIES)),
+    )
+
+
+def get_policy_cache() -> EffectivePolicyCache:
+    global _cache, _channel
+    cache = _cache
+    if cache is not None:
+        return cache
+    with _lock:
+        if _cache is None:
+            ttl_seconds, max_entries = _cache_settings()
+            _cache = EffectivePolicyCache(ttl_seconds=ttl_seconds, max_entries=max_entries)
+            if _channel is None:
+                _channel = InMemoryInvalidationChannel()
+            _channel.subscribe(_cache.invalidate_team)
+        return _cache
+
+
+def set_team_policy_invalidation_channel(channel: InvalidationChannel) -> None:
+    global _channel
+    with _lock:
+        _channel = channel
+        if _cache is not None:
+            channel.subscribe(_cache.invalidate_team)
+
+
+def resolve_effective_policy(supabase, *, api_key: dict[str, Any]) -> EffectivePolicy:
+    return get_policy_cache().resolve(supabase, api_key=api_key)
+
+
+def invalidate_team_policy(team_id: str | int | None) -> None:
+    if team_id is None or str(team_id) == "":
+        return
+    get_policy_cache()
+    channel = _channel
+    if channel is not None:
+        channel.publish(str(team_id))
+
+
+def reset_policy_cache() -> None:
+    global _cache, _channel
+    with _lock:
+        _cache = None
+        _channel = None
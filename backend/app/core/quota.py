@@ -1,8 +1,19 @@
 from __future__ import annotations
 
+import asyncio
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
-from datetime import datetime, timezone
-from typing import Any
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+from app.core.config import get_settings
+from app.core.db import execute_async
+
+_DEFAULT_RECONCILE_SECONDS = 60.0
+_DEFAULT_MAX_ENTRIES = 50000
+_SCOPE_FIELDS = {"api_key": "api_key_id", "user": "user_id"}
 
 
 @dataclass(frozen=True)
@@ -13,14 +24,112 @@ class QuotaDecision:
     used: int | None = None
 
 
-def _count_since(*, supabase, field: str, value: Any, since_iso: str) -> int:
-    query = (
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _day_start(now: datetime) -> datetime:
+    return now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+@dataclass
+class _DayCounter:
+    day: str
+    count: int
+    reconciled_at: float
+
+
+class DailyUsageCounters:
+    """Per-UTC-day call counters keyed by (scope, id).
+
+    Admitted calls are counted in memory under one lock, so the check and the
+    increment are atomic within the process. Each counter is seeded from
+    ``tool_calls`` and re-reconciled every ``reconcile_seconds`` to pick up
+    calls admitted by other workers. A new UTC day starts a fresh counter.
+    """
+
+    def __init__(
+        self,
+        *,
+        reconcile_seconds: float,
+        max_entries: int = _DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+        now: Callable[[], datetime] = _utc_now,
+    ):
+        self.reconcile_seconds = max(0.0, float(reconcile_seconds))
+        self.max_entries = max(1, int(max_entries))
+        self._clock = clock
+        self._now = now
+        self._lock = threading.Lock()
+        self._counters: OrderedDict[tuple[str, str], _DayCounter] = OrderedDict()
+        self.reconciles = 0
+
+    def today(self) -> str:
+        return self._now().date().isoformat()
+
+    def day_start_iso(self) -> str:
+        return _day_start(self._now()).isoformat()
+
+    def needs_reconcile(self, scope: str, value: Any) -> bool:
+        with self._lock:
+            counter = self._counters.get((scope, str(value)))
+        if counter is None or counter.day != self.today():
+            return True
+        return self._clock() - counter.reconciled_at >= self.reconcile_seconds
+
+    def reconcile(self, scope: str, value: Any, *, day: str, db_count: int) -> None:
+        """Fold a ``tool_calls`` count for ``day`` into the counter, never moving it backwards."""
+        key = (scope, str(value))
+        with self._lock:
+            self.reconciles += 1
+            counter = self._counters.get(key)
+            if counter is None or counter.day != day:
+                counter = _DayCounter(day=day, count=0, reconciled_at=0.0)
+                self._counters[key] = counter
+            counter.count = max(counter.count, int(db_count))
+            counter.reconciled_at = self._clock()
+            self._counters.move_to_end(key)
+            while len(self._counters) > self.max_entries:
+                self._counters.popitem(last=False)
+
+    def admit(self, checks: list[tuple[str, Any, int]]) -> QuotaDecision:
+        """Count one call against every ``(scope, id, limit)``, or none if any limit is reached."""
+        day = self.today()
+        with self._lock:
+            counters: list[tuple[str, int, _DayCounter]] = []
+            for scope, value, limit in checks:
+                key = (scope, str(value))
+                counter = self._counters.get(key)
+                if counter is None or counter.day != day:
+                    counter = _DayCounter(day=day, count=0, reconciled_at=0.0)
+                    self._counters[key] = counter
+                if counter.count >= limit:
+                    return QuotaDecision(exceeded=True, scope=scope, limit=limit, used=counter.count)
+                counters.append((scope, limit, counter))
+            for _scope, _limit, counter in counters:
+                counter.count += 1
+        return QuotaDecision(exceeded=False)
+
+    def used(self, scope: str, value: Any, *, day: str | None = None) -> int:
+        day = day or self.today()
+        with self._lock:
+            counter = self._counters.get((scope, str(value)))
+            if counter is None or counter.day != day:
+                return 0
+            return counter.count
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
+
+async def _count_since(*, supabase, field: str, value: Any, since_iso: str) -> int:
+    query = await execute_async(
         supabase.table("tool_calls")
         .select("id", count="exact")
         .eq(field, value)
         .gte("created_at", since_iso)
         .limit(1)
-        .execute()
     )
     count = getattr(query, "count", None)
     if isinstance(count, int):
@@ -29,7 +138,48 @@ def _count_since(*, supabase, field: str, value: Any, since_iso: str) -> int:
     return len(rows)
 
 
-def evaluate_daily_quota(
+_lock = threading.Lock()
+_counters: DailyUsageCounters | None = None
+
+
+def get_usage_counters() -> DailyUsageCounters:
+    global _counters
+    counters = _counters
+    if counters is not None:
+        return counters
+    with _lock:
+        if _counters is None:
+            try:
+                settings = get_settings()
+            except Exception:
+                settings = None
+            _counters = DailyUsageCounters(
+                reconcile_seconds=float(getattr(settings, "mcp_quota_reconcile_seconds", _DEFAULT_RECONCILE_SECONDS))
+            )
+        return _counters
+
+
+def reset_usage_counters() -> None:
+    global _counters
+    with _lock:
+        _counters = None
+
+
+async def _reconcile_stale(*, supabase, counters: DailyUsageCounters, targets: list[tuple[str, Any]]) -> None:
+    stale = [(scope, value) for scope, value in targets if counters.needs_reconcile(scope, value)]
+    if not stale:
+        return
+    day = counters.today()
+    since = counters.day_start_iso()
+    # Independent round-trips; issue them together rather than back to back.
+    results = await asyncio.gather(
+        *(_count_since(supabase=supabase, field=_SCOPE_FIELDS[scope], value=value, since_iso=since) for scope, value in stale)
+    )
+    for (scope, value), db_count in zip(stale, results):
+        counters.reconcile(scope, value, day=day, db_count=db_count)
+
+
+async def evaluate_daily_quota(
     *,
     supabase,
     user_id: str,
@@ -37,15 +187,28 @@ def evaluate_daily_quota(
     per_key_daily_limit: int,
     per_user_daily_limit: int,
 ) -> QuotaDecision:
-    since = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
+    checks: list[tuple[str, Any, int]] = []
     if per_key_daily_limit > 0:
-        key_used = _count_since(supabase=supabase, field="api_key_id", value=api_key_id, since_iso=since)
-        if key_used >= per_key_daily_limit:
-            return QuotaDecision(exceeded=True, scope="api_key", limit=per_key_daily_limit, used=key_used)
-
+        checks.append(("api_key", api_key_id, per_key_daily_limit))
     if per_user_daily_limit > 0:
-        user_used = _count_since(supabase=supabase, field="user_id", value=user_id, since_iso=since)
-        if user_used >= per_user_daily_limit:
-            return QuotaDecision(exceeded=True, scope="user", limit=per_user_daily_limit, used=user_used)
+        checks.append(("user", user_id, per_user_daily_limit))
+    if not checks:
+        return QuotaDecision(exceeded=False)
+
+    counters = get_usage_counters()
+    await _reconcile_stale(supabase=supabase, counters=counters, targets=[(scope, value) for scope, value, _ in checks])
+    return counters.admit(checks)
+
+
+async def current_daily_usage(
+    *, supabase, targets: list[tuple[str, Any]]
+) -> tuple[str, dict[tuple[str, str], int]]:
+    """The counters' current day and its usage per ``(scope, id)``, reconciled when stale."""
+    counters = get_usage_counters()
+    await _reconcile_stale(supabase=supabase, counters=counters, targets=targets)
+    day = counters.today()
+    return day, {(scope, str(value)): counters.used(scope, value, day=day) for scope, value in targets}
+
 
-    return QuotaDecision(exceeded=False)
+def next_quota_reset_iso() -> str:
+    return (_day_start(_utc_now()) + timedelta(days=1)).isoformat()
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Protocol
+
+_DEFAULT_MAX_KEYS = 50000
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after_seconds: float = 0.0
+
+    @property
+    def retry_after_header(self) -> str:
+        """Whole seconds for the HTTP ``Retry-After`` header (never 0 when blocked)."""
+        return str(max(1, math.ceil(self.retry_after_seconds)))
+
+
+class RateLimitBackend(Protocol):
+    """Shared limiter state. Multi-worker deployments plug in a backend shared by every process."""
+
+    def acquire(self, key: str, *, limit: int, window_seconds: float) -> RateLimitDecision: ...
+
+
+class InMemoryRateLimitBackend:
+    """Per-process token buckets: ``limit`` tokens, refilled evenly over ``window_seconds``."""
+
+    def __init__(self, *, max_keys: int = _DEFAULT_MAX_KEYS, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max(1, int(max_keys))
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (tokens, last refill time)
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def acquire(self, key: str, *, limit: int, window_seconds: float) -> RateLimitDecision:
+        capacity = float(max(1, int(limit)))
+        refill_per_second = capacity / max(0.001, float(window_seconds))
+        now = self._clock()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+            allowed = tokens >= 1.0
+            if allowed:
+                tokens -= 1.0
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        if allowed:
+            return RateLimitDecision(allowed=True, limit=int(capacity), remaining=int(tokens))
+        return RateLimitDecision(
+            allowed=False,
+            limit=int(capacity),
+            remaining=0,
+            retry_after_seconds=(1.0 - tokens) / refill_per_second,
+        )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+_lock = threading.Lock()
+_backend: RateLimitBackend | None = None
+
+
+def get_rate_limit_backend() -> RateLimitBackend:
+    global _backend
+    backend = _backend
+    if backend is not None:
+        return backend
+    with _lock:
+        if _backend is None:
+            _backend = InMemoryRateLimitBackend()
+        return _backend
+
+
+def set_rate_limit_backend(backend: RateLimitBackend) -> None:
+    global _backend
+    with _lock:
+        _backend = backend
+
+
+def check_rate_limit(key: str, *, limit: int, window_seconds: float = 60.0) -> RateLimitDecision:
+    """Take one token for ``key``; a ``limit`` of 0 or less disables limiting."""
+    if limit <= 0:
+        return RateLimitDecision(allowed=True, limit=0, remaining=0)
+    return get_rate_limit_backend().acquire(key, limit=limit, window_seconds=window_seconds)
+
+
+def reset_rate_limiter() -> None:
+    global _backend
+    with _lock:
+        _backend = None
@@ -1,15 +1,24 @@
 from __future__ import annotations
 
 import asyncio
-import re
+import random
+import threading
 from dataclasses import dataclass
 from typing import Any, Awaitable, Callable
 
 from fastapi import HTTPException
 
+from app.core.config import get_settings
+from app.core.deadline import remaining_seconds
+from app.core.upstream_errors import UpstreamError, upstream_status_of
+
 
 AsyncOperation = Callable[[], Awaitable[dict[str, Any]]]
 
+_DEFAULT_MAX_BACKOFF_MS = 5000
+_DEFAULT_BUDGET_RATIO = 0.2
+_DEFAULT_BUDGET_MAX_TOKENS = 10.0
+
 
 @dataclass(frozen=True)
 class RetryResult:
@@ -17,16 +26,6 @@ class RetryResult:
     retry_count: int
 
 
-def _extract_status_code(detail: str) -> int | None:
-    match = re.search(r"\|status=(\d{3})", detail)
-    if not match:
-        return None
-    try:
-        return int(match.group(1))
-    except ValueError:
-        return None
-
-
 def should_retry_http_exception(exc: HTTPException) -> bool:
     detail = str(exc.detail or "")
     if ":VALIDATION_" in detail:
@@ -35,8 +34,62 @@ def should_retry_http_exception(exc: HTTPException) -> bool:
         return False
     if ":RATE_LIMITED" in detail:
         return True
-    status = _extract_status_code(detail)
-    return status in {429, 500, 502, 503, 504}
+    return upstream_status_of(exc) in {429, 500, 502, 503, 504}
+
+
+class RetryBudget:
+    """Caps retries to a fraction of calls for one service.
+
+    Each call deposits ``ratio`` tokens (up to ``max_tokens``) and each retry spends
+    one, so while a provider is throttling, retries stay near ``ratio`` of traffic
+    instead of multiplying it. The bucket starts full so quiet services can still retry.
+    """
+
+    def __init__(self, *, ratio: float, max_tokens: float):
+        self.ratio = max(0.0, float(ratio))
+        self.max_tokens = max(0.0, float(max_tokens))
+        self._lock = threading.Lock()
+        self._tokens = self.max_tokens
+        self.calls = 0
+        self.retries = 0
+        self.denied = 0
+
+    def record_call(self) -> None:
+        with self._lock:
+            self.calls += 1
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens < 1.0:
+                self.denied += 1
+                return False
+            self._tokens -= 1.0
+            self.retries += 1
+            return True
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "tokens": round(self._tokens, 2),
+                "calls": self.calls,
+                "retries": self.retries,
+                "denied": self.denied,
+            }
+
+
+def next_backoff_ms(
+    *,
+    base_ms: float,
+    previous_ms: float,
+    max_backoff_ms: float,
+    rng: random.Random | None = None,
+) -> float:
+    """Decorrelated jitter: uniform between the base and three times the previous sleep, capped."""
+    if base_ms <= 0:
+        return 0.0
+    upper = max(base_ms, previous_ms * 3)
+    return min(max_backoff_ms, (rng or random).uniform(base_ms, upper))
 
 
 async def run_with_retry(
@@ -44,8 +97,24 @@ async def run_with_retry(
     operation: AsyncOperation,
     max_retries: int,
     backoff_ms: int,
+    max_backoff_ms: int | None = None,
+    service: str | None = None,
+    rng: random.Random | None = None,
 ) -> RetryResult:
+    """Run ``operation``, retrying transient upstream failures.
+
+    Waits follow decorrelated jitter from ``backoff_ms`` up to ``max_backoff_ms``. A
+    server hint (``Retry-After`` / rate-limit reset on an UpstreamError) replaces the
+    jittered wait; when the hint is longer than ``max_backoff_ms`` the error is raised
+    at once rather than sleeping through it, as is a wait that would outlast the
+    request deadline. With a ``service``, retries also draw on that service's retry budget.
+    """
+    cap_ms = float(_DEFAULT_MAX_BACKOFF_MS if max_backoff_ms is None else max(0, max_backoff_ms))
+    budget = get_retry_budget(service) if service else None
+    if budget is not None:
+        budget.record_call()
     retries = 0
+    previous_ms = float(backoff_ms)
     while True:
         try:
             data = await operation()
@@ -53,6 +122,53 @@ async def run_with_retry(
         except HTTPException as exc:
             if retries >= max_retries or not should_retry_http_exception(exc):
                 raise
+            hint = exc.retry_after_seconds if isinstance(exc, UpstreamError) else None
+            if hint is not None:
+                if hint * 1000 > cap_ms:
+                    raise
+                # Jitter on top keeps callers given the same reset time from retrying in lockstep.
+                jitter_ms = (rng or random).uniform(0, backoff_ms) if backoff_ms > 0 else 0.0
+                wait_ms = min(cap_ms, hint * 1000 + jitter_ms)
+            else:
+                wait_ms = next_backoff_ms(base_ms=backoff_ms, previous_ms=previous_ms, max_backoff_ms=cap_ms, rng=rng)
+                previous_ms = max(wait_ms, float(backoff_ms))
+            remaining = remaining_seconds()
+            if remaining is not None and wait_ms / 1000.0 >= remaining:
+                # The retry could not finish before the request deadline; fail now with the real error.
+                raise
+            if budget is not None and not budget.try_spend():
+                raise
             retries += 1
-            if backoff_ms > 0:
-                await asyncio.sleep((backoff_ms * retries) / 1000.0)
+            if wait_ms > 0:
+                await asyncio.sleep(wait_ms / 1000.0)
+
+
+_lock = threading.Lock()
+_budgets: dict[str, RetryBudget] = {}
+
+
+def get_retry_budget(service: str) -> RetryBudget:
+    with _lock:
+        budget = _budgets.get(service)
+        if budget is None:
+            try:
+                settings = get_settings()
+            except Exception:
+                settings = None
+            budget = RetryBudget(
+                ratio=float(getattr(settings, "mcp_retry_budget_ratio", _DEFAULT_BUDGET_RATIO)),
+                max_tokens=float(getattr(settings, "mcp_retry_budget_max_tokens", _DEFAULT_BUDGET_MAX_TOKENS)),
+            )
+            _budgets[service] = budget
+        return budget
+
+
+def retry_budget_stats() -> dict[str, dict[str, Any]]:
+    with _lock:
+        budgets = dict(_budgets)
+    return {service: budget.stats() for service, budget in sorted(budgets.items())}
+
+
+def reset_retry_budgets() -> None:
+    with _lock:
+        _budgets.clear()
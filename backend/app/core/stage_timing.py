@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable
+
+# Upper bounds (ms) of the latency histogram buckets; anything slower lands in +Inf.
+STAGE_BUCKETS_MS: tuple[float, ...] = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class StageTimer:
+    """Milliseconds spent in each named stage of one gateway request.
+
+    ``stage()`` times a block; ``lap()`` books the time since the previous stage
+    ended (or since the timer started) under a name, for code paths that are
+    awkward to wrap. Repeated stages accumulate.
+    """
+
+    def __init__(self, *, clock: Callable[[], float] = time.perf_counter):
+        self._clock = clock
+        self.started = clock()
+        self._mark = self.started
+        self._stages: dict[str, float] = {}
+        self._finished: dict[str, float] | None = None
+
+    def add(self, name: str, duration_ms: float) -> None:
+        self._stages[name] = self._stages.get(name, 0.0) + max(0.0, float(duration_ms))
+
+    def stage(self, name: str) -> _Stage:
+        return _Stage(self, name)
+
+    def lap(self, name: str) -> None:
+        now = self._clock()
+        self.add(name, (now - self._mark) * 1000)
+        self._mark = now
+
+    def get(self, name: str) -> float:
+        return self._stages.get(name, 0.0)
+
+    def as_dict(self) -> dict[str, float]:
+        if self._finished is not None:
+            return dict(self._finished)
+        timings = {name: round(duration, 2) for name, duration in self._stages.items()}
+        timings["total"] = round((self._clock() - self.started) * 1000, 2)
+        return timings
+
+    def server_timing(self) -> str:
+        """``Server-Timing`` header value, e.g. ``auth;dur=1.2, upstream;dur=180.4, total;dur=190.0``."""
+        return ", ".join(f"{name};dur={duration:.1f}" for name, duration in self.as_dict().items())
+
+    def finish(self) -> dict[str, float]:
+        """Freeze the timings and add them to the process histograms (once)."""
+        if self._finished is None:
+            self._finished = self.as_dict()
+            get_stage_histograms().observe_all(self._finished)
+        return dict(self._finished)
+
+
+class _Stage:
+    # A plain context manager rather than @contextmanager: the generator form rewrites
+    # ``__traceback__`` on exceptions passing through, which frozen dataclass exceptions
+    # such as ResolverException reject.
+    def __init__(self, timer: StageTimer, name: str):
+        self._timer = timer
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self) -> None:
+        self._start = self._timer._clock()
+
+    def __exit__(self, *_exc_info) -> bool:
+        end = self._timer._clock()
+        self._timer.add(self._name, (end - self._start) * 1000)
+        self._timer._mark = end
+        return False
+
+
+class StageLatencyHistograms:
+    """Cumulative per-stage latency histograms, Prometheus style (``le`` buckets plus count and sum)."""
+
+    def __init__(self, buckets_ms: tuple[float, ...] = STAGE_BUCKETS_MS):
+        self.buckets_ms = tuple(sorted(buckets_ms))
+        self._lock = threading.Lock()
+        # stage -> (per-bucket counts with a trailing +Inf slot, count, sum_ms)
+        self._stages: dict[str, tuple[list[int], int, float]] = {}
+
+    def observe(self, stage: str, duration_ms: float) -> None:
+        index = len(self.buckets_ms)
+        for position, bound in enumerate(self.buckets_ms):
+            if duration_ms <= bound:
+                index = position
+                break
+        with self._lock:
+            counts, count, total = self._stages.get(stage, ([0] * (len(self.buckets_ms) + 1), 0, 0.0))
+            counts[index] += 1
+            self._stages[stage] = (counts, count + 1, total + float(duration_ms))
+
+    def observe_all(self, timings: dict[str, float]) -> None:
+        for stage, duration_ms in timings.items():
+            self.observe(stage, duration_ms)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            stages = {stage: (list(counts), count, total) for stage, (counts, count, total) in self._stages.items()}
+        result: dict[str, Any] = {}
+        for stage, (counts, count, total) in sorted(stages.items()):
+            cumulative = 0
+            buckets: dict[str, int] = {}
+            for bound, bucket_count in zip([*self.buckets_ms, None], counts):
+                cumulative += bucket_count
+                buckets["+Inf" if bound is None else f"{bound:g}"] = cumulative
+            result[stage] = {"buckets": buckets, "count": count, "sum_ms": round(total, 2)}
+        return result
+
+
+_lock = threading.Lock()
+_histograms: StageLatencyHistograms | None = None
+
+
+def get_stage_histograms() -> StageLatencyHistograms:
+    global _histograms
+    histograms = _histograms
+    if histograms is not None:
+        return histograms
+    with _lock:
+        if _histograms is None:
+            _histograms = StageLatencyHistograms()
+        return _histograms
+
+
+def reset_stage_histograms() -> None:
+    global _histograms
+    with _lock:
+        _histograms = None
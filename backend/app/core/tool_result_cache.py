@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable
+
+from app.core.config import get_settings
+
+_DEFAULT_MAX_ENTRIES = 5000
+
+CACHE_HIT = "hit"
+CACHE_MISS = "miss"
+
+_last_status: ContextVar[str | None] = ContextVar("tool_result_cache_status", default=None)
+
+
+def last_result_cache_status() -> str | None:
+    """``hit`` / ``miss`` for the most recent cacheable execute_tool call in this task, else None."""
+    return _last_status.get()
+
+
+def _payload_digest(payload: dict[str, Any]) -> str:
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ToolResultCache:
+    """Per-user read-through cache for read-only tool results.
+
+    Entries are keyed by (user, service, tool, payload) and expire after the tool's
+    spec-declared TTL. A successful mutating call bumps the (user, service)
+    generation, which invalidates every cached read for that connector at once;
+    a read that was in flight during the mutation is not stored.
+    """
+
+    def __init__(self, *, max_entries: int, enabled: bool = True, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max(1, int(max_entries))
+        self.enabled = bool(enabled)
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (expires_at, generation, result)
+        self._entries: OrderedDict[tuple[str, str, str, str], tuple[float, int, dict[str, Any]]] = OrderedDict()
+        # Generations come from one counter; scopes missing from the map are at the floor.
+        self._generations: dict[tuple[str, str], int] = {}
+        self._generation_seq = 0
+        self._generation_floor = 0
+        self._tool_stats: dict[str, dict[str, int]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _count(self, tool_name: str, outcome: str) -> None:
+        counts = self._tool_stats.setdefault(tool_name, {CACHE_HIT: 0, CACHE_MISS: 0})
+        counts[outcome] += 1
+        if outcome == CACHE_HIT:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    async def read_through(
+        self,
+        *,
+        user_id: str,
+        service: str,
+        tool_name: str,
+        ttl_seconds: float,
+        payload: dict[str, Any],
+        load: Callable[[], Awaitable[dict[str, Any]]],
+        record_status: bool = True,
+    ) -> dict[str, Any]:
+        """``record_status=False`` keeps a nested read inside another tool call from reporting a cache hit for it."""
+        if not self.enabled or ttl_seconds <= 0:
+            if record_status:
+                _last_status.set(None)
+            return await load()
+        key = (str(user_id), service, tool_name, _payload_digest(payload))
+        scope = (str(user_id), service)
+        now = self._clock()
+        with self._lock:
+            generation = self._generations.get(scope, self._generation_floor)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now and entry[1] == generation:
+                self._entries.move_to_end(key)
+                self._count(tool_name, CACHE_HIT)
+                if record_status:
+                    _last_status.set(CACHE_HIT)
+                return copy.deepcopy(entry[2])
+            self._count(tool_name, CACHE_MISS)
+        if record_status:
+            _last_status.set(CACHE_MISS)
+
+        result = await load()
+        if isinstance(result, dict) and result.get("ok", True) is not False:
+            with self._lock:
+                if self._generations.get(scope, self._generation_floor) == generation:
+                    self._entries[key] = (self._clock() + ttl_seconds, generation, copy.deepcopy(result))
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+        return result
+
+    def invalidate(self, *, user_id: str, service: str) -> None:
+        scope = (str(user_id), service)
+        with self._lock:
+            self._generation_seq += 1
+            self._generations[scope] = self._generation_seq
+            self.invalidations += 1
+            self._prune_generations()
+
+    def _prune_generations(self) -> None:
+        """Keep generations only for scopes with cached entries once they outgrow them; caller holds the lock."""
+        if len(self._generations) <= 2 * self.max_entries:
+            return
+        floor = self._generation_floor
+        live_scopes = {key[:2] for key in self._entries}
+        self._generations = {scope: self._generations.get(scope, floor) for scope in live_scopes}
+        # Reads in flight for a dropped scope captured an older value, so they still skip their store.
+        self._generation_floor = self._generation_seq
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+                "invalidations": self.invalidations,
+                "tools": {name: dict(counts) for name, counts in sorted(self._tool_stats.items())},
+            }
+
+
+_lock = threading.Lock()
+_cache: ToolResultCache | None = None
+
+
+def get_tool_result_cache() -> ToolResultCache:
+    global _cache
+    cache = _cache
+    if cache is not None:
+        return cache
+    with _lock:
+        if _cache is None:
+            try:
+                settings = get_settings()
+            except Exception:
+                settings = None
+            _cache = ToolResultCache(
+                max_entries=int(getattr(settings, "tool_result_cache_max_entries", _DEFAULT_MAX_ENTRIES)),
+                enabled=bool(getattr(settings, "tool_result_cache_enabled", True)),
+            )
+        return _cache
+
+
+def invalidate_tool_results(user_id: str | None, service: str) -> None:
+    """Call after a user's connection to ``service`` is created, replaced or removed."""
+    if not user_id:
+        return
+    get_tool_result_cache().invalidate(user_id=str(user_id), service=service)
+
+
+def reset_tool_result_cache() -> None:
+    global _cache
+    with _lock:
+        _cache = None
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from app.core.api_key_cache import InMemoryInvalidationChannel, InvalidationChannel
+from app.core.config import get_settings
+from app.core.db import execute_async
+
+_DEFAULT_TTL_SECONDS = 300.0
+_DEFAULT_MAX_ENTRIES = 1024
+
+
+@dataclass(frozen=True)
+class UserConnections:
+    services: tuple[str, ...]
+    scopes: dict[str, frozenset[str]]
+
+
+@dataclass(frozen=True)
+class VisibleTools:
+    etag: str
+    body: bytes
+
+
+def _extract_scopes(rows: list[dict[str, Any]]) -> dict[str, frozenset[str]]:
+    scopes: dict[str, frozenset[str]] = {}
+    for row in rows:
+        provider = str(row.get("provider") or "").strip().lower()
+        if not provider:
+            continue
+        items = row.get("granted_scopes")
+        if not isinstance(items, list):
+            continue
+        scopes[provider] = frozenset(str(item).strip() for item in items if str(item).strip())
+    return scopes
+
+
+def visibility_key(*, connections: UserConnections, policy_json: dict[str, Any], allowed_tools: Any) -> str:
+    """Hash of everything that decides which tools a key can see."""
+    material = {
+        "services": list(connections.services),
+        "scopes": {provider: sorted(values) for provider, values in sorted(connections.scopes.items())},
+        "policy": policy_json,
+        "allowed_tools": sorted(str(item) for item in allowed_tools) if isinstance(allowed_tools, list) else None,
+    }
+    encoded = json.dumps(material, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:32]
+
+
+class ToolVisibilityCache:
+    """Per-user OAuth connection state plus pre-serialized list_tools payloads keyed by ``visibility_key``.
+
+    Connection state is dropped on OAuth connect/disconnect (and expires after
+    ``ttl_seconds``); a load that was in flight when that happened is not stored.
+    Serialized tool lists never go stale because policy and connection changes
+    produce a different key.
+    """
+
+    def __init__(self, *, ttl_seconds: float, max_entries: int, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self.max_entries = max(1, int(max_entries))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._connections: OrderedDict[str, tuple[float, UserConnections]] = OrderedDict()
+        # Generations come from one counter; users missing from the map are at the floor.
+        self._generations: dict[str, int] = {}
+        self._generation_seq = 0
+        self._generation_floor = 0
+        self._tools: OrderedDict[str, VisibleTools] = OrderedDict()
+        self.connection_loads = 0
+        self.hits = 0
+        self.misses = 0
+
+    async def connections(self, supabase, *, user_id: str) -> UserConnections:
+        key = str(user_id)
+        now = self._clock()
+        with self._lock:
+            generation = self._generations.get(key, self._generation_floor)
+            cached = self._connections.get(key)
+            if cached is not None and cached[0] > now:
+                self._connections.move_to_end(key)
+                return cached[1]
+        rows = (
+            await execute_async(
+                supabase.table("oauth_tokens")
+                .select("provider,granted_scopes")
+                .eq("user_id", user_id)
+            )
+        ).data or []
+        connections = UserConnections(
+            services=tuple(sorted({str(row.get("provider") or "").strip().lower() for row in rows if row.get("provider")})),
+            scopes=_extract_scopes(rows),
+        )
+        with self._lock:
+            self.connection_loads += 1
+            if self.ttl_seconds > 0 and self._generations.get(key, self._generation_floor) == generation:
+                self._connections[key] = (now + self.ttl_seconds, connections)
+                self._connections.move_to_end(key)
+                while len(self._connections) > self.max_entries:
+                    self._connections.popitem(last=False)
+        return connections
+
+    def get_or_build(self, key: str, build: Callable[[], list[dict[str, Any]]]) -> VisibleTools:
+        with self._lock:
+            entry = self._tools.get(key)
+            if entry is not None:
+                self._tools.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        body = json.dumps(build(), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        entry = VisibleTools(etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"', body=body)
+        with self._lock:
+            self._tools[key] = entry
+            self._tools.move_to_end(key)
+            while len(self._tools) > self.max_entries:
+                self._tools.popitem(last=False)
+        return entry
+
+    def invalidate_user(self, user_id: str) -> None:
+        key = str(user_id)
+        with self._lock:
+            self._connections.pop(key, None)
+            self._generation_seq += 1
+            self._generations[key] = self._generation_seq
+            self._prune_generations()
+
+    def _prune_generations(self) -> None:
+        """Keep generations only for cached users once they outgrow the entries; caller holds the lock."""
+        if len(self._generations) <= 2 * self.max_entries:
+            return
+        floor = self._generation_floor
+        self._generations = {key: self._generations.get(key, floor) for key in self._connections}
+        # Loads in flight for a dropped user captured an older value, so they still skip their store.
+        self._generation_floor = self._generation_seq
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "users": len(self._connections),
+                "tool_lists": len(self._tools),
+                "connection_loads": self.connection_loads,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_lock = threading.Lock()
+_cache: ToolVisibilityCache | None = None
+_channel: InvalidationChannel | None = None
+
+
+def _cache_settings() -> tuple[float, int]:
+    try:
+        settings = get_settings()
+    except Exception:
+        return _DEFAULT_TTL_SECONDS, _DEFAULT_MAX_ENTRIES
+    return (
+        float(getattr(settings, "mcp_list_tools_cache_ttl_seconds", _DEFAULT_TTL_SECONDS)),
+        int(getattr(settings, "mcp_list_tools_cache_max_entries", _DEFAULT_MAX_ENTRIES)),
+    )
+
+
+def get_tool_visibility_cache() -> ToolVisibilityCache:
+    global _cache, _channel
+    cache = _cache
+    if cache is not None:
+        return cache
+    with _lock:
+        if _cache is None:
+            ttl_seconds, max_entries = _cache_settings()
+            _cache = ToolVisibilityCache(ttl_seconds=ttl_seconds, max_entries=max_entries)
+            if _channel is None:
+                _channel = InMemoryInvalidationChannel()
+            _channel.subscribe(_cache.invalidate_user)
+        return _cache
+
+
+def set_oauth_connection_invalidation_channel(channel: InvalidationChannel) -> None:
+    global _channel
+    with _lock:
+        _channel = channel
+        if _cache is not None:
+            channel.subscribe(_cache.invalidate_user)
+
+
+def invalidate_user_connections(user_id: str | None) -> None:
+    """Call after a user's OAuth connection is created, refreshed with new scopes, or removed."""
+    if not user_id:
+        return
+    get_tool_visibility_cache()
+    channel = _channel
+    if channel is not None:
+        channel.publish(str(user_id))
+
+
+def reset_tool_visibility_cache() -> None:
+    global _cache, _channel
+    with _lock:
+        _cache = None
+        _channel = None
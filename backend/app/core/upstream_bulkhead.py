@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from fastapi import HTTPException
+
+from app.core.config import get_settings
+
+_DEFAULT_MAX_KEYS = 20000
+
+
+@dataclass(frozen=True)
+class UpstreamLimits:
+    """Per-(user, service) limits declared in a tool spec's ``limits`` block; 0 disables each one."""
+
+    max_concurrency: int = 0
+    requests_per_second: float = 0.0
+    burst: int = 0
+    queue_timeout_ms: int = 10000
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_concurrency > 0 or self.requests_per_second > 0
+
+
+@dataclass
+class _Lane:
+    loop: asyncio.AbstractEventLoop
+    slots: asyncio.Semaphore | None
+    tokens: float
+    updated_at: float
+
+
+@dataclass
+class _ConnectorStats:
+    in_flight: int = 0
+    queued: int = 0
+    admitted: int = 0
+    waited: int = 0
+    timeouts: int = 0
+    wait_ms_total: float = 0.0
+    wait_ms_max: float = 0.0
+
+
+class UpstreamBulkheads:
+    """Concurrency caps plus token-bucket pacing per (user, service).
+
+    Calls over the limit wait in line instead of reaching the SaaS API and
+    collecting 429s. A call that cannot start within ``queue_timeout_ms`` fails
+    with ``<service>:QUEUE_TIMEOUT``.
+    """
+
+    def __init__(self, *, max_keys: int = _DEFAULT_MAX_KEYS, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max(1, int(max_keys))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._lanes: dict[tuple[str, str], _Lane] = {}
+        self._stats: dict[str, _ConnectorStats] = {}
+
+    def _lane(self, key: tuple[str, str], limits: UpstreamLimits) -> _Lane:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            lane = self._lanes.get(key)
+            if lane is None or lane.loop is not loop:
+                if len(self._lanes) >= self.max_keys:
+                    idle = [lane_key for lane_key, item in self._lanes.items() if item.slots is None or not item.slots.locked()]
+                    for lane_key in idle[: max(1, len(idle) // 2)]:
+                        del self._lanes[lane_key]
+                lane = _Lane(
+                    loop=loop,
+                    slots=asyncio.Semaphore(limits.max_concurrency) if limits.max_concurrency > 0 else None,
+                    tokens=float(max(1, limits.burst or 1)),
+                    updated_at=self._clock(),
+                )
+                self._lanes[key] = lane
+            return lane
+
+    def _reserve_token(self, lane: _Lane, limits: UpstreamLimits, *, max_wait: float) -> float | None:
+        """Take a token, returning how long to sleep before using it; None if that exceeds ``max_wait``."""
+        if limits.requests_per_second <= 0:
+            return 0.0
+        capacity = float(max(1, limits.burst or 1))
+        with self._lock:
+            now = self._clock()
+            lane.tokens = min(capacity, lane.tokens + (now - lane.updated_at) * limits.requests_per_second)
+            lane.updated_at = now
+            wait = max(0.0, (1.0 - lane.tokens) / limits.requests_per_second)
+            if wait > max_wait:
+                return None
+            # Going negative books a future token, so queued callers are paced in order.
+            lane.tokens -= 1.0
+            return wait
+
+    def _connector(self, service: str) -> _ConnectorStats:
+        return self._stats.setdefault(service, _ConnectorStats())
+
+    def _timeout(self, service: str, started: float) -> HTTPException:
+        with self._lock:
+            stats = self._connector(service)
+            stats.queued -= 1
+            stats.timeouts += 1
+        waited_ms = int((self._clock() - started) * 1000)
+        return HTTPException(status_code=503, detail=f"{service}:QUEUE_TIMEOUT|waited_ms={waited_ms}")
+
+    async def run(self, *, user_id: str, service: str, limits: UpstreamLimits, operation: Callable[[], Any]):
+        if not limits.enabled:
+            return await operation()
+        lane = self._lane((str(user_id), service), limits)
+        started = self._clock()
+        deadline = started + max(0, limits.queue_timeout_ms) / 1000.0
+        with self._lock:
+            self._connector(service).queued += 1
+
+        acquired = False
+        admitted = False
+        try:
+            if lane.slots is not None:
+                try:
+                    await asyncio.wait_for(lane.slots.acquire(), timeout=max(0.0, deadline - self._clock()))
+                except asyncio.TimeoutError:
+                    raise self._timeout(service, started) from None
+                acquired = True
+            wait = self._reserve_token(lane, limits, max_wait=max(0.0, deadline - self._clock()))
+            if wait is None:
+                raise self._timeout(service, started)
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            waited_ms = (self._clock() - started) * 1000
+            with self._lock:
+                stats = self._connector(service)
+                stats.queued -= 1
+                stats.in_flight += 1
+                stats.admitted += 1
+                if waited_ms >= 1.0:
+                    stats.waited += 1
+                stats.wait_ms_total += waited_ms
+                stats.wait_ms_max = max(stats.wait_ms_max, waited_ms)
+            admitted = True
+            return await operation()
+        except asyncio.CancelledError:
+            if not admitted:
+                with self._lock:
+                    self._connector(service).queued -= 1
+            raise
+        finally:
+            if admitted:
+                with self._lock:
+                    self._connector(service).in_flight -= 1
+            if acquired:
+                lane.slots.release()
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return {
+                service: {
+                    "in_flight": item.in_flight,
+                    "queue_depth": item.queued,
+                    "admitted": item.admitted,
+                    "waited": item.waited,
+                    "timeouts": item.timeouts,
+                    "avg_wait_ms": round(item.wait_ms_total / item.admitted, 2) if item.admitted else 0.0,
+                    "max_wait_ms": round(item.wait_ms_max, 2),
+                }
+                for service, item in sorted(self._stats.items())
+            }
+
+
+_lock = threading.Lock()
+_bulkheads: UpstreamBulkheads | None = None
+
+
+def get_upstream_bulkheads() -> UpstreamBulkheads:
+    global _bulkheads
+    bulkheads = _bulkheads
+    if bulkheads is not None:
+        return bulkheads
+    with _lock:
+        if _bulkheads is None:
+            _bulkheads = UpstreamBulkheads()
+        return _bulkheads
+
+
+def upstream_bulkheads_enabled() -> bool:
+    try:
+        settings = get_settings()
+    except Exception:
+        return True
+    return bool(getattr(settings, "upstream_bulkheads_enabled", True))
+
+
+def reset_upstream_bulkheads() -> None:
+    global _bulkheads
+    with _lock:
+        _bulkheads = None
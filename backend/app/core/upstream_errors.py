@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import re
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+from fastapi import HTTPException
+
+# Headers that carry the upstream request id, checked in order.
+_REQUEST_ID_HEADERS = (
+    "x-request-id",
+    "x-notion-request-id",
+    "x-github-request-id",
+    "request-id",
+)
+# Rate-limit reset headers: (name, unit). Epoch values are converted to a delay.
+_RESET_HEADERS = (
+    ("ratelimit-reset", "delta_seconds"),
+    ("x-ratelimit-reset", "epoch_seconds"),
+    ("x-ratelimit-requests-reset", "epoch_ms"),
+)
+# Clamp for absurd hints; anything near this is far past what the retry engine will wait.
+_MAX_HINT_SECONDS = 3600.0
+
+
+class UpstreamError(HTTPException):
+    """A failed upstream SaaS call with the details the retry engine and MCP mapping need.
+
+    ``detail`` keeps the ``<tool>:<CODE>|status=...|message=...`` shape existing handlers
+    match on; callers should read ``status`` / ``retry_after_seconds`` / ``request_id``
+    from the attributes instead of parsing it.
+    """
+
+    def __init__(
+        self,
+        *,
+        tool_name: str,
+        code: str,
+        status: int | None,
+        message: str = "",
+        upstream_code: str = "",
+        request_id: str = "",
+        retry_after_seconds: float | None = None,
+        detail: str | None = None,
+    ):
+        self.tool_name = tool_name
+        self.code = code
+        self.status = status
+        self.message = message
+        self.upstream_code = upstream_code
+        self.request_id = request_id
+        self.retry_after_seconds = retry_after_seconds
+        if detail is None:
+            detail = f"{tool_name}:{code}"
+            if status is not None:
+                detail += f"|status={status}"
+            if message:
+                detail += f"|message={message}"
+        super().__init__(status_code=400, detail=detail)
+
+    @classmethod
+    def from_response(
+        cls,
+        response: Any,
+        *,
+        tool_name: str,
+        code: str,
+        message: str = "",
+        upstream_code: str = "",
+        request_id: str = "",
+        detail: str | None = None,
+    ) -> UpstreamError:
+        headers = getattr(response, "headers", None) or {}
+        status = int(response.status_code)
+        return cls(
+            tool_name=tool_name,
+            code=code,
+            status=status,
+            message=message,
+            upstream_code=upstream_code,
+            request_id=request_id or upstream_request_id(headers),
+            # Reset headers ride along on every GitHub/Linear response; they only mean "wait" when throttled.
+            retry_after_seconds=retry_after_seconds(headers, include_reset=status in {403, 429}),
+            detail=detail,
+        )
+
+
+def _header(headers: Any, name: str) -> str:
+    value = headers.get(name)
+    if value is None and isinstance(headers, dict):
+        lowered = {str(key).lower(): item for key, item in headers.items()}
+        value = lowered.get(name)
+    return str(value or "").strip()
+
+
+def upstream_request_id(headers: Any) -> str:
+    for name in _REQUEST_ID_HEADERS:
+        value = _header(headers, name)
+        if value:
+            return value
+    return ""
+
+
+def retry_after_seconds(headers: Any, *, include_reset: bool = True, now: float | None = None) -> float | None:
+    """Server wait hint from ``Retry-After`` or a rate-limit reset header, in seconds."""
+    now = time.time() if now is None else now
+    hint: float | None = None
+    retry_after = _header(headers, "retry-after")
+    if retry_after:
+        try:
+            hint = float(retry_after)
+        except ValueError:
+            try:
+                hint = parsedate_to_datetime(retry_after).timestamp() - now
+            except (TypeError, ValueError):
+                hint = None
+    if hint is None and include_reset:
+        for name, unit in _RESET_HEADERS:
+            raw = _header(headers, name)
+            if not raw:
+                continue
+            try:
+                value = float(raw)
+            except ValueError:
+                continue
+            if unit == "epoch_seconds":
+                value -= now
+            elif unit == "epoch_ms":
+                value = value / 1000.0 - now
+            hint = value
+            break
+    if hint is None:
+        return None
+    return min(_MAX_HINT_SECONDS, max(0.0, hint))
+
+
+def upstream_status_of(exc: HTTPException) -> int | None:
+    """Upstream HTTP status for a tool failure; falls back to ``|status=NNN`` for legacy details."""
+    if isinstance(exc, UpstreamError):
+        return exc.status
+    match = re.search(r"\|status=(\d{3})", str(exc.detail or ""))
+    return int(match.group(1)) if match else None
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from typing import Any
+
+from app.core.config import get_settings
+from app.core.event_hooks import deliver_recorded_webhooks, emit_webhook_event, record_webhook_event
+
+logger = logging.getLogger("metel-backend.webhook_dispatcher")
+
+_DEFAULT_WORKERS = 4
+_DEFAULT_MAX_QUEUE = 5000
+_DEFAULT_DRAIN_SECONDS = 5.0
+_DEFAULT_LEASE_SECONDS = 120.0
+
+
+def _retry_kwargs() -> dict[str, int]:
+    try:
+        settings = get_settings()
+    except Exception:
+        settings = None
+    return {
+        "max_retries": max(0, int(getattr(settings, "webhook_retry_max_retries", 5))),
+        "base_backoff_seconds": max(1, int(getattr(settings, "webhook_retry_base_backoff_seconds", 30))),
+        "max_backoff_seconds": max(1, int(getattr(settings, "webhook_retry_max_backoff_seconds", 900))),
+    }
+
+
+class WebhookDispatcher:
+    """Delivers recorded webhook deliveries from an in-process queue with a pool of worker tasks.
+
+    The request path writes the pending webhook_deliveries rows (the durable outbox)
+    before anything is queued; the queue only carries those rows to a worker for a
+    prompt POST. Queued rows are leased (``next_retry_at`` = now + ``lease_seconds``)
+    so the retry processor does not deliver them a second time meanwhile. Rows
+    dropped on overflow, at shutdown or by a crash stay pending in the table and
+    ``process_pending_webhook_retries`` delivers them once the lease runs out.
+    """
+
+    def __init__(self, *, workers: int, max_queue: int, drain_seconds: float, lease_seconds: float = _DEFAULT_LEASE_SECONDS):
+        self.workers = max(1, int(workers))
+        self.max_queue = max(1, int(max_queue))
+        self.drain_seconds = max(0.0, float(drain_seconds))
+        self.lease_seconds = max(0.0, float(lease_seconds))
+        self._queue: asyncio.Queue[dict[str, Any]] | None = None
+        self._tasks: list[asyncio.Task] = []
+        self.enqueued = 0
+        self.delivered = 0
+        self.overflowed = 0
+        self.recorded_only = 0
+        self.errors = 0
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    def submit(self, event: dict[str, Any]) -> bool:
+        """Queue already-recorded deliveries; returns False when no worker is running or the queue is full."""
+        if not self.running or self._queue is None:
+            return False
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed += 1
+            return False
+        self.enqueued += 1
+        return True
+
+    def start(self) -> None:
+        if self.running:
+            return
+        loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks = [loop.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        queue = self._queue
+        tasks = self._tasks
+        if queue is not None and tasks:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(queue.join(), timeout=self.drain_seconds)
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._tasks = []
+        if queue is None:
+            return
+        # Left-over deliveries are already pending rows; the retry processor picks them up.
+        while not queue.empty():
+            queue.get_nowait()
+            self.recorded_only += 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "running": self.running,
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "enqueued": self.enqueued,
+            "delivered": self.delivered,
+            "overflowed": self.overflowed,
+            "recorded_only": self.recorded_only,
+            "errors": self.errors,
+        }
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            event = await queue.get()
+            try:
+                await deliver_recorded_webhooks(
+                    supabase=event["supabase"],
+                    event_type=event["event_type"],
+                    pending=event["pending"],
+                    **_retry_kwargs(),
+                )
+                self.delivered += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.errors += 1
+                logger.exception("webhook_dispatch_failed event_type=%s", event.get("event_type"))
+            finally:
+                queue.task_done()
+
+
+def _dispatcher_settings() -> dict[str, Any]:
+    try:
+        settings = get_settings()
+    except Exception:
+        settings = None
+    return {
+        "workers": int(getattr(settings, "webhook_dispatch_workers", _DEFAULT_WORKERS)),
+        "max_queue": int(getattr(settings, "webhook_dispatch_max_queue", _DEFAULT_MAX_QUEUE)),
+        "drain_seconds": float(getattr(settings, "webhook_dispatch_drain_seconds", _DEFAULT_DRAIN_SECONDS)),
+        "lease_seconds": float(getattr(settings, "webhook_dispatch_lease_seconds", _DEFAULT_LEASE_SECONDS)),
+    }
+
+
+_dispatcher = WebhookDispatcher(**_dispatcher_settings())
+
+
+async def dispatch_webhook_event(*, supabase, user_id: str, event_type: str, payload: dict[str, Any]) -> None:
+    """Record a webhook event in the outbox and hand its deliveries to the background dispatcher.
+
+    The pending webhook_deliveries rows are inserted before this returns, so nothing
+    is lost if the process dies before a worker gets to them. With a full queue the
+    rows simply wait for the retry processor; without a running dispatcher the event
+    is delivered inline as before.
+    """
+    if not _dispatcher.running:
+        await emit_webhook_event(supabase=supabase, user_id=user_id, event_type=event_type, payload=payload, **_retry_kwargs())
+        return
+    pending = await record_webhook_event(
+        supabase=supabase,
+        user_id=user_id,
+        event_type=event_type,
+        payload=payload,
+        lease_seconds=_dispatcher.lease_seconds,
+    )
+    if not pending:
+        return
+    if not _dispatcher.submit({"supabase": supabase, "event_type": event_type, "pending": pending}):
+        _dispatcher.recorded_only += 1
+
+
+def webhook_dispatcher_stats() -> dict[str, Any]:
+    return _dispatcher.stats()
+
+
+def start_webhook_dispatcher() -> None:
+    _dispatcher.start()
+
+
+async def stop_webhook_dispatcher() -> None:
+    await _dispatcher.stop()
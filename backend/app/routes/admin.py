@@ -5,11 +5,23 @@ from datetime import datetime, timedelta, timezone
 
 from fastapi import APIRouter, Query, Request, HTTPException
 from pydantic import BaseModel, Field
-from supabase import create_client
 
+from app.core.agent_index import get_default_agent_index
+from app.core.api_key_usage import last_used_writer_stats
+from app.core.audit_writer import audit_writer_stats
 from app.core.auth import get_authenticated_user_id
+from app.core.circuit_breaker import get_circuit_breakers
 from app.core.authz import Role, get_authz_context, require_min_role
-from app.core.config import get_settings
+from app.core.db import get_supabase_client, supabase_pool_stats
+from app.core.http_pool import get_upstream_client_pools
+from app.core.idempotency import get_idempotency_cache
+from app.core.oauth_token_cache import get_oauth_token_cache
+from app.core.retry_policy import retry_budget_stats
+from app.core.stage_timing import get_stage_histograms
+from app.core.tool_result_cache import get_tool_result_cache
+from app.core.tool_visibility import get_tool_visibility_cache
+from app.core.upstream_bulkhead import get_upstream_bulkheads
+from app.core.webhook_dispatcher import webhook_dispatcher_stats
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
@@ -125,8 +137,7 @@ def _save_incident_banner_record(*, supabase, organization_id: int | None, user_
 @router.get("/connectors/diagnostics")
 async def connector_diagnostics(request: Request):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.ADMIN, method=request.method)
     rows = (
@@ -163,8 +174,7 @@ async def connector_diagnostics(request: Request):
 @router.get("/rate-limit-events")
 async def rate_limit_events(request: Request, days: int = Query(7, ge=1, le=30), limit: int = Query(100, ge=1, le=500)):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.ADMIN, method=request.method)
     since = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
@@ -184,8 +194,7 @@ async def rate_limit_events(request: Request, days: int = Query(7, ge=1, le=30),
 @router.get("/system-health")
 async def system_health(request: Request):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.ADMIN, method=request.method)
     db_ok = True
@@ -198,15 +207,41 @@ async def system_health(request: Request):
     return {
         "status": "ok" if db_ok else "degraded",
         "time_utc": datetime.now(timezone.utc).isoformat(),
-        "services": {"database": {"ok": db_ok, "error": error_message}},
+        "services": {
+            "database": {
+                "ok": db_ok,
+                "error": error_message,
+                "pool": supabase_pool_stats(),
+                "last_used_writer": last_used_writer_stats(),
+                "audit_writer": audit_writer_stats(),
+                "agent_index": get_default_agent_index().stats(),
+                "tool_visibility": get_tool_visibility_cache().stats(),
+                "oauth_token_cache": get_oauth_token_cache().stats(),
+            },
+            "webhook_dispatcher": webhook_dispatcher_stats(),
+            "idempotency_cache": get_idempotency_cache().stats(),
+            "tool_result_cache": get_tool_result_cache().stats(),
+            "upstream_bulkheads": get_upstream_bulkheads().stats(),
+            "retry_budgets": retry_budget_stats(),
+            "upstream_http_pools": get_upstream_client_pools().stats(),
+        },
     }
 
 
+@router.get("/gateway-stage-latency")
+async def gateway_stage_latency(request: Request):
+    user_id = await get_authenticated_user_id(request)
+    supabase = get_supabase_client()
+    authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
+    require_min_role(authz_ctx, Role.ADMIN, method=request.method)
+    histograms = get_stage_histograms()
+    return {"buckets_ms": list(histograms.buckets_ms), "stages": histograms.snapshot()}
+
+
 @router.get("/external-health")
 async def external_health(request: Request, days: int = Query(1, ge=1, le=14)):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.ADMIN, method=request.method)
     since = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
@@ -245,6 +280,8 @@ async def external_health(request: Request, days: int = Query(1, ge=1, le=14)):
         bucket["avg_latency_ms"] += float(row.get("latency_ms") or 0.0)
         buckets[connector] = bucket
 
+    queue_stats = get_upstream_bulkheads().stats()
+    circuits = get_circuit_breakers().snapshot()
     items: list[dict[str, Any]] = []
     for connector, bucket in buckets.items():
         calls = int(bucket.get("calls") or 0)
@@ -255,6 +292,9 @@ async def external_health(request: Request, days: int = Query(1, ge=1, le=14)):
         status = "ok"
         if calls >= 5 and (fail_rate >= 0.3 or upstream_temporary >= 3):
             status = "degraded"
+        circuit = circuits.get(connector)
+        if circuit is not None and circuit["state"] != "closed":
+            status = "degraded"
         top_errors_dict = bucket.get("top_errors") or {}
         top_errors = [
             {"error_code": code, "count": count}
@@ -271,6 +311,8 @@ async def external_health(request: Request, days: int = Query(1, ge=1, le=14)):
                 "last_error_at": bucket.get("last_error_at"),
                 "status": status,
                 "top_errors": top_errors,
+                "queue": queue_stats.get(connector),
+                "circuit": circuit,
             }
         )
 
@@ -280,8 +322,7 @@ async def external_health(request: Request, days: int = Query(1, ge=1, le=14)):
 @router.get("/incident-banner")
 async def get_incident_banner(request: Request):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     organization_id = _resolve_incident_org_id(request, authz_ctx, require_value=False)
     rows = []
@@ -322,8 +363,7 @@ async def get_incident_banner(request: Request):
 @router.patch("/incident-banner")
 async def update_incident_banner(request: Request, body: IncidentBannerUpdateRequest):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.OWNER, method=request.method)
     organization_id = _resolve_incident_org_id(request, authz_ctx, require_value=True)
@@ -354,8 +394,7 @@ async def update_incident_banner(request: Request, body: IncidentBannerUpdateReq
 @router.get("/incident-banner/revisions")
 async def list_incident_banner_revisions(request: Request, limit: int = Query(50, ge=1, le=200)):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.ADMIN, method=request.method)
     organization_id = _resolve_incident_org_id(request, authz_ctx, require_value=True)
@@ -383,8 +422,7 @@ async def list_incident_banner_revisions(request: Request, limit: int = Query(50
 @router.post("/incident-banner/revisions")
 async def create_incident_banner_revision(request: Request, body: IncidentBannerRevisionCreateRequest):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.ADMIN, method=request.method)
     organization_id = _resolve_incident_org_id(request, authz_ctx, require_value=True)
@@ -414,8 +452,7 @@ async def create_incident_banner_revision(request: Request, body: IncidentBanner
 @router.post("/incident-banner/revisions/{revision_id}/review")
 async def review_incident_banner_revision(request: Request, revision_id: str, body: IncidentBannerRevisionReviewRequest):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.OWNER, method=request.method)
     organization_id = _resolve_incident_org_id(request, authz_ctx, require_value=True)
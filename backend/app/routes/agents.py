@@ -5,11 +5,11 @@ from typing import Any
 
 from fastapi import APIRouter, HTTPException, Query, Request
 from pydantic import BaseModel, Field
-from supabase import create_client
 
+from app.core.agent_index import invalidate_team_agents
 from app.core.auth import get_authenticated_user_id
 from app.core.authz import AuthzContext, Role, get_authz_context, require_min_role
-from app.core.config import get_settings
+from app.core.db import get_supabase_client
 
 router = APIRouter(prefix="/api/agents", tags=["agents"])
 
@@ -95,8 +95,7 @@ async def list_agents(
     status: str = Query(default=""),
 ):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
 
@@ -132,8 +131,7 @@ async def list_agents(
 @router.get("/{agent_id}")
 async def get_agent(request: Request, agent_id: int):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
 
@@ -154,8 +152,7 @@ async def get_agent(request: Request, agent_id: int):
 @router.post("")
 async def create_agent(request: Request, body: AgentCreateRequest):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.ADMIN, method=request.method)
 
@@ -186,14 +183,14 @@ async def create_agent(request: Request, body: AgentCreateRequest):
     rows = supabase.table("agents").insert(payload).execute().data or []
     if not rows:
         raise HTTPException(status_code=500, detail="agent_create_failed")
+    invalidate_team_agents()
     return {"item": rows[0]}
 
 
 @router.patch("/{agent_id}")
 async def update_agent(request: Request, agent_id: int, body: AgentUpdateRequest):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.ADMIN, method=request.method)
 
@@ -229,4 +226,5 @@ async def update_agent(request: Request, agent_id: int, body: AgentUpdateRequest
         .eq("id", agent_id)
         .execute()
     ).data or []
+    invalidate_team_agents()
     return {"ok": True, "updated": True, "item": rows[0] if rows else None}
@@ -6,13 +6,13 @@ from typing import Any
 
 from fastapi import APIRouter, HTTPException, Query, Request
 from pydantic import BaseModel, Field
-from supabase import create_client
 
 from agent.registry import load_registry
+from app.core.api_key_cache import invalidate_api_key
 from app.core.api_keys import generate_api_key, hash_api_key
 from app.core.auth import get_authenticated_user_id
 from app.core.authz import AuthzContext, Role, get_authz_context, require_min_role
-from app.core.config import get_settings
+from app.core.db import get_supabase_client
 from app.core.error_codes import ERR_POLICY_CONFLICT
 
 router = APIRouter(prefix="/api/api-keys", tags=["api-keys"])
@@ -201,6 +201,12 @@ def _normalize_api_key_policy(raw_policy: dict[str, Any] | None) -> dict[str, An
             team_ids.append(value)
         normalized["allowed_linear_team_ids"] = team_ids
 
+    rate_limit_per_minute = raw_policy.get("rate_limit_per_minute")
+    if rate_limit_per_minute is not None:
+        if isinstance(rate_limit_per_minute, bool) or not isinstance(rate_limit_per_minute, int) or rate_limit_per_minute <= 0:
+            raise HTTPException(status_code=400, detail="invalid_policy_json:rate_limit_per_minute")
+        normalized["rate_limit_per_minute"] = rate_limit_per_minute
+
     return normalized
 
 
@@ -294,8 +300,7 @@ def _iso_bucket_day(value: str | None) -> str:
 @router.get("")
 async def list_api_keys(request: Request):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
 
@@ -314,8 +319,7 @@ async def list_api_keys(request: Request):
 @router.get("/tool-options")
 async def list_api_key_tool_options(request: Request):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
     return {"items": _phase1_tool_options()}
@@ -328,8 +332,7 @@ async def api_key_drilldown(
     days: int = Query(7, ge=1, le=30),
 ):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
 
@@ -418,8 +421,7 @@ async def api_key_drilldown(
 @router.post("")
 async def create_api_key(request: Request, body: CreateApiKeyRequest):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
 
@@ -475,8 +477,7 @@ async def create_api_key(request: Request, body: CreateApiKeyRequest):
 @router.delete("/{key_id}")
 async def revoke_api_key(request: Request, key_id: str):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
     now = datetime.now(timezone.utc).isoformat()
@@ -499,14 +500,14 @@ async def revoke_api_key(request: Request, key_id: str):
         .eq("user_id", user_id)
         .execute()
     )
+    invalidate_api_key(key_id)
     return {"ok": True}
 
 
 @router.patch("/{key_id}")
 async def update_api_key(request: Request, key_id: str, body: UpdateApiKeyRequest):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
 
@@ -566,14 +567,14 @@ async def update_api_key(request: Request, key_id: str, body: UpdateApiKeyReques
         .eq("user_id", user_id)
         .execute()
     )
+    invalidate_api_key(key_id)
     return {"ok": True, "updated": True}
 
 
 @router.post("/{key_id}/rotate")
 async def rotate_api_key(request: Request, key_id: str):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
 
@@ -627,6 +628,7 @@ async def rotate_api_key(request: Request, key_id: str):
         .eq("user_id", user_id)
         .execute()
     )
+    invalidate_api_key(key_id)
 
     return {
         "id": created_row.get("id"),
@@ -10,11 +10,10 @@ from typing import Any
 from fastapi import APIRouter, HTTPException, Query, Request
 from fastapi.responses import Response
 from pydantic import BaseModel, Field
-from supabase import create_client
 
 from app.core.auth import get_authenticated_user_id
 from app.core.authz import Role, get_authz_context, require_min_role
-from app.core.config import get_settings
+from app.core.db import get_supabase_client
 
 router = APIRouter(prefix="/api/audit", tags=["audit"])
 
@@ -253,8 +252,7 @@ async def list_audit_events(
     to: str = Query(default=""),
 ):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
 
@@ -379,8 +377,7 @@ async def export_audit_events(
     to: str = Query(default=""),
 ):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.ADMIN, method=request.method)
 
@@ -506,8 +503,7 @@ async def export_audit_events(
 @router.get("/settings")
 async def get_audit_settings(request: Request):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.ADMIN, method=request.method)
     row = _load_audit_settings(supabase=supabase, user_id=user_id)
@@ -522,8 +518,7 @@ async def get_audit_settings(request: Request):
 @router.patch("/settings")
 async def update_audit_settings(request: Request, body: AuditSettingsUpdateRequest):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.OWNER, method=request.method)
 
@@ -554,8 +549,7 @@ async def get_audit_event_detail(
     event_id: int,
 ):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
 
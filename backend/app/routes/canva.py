@@ -10,12 +10,16 @@ import httpx
 from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import RedirectResponse
 from pydantic import BaseModel, Field
-from supabase import create_client
 
 from app.core.auth import get_authenticated_user_id
 from app.core.connector_jobs import record_connector_job_run
 from app.core.config import get_settings
+from app.core.db import get_supabase_client
+from app.core.deadline import upstream_timeout
+from app.core.oauth_token_cache import get_oauth_token_cache, invalidate_oauth_token
 from app.core.state import build_state, verify_state
+from app.core.tool_result_cache import invalidate_tool_results
+from app.core.tool_visibility import invalidate_user_connections
 from app.security.token_vault import TokenVault
 
 router = APIRouter(prefix="/api/oauth/canva", tags=["canva-oauth"])
@@ -166,8 +170,7 @@ def _granted_scope_set(row: dict | None) -> set[str]:
 
 
 async def _require_canva_token_row(user_id: str) -> tuple[str, dict]:
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     row = _load_canva_oauth_row(supabase=supabase, user_id=user_id)
     if not row:
         raise HTTPException(status_code=400, detail="Canva가 연결되어 있지 않습니다. 먼저 연동을 완료해주세요.")
@@ -255,6 +258,13 @@ def _is_expired(value: str | None) -> bool:
     return expires_at <= datetime.now(timezone.utc)
 
 
+def _seconds_until_expiry(value: str | None) -> float | None:
+    expires_at = _parse_iso_datetime(value)
+    if not expires_at:
+        return None
+    return (expires_at - datetime.now(timezone.utc)).total_seconds()
+
+
 async def _canva_api_get(access_token: str, path: str) -> dict:
     payload = await _canva_api_request("GET", path, access_token=access_token)
     return payload if isinstance(payload, dict) else {}
@@ -262,7 +272,7 @@ async def _canva_api_get(access_token: str, path: str) -> dict:
 
 async def _canva_api_request(method: str, path: str, *, access_token: str, params: dict | None = None, json_body: dict | None = None) -> dict:
     settings = get_settings()
-    async with httpx.AsyncClient(timeout=20) as client:
+    async with httpx.AsyncClient(timeout=upstream_timeout(20)) as client:
         response = await client.request(
             method.upper(),
             f"{settings.canva_api_base_url.rstrip('/')}{path}",
@@ -344,7 +354,7 @@ async def _refresh_canva_access_token_if_needed(*, supabase, row: dict | None) -
     if not refresh_token:
         return row
 
-    async with httpx.AsyncClient(timeout=20) as client:
+    async with httpx.AsyncClient(timeout=upstream_timeout(20)) as client:
         response = await client.post(
             f"{settings.canva_api_base_url.rstrip('/')}/oauth/token",
             headers={"Content-Type": "application/x-www-form-urlencoded"},
@@ -376,6 +386,9 @@ async def _refresh_canva_access_token_if_needed(*, supabase, row: dict | None) -
         "updated_at": now.isoformat(),
     }
     supabase.table("oauth_tokens").upsert(updated_row, on_conflict="user_id,provider").execute()
+    invalidate_user_connections(row.get("user_id"))
+    invalidate_oauth_token(row.get("user_id"), "canva")
+    invalidate_tool_results(row.get("user_id"), "canva")
     return updated_row
 
 
@@ -398,7 +411,20 @@ async def _require_canva_access_token(user_id: str) -> str:
 
 
 async def load_canva_access_token_for_user(user_id: str) -> str:
-    return await _require_canva_access_token(user_id)
+    cache = get_oauth_token_cache()
+    cached, generation = cache.lookup(user_id, "canva")
+    if cached is not None:
+        return cached
+    access_token, row = await _require_canva_token_row(user_id)
+    # Never serve a cached token past its expiry; the next load refreshes it instead.
+    cache.store(
+        user_id,
+        "canva",
+        access_token,
+        generation=generation,
+        ttl_seconds=_seconds_until_expiry((row or {}).get("token_expires_at")),
+    )
+    return access_token
 
 
 @router.post("/start")
@@ -410,7 +436,7 @@ async def canva_oauth_start(request: Request):
     code_verifier = _build_pkce_verifier()
     code_challenge = _build_pkce_challenge(code_verifier)
     now = datetime.now(timezone.utc)
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     (
         supabase.table("oauth_pending_states")
         .upsert(
@@ -474,7 +500,7 @@ async def canva_oauth_callback(
     if not user_id:
         raise HTTPException(status_code=400, detail="Invalid or expired state")
 
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     code_verifier = _consume_pkce_verifier(supabase=supabase, state=normalized_state)
     if not code_verifier:
         existing = (
@@ -542,6 +568,9 @@ async def canva_oauth_callback(
         "updated_at": now.isoformat(),
     }
     supabase.table("oauth_tokens").upsert(upsert_payload, on_conflict="user_id,provider").execute()
+    invalidate_user_connections(user_id)
+    invalidate_oauth_token(user_id, "canva")
+    invalidate_tool_results(user_id, "canva")
 
     return RedirectResponse(url=_frontend_dashboard_url(settings.frontend_url, "canva=connected"), status_code=302)
 
@@ -550,8 +579,7 @@ async def canva_oauth_callback(
 async def canva_oauth_status(request: Request):
     try:
         user_id = await get_authenticated_user_id(request)
-        settings = get_settings()
-        supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+        supabase = get_supabase_client()
         integration = _load_canva_oauth_row(supabase=supabase, user_id=user_id)
         integration = await _refresh_canva_access_token_if_needed(supabase=supabase, row=integration)
         return {"connected": bool(integration), "integration": _serialize_canva_integration(integration)}
@@ -562,8 +590,7 @@ async def canva_oauth_status(request: Request):
 @router.delete("/disconnect")
 async def canva_oauth_disconnect(request: Request):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     (
         supabase.table("oauth_tokens")
         .delete()
@@ -571,6 +598,9 @@ async def canva_oauth_disconnect(request: Request):
         .eq("provider", "canva")
         .execute()
     )
+    invalidate_user_connections(user_id)
+    invalidate_oauth_token(user_id, "canva")
+    invalidate_tool_results(user_id, "canva")
     (
         supabase.table("oauth_pending_states")
         .delete()
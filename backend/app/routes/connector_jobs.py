@@ -1,10 +1,9 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Query, Request
-from supabase import create_client
 
 from app.core.auth import get_authenticated_user_id
-from app.core.config import get_settings
+from app.core.db import get_supabase_client
 
 router = APIRouter(prefix="/api/connector-jobs", tags=["connector-jobs"])
 
@@ -19,8 +18,7 @@ async def list_connector_job_runs(
     limit: int = Query(default=20, ge=1, le=100),
 ):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
 
     query = (
         supabase.table("connector_job_runs")
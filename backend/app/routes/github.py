@@ -6,11 +6,14 @@ from urllib.parse import urlencode
 import httpx
 from fastapi import APIRouter, HTTPException, Query, Request
 from fastapi.responses import RedirectResponse
-from supabase import create_client
 
 from app.core.auth import get_authenticated_user_id
 from app.core.config import get_settings
+from app.core.db import get_supabase_client
+from app.core.oauth_token_cache import invalidate_oauth_token
 from app.core.state import build_state, verify_state
+from app.core.tool_result_cache import invalidate_tool_results
+from app.core.tool_visibility import invalidate_user_connections
 from app.security.token_vault import TokenVault
 
 router = APIRouter(prefix="/api/oauth/github", tags=["github-oauth"])
@@ -102,7 +105,7 @@ async def github_oauth_callback(code: str, state: str):
     scope_text = str(payload.get("scope") or "").strip()
     granted_scopes = [item.strip() for item in scope_text.split(",") if item.strip()] or ["read:user", "repo"]
 
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     supabase.table("oauth_tokens").upsert(
         {
             "user_id": user_id,
@@ -115,6 +118,9 @@ async def github_oauth_callback(code: str, state: str):
         },
         on_conflict="user_id,provider",
     ).execute()
+    invalidate_user_connections(user_id)
+    invalidate_oauth_token(user_id, "github")
+    invalidate_tool_results(user_id, "github")
 
     return RedirectResponse(url=_frontend_dashboard_url(settings.frontend_url, "github=connected"), status_code=302)
 
@@ -123,8 +129,7 @@ async def github_oauth_callback(code: str, state: str):
 async def github_oauth_status(request: Request):
     try:
         user_id = await get_authenticated_user_id(request)
-        settings = get_settings()
-        supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+        supabase = get_supabase_client()
         result = (
             supabase.table("oauth_tokens")
             .select("workspace_name, workspace_id, updated_at")
@@ -142,8 +147,7 @@ async def github_oauth_status(request: Request):
 @router.delete("/disconnect")
 async def github_oauth_disconnect(request: Request):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     (
         supabase.table("oauth_tokens")
         .delete()
@@ -151,6 +155,9 @@ async def github_oauth_disconnect(request: Request):
         .eq("provider", "github")
         .execute()
     )
+    invalidate_user_connections(user_id)
+    invalidate_oauth_token(user_id, "github")
+    invalidate_tool_results(user_id, "github")
     return {"ok": True, "connected": False}
 
 
@@ -158,7 +165,7 @@ async def github_oauth_disconnect(request: Request):
 async def github_repos_list(request: Request, per_page: int = Query(5, ge=1, le=20)):
     user_id = await get_authenticated_user_id(request)
     settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     token_result = (
         supabase.table("oauth_tokens")
         .select("access_token_encrypted")
@@ -6,11 +6,14 @@ from urllib.parse import urlencode
 import httpx
 from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import RedirectResponse
-from supabase import create_client
 
 from app.core.auth import get_authenticated_user_id
 from app.core.config import get_settings
+from app.core.db import get_supabase_client
+from app.core.oauth_token_cache import invalidate_oauth_token
 from app.core.state import build_state, verify_state
+from app.core.tool_result_cache import invalidate_tool_results
+from app.core.tool_visibility import invalidate_user_connections
 from app.security.token_vault import TokenVault
 
 router = APIRouter(prefix="/api/oauth/google", tags=["google-oauth"])
@@ -83,7 +86,7 @@ async def google_oauth_callback(code: str, state: str):
     encrypted = TokenVault(settings.notion_token_encryption_key).encrypt(access_token)
     scope_text = str(payload.get("scope") or "").strip()
     granted_scopes = [item.strip() for item in scope_text.split(" ") if item.strip()] or ["calendar.read"]
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     supabase.table("oauth_tokens").upsert(
         {
             "user_id": user_id,
@@ -96,6 +99,9 @@ async def google_oauth_callback(code: str, state: str):
         },
         on_conflict="user_id,provider",
     ).execute()
+    invalidate_user_connections(user_id)
+    invalidate_oauth_token(user_id, "google")
+    invalidate_tool_results(user_id, "google")
 
     frontend_base = (settings.frontend_url or "").strip().strip("'\"").replace("\r", "").replace("\n", "").rstrip("/")
     if not frontend_base.startswith(("http://", "https://")):
@@ -106,8 +112,7 @@ async def google_oauth_callback(code: str, state: str):
 @router.get("/status")
 async def google_oauth_status(request: Request):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     result = (
         supabase.table("oauth_tokens")
         .select("updated_at")
@@ -123,8 +128,7 @@ async def google_oauth_status(request: Request):
 @router.delete("/disconnect")
 async def google_oauth_disconnect(request: Request):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     (
         supabase.table("oauth_tokens")
         .delete()
@@ -132,4 +136,7 @@ async def google_oauth_disconnect(request: Request):
         .eq("provider", "google")
         .execute()
     )
+    invalidate_user_connections(user_id)
+    invalidate_oauth_token(user_id, "google")
+    invalidate_tool_results(user_id, "google")
     return {"ok": True, "connected": False}
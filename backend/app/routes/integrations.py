@@ -5,11 +5,11 @@ from typing import Any
 
 from fastapi import APIRouter, HTTPException, Query, Request
 from pydantic import BaseModel, Field
-from supabase import create_client
 
 from app.core.auth import get_authenticated_user_id
 from app.core.authz import Role, get_authz_context, require_min_role
 from app.core.config import get_settings
+from app.core.db import get_supabase_client
 from app.core.dead_letter_alert import send_dead_letter_alert
 from app.core.event_hooks import emit_webhook_event, process_pending_webhook_retries, retry_webhook_delivery
 
@@ -146,8 +146,7 @@ async def list_webhooks(
     team_id: int | None = Query(default=None),
 ):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
     scoped_user_ids = _resolve_scoped_user_ids(
@@ -174,8 +173,7 @@ async def list_webhooks(
 @router.post("/webhooks")
 async def create_webhook(request: Request, body: WebhookCreateRequest):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.ADMIN, method=request.method)
     now = datetime.now(timezone.utc).isoformat()
@@ -202,8 +200,7 @@ async def create_webhook(request: Request, body: WebhookCreateRequest):
 @router.patch("/webhooks/{webhook_id}")
 async def update_webhook(request: Request, webhook_id: str, body: WebhookUpdateRequest):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.ADMIN, method=request.method)
     exists = (
@@ -235,8 +232,7 @@ async def update_webhook(request: Request, webhook_id: str, body: WebhookUpdateR
 @router.delete("/webhooks/{webhook_id}")
 async def delete_webhook(request: Request, webhook_id: str):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.ADMIN, method=request.method)
     supabase.table("webhook_subscriptions").update({"is_active": False, "updated_at": datetime.now(timezone.utc).isoformat()}).eq("id", webhook_id).eq("user_id", user_id).execute()
@@ -247,7 +243,7 @@ async def delete_webhook(request: Request, webhook_id: str):
 async def send_test_event(request: Request, webhook_id: str):
     user_id = await get_authenticated_user_id(request)
     settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.ADMIN, method=request.method)
     exists = (
@@ -283,8 +279,7 @@ async def list_deliveries(
     limit: int = Query(50, ge=1, le=300),
 ):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
     scoped_user_ids = _resolve_scoped_user_ids(
@@ -319,7 +314,7 @@ async def list_deliveries(
 async def retry_delivery(request: Request, delivery_id: str):
     user_id = await get_authenticated_user_id(request)
     settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.ADMIN, method=request.method)
     result = await retry_webhook_delivery(
@@ -355,7 +350,7 @@ async def retry_delivery(request: Request, delivery_id: str):
 async def process_deliveries(request: Request, limit: int = Query(100, ge=1, le=500)):
     user_id = await get_authenticated_user_id(request)
     settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.ADMIN, method=request.method)
     result = await process_pending_webhook_retries(
@@ -7,11 +7,14 @@ from urllib.parse import urlencode
 import httpx
 from fastapi import APIRouter, HTTPException, Query, Request
 from fastapi.responses import RedirectResponse
-from supabase import create_client
 
 from app.core.auth import get_authenticated_user_id
 from app.core.config import get_settings
+from app.core.db import get_supabase_client
+from app.core.oauth_token_cache import invalidate_oauth_token
 from app.core.state import build_state, verify_state
+from app.core.tool_result_cache import invalidate_tool_results
+from app.core.tool_visibility import invalidate_user_connections
 from app.security.token_vault import TokenVault
 
 router = APIRouter(prefix="/api/oauth/linear", tags=["linear-oauth"])
@@ -109,7 +112,7 @@ async def linear_oauth_callback(code: str, state: str):
         if provider_code == "invalid_grant":
             # OAuth code can be consumed by a duplicate callback path (prefetch/retry).
             # If token already exists for this user/provider, treat it as an idempotent success.
-            supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+            supabase = get_supabase_client()
             existing = (
                 supabase.table("oauth_tokens")
                 .select("provider, updated_at")
@@ -155,7 +158,7 @@ async def linear_oauth_callback(code: str, state: str):
     encrypted = TokenVault(settings.notion_token_encryption_key).encrypt(access_token)
     granted_scope_text = str(payload.get("scope") or "").strip()
     granted_scopes = [item.strip() for item in granted_scope_text.split(" ") if item.strip()] or ["read", "write"]
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     supabase.table("oauth_tokens").upsert(
         {
             "user_id": user_id,
@@ -168,6 +171,9 @@ async def linear_oauth_callback(code: str, state: str):
         },
         on_conflict="user_id,provider",
     ).execute()
+    invalidate_user_connections(user_id)
+    invalidate_oauth_token(user_id, "linear")
+    invalidate_tool_results(user_id, "linear")
 
     return RedirectResponse(url=_frontend_dashboard_url(settings.frontend_url, "linear=connected"), status_code=302)
 
@@ -176,8 +182,7 @@ async def linear_oauth_callback(code: str, state: str):
 async def linear_oauth_status(request: Request):
     try:
         user_id = await get_authenticated_user_id(request)
-        settings = get_settings()
-        supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+        supabase = get_supabase_client()
         result = (
             supabase.table("oauth_tokens")
             .select("workspace_name, workspace_id, updated_at")
@@ -196,8 +201,7 @@ async def linear_oauth_status(request: Request):
 @router.delete("/disconnect")
 async def linear_oauth_disconnect(request: Request):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     (
         supabase.table("oauth_tokens")
         .delete()
@@ -205,6 +209,9 @@ async def linear_oauth_disconnect(request: Request):
         .eq("provider", "linear")
         .execute()
     )
+    invalidate_user_connections(user_id)
+    invalidate_oauth_token(user_id, "linear")
+    invalidate_tool_results(user_id, "linear")
     return {"ok": True, "connected": False}
 
 
@@ -212,7 +219,7 @@ async def linear_oauth_disconnect(request: Request):
 async def linear_issues_list(request: Request, first: int = Query(5, ge=1, le=20)):
     user_id = await get_authenticated_user_id(request)
     settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     token_result = (
         supabase.table("oauth_tokens")
         .select("access_token_encrypted")
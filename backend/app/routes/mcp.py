@@ -1,19 +1,32 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
+import logging
 import time
-from datetime import datetime, timedelta, timezone
-from typing import Any
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable
 
 from fastapi import APIRouter, Header, HTTPException, Request
-from fastapi.responses import JSONResponse
-from supabase import create_client
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 
 from agent.registry import ToolDefinition, load_registry
-from agent.tool_runner import execute_tool
+from agent.tool_runner import execute_tool, next_page_payload
+from app.core.api_key_cache import get_api_key_cache
+from app.core.api_key_usage import record_api_key_use
 from app.core.api_keys import API_KEY_PREFIX, hash_api_key
+from app.core.audit_writer import submit_tool_call
 from app.core.config import get_settings
+from app.core.db import execute_async, get_supabase_client, run_db
+from app.core.deadline import DeadlineScope
+from app.core.idempotency import OUTCOME_EXECUTED, IdempotencyKeyReused, get_idempotency_cache
 from app.core.error_codes import (
     CODE_ACCESS_DENIED,
+    CODE_DEADLINE_EXCEEDED,
+    CODE_IDEMPOTENCY_KEY_REUSED,
+    CODE_INTERNAL_ERROR,
     CODE_POLICY_BLOCKED,
     CODE_QUOTA_EXCEEDED,
     CODE_RESOLVE_AMBIGUOUS,
@@ -22,23 +35,35 @@ from app.core.error_codes import (
     CODE_TOOL_NOT_ALLOWED,
     CODE_UPSTREAM_TEMPORARY_FAILURE,
     ERR_ACCESS_DENIED,
+    ERR_DEADLINE_EXCEEDED,
+    ERR_IDEMPOTENCY_KEY_REUSED,
+    ERR_IDEMPOTENT_REPLAY,
+    ERR_INTERNAL_ERROR,
     ERR_POLICY_BLOCKED,
     ERR_POLICY_OVERRIDE_ALLOWED,
     ERR_QUOTA_EXCEEDED,
     ERR_RESOLVE_NOT_FOUND,
+    ERR_RESULT_CACHE_HIT,
     ERR_SERVICE_NOT_ALLOWED,
     ERR_UPSTREAM_TEMPORARY_FAILURE,
 )
-from app.core.event_hooks import emit_webhook_event
+from app.core.policy import EffectivePolicy, compile_policy, resolve_effective_policy
 from app.core.quota import evaluate_daily_quota
+from app.core.rate_limit import RateLimitDecision, check_rate_limit
 from app.core.resolver import ResolverException, resolve_tool_payload
 from app.core.retry_policy import run_with_retry
 from app.core.risk_gate import evaluate_risk_with_policy
+from app.core.stage_timing import StageTimer
+from app.core.tool_result_cache import CACHE_HIT, last_result_cache_status
+from app.core.tool_visibility import get_tool_visibility_cache, visibility_key
+from app.core.upstream_errors import UpstreamError, upstream_status_of
+from app.core.webhook_dispatcher import dispatch_webhook_event
 
 router = APIRouter(prefix="/mcp", tags=["mcp"])
+logger = logging.getLogger(__name__)
 
 _PHASE1_SERVICES = {"notion", "linear", "github", "canva"}
-_RATE_LIMIT_PER_MINUTE = 30
+_RATE_LIMIT_WINDOW_SECONDS = 60.0
 
 
 def _jsonrpc_error(
@@ -48,24 +73,12 @@ def _jsonrpc_error(
     message: str,
     data: dict[str, Any] | None = None,
     status_code: int = 200,
+    headers: dict[str, str] | None = None,
 ) -> JSONResponse:
     payload: dict[str, Any] = {"jsonrpc": "2.0", "id": req_id, "error": {"code": code, "message": message}}
     if data:
         payload["error"]["data"] = data
-    return JSONResponse(status_code=status_code, content=payload)
-
-
-def _extract_oauth_scope_map(rows: list[dict[str, Any]]) -> dict[str, set[str]]:
-    scopes: dict[str, set[str]] = {}
-    for row in rows:
-        provider = str(row.get("provider") or "").strip().lower()
-        if not provider:
-            continue
-        items = row.get("granted_scopes")
-        if not isinstance(items, list):
-            continue
-        scopes[provider] = {str(item).strip() for item in items if str(item).strip()}
-    return scopes
+    return JSONResponse(status_code=status_code, content=payload, headers=headers)
 
 
 async def _authenticate_api_key(authorization: str | None) -> dict[str, Any]:
@@ -77,30 +90,27 @@ async def _authenticate_api_key(authorization: str | None) -> dict[str, Any]:
         raise HTTPException(status_code=401, detail="invalid_api_key_format")
 
     key_hash = hash_api_key(raw_key)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
-
-    result = (
-        supabase.table("api_keys")
-        .select("id,user_id,is_active,team_id,allowed_tools,policy_json")
-        .eq("key_hash", key_hash)
-        .limit(1)
-        .execute()
-    )
-    rows = result.data or []
-    if not rows:
-        raise HTTPException(status_code=401, detail="invalid_api_key")
+    supabase = get_supabase_client()
+
+    cache = get_api_key_cache()
+    api_key, generation = cache.lookup(key_hash)
+    if api_key is None:
+        result = await execute_async(
+            supabase.table("api_keys")
+            .select("id,user_id,is_active,team_id,allowed_tools,policy_json")
+            .eq("key_hash", key_hash)
+            .limit(1)
+        )
+        rows = result.data or []
+        if not rows:
+            raise HTTPException(status_code=401, detail="invalid_api_key")
+        api_key = rows[0]
+        cache.put(key_hash, api_key, generation=generation)
 
-    api_key = rows[0]
     if not api_key.get("is_active"):
         raise HTTPException(status_code=401, detail="api_key_revoked")
 
-    (
-        supabase.table("api_keys")
-        .update({"last_used_at": datetime.now(timezone.utc).isoformat()})
-        .eq("id", api_key["id"])
-        .execute()
-    )
+    record_api_key_use(api_key["id"])
     return api_key
 
 
@@ -117,28 +127,31 @@ def _map_tool_error(exc: HTTPException) -> tuple[int, str, dict[str, Any] | None
     if detail.endswith("_not_connected"):
         provider = detail.removesuffix("_not_connected")
         return 4003, "oauth_not_connected", {"provider": provider}
-    status = _extract_upstream_status(detail)
-    if ":RATE_LIMITED" in detail or status in {429, 500, 502, 503, 504}:
+    if ":DEADLINE_EXCEEDED" in detail:
+        return CODE_DEADLINE_EXCEEDED, ERR_DEADLINE_EXCEEDED, None
+    if ":CIRCUIT_OPEN" in detail:
+        data = {"status": None, "retryable": True, "reason": "circuit_open"}
+        if isinstance(exc, UpstreamError) and exc.retry_after_seconds is not None:
+            data["retry_after_ms"] = int(exc.retry_after_seconds * 1000)
+        return CODE_UPSTREAM_TEMPORARY_FAILURE, ERR_UPSTREAM_TEMPORARY_FAILURE, data
+    if ":QUEUE_TIMEOUT" in detail:
         return (
             CODE_UPSTREAM_TEMPORARY_FAILURE,
             ERR_UPSTREAM_TEMPORARY_FAILURE,
-            {"status": status, "retryable": True},
+            {"status": None, "retryable": True, "reason": "queue_timeout"},
         )
+    status = upstream_status_of(exc)
+    if ":RATE_LIMITED" in detail or status in {429, 500, 502, 503, 504}:
+        data: dict[str, Any] = {"status": status, "retryable": True}
+        if isinstance(exc, UpstreamError):
+            if exc.retry_after_seconds is not None:
+                data["retry_after_ms"] = int(exc.retry_after_seconds * 1000)
+            if exc.request_id:
+                data["upstream_request_id"] = exc.request_id
+        return CODE_UPSTREAM_TEMPORARY_FAILURE, ERR_UPSTREAM_TEMPORARY_FAILURE, data
     return 5001, "tool_execution_failed", {"detail": detail}
 
 
-def _extract_upstream_status(detail: str) -> int | None:
-    marker = "|status="
-    if marker not in detail:
-        return None
-    tail = detail.split(marker, 1)[1]
-    code_text = tail.split("|", 1)[0].strip()
-    try:
-        return int(code_text)
-    except ValueError:
-        return None
-
-
 def _connector_from_tool_name(tool_name: str) -> str:
     value = str(tool_name or "").strip().lower()
     if value.startswith("notion_"):
@@ -150,37 +163,6 @@ def _connector_from_tool_name(tool_name: str) -> str:
     return "other"
 
 
-def _resolve_default_agent_id(*, supabase, api_key_id: int | str) -> int | None:
-    key_rows = (
-        supabase.table("api_keys")
-        .select("team_id")
-        .eq("id", api_key_id)
-        .limit(1)
-        .execute()
-    ).data or []
-    if not key_rows:
-        return None
-    team_id = key_rows[0].get("team_id")
-    if team_id is None:
-        return None
-    agent_rows = (
-        supabase.table("agents")
-        .select("id")
-        .eq("team_id", team_id)
-        .eq("is_active", True)
-        .order("created_at", desc=False)
-        .limit(1)
-        .execute()
-    ).data or []
-    if not agent_rows:
-        return None
-    agent_id = agent_rows[0].get("id")
-    try:
-        return int(agent_id) if agent_id is not None else None
-    except (TypeError, ValueError):
-        return None
-
-
 def _log_tool_call(
     *,
     supabase,
@@ -201,34 +183,34 @@ def _log_tool_call(
     backoff_ms: int | None = None,
     masked_fields: list[str] | None = None,
     agent_id: int | None = None,
+    team_id: int | str | None = None,
+    timer: StageTimer | None = None,
 ) -> None:
-    query = supabase.table("tool_calls")
-    if not hasattr(query, "insert"):
-        return
-    if agent_id is None:
-        agent_id = _resolve_default_agent_id(supabase=supabase, api_key_id=api_key_id)
-    query.insert(
-        {
-            "request_id": request_id,
-            "trace_id": trace_id or request_id,
-            "user_id": user_id,
-            "api_key_id": api_key_id,
-            "tool_name": tool_name,
-            "connector": connector,
-            "status": status,
-            "error_code": error_code,
-            "latency_ms": latency_ms,
-            "request_payload": request_payload,
-            "resolved_payload": resolved_payload,
-            "risk_result": risk_result,
-            "upstream_status": upstream_status,
-            "retry_count": retry_count if retry_count is not None else 0,
-            "backoff_ms": backoff_ms if backoff_ms is not None else 0,
-            "masked_fields": masked_fields or [],
-            "agent_id": agent_id,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-        }
-    ).execute()
+    row = {
+        "request_id": request_id,
+        "trace_id": trace_id or request_id,
+        "user_id": user_id,
+        "api_key_id": api_key_id,
+        "tool_name": tool_name,
+        "connector": connector,
+        "status": status,
+        "error_code": error_code,
+        "latency_ms": latency_ms,
+        "request_payload": request_payload,
+        "resolved_payload": resolved_payload,
+        "risk_result": risk_result,
+        "upstream_status": upstream_status,
+        "retry_count": retry_count if retry_count is not None else 0,
+        "backoff_ms": backoff_ms if backoff_ms is not None else 0,
+        "masked_fields": masked_fields or [],
+        "agent_id": agent_id,
+        # Not a tool_calls column: the audit writer resolves the default agent from it and drops it.
+        "team_id": team_id,
+        "stage_timings": timer.as_dict() if timer is not None else None,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    with timer.stage("audit") if timer is not None else nullcontext():
+        submit_tool_call(supabase, row)
 
 
 def _masked_payload(payload: dict[str, Any]) -> tuple[dict[str, Any], list[str]]:
@@ -242,21 +224,11 @@ def _masked_payload(payload: dict[str, Any]) -> tuple[dict[str, Any], list[str]]
     return masked, masked_fields
 
 
-def _is_rate_limited(*, supabase, api_key_id: str) -> bool:
-    since = (datetime.now(timezone.utc) - timedelta(minutes=1)).isoformat()
-    query = (
-        supabase.table("tool_calls")
-        .select("id", count="exact")
-        .eq("api_key_id", api_key_id)
-        .gte("created_at", since)
-        .limit(_RATE_LIMIT_PER_MINUTE + 1)
-        .execute()
-    )
-    count = getattr(query, "count", None)
-    if isinstance(count, int):
-        return count >= _RATE_LIMIT_PER_MINUTE
-    rows = query.data or []
-    return len(rows) >= _RATE_LIMIT_PER_MINUTE
+def _check_rate_limit(*, api_key: dict[str, Any]) -> RateLimitDecision:
+    limit = _effective_policy(api_key).rate_limit_per_minute
+    if limit is None:
+        limit = int(getattr(get_settings(), "mcp_rate_limit_per_minute", 30))
+    return check_rate_limit(f"api_key:{api_key['id']}", limit=limit, window_seconds=_RATE_LIMIT_WINDOW_SECONDS)
 
 
 def _phase1_filter_tools(tools: list[ToolDefinition]) -> list[ToolDefinition]:
@@ -278,138 +250,57 @@ def _apply_allowed_tools(tools: list[ToolDefinition], api_key: dict[str, Any]) -
     return [tool for tool in tools if tool.tool_name in allowed]
 
 
-def _api_key_policy(api_key: dict[str, Any]) -> dict[str, Any] | None:
-    effective = api_key.get("effective_policy_json")
-    if isinstance(effective, dict):
-        return effective
+def _effective_policy(api_key: dict[str, Any]) -> EffectivePolicy:
+    policy = api_key.get("effective_policy")
+    if isinstance(policy, EffectivePolicy):
+        return policy
     raw = api_key.get("policy_json")
-    return raw if isinstance(raw, dict) else None
-
-
-def _normalized_policy(policy: dict[str, Any] | None) -> dict[str, Any]:
-    if not isinstance(policy, dict):
-        return {}
-    out: dict[str, Any] = {}
-    if "allow_high_risk" in policy:
-        out["allow_high_risk"] = bool(policy.get("allow_high_risk"))
-    for key in ("allowed_services", "deny_tools", "allowed_linear_team_ids"):
-        raw = policy.get(key)
-        if not isinstance(raw, list):
-            continue
-        values = [str(item).strip() for item in raw if str(item).strip()]
-        if key == "allowed_services":
-            values = [item.lower() for item in values]
-        out[key] = values
-    return out
+    return compile_policy(None, raw if isinstance(raw, dict) else None)
 
 
-def _merge_team_and_key_policy(team_policy: dict[str, Any] | None, key_policy: dict[str, Any] | None) -> dict[str, Any]:
-    team = _normalized_policy(team_policy)
-    key = _normalized_policy(key_policy)
-    if not team and not key:
-        return {}
-
-    merged: dict[str, Any] = {}
-    if "allow_high_risk" in key:
-        merged["allow_high_risk"] = bool(key["allow_high_risk"])
-    elif "allow_high_risk" in team:
-        merged["allow_high_risk"] = bool(team["allow_high_risk"])
-
-    def _merge_allowlist(field: str) -> list[str] | None:
-        team_values = set(team.get(field) or []) if isinstance(team.get(field), list) else None
-        key_values = set(key.get(field) or []) if isinstance(key.get(field), list) else None
-        if team_values is not None and key_values is not None:
-            return sorted(team_values.intersection(key_values))
-        if key_values is not None:
-            return sorted(key_values)
-        if team_values is not None:
-            return sorted(team_values)
-        return None
-
-    allowed_services = _merge_allowlist("allowed_services")
-    if allowed_services is not None:
-        merged["allowed_services"] = allowed_services
-
-    allowed_linear_team_ids = _merge_allowlist("allowed_linear_team_ids")
-    if allowed_linear_team_ids is not None:
-        merged["allowed_linear_team_ids"] = allowed_linear_team_ids
-
-    team_deny = set(team.get("deny_tools") or []) if isinstance(team.get("deny_tools"), list) else set()
-    key_deny = set(key.get("deny_tools") or []) if isinstance(key.get("deny_tools"), list) else set()
-    deny_tools = sorted(team_deny.union(key_deny))
-    if deny_tools:
-        merged["deny_tools"] = deny_tools
-    return merged
+def _api_key_policy(api_key: dict[str, Any]) -> dict[str, Any] | None:
+    return _effective_policy(api_key).policy_json or None
 
 
-def _load_team_policy(supabase, *, team_id: int | str | None) -> dict[str, Any] | None:
-    if not team_id:
-        return None
-    rows = (
-        supabase.table("team_policies")
-        .select("policy_json")
-        .eq("team_id", team_id)
-        .limit(1)
-        .execute()
-    ).data or []
-    if not rows:
-        return None
-    raw = rows[0].get("policy_json")
-    return raw if isinstance(raw, dict) else None
+def _merge_team_and_key_policy(team_policy: dict[str, Any] | None, key_policy: dict[str, Any] | None) -> dict[str, Any]:
+    return compile_policy(team_policy, key_policy).policy_json
 
 
 def _with_effective_policy(supabase, *, api_key: dict[str, Any]) -> dict[str, Any]:
+    policy = resolve_effective_policy(supabase, api_key=api_key)
     next_api_key = dict(api_key)
-    next_api_key["effective_policy_json"] = _merge_team_and_key_policy(
-        _load_team_policy(supabase, team_id=api_key.get("team_id")),
-        api_key.get("policy_json") if isinstance(api_key.get("policy_json"), dict) else None,
-    )
+    next_api_key["effective_policy"] = policy
+    next_api_key["effective_policy_json"] = policy.policy_json
     return next_api_key
 
 
-def _policy_allowed_services(api_key: dict[str, Any]) -> set[str] | None:
-    policy = _api_key_policy(api_key)
-    if not policy:
-        return None
-    items = policy.get("allowed_services")
-    if not isinstance(items, list):
-        return None
-    services = {str(item).strip().lower() for item in items if str(item).strip()}
-    return services or None
+def _policy_allowed_services(api_key: dict[str, Any]) -> frozenset[str] | None:
+    return _effective_policy(api_key).allowed_services or None
 
 
-def _policy_deny_tools(api_key: dict[str, Any]) -> set[str]:
-    policy = _api_key_policy(api_key)
-    if not policy:
-        return set()
-    items = policy.get("deny_tools")
-    if not isinstance(items, list):
-        return set()
-    return {str(item).strip() for item in items if str(item).strip()}
+def _policy_deny_tools(api_key: dict[str, Any]) -> frozenset[str]:
+    return _effective_policy(api_key).deny_tools
 
 
-def _policy_allowed_linear_team_ids(api_key: dict[str, Any]) -> set[str] | None:
-    policy = _api_key_policy(api_key)
-    if not policy:
-        return None
-    items = policy.get("allowed_linear_team_ids")
-    if not isinstance(items, list):
-        return None
-    team_ids = {str(item).strip() for item in items if str(item).strip()}
-    return team_ids or None
+def _policy_allowed_linear_team_ids(api_key: dict[str, Any]) -> frozenset[str] | None:
+    return _effective_policy(api_key).allowed_linear_team_ids or None
 
 
 def _apply_policy_filters(tools: list[ToolDefinition], api_key: dict[str, Any]) -> list[ToolDefinition]:
-    allowed_services = _policy_allowed_services(api_key)
-    deny_tools = _policy_deny_tools(api_key)
+    policy = _effective_policy(api_key)
     filtered = tools
-    if allowed_services:
-        filtered = [tool for tool in filtered if tool.service in allowed_services]
-    if deny_tools:
-        filtered = [tool for tool in filtered if str(getattr(tool, "tool_name", getattr(tool, "_name", ""))) not in deny_tools]
+    if policy.allowed_services:
+        filtered = [tool for tool in filtered if policy.allows_service(tool.service)]
+    if policy.deny_tools:
+        filtered = [tool for tool in filtered if not policy.denies_tool(str(getattr(tool, "tool_name", getattr(tool, "_name", ""))))]
     return filtered
 
 
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    candidates = {item.strip().removeprefix("W/") for item in str(if_none_match or "").split(",")}
+    return etag in candidates or "*" in candidates
+
+
 @router.post("/list_tools")
 async def mcp_list_tools(
     request: Request,
@@ -421,46 +312,182 @@ async def mcp_list_tools(
         return _jsonrpc_error(req_id=req_id, code=4000, message="invalid_method", data={"expected": "list_tools"})
 
     api_key = await _authenticate_api_key(authorization)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
-    api_key = _with_effective_policy(supabase, api_key=api_key)
-
-    token_rows = (
-        supabase.table("oauth_tokens")
-        .select("provider,granted_scopes")
-        .eq("user_id", api_key["user_id"])
-        .execute()
-    ).data or []
-    connected_services = sorted({str(row.get("provider") or "").strip().lower() for row in token_rows if row.get("provider")})
-    scope_map = _extract_oauth_scope_map(token_rows)
-
-    registry = load_registry()
-    tools = _apply_allowed_tools(
-        _apply_policy_filters(
-            _phase1_filter_tools(
-                registry.list_available_tools(
-                    connected_services=connected_services,
-                    granted_scopes=scope_map,
-                )
+    supabase = get_supabase_client()
+    api_key = await run_db(_with_effective_policy, supabase, api_key=api_key)
+
+    cache = get_tool_visibility_cache()
+    connections = await cache.connections(supabase, user_id=api_key["user_id"])
+    key = visibility_key(
+        connections=connections,
+        policy_json=_effective_policy(api_key).policy_json,
+        allowed_tools=api_key.get("allowed_tools"),
+    )
+
+    def _build() -> list[dict[str, Any]]:
+        registry = load_registry()
+        tools = _apply_allowed_tools(
+            _apply_policy_filters(
+                _phase1_filter_tools(
+                    registry.list_available_tools(
+                        connected_services=connections.services,
+                        granted_scopes=connections.scopes,
+                    )
+                ),
+                api_key,
             ),
             api_key,
-        ),
-        api_key,
+        )
+        return [tool.to_llm_tool() for tool in tools]
+
+    visible = cache.get_or_build(key, _build)
+    headers = {"ETag": visible.etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), visible.etag):
+        return Response(status_code=304, headers=headers)
+    content = b"".join(
+        [
+            b'{"jsonrpc":"2.0","id":',
+            json.dumps(req_id, ensure_ascii=False).encode("utf-8"),
+            b',"result":{"tools":',
+            visible.body,
+            b"}}",
+        ]
     )
+    return Response(content=content, media_type="application/json", headers=headers)
 
-    return {
-        "jsonrpc": "2.0",
-        "id": req_id,
-        "result": {"tools": [tool.to_llm_tool() for tool in tools]},
-    }
 
+_STREAM_MEDIA_TYPES = {"text/event-stream": "sse", "application/x-ndjson": "ndjson"}
 
-@router.post("/call_tool")
-async def mcp_call_tool(
-    request: Request,
-    authorization: str | None = Header(default=None),
-):
-    body = await request.json()
+
+def _negotiate_stream_format(accept: str | None) -> str | None:
+    """Pick SSE or NDJSON when the client lists it ahead of application/json in ``Accept``."""
+    for item in str(accept or "").split(","):
+        media_type = item.split(";", 1)[0].strip().lower()
+        if media_type in _STREAM_MEDIA_TYPES:
+            return _STREAM_MEDIA_TYPES[media_type]
+        if media_type in {"application/json", "*/*"}:
+            return None
+    return None
+
+
+def _encode_stream_message(stream_format: str, message: dict[str, Any]) -> str:
+    body = json.dumps(message, ensure_ascii=False, default=str)
+    if stream_format == "sse":
+        return f"event: message\ndata: {body}\n\n"
+    return body + "\n"
+
+
+def _stream_tool_pages(
+    *,
+    stream_format: str,
+    supabase,
+    api_key: dict[str, Any],
+    request_id: str,
+    req_id: Any,
+    tool_name: str,
+    connector: str,
+    first_page: Any,
+    payload: dict[str, Any],
+    started: float,
+    success_error_code: str | None,
+    max_retries: int,
+    backoff_ms: int,
+    max_backoff_ms: int,
+    max_pages: int,
+    log_fields: dict[str, Any],
+    timer: StageTimer | None = None,
+) -> StreamingResponse:
+    """Stream each result page as a JSON-RPC notification, then the final response.
+
+    The first page is fetched before the response starts so pre-stream failures keep
+    the regular error path; later pages are fetched while earlier ones are on the wire.
+    """
+
+    async def _messages():
+        pages = 0
+        retry_count = int(first_page.retry_count)
+        result = first_page.data
+        next_payload: dict[str, Any] | None = payload
+        failure: tuple[int, str, dict[str, Any] | None, int | None] | None = None
+        completed = False
+        try:
+            while True:
+                pages += 1
+                yield _encode_stream_message(
+                    stream_format,
+                    {"jsonrpc": "2.0", "method": "notifications/tool_result_page", "params": {"id": req_id, "page": pages, "result": result}},
+                )
+                next_payload = next_page_payload(tool_name, next_payload, result)
+                if next_payload is None or pages >= max_pages:
+                    break
+                page_payload = next_payload
+                with timer.stage("stream_pages") if timer is not None else nullcontext():
+                    retried = await run_with_retry(
+                        operation=lambda: execute_tool(user_id=api_key["user_id"], tool_name=tool_name, payload=page_payload),
+                        max_retries=max_retries,
+                        backoff_ms=backoff_ms,
+                        max_backoff_ms=max_backoff_ms,
+                        service=connector,
+                    )
+                retry_count += int(retried.retry_count)
+                result = retried.data
+        except HTTPException as exc:
+            code, message, data = _map_tool_error(exc)
+            failure = (code, message, data, upstream_status_of(exc))
+            yield _encode_stream_message(
+                stream_format,
+                {"jsonrpc": "2.0", "id": req_id, "error": {"code": code, "message": message, **({"data": data} if data else {})}},
+            )
+        else:
+            completed = True
+            yield _encode_stream_message(
+                stream_format,
+                {"jsonrpc": "2.0", "id": req_id, "result": {"ok": True, "streamed": True, "pages": pages, "has_more": next_payload is not None}},
+            )
+        finally:
+            # Also runs when the client disconnects mid-stream (no await allowed here).
+            _log_tool_call(
+                supabase=supabase,
+                request_id=request_id,
+                user_id=api_key["user_id"],
+                api_key_id=api_key["id"],
+                team_id=api_key.get("team_id"),
+                tool_name=tool_name,
+                connector=connector,
+                status="success" if completed else "fail",
+                error_code=success_error_code if completed else (failure[1] if failure else "stream_aborted"),
+                latency_ms=int((time.perf_counter() - started) * 1000),
+                upstream_status=None if failure is None else failure[3],
+                retry_count=retry_count,
+                backoff_ms=backoff_ms,
+                timer=timer,
+                **log_fields,
+            )
+            if timer is not None:
+                timer.finish()
+        event_payload: dict[str, Any] = {"request_id": request_id, "api_key_id": api_key["id"], "tool_name": tool_name}
+        if completed:
+            await dispatch_webhook_event(
+                supabase=supabase,
+                user_id=api_key["user_id"],
+                event_type="tool_succeeded",
+                payload={**event_payload, "connector": connector, "retry_count": retry_count},
+            )
+        elif failure is not None:
+            await dispatch_webhook_event(
+                supabase=supabase,
+                user_id=api_key["user_id"],
+                event_type="tool_failed",
+                payload={**event_payload, "error_code": failure[1], "upstream_status": failure[3]},
+            )
+
+    media_type = "text/event-stream" if stream_format == "sse" else "application/x-ndjson"
+    return StreamingResponse(_messages(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+
+def _parse_call_tool_body(body: Any) -> tuple[Any, str, dict[str, Any]] | JSONResponse:
+    """Validate one call_tool JSON-RPC request; returns (id, tool_name, arguments) or the error response."""
+    if not isinstance(body, dict):
+        return _jsonrpc_error(req_id=None, code=4004, message="invalid_params")
     req_id = body.get("id")
     if body.get("method") != "call_tool":
         return _jsonrpc_error(req_id=req_id, code=4000, message="invalid_method", data={"expected": "call_tool"})
@@ -476,22 +503,189 @@ async def mcp_call_tool(
         arguments = {}
     if not isinstance(arguments, dict):
         return _jsonrpc_error(req_id=req_id, code=4006, message="invalid_arguments")
+    return req_id, tool_name, arguments
 
-    api_key = await _authenticate_api_key(authorization)
+
+def _deadline_ms(tool_name: str, requested_ms: str | None) -> int:
+    """Budget for one call_tool: the client's ``X-Request-Timeout-Ms`` (capped), else the tool or global default."""
     settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
-    api_key = _with_effective_policy(supabase, api_key=api_key)
+    max_ms = max(1, int(getattr(settings, "mcp_max_deadline_ms", 120000)))
+    try:
+        requested = int(str(requested_ms or "").strip())
+    except ValueError:
+        requested = 0
+    if requested > 0:
+        return min(requested, max_ms)
+    try:
+        tool_default = int(getattr(load_registry().get_tool(tool_name), "deadline_ms", 0) or 0)
+    except Exception:
+        tool_default = 0
+    return min(tool_default or max(0, int(getattr(settings, "mcp_default_deadline_ms", 30000))), max_ms)
+
+
+def _batch_service(tool_name: str) -> str:
+    """Registry service for per-service batch slots; unknown tools fail later in the call itself."""
+    try:
+        service = str(getattr(load_registry().get_tool(tool_name), "service", "") or "")
+    except Exception:
+        service = ""
+    return service or _connector_from_tool_name(tool_name)
+
+
+@router.post("/call_tool")
+async def mcp_call_tool(
+    request: Request,
+    authorization: str | None = Header(default=None),
+):
+    parsed = _parse_call_tool_body(await request.json())
+    if isinstance(parsed, JSONResponse):
+        return parsed
+    req_id, tool_name, arguments = parsed
+
+    timer = StageTimer()
+    with timer.stage("auth"):
+        api_key = await _authenticate_api_key(authorization)
+    supabase = get_supabase_client()
+    if getattr(get_settings(), "mcp_server_timing_enabled", True):
+        # Rendered into the Server-Timing header by the request middleware.
+        request.state.stage_timer = timer
     request_id = getattr(request.state, "request_id", "")
+    stream_format = _negotiate_stream_format(request.headers.get("accept"))
+
+    deadline_ms = _deadline_ms(tool_name, request.headers.get("x-request-timeout-ms"))
+
+    async def _execute():
+        # Bounds policy, resolver lookups, retries and upstream calls; streamed follow-up pages are not bounded.
+        with DeadlineScope(deadline_ms):
+            with timer.stage("policy"):
+                authorized_key = await run_db(_with_effective_policy, supabase, api_key=api_key)
+            return await _run_tool_call(
+                supabase=supabase,
+                api_key=authorized_key,
+                request_id=request_id,
+                req_id=req_id,
+                tool_name=tool_name,
+                arguments=arguments,
+                stream_format=stream_format,
+                timer=timer,
+            )
+
+    if stream_format is not None:
+        return await _execute()
+    response = await _call_idempotent(
+        supabase=supabase,
+        api_key=api_key,
+        request_id=request_id,
+        req_id=req_id,
+        tool_name=tool_name,
+        arguments=arguments,
+        timer=timer,
+        execute=_execute,
+    )
+    timer.finish()
+    return response
+
+
+def _is_jsonrpc_success(response: Any) -> bool:
+    return isinstance(response, dict) and "result" in response
+
+
+def _arguments_fingerprint(arguments: dict[str, Any]) -> str:
+    encoded = json.dumps(arguments, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+async def _call_idempotent(
+    *,
+    supabase,
+    api_key: dict[str, Any],
+    request_id: str,
+    req_id: Any,
+    tool_name: str,
+    arguments: dict[str, Any],
+    timer: StageTimer,
+    execute: Callable[[], Awaitable[Any]],
+):
+    """Run ``execute`` once per (API key, tool, idempotency_key); duplicates get the first response."""
+    idempotency_key = str(arguments.get("idempotency_key") or "").strip()
+    if not idempotency_key:
+        return await execute()
+    masked_request_payload, masked_fields = _masked_payload(arguments)
+    try:
+        response, outcome = await get_idempotency_cache().run(
+            (str(api_key["id"]), tool_name, idempotency_key),
+            execute,
+            fingerprint=_arguments_fingerprint(arguments),
+            cacheable=_is_jsonrpc_success,
+        )
+    except IdempotencyKeyReused:
+        _log_tool_call(
+            supabase=supabase,
+            request_id=request_id,
+            user_id=api_key["user_id"],
+            api_key_id=api_key["id"],
+            team_id=api_key.get("team_id"),
+            tool_name=tool_name,
+            connector=_connector_from_tool_name(tool_name),
+            status="fail",
+            error_code=ERR_IDEMPOTENCY_KEY_REUSED,
+            latency_ms=int(timer.as_dict()["total"]),
+            request_payload=masked_request_payload,
+            masked_fields=masked_fields,
+            timer=timer,
+        )
+        return _jsonrpc_error(req_id=req_id, code=CODE_IDEMPOTENCY_KEY_REUSED, message=ERR_IDEMPOTENCY_KEY_REUSED)
+    if outcome == OUTCOME_EXECUTED:
+        return response
+
+    payload = {**_jsonrpc_payload(response), "id": req_id}
+    _log_tool_call(
+        supabase=supabase,
+        request_id=request_id,
+        user_id=api_key["user_id"],
+        api_key_id=api_key["id"],
+        team_id=api_key.get("team_id"),
+        tool_name=tool_name,
+        connector=_connector_from_tool_name(tool_name),
+        status="success" if "result" in payload else "fail",
+        error_code=ERR_IDEMPOTENT_REPLAY,
+        latency_ms=int(timer.as_dict()["total"]),
+        request_payload=masked_request_payload,
+        masked_fields=masked_fields,
+        timer=timer,
+    )
+    if isinstance(response, JSONResponse):
+        return JSONResponse(status_code=response.status_code, content=payload)
+    return payload
+
+
+async def _run_tool_call(
+    *,
+    supabase,
+    api_key: dict[str, Any],
+    request_id: str,
+    req_id: Any,
+    tool_name: str,
+    arguments: dict[str, Any],
+    stream_format: str | None = None,
+    timer: StageTimer | None = None,
+):
+    """Rate limit, quota, policy, execute and audit one authenticated tool call."""
+    settings = get_settings()
     started = time.perf_counter()
+    timer = timer or StageTimer()
     masked_request_payload, masked_fields = _masked_payload(arguments)
 
-    if _is_rate_limited(supabase=supabase, api_key_id=api_key["id"]):
+    with timer.stage("rate_limit"):
+        rate_limit = _check_rate_limit(api_key=api_key)
+    if not rate_limit.allowed:
         latency_ms = int((time.perf_counter() - started) * 1000)
         _log_tool_call(
             supabase=supabase,
             request_id=request_id,
             user_id=api_key["user_id"],
             api_key_id=api_key["id"],
+            team_id=api_key.get("team_id"),
             tool_name=tool_name,
             connector=_connector_from_tool_name(tool_name),
             status="fail",
@@ -503,34 +697,48 @@ async def mcp_call_tool(
             retry_count=0,
             backoff_ms=max(0, int(getattr(settings, "mcp_retry_backoff_ms", 250))),
             masked_fields=masked_fields,
+            timer=timer,
+        )
+        with timer.stage("webhook"):
+            await dispatch_webhook_event(
+                supabase=supabase,
+                user_id=api_key["user_id"],
+                event_type="rate_limit_exceeded",
+                payload={"request_id": request_id, "api_key_id": api_key["id"], "tool_name": tool_name},
+            )
+        return _jsonrpc_error(
+            req_id=req_id,
+            code=4290,
+            message="rate_limit_exceeded",
+            data={
+                "limit": rate_limit.limit,
+                "window_seconds": int(_RATE_LIMIT_WINDOW_SECONDS),
+                "retry_after_seconds": round(rate_limit.retry_after_seconds, 3),
+            },
+            headers={"Retry-After": rate_limit.retry_after_header},
         )
-        await emit_webhook_event(
+    with timer.stage("webhook"):
+        await dispatch_webhook_event(
             supabase=supabase,
             user_id=api_key["user_id"],
-            event_type="rate_limit_exceeded",
-            payload={"request_id": request_id, "api_key_id": api_key["id"], "tool_name": tool_name},
+            event_type="tool_called",
+            payload={
+                "request_id": request_id,
+                "api_key_id": api_key["id"],
+                "tool_name": tool_name,
+                "connector": _connector_from_tool_name(tool_name),
+            },
         )
-        return _jsonrpc_error(req_id=req_id, code=4290, message="rate_limit_exceeded")
-    await emit_webhook_event(
-        supabase=supabase,
-        user_id=api_key["user_id"],
-        event_type="tool_called",
-        payload={
-            "request_id": request_id,
-            "api_key_id": api_key["id"],
-            "tool_name": tool_name,
-            "connector": _connector_from_tool_name(tool_name),
-        },
-    )
     resolved_arguments: dict[str, Any] | None = None
     risk_result: dict[str, Any] | None = None
-    quota = evaluate_daily_quota(
-        supabase=supabase,
-        user_id=api_key["user_id"],
-        api_key_id=api_key["id"],
-        per_key_daily_limit=max(0, int(getattr(settings, "mcp_quota_per_key_daily", 0))),
-        per_user_daily_limit=max(0, int(getattr(settings, "mcp_quota_per_user_daily", 0))),
-    )
+    with timer.stage("quota"):
+        quota = await evaluate_daily_quota(
+            supabase=supabase,
+            user_id=api_key["user_id"],
+            api_key_id=api_key["id"],
+            per_key_daily_limit=max(0, int(getattr(settings, "mcp_quota_per_key_daily", 0))),
+            per_user_daily_limit=max(0, int(getattr(settings, "mcp_quota_per_user_daily", 0))),
+        )
     if quota.exceeded:
         latency_ms = int((time.perf_counter() - started) * 1000)
         _log_tool_call(
@@ -538,6 +746,7 @@ async def mcp_call_tool(
             request_id=request_id,
             user_id=api_key["user_id"],
             api_key_id=api_key["id"],
+            team_id=api_key.get("team_id"),
             tool_name=tool_name,
             connector="other",
             status="fail",
@@ -549,13 +758,15 @@ async def mcp_call_tool(
             retry_count=0,
             backoff_ms=max(0, int(getattr(settings, "mcp_retry_backoff_ms", 250))),
             masked_fields=masked_fields,
+            timer=timer,
         )
-        await emit_webhook_event(
-            supabase=supabase,
-            user_id=api_key["user_id"],
-            event_type="quota_exceeded",
-            payload={"request_id": request_id, "api_key_id": api_key["id"], "tool_name": tool_name},
-        )
+        with timer.stage("webhook"):
+            await dispatch_webhook_event(
+                supabase=supabase,
+                user_id=api_key["user_id"],
+                event_type="quota_exceeded",
+                payload={"request_id": request_id, "api_key_id": api_key["id"], "tool_name": tool_name},
+            )
         return _jsonrpc_error(
             req_id=req_id,
             code=CODE_QUOTA_EXCEEDED,
@@ -575,6 +786,7 @@ async def mcp_call_tool(
                 request_id=request_id,
                 user_id=api_key["user_id"],
                 api_key_id=api_key["id"],
+                team_id=api_key.get("team_id"),
                 tool_name=tool_name,
                 connector=tool.service,
                 status="fail",
@@ -586,6 +798,7 @@ async def mcp_call_tool(
                 retry_count=0,
                 backoff_ms=max(0, int(getattr(settings, "mcp_retry_backoff_ms", 250))),
                 masked_fields=masked_fields,
+                timer=timer,
             )
             return _jsonrpc_error(req_id=req_id, code=CODE_TOOL_NOT_ALLOWED, message="tool_not_allowed_for_api_key")
         deny_tools = _policy_deny_tools(api_key)
@@ -596,6 +809,7 @@ async def mcp_call_tool(
                 request_id=request_id,
                 user_id=api_key["user_id"],
                 api_key_id=api_key["id"],
+                team_id=api_key.get("team_id"),
                 tool_name=tool_name,
                 connector=tool.service,
                 status="fail",
@@ -607,6 +821,7 @@ async def mcp_call_tool(
                 retry_count=0,
                 backoff_ms=max(0, int(getattr(settings, "mcp_retry_backoff_ms", 250))),
                 masked_fields=masked_fields,
+                timer=timer,
             )
             return _jsonrpc_error(req_id=req_id, code=CODE_ACCESS_DENIED, message=ERR_ACCESS_DENIED)
         allowed_services = _policy_allowed_services(api_key)
@@ -617,6 +832,7 @@ async def mcp_call_tool(
                 request_id=request_id,
                 user_id=api_key["user_id"],
                 api_key_id=api_key["id"],
+                team_id=api_key.get("team_id"),
                 tool_name=tool_name,
                 connector=tool.service,
                 status="fail",
@@ -628,6 +844,7 @@ async def mcp_call_tool(
                 retry_count=0,
                 backoff_ms=max(0, int(getattr(settings, "mcp_retry_backoff_ms", 250))),
                 masked_fields=masked_fields,
+                timer=timer,
             )
             return _jsonrpc_error(
                 req_id=req_id,
@@ -648,6 +865,7 @@ async def mcp_call_tool(
                 request_id=request_id,
                 user_id=api_key["user_id"],
                 api_key_id=api_key["id"],
+                team_id=api_key.get("team_id"),
                 tool_name=tool_name,
                 connector=tool.service,
                 status="fail",
@@ -659,31 +877,35 @@ async def mcp_call_tool(
                 retry_count=0,
                 backoff_ms=max(0, int(getattr(settings, "mcp_retry_backoff_ms", 250))),
                 masked_fields=masked_fields,
+                timer=timer,
             )
-            await emit_webhook_event(
-                supabase=supabase,
-                user_id=api_key["user_id"],
-                event_type="policy_blocked",
-                payload={
-                    "request_id": request_id,
-                    "api_key_id": api_key["id"],
-                    "tool_name": tool_name,
-                    "reason": risk.reason,
-                    "risk_type": risk.risk_type,
-                },
-            )
+            with timer.stage("webhook"):
+                await dispatch_webhook_event(
+                    supabase=supabase,
+                    user_id=api_key["user_id"],
+                    event_type="policy_blocked",
+                    payload={
+                        "request_id": request_id,
+                        "api_key_id": api_key["id"],
+                        "tool_name": tool_name,
+                        "reason": risk.reason,
+                        "risk_type": risk.risk_type,
+                    },
+                )
             return _jsonrpc_error(
                 req_id=req_id,
                 code=CODE_POLICY_BLOCKED,
                 message=ERR_POLICY_BLOCKED,
                 data={"reason": risk.reason, "risk_type": risk.risk_type},
             )
-        resolved_arguments = await resolve_tool_payload(
-            user_id=api_key["user_id"],
-            tool_name=tool_name,
-            payload=arguments,
-            execute_tool=execute_tool,
-        )
+        timer.lap("authorize")
+        with timer.stage("resolve"):
+            resolved_arguments = await resolve_tool_payload(
+                user_id=api_key["user_id"],
+                tool_name=tool_name,
+                payload=arguments,
+                execute_tool=execute_tool,
+            )
         masked_resolved_payload, _ = _masked_payload(resolved_arguments)
         allowed_linear_team_ids = _policy_allowed_linear_team_ids(api_key)
         if tool.service == "linear" and allowed_linear_team_ids is not None:
@@ -695,6 +917,7 @@ async def mcp_call_tool(
                     request_id=request_id,
                     user_id=api_key["user_id"],
                     api_key_id=api_key["id"],
+                    team_id=api_key.get("team_id"),
                     tool_name=tool_name,
                     connector=tool.service,
                     status="fail",
@@ -706,6 +929,7 @@ async def mcp_call_tool(
                     retry_count=0,
                     backoff_ms=max(0, int(getattr(settings, "mcp_retry_backoff_ms", 250))),
                     masked_fields=masked_fields,
+                    timer=timer,
                 )
                 return _jsonrpc_error(
                     req_id=req_id,
@@ -715,21 +939,63 @@ async def mcp_call_tool(
                 )
         max_retries = max(0, int(getattr(settings, "mcp_retry_max_retries", 1)))
         backoff_ms = max(0, int(getattr(settings, "mcp_retry_backoff_ms", 250)))
+        max_backoff_ms = max(0, int(getattr(settings, "mcp_retry_max_backoff_ms", 5000)))
+        attempts = 0
+
+        async def _execute_attempt() -> dict[str, Any]:
+            nonlocal attempts
+            attempts += 1
+            if attempts > 1:
+                # Time since the failed attempt ended is the retry backoff.
+                timer.lap("retry_wait")
+            with timer.stage("upstream"):
+                return await execute_tool(user_id=api_key["user_id"], tool_name=tool_name, payload=resolved_arguments)
+
         retried = await run_with_retry(
-            operation=lambda: execute_tool(user_id=api_key["user_id"], tool_name=tool_name, payload=resolved_arguments),
+            operation=_execute_attempt,
             max_retries=max_retries,
             backoff_ms=backoff_ms,
+            max_backoff_ms=max_backoff_ms,
+            service=tool.service,
         )
         result = retried.data
         success_error_code: str | None = None
         if risk.reason == "policy_override_high_risk":
             success_error_code = ERR_POLICY_OVERRIDE_ALLOWED
+        elif last_result_cache_status() == CACHE_HIT:
+            success_error_code = ERR_RESULT_CACHE_HIT
+        if stream_format is not None:
+            return _stream_tool_pages(
+                stream_format=stream_format,
+                supabase=supabase,
+                api_key=api_key,
+                request_id=request_id,
+                req_id=req_id,
+                tool_name=tool_name,
+                connector=tool.service,
+                first_page=retried,
+                payload=resolved_arguments,
+                started=started,
+                success_error_code=success_error_code,
+                max_retries=max_retries,
+                backoff_ms=backoff_ms,
+                max_backoff_ms=max_backoff_ms,
+                max_pages=max(1, int(getattr(settings, "mcp_stream_max_pages", 50))),
+                timer=timer,
+                log_fields={
+                    "request_payload": masked_request_payload,
+                    "resolved_payload": masked_resolved_payload,
+                    "risk_result": risk_result,
+                    "masked_fields": masked_fields,
+                },
+            )
         latency_ms = int((time.perf_counter() - started) * 1000)
         _log_tool_call(
             supabase=supabase,
             request_id=request_id,
             user_id=api_key["user_id"],
             api_key_id=api_key["id"],
+            team_id=api_key.get("team_id"),
             tool_name=tool_name,
             connector=tool.service,
             status="success",
@@ -741,19 +1007,21 @@ async def mcp_call_tool(
             retry_count=int(retried.retry_count),
             backoff_ms=backoff_ms,
             masked_fields=masked_fields,
+            timer=timer,
         )
-        await emit_webhook_event(
-            supabase=supabase,
-            user_id=api_key["user_id"],
-            event_type="tool_succeeded",
-            payload={
-                "request_id": request_id,
-                "api_key_id": api_key["id"],
-                "tool_name": tool_name,
-                "connector": tool.service,
-                "retry_count": int(retried.retry_count),
-            },
-        )
+        with timer.stage("webhook"):
+            await dispatch_webhook_event(
+                supabase=supabase,
+                user_id=api_key["user_id"],
+                event_type="tool_succeeded",
+                payload={
+                    "request_id": request_id,
+                    "api_key_id": api_key["id"],
+                    "tool_name": tool_name,
+                    "connector": tool.service,
+                    "retry_count": int(retried.retry_count),
+                },
+            )
         return {"jsonrpc": "2.0", "id": req_id, "result": result}
     except ResolverException as exc:
         latency_ms = int((time.perf_counter() - started) * 1000)
@@ -762,6 +1030,7 @@ async def mcp_call_tool(
             request_id=request_id,
             user_id=api_key["user_id"],
             api_key_id=api_key["id"],
+            team_id=api_key.get("team_id"),
             tool_name=tool_name,
             connector=_connector_from_tool_name(tool_name),
             status="fail",
@@ -773,18 +1042,20 @@ async def mcp_call_tool(
             retry_count=0,
             backoff_ms=max(0, int(getattr(settings, "mcp_retry_backoff_ms", 250))),
             masked_fields=masked_fields,
+            timer=timer,
         )
-        await emit_webhook_event(
-            supabase=supabase,
-            user_id=api_key["user_id"],
-            event_type="tool_failed",
-            payload={
-                "request_id": request_id,
-                "api_key_id": api_key["id"],
-                "tool_name": tool_name,
-                "error_code": exc.error_code,
-            },
-        )
+        with timer.stage("webhook"):
+            await dispatch_webhook_event(
+                supabase=supabase,
+                user_id=api_key["user_id"],
+                event_type="tool_failed",
+                payload={
+                    "request_id": request_id,
+                    "api_key_id": api_key["id"],
+                    "tool_name": tool_name,
+                    "error_code": exc.error_code,
+                },
+            )
         return _jsonrpc_error(
             req_id=req_id,
             code=CODE_RESOLVE_NOT_FOUND if exc.error_code == ERR_RESOLVE_NOT_FOUND else CODE_RESOLVE_AMBIGUOUS,
@@ -794,7 +1065,7 @@ async def mcp_call_tool(
     except HTTPException as exc:
         latency_ms = int((time.perf_counter() - started) * 1000)
         code, message, data = _map_tool_error(exc)
-        upstream_status = _extract_upstream_status(str(exc.detail or ""))
+        upstream_status = upstream_status_of(exc)
         masked_resolved_payload: dict[str, Any] | None = None
         if isinstance(resolved_arguments, dict):
             masked_resolved_payload, _ = _masked_payload(resolved_arguments)
@@ -803,6 +1074,7 @@ async def mcp_call_tool(
             request_id=request_id,
             user_id=api_key["user_id"],
             api_key_id=api_key["id"],
+            team_id=api_key.get("team_id"),
             tool_name=tool_name,
             connector=_connector_from_tool_name(tool_name),
             status="fail",
@@ -815,17 +1087,96 @@ async def mcp_call_tool(
             retry_count=0,
             backoff_ms=max(0, int(getattr(settings, "mcp_retry_backoff_ms", 250))),
             masked_fields=masked_fields,
+            timer=timer,
         )
-        await emit_webhook_event(
-            supabase=supabase,
-            user_id=api_key["user_id"],
-            event_type="tool_failed",
-            payload={
-                "request_id": request_id,
-                "api_key_id": api_key["id"],
-                "tool_name": tool_name,
-                "error_code": message,
-                "upstream_status": upstream_status,
-            },
-        )
+        with timer.stage("webhook"):
+            await dispatch_webhook_event(
+                supabase=supabase,
+                user_id=api_key["user_id"],
+                event_type="tool_failed",
+                payload={
+                    "request_id": request_id,
+                    "api_key_id": api_key["id"],
+                    "tool_name": tool_name,
+                    "error_code": message,
+                    "upstream_status": upstream_status,
+                },
+            )
         return _jsonrpc_error(req_id=req_id, code=code, message=message, data=data)
+
+
+def _jsonrpc_payload(response: dict[str, Any] | JSONResponse) -> dict[str, Any]:
+    if isinstance(response, JSONResponse):
+        return json.loads(bytes(response.body))
+    return response
+
+
+@router.post("/batch_call_tool")
+async def mcp_batch_call_tool(
+    request: Request,
+    authorization: str | None = Header(default=None),
+):
+    body = await request.json()
+    settings = get_settings()
+    max_items = max(1, int(getattr(settings, "mcp_batch_max_items", 20)))
+    if not isinstance(body, list) or not body:
+        return _jsonrpc_error(req_id=None, code=4004, message="invalid_params", data={"expected": "non_empty_batch"})
+    if len(body) > max_items:
+        return _jsonrpc_error(req_id=None, code=4008, message="batch_too_large", data={"max_items": max_items})
+
+    api_key = await _authenticate_api_key(authorization)
+    supabase = get_supabase_client()
+    api_key = await run_db(_with_effective_policy, supabase, api_key=api_key)
+    request_id = getattr(request.state, "request_id", "")
+    batch_deadline_ms = request.headers.get("x-request-timeout-ms")
+
+    key_slots = asyncio.Semaphore(max(1, int(getattr(settings, "mcp_batch_max_concurrency", 8))))
+    per_service = max(1, int(getattr(settings, "mcp_batch_per_service_concurrency", 4)))
+    service_slots: dict[str, asyncio.Semaphore] = {}
+
+    async def _run_item(index: int, item: Any) -> dict[str, Any]:
+        # One item's unexpected failure must not discard the other items' results.
+        try:
+            return await _call_item(index, item)
+        except Exception:
+            logger.exception("mcp_batch_item_failed request_id=%s index=%s", request_id, index)
+            req_id = item.get("id") if isinstance(item, dict) else None
+            return _jsonrpc_payload(
+                _jsonrpc_error(req_id=req_id, code=CODE_INTERNAL_ERROR, message=ERR_INTERNAL_ERROR, data={"index": index})
+            )
+
+    async def _call_item(index: int, item: Any) -> dict[str, Any]:
+        parsed = _parse_call_tool_body(item)
+        if isinstance(parsed, JSONResponse):
+            return _jsonrpc_payload(parsed)
+        req_id, tool_name, arguments = parsed
+        service = _batch_service(tool_name)
+        slots = service_slots.setdefault(service, asyncio.Semaphore(per_service))
+        timer = StageTimer()
+        item_request_id = f"{request_id}:{index}" if request_id else ""
+        # The item's budget includes time spent queued behind other batch items.
+        with DeadlineScope(_deadline_ms(tool_name, batch_deadline_ms)):
+            async with key_slots, slots:
+                timer.lap("batch_queue")
+                response = await _call_idempotent(
+                    supabase=supabase,
+                    api_key=api_key,
+                    request_id=item_request_id,
+                    req_id=req_id,
+                    tool_name=tool_name,
+                    arguments=arguments,
+                    timer=timer,
+                    execute=lambda: _run_tool_call(
+                        supabase=supabase,
+                        api_key=api_key,
+                        request_id=item_request_id,
+                        req_id=req_id,
+                        tool_name=tool_name,
+                        arguments=arguments,
+                        timer=timer,
+                    ),
+                )
+        timer.finish()
+        return _jsonrpc_payload(response)
+
+    return list(await asyncio.gather(*(_run_item(index, item) for index, item in enumerate(body))))
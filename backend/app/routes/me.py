@@ -1,11 +1,11 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Request
-from supabase import create_client
 
 from app.core.auth import get_authenticated_user_id
 from app.core.authz import Role, get_authz_context
 from app.core.config import get_settings
+from app.core.db import get_supabase_client
 
 router = APIRouter(prefix="/api/me", tags=["me"])
 
@@ -14,7 +14,7 @@ router = APIRouter(prefix="/api/me", tags=["me"])
 async def get_my_permissions(request: Request):
     user_id = await get_authenticated_user_id(request)
     settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
 
     role = authz_ctx.role.value
@@ -6,11 +6,14 @@ from json import JSONDecodeError
 import httpx
 from fastapi import APIRouter, HTTPException, Query, Request
 from fastapi.responses import RedirectResponse
-from supabase import create_client
 
 from app.core.auth import get_authenticated_user_id
 from app.core.config import get_settings
+from app.core.db import get_supabase_client
+from app.core.oauth_token_cache import invalidate_oauth_token
 from app.core.state import build_state, verify_state
+from app.core.tool_result_cache import invalidate_tool_results
+from app.core.tool_visibility import invalidate_user_connections
 from app.security.token_vault import TokenVault
 
 router = APIRouter(prefix="/api/oauth/notion", tags=["notion-oauth"])
@@ -87,7 +90,7 @@ async def notion_oauth_callback(code: str, state: str):
         if provider_code == "invalid_grant":
             # OAuth code can be consumed by a duplicate callback path (prefetch/retry).
             # If token already exists for this user/provider, treat it as an idempotent success.
-            supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+            supabase = get_supabase_client()
             existing = (
                 supabase.table("oauth_tokens")
                 .select("provider, updated_at")
@@ -116,7 +119,7 @@ async def notion_oauth_callback(code: str, state: str):
     vault = TokenVault(settings.notion_token_encryption_key)
     encrypted = vault.encrypt(access_token)
 
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
 
     upsert_payload = {
         "user_id": user_id,
@@ -129,6 +132,9 @@ async def notion_oauth_callback(code: str, state: str):
     }
 
     supabase.table("oauth_tokens").upsert(upsert_payload, on_conflict="user_id,provider").execute()
+    invalidate_user_connections(user_id)
+    invalidate_oauth_token(user_id, "notion")
+    invalidate_tool_results(user_id, "notion")
 
     return RedirectResponse(url=_frontend_dashboard_url(settings.frontend_url, "notion=connected"), status_code=302)
 
@@ -137,8 +143,7 @@ async def notion_oauth_callback(code: str, state: str):
 async def notion_oauth_status(request: Request):
     try:
         user_id = await get_authenticated_user_id(request)
-        settings = get_settings()
-        supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+        supabase = get_supabase_client()
 
         result = (
             supabase.table("oauth_tokens")
@@ -159,8 +164,7 @@ async def notion_oauth_status(request: Request):
 @router.delete("/disconnect")
 async def notion_oauth_disconnect(request: Request):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
 
     (
         supabase.table("oauth_tokens")
@@ -169,6 +173,9 @@ async def notion_oauth_disconnect(request: Request):
         .eq("provider", "notion")
         .execute()
     )
+    invalidate_user_connections(user_id)
+    invalidate_oauth_token(user_id, "notion")
+    invalidate_tool_results(user_id, "notion")
 
     return {"ok": True, "connected": False}
 
@@ -178,7 +185,7 @@ async def notion_pages_list(request: Request, page_size: int = Query(5, ge=1, le
     try:
         user_id = await get_authenticated_user_id(request)
         settings = get_settings()
-        supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+        supabase = get_supabase_client()
 
         token_result = (
             supabase.table("oauth_tokens")
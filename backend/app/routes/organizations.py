@@ -6,11 +6,10 @@ from uuid import uuid4
 
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, Field
-from supabase import create_client
 
 from app.core.auth import get_authenticated_user_id
 from app.core.authz import Role, get_authz_context, require_min_role
-from app.core.config import get_settings
+from app.core.db import get_supabase_client
 
 router = APIRouter(prefix="/api/organizations", tags=["organizations"])
 
@@ -166,8 +165,7 @@ def _user_email(*, supabase, user_id: str) -> str | None:
 @router.get("/{organization_id}/policy")
 async def get_organization_policy(request: Request, organization_id: str):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
     role = _org_member_role(supabase=supabase, user_id=user_id, organization_id=organization_id)
@@ -193,8 +191,7 @@ async def get_organization_policy(request: Request, organization_id: str):
 @router.patch("/{organization_id}/policy")
 async def update_organization_policy(request: Request, organization_id: str, body: OrganizationPolicyUpdateRequest):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.ADMIN, method=request.method)
     _require_org_admin_or_owner(supabase=supabase, user_id=user_id, organization_id=organization_id)
@@ -214,8 +211,7 @@ async def update_organization_policy(request: Request, organization_id: str, bod
 @router.get("/{organization_id}/oauth-policy")
 async def get_organization_oauth_policy(request: Request, organization_id: str):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
     role = _org_member_role(supabase=supabase, user_id=user_id, organization_id=organization_id)
@@ -245,8 +241,7 @@ async def get_organization_oauth_policy(request: Request, organization_id: str):
 @router.patch("/{organization_id}/oauth-policy")
 async def update_organization_oauth_policy(request: Request, organization_id: str, body: OrganizationOAuthPolicyUpdateRequest):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.ADMIN, method=request.method)
     _require_org_admin_or_owner(supabase=supabase, user_id=user_id, organization_id=organization_id)
@@ -277,8 +272,7 @@ async def update_organization_oauth_policy(request: Request, organization_id: st
 @router.get("")
 async def list_organizations(request: Request):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
 
@@ -318,8 +312,7 @@ async def list_organizations(request: Request):
 @router.post("")
 async def create_organization(request: Request, body: OrganizationCreateRequest):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
     now = datetime.now(timezone.utc).isoformat()
@@ -347,8 +340,7 @@ async def create_organization(request: Request, body: OrganizationCreateRequest)
 @router.patch("/{organization_id}")
 async def update_organization(request: Request, organization_id: str, body: OrganizationUpdateRequest):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.ADMIN, method=request.method)
     if not _is_org_owner(supabase=supabase, user_id=user_id, organization_id=organization_id):
@@ -360,8 +352,7 @@ async def update_organization(request: Request, organization_id: str, body: Orga
 @router.delete("/{organization_id}")
 async def delete_organization(request: Request, organization_id: str):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.OWNER, method=request.method)
     if not _is_org_owner(supabase=supabase, user_id=user_id, organization_id=organization_id):
@@ -373,8 +364,7 @@ async def delete_organization(request: Request, organization_id: str):
 @router.get("/{organization_id}/members")
 async def list_organization_members(request: Request, organization_id: str):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
     if not _is_org_member(supabase=supabase, user_id=user_id, organization_id=organization_id):
@@ -392,8 +382,7 @@ async def list_organization_members(request: Request, organization_id: str):
 @router.post("/{organization_id}/members")
 async def upsert_organization_member(request: Request, organization_id: str, body: OrganizationMemberRequest):
     actor_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=actor_id, supabase=supabase)
     require_min_role(authz_ctx, Role.ADMIN, method=request.method)
     actor_role = _require_org_admin_or_owner(supabase=supabase, user_id=actor_id, organization_id=organization_id)
@@ -446,8 +435,7 @@ async def upsert_organization_member(request: Request, organization_id: str, bod
 @router.delete("/{organization_id}/members/{member_user_id}")
 async def delete_organization_member(request: Request, organization_id: str, member_user_id: str):
     actor_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=actor_id, supabase=supabase)
     require_min_role(authz_ctx, Role.ADMIN, method=request.method)
     actor_role = _require_org_admin_or_owner(supabase=supabase, user_id=actor_id, organization_id=organization_id)
@@ -474,8 +462,7 @@ async def delete_organization_member(request: Request, organization_id: str, mem
 @router.get("/{organization_id}/invites")
 async def list_organization_invites(request: Request, organization_id: str):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
     if not _is_org_member(supabase=supabase, user_id=user_id, organization_id=organization_id):
@@ -493,8 +480,7 @@ async def list_organization_invites(request: Request, organization_id: str):
 @router.post("/{organization_id}/invites")
 async def create_organization_invite(request: Request, organization_id: str, body: OrganizationInviteCreateRequest):
     invited_by = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=invited_by, supabase=supabase)
     require_min_role(authz_ctx, Role.ADMIN, method=request.method)
     actor_role = _require_org_admin_or_owner(supabase=supabase, user_id=invited_by, organization_id=organization_id)
@@ -521,8 +507,7 @@ async def create_organization_invite(request: Request, organization_id: str, bod
 @router.post("/{organization_id}/invites/{invite_id}/revoke")
 async def revoke_organization_invite(request: Request, organization_id: str, invite_id: str):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.ADMIN, method=request.method)
     _require_org_admin_or_owner(supabase=supabase, user_id=user_id, organization_id=organization_id)
@@ -549,8 +534,7 @@ async def revoke_organization_invite(request: Request, organization_id: str, inv
 @router.post("/{organization_id}/invites/{invite_id}/reissue")
 async def reissue_organization_invite(request: Request, organization_id: str, invite_id: str):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.ADMIN, method=request.method)
     _require_org_admin_or_owner(supabase=supabase, user_id=user_id, organization_id=organization_id)
@@ -586,8 +570,7 @@ async def reissue_organization_invite(request: Request, organization_id: str, in
 @router.post("/invites/accept")
 async def accept_organization_invite(request: Request, body: OrganizationInviteAcceptRequest):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
     token = body.token.strip()
@@ -641,8 +624,7 @@ async def accept_organization_invite(request: Request, body: OrganizationInviteA
 @router.get("/{organization_id}/role-requests")
 async def list_organization_role_requests(request: Request, organization_id: str):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
     role = _org_member_role(supabase=supabase, user_id=user_id, organization_id=organization_id)
@@ -666,8 +648,7 @@ async def list_organization_role_requests(request: Request, organization_id: str
 @router.post("/{organization_id}/role-requests")
 async def create_organization_role_request(request: Request, organization_id: str, body: OrganizationRoleRequestCreateRequest):
     requested_by = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=requested_by, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
     requester_role = _org_member_role(supabase=supabase, user_id=requested_by, organization_id=organization_id)
@@ -702,8 +683,7 @@ async def review_organization_role_request(
     request: Request, organization_id: str, request_id: str, body: OrganizationRoleRequestReviewRequest
 ):
     reviewer_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=reviewer_id, supabase=supabase)
     require_min_role(authz_ctx, Role.OWNER, method=request.method)
     if not _is_org_owner(supabase=supabase, user_id=reviewer_id, organization_id=organization_id):
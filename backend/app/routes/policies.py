@@ -4,13 +4,13 @@ from typing import Any
 
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, Field
-from supabase import create_client
 
 from agent.registry import load_registry
 from app.core.auth import get_authenticated_user_id
 from app.core.authz import Role, get_authz_context, require_min_role
-from app.core.config import get_settings
+from app.core.db import get_supabase_client, run_db
 from app.core.error_codes import ERR_ACCESS_DENIED, ERR_POLICY_BLOCKED, ERR_SERVICE_NOT_ALLOWED
+from app.core.policy import resolve_effective_policy
 from app.core.risk_gate import evaluate_risk_with_policy
 
 router = APIRouter(prefix="/api/policies", tags=["policies"])
@@ -31,64 +31,6 @@ def _allowed_set(api_key: dict[str, Any]) -> set[str] | None:
     return items or None
 
 
-def _policy(api_key: dict[str, Any]) -> dict[str, Any]:
-    raw_effective = api_key.get("effective_policy_json")
-    if isinstance(raw_effective, dict):
-        return raw_effective
-    raw = api_key.get("policy_json")
-    return raw if isinstance(raw, dict) else {}
-
-
-def _normalized_policy(policy: dict[str, Any] | None) -> dict[str, Any]:
-    if not isinstance(policy, dict):
-        return {}
-    out: dict[str, Any] = {}
-    if "allow_high_risk" in policy:
-        out["allow_high_risk"] = bool(policy.get("allow_high_risk"))
-    for key in ("allowed_services", "deny_tools", "allowed_linear_team_ids"):
-        raw = policy.get(key)
-        if isinstance(raw, list):
-            values = [str(item).strip() for item in raw if str(item).strip()]
-            out[key] = [item.lower() for item in values] if key == "allowed_services" else values
-    return out
-
-
-def _merge_team_and_key_policy(team_policy: dict[str, Any] | None, key_policy: dict[str, Any] | None) -> dict[str, Any]:
-    team = _normalized_policy(team_policy)
-    key = _normalized_policy(key_policy)
-    if not team and not key:
-        return {}
-    merged: dict[str, Any] = {}
-    if "allow_high_risk" in key:
-        merged["allow_high_risk"] = bool(key["allow_high_risk"])
-    elif "allow_high_risk" in team:
-        merged["allow_high_risk"] = bool(team["allow_high_risk"])
-
-    def _merge_allowlist(field: str) -> list[str] | None:
-        team_values = set(team.get(field) or []) if isinstance(team.get(field), list) else None
-        key_values = set(key.get(field) or []) if isinstance(key.get(field), list) else None
-        if team_values is not None and key_values is not None:
-            return sorted(team_values.intersection(key_values))
-        if key_values is not None:
-            return sorted(key_values)
-        if team_values is not None:
-            return sorted(team_values)
-        return None
-
-    allowed_services = _merge_allowlist("allowed_services")
-    if allowed_services is not None:
-        merged["allowed_services"] = allowed_services
-    allowed_linear_team_ids = _merge_allowlist("allowed_linear_team_ids")
-    if allowed_linear_team_ids is not None:
-        merged["allowed_linear_team_ids"] = allowed_linear_team_ids
-
-    deny_tools = set(team.get("deny_tools") or []) if isinstance(team.get("deny_tools"), list) else set()
-    deny_tools.update(set(key.get("deny_tools") or []) if isinstance(key.get("deny_tools"), list) else set())
-    if deny_tools:
-        merged["deny_tools"] = sorted(deny_tools)
-    return merged
-
-
 def _enforce_member_simulation_scope(*, role: Role, team_ids: set[int], arguments: dict[str, Any]) -> None:
     if role != Role.MEMBER:
         return
@@ -116,8 +58,7 @@ def _enforce_member_simulation_scope(*, role: Role, team_ids: set[int], argument
 @router.post("/simulate")
 async def simulate_policy(request: Request, body: SimulatePolicyRequest):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
 
@@ -159,19 +100,8 @@ async def simulate_policy(request: Request, body: SimulatePolicyRequest):
         api_key = rows[0]
         if not bool(api_key.get("is_active")):
             raise HTTPException(status_code=409, detail="api_key_not_active")
-        team_id = api_key.get("team_id")
-        team_policy_rows = (
-            supabase.table("team_policies")
-            .select("policy_json")
-            .eq("team_id", team_id)
-            .limit(1)
-            .execute()
-        ).data or []
-        team_policy = team_policy_rows[0].get("policy_json") if team_policy_rows else None
-        api_key["effective_policy_json"] = _merge_team_and_key_policy(
-            team_policy if isinstance(team_policy, dict) else None,
-            api_key.get("policy_json") if isinstance(api_key.get("policy_json"), dict) else None,
-        )
+
+    policy = await run_db(resolve_effective_policy, supabase, api_key=api_key)
 
     reasons: list[dict[str, Any]] = []
     allowed = True
@@ -187,24 +117,15 @@ async def simulate_policy(request: Request, body: SimulatePolicyRequest):
             }
         )
 
-    policy_json = _policy(api_key)
-    deny_tools_raw = policy_json.get("deny_tools")
-    deny_tools = {str(item).strip() for item in deny_tools_raw if str(item).strip()} if isinstance(deny_tools_raw, list) else set()
-    if tool_name in deny_tools:
+    if policy.denies_tool(tool_name):
         allowed = False
         reasons.append({"code": ERR_ACCESS_DENIED, "message": "Tool denied by policy.", "source": "policy.deny_tools"})
 
-    allowed_services_raw = policy_json.get("allowed_services")
-    allowed_services = (
-        {str(item).strip().lower() for item in allowed_services_raw if str(item).strip()}
-        if isinstance(allowed_services_raw, list)
-        else set()
-    )
-    if allowed_services and tool.service not in allowed_services:
+    if not policy.allows_service(tool.service):
         allowed = False
         reasons.append({"code": ERR_SERVICE_NOT_ALLOWED, "message": "Service denied by policy.", "source": "policy.allowed_services"})
 
-    risk = evaluate_risk_with_policy(tool_name=tool_name, payload=arguments, policy=policy_json)
+    risk = evaluate_risk_with_policy(tool_name=tool_name, payload=arguments, policy=policy.policy_json)
     if not risk.allowed:
         allowed = False
         reasons.append(
@@ -217,11 +138,9 @@ async def simulate_policy(request: Request, body: SimulatePolicyRequest):
             }
         )
 
-    allowed_linear_team_ids_raw = policy_json.get("allowed_linear_team_ids")
-    if tool.service == "linear" and isinstance(allowed_linear_team_ids_raw, list):
-        allowed_team_ids = {str(item).strip() for item in allowed_linear_team_ids_raw if str(item).strip()}
+    if tool.service == "linear":
         team_id = str(arguments.get("team_id") or "").strip()
-        if team_id and team_id not in allowed_team_ids:
+        if team_id and not policy.allows_linear_team(team_id):
             allowed = False
             reasons.append(
                 {
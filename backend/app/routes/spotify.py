@@ -5,11 +5,14 @@ from urllib.parse import urlencode
 import httpx
 from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import RedirectResponse
-from supabase import create_client
 
 from app.core.auth import get_authenticated_user_id
 from app.core.config import get_settings
+from app.core.db import get_supabase_client
+from app.core.oauth_token_cache import invalidate_oauth_token
 from app.core.state import build_state, verify_state
+from app.core.tool_result_cache import invalidate_tool_results
+from app.core.tool_visibility import invalidate_user_connections
 from app.security.token_vault import TokenVault
 
 router = APIRouter(prefix="/api/oauth/spotify", tags=["spotify-oauth"])
@@ -80,7 +83,7 @@ async def spotify_oauth_callback(code: str, state: str):
         raise HTTPException(status_code=400, detail="Missing access_token from Spotify")
 
     encrypted = TokenVault(settings.notion_token_encryption_key).encrypt(access_token)
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     supabase.table("oauth_tokens").upsert(
         {
             "user_id": user_id,
@@ -92,6 +95,9 @@ async def spotify_oauth_callback(code: str, state: str):
         },
         on_conflict="user_id,provider",
     ).execute()
+    invalidate_user_connections(user_id)
+    invalidate_oauth_token(user_id, "spotify")
+    invalidate_tool_results(user_id, "spotify")
 
     frontend_base = (settings.frontend_url or "").strip().strip("'\"").replace("\r", "").replace("\n", "").rstrip("/")
     if not frontend_base.startswith(("http://", "https://")):
@@ -102,8 +108,7 @@ async def spotify_oauth_callback(code: str, state: str):
 @router.get("/status")
 async def spotify_oauth_status(request: Request):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     result = (
         supabase.table("oauth_tokens")
         .select("updated_at")
@@ -118,8 +123,7 @@ async def spotify_oauth_status(request: Request):
 @router.delete("/disconnect")
 async def spotify_oauth_disconnect(request: Request):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     (
         supabase.table("oauth_tokens")
         .delete()
@@ -127,4 +131,7 @@ async def spotify_oauth_disconnect(request: Request):
         .eq("provider", "spotify")
         .execute()
     )
+    invalidate_user_connections(user_id)
+    invalidate_oauth_token(user_id, "spotify")
+    invalidate_tool_results(user_id, "spotify")
     return {"ok": True, "connected": False}
@@ -5,11 +5,13 @@ from typing import Any
 
 from fastapi import APIRouter, HTTPException, Query, Request
 from pydantic import BaseModel, Field
-from supabase import create_client
 
+from app.core.agent_index import invalidate_default_agent_index
+from app.core.api_key_cache import invalidate_api_key
 from app.core.auth import get_authenticated_user_id
 from app.core.authz import AuthzContext, Role, get_authz_context, require_min_role
-from app.core.config import get_settings
+from app.core.db import get_supabase_client
+from app.core.policy import invalidate_team_policy
 
 router = APIRouter(prefix="/api/teams", tags=["teams"])
 
@@ -81,6 +83,11 @@ def _normalize_policy(raw: dict[str, Any] | None) -> dict[str, Any]:
     allowed_linear_team_ids = raw.get("allowed_linear_team_ids")
     if isinstance(allowed_linear_team_ids, list):
         out["allowed_linear_team_ids"] = [str(item).strip() for item in allowed_linear_team_ids if str(item).strip()]
+    rate_limit_per_minute = raw.get("rate_limit_per_minute")
+    if rate_limit_per_minute is not None:
+        if isinstance(rate_limit_per_minute, bool) or not isinstance(rate_limit_per_minute, int) or rate_limit_per_minute <= 0:
+            raise HTTPException(status_code=400, detail="invalid_policy_json:rate_limit_per_minute")
+        out["rate_limit_per_minute"] = rate_limit_per_minute
     return out
 
 
@@ -241,8 +248,7 @@ def _require_team_access(*, supabase, authz_ctx: AuthzContext, team_id: str, wri
 @router.get("")
 async def list_teams(request: Request, organization_id: int | None = Query(default=None)):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
 
@@ -313,8 +319,7 @@ async def list_teams(request: Request, organization_id: int | None = Query(defau
 @router.post("")
 async def create_team(request: Request, body: TeamCreateRequest):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.ADMIN, method=request.method)
 
@@ -366,8 +371,7 @@ async def create_team(request: Request, body: TeamCreateRequest):
 @router.patch("/{team_id}")
 async def update_team(request: Request, team_id: str, body: TeamUpdateRequest):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.ADMIN, method=request.method)
 
@@ -406,6 +410,7 @@ async def update_team(request: Request, team_id: str, body: TeamUpdateRequest):
         else:
             supabase.table("team_policies").insert({"team_id": team_id, "policy_json": policy_json, "created_at": now, "updated_at": now}).execute()
         _insert_policy_revision(supabase=supabase, team_id=team_id, user_id=user_id, source="team_policy_update", policy_json=policy_json)
+        invalidate_team_policy(team_id)
 
     return {"ok": True}
 
@@ -413,8 +418,7 @@ async def update_team(request: Request, team_id: str, body: TeamUpdateRequest):
 @router.get("/{team_id}/members")
 async def list_team_members(request: Request, team_id: str):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
 
@@ -433,8 +437,7 @@ async def list_team_members(request: Request, team_id: str):
 @router.post("/{team_id}/members")
 async def add_team_member(request: Request, team_id: str, body: TeamMemberRequest):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.ADMIN, method=request.method)
 
@@ -457,8 +460,7 @@ async def add_team_member(request: Request, team_id: str, body: TeamMemberReques
 @router.delete("/{team_id}/members/{membership_id}")
 async def delete_team_member(request: Request, team_id: str, membership_id: str):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.ADMIN, method=request.method)
 
@@ -482,8 +484,7 @@ async def delete_team_member(request: Request, team_id: str, membership_id: str)
 @router.get("/{team_id}/policy-revisions")
 async def list_policy_revisions(request: Request, team_id: str, limit: int = 20):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
 
@@ -503,8 +504,7 @@ async def list_policy_revisions(request: Request, team_id: str, limit: int = 20)
 @router.post("/{team_id}/policy-revisions/{revision_id}/rollback")
 async def rollback_policy_revision(request: Request, team_id: str, revision_id: str):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.ADMIN, method=request.method)
 
@@ -534,20 +534,25 @@ async def rollback_policy_revision(request: Request, team_id: str, revision_id:
     else:
         supabase.table("team_policies").insert({"team_id": team_id, "policy_json": policy_json, "created_at": now, "updated_at": now}).execute()
     _insert_policy_revision(supabase=supabase, team_id=team_id, user_id=user_id, source="team_policy_rollback", policy_json=policy_json)
+    invalidate_team_policy(team_id)
     return {"ok": True, "policy_json": policy_json}
 
 
 @router.delete("/{team_id}")
 async def delete_team(request: Request, team_id: str):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.ADMIN, method=request.method)
 
     _require_team_access(supabase=supabase, authz_ctx=authz_ctx, team_id=team_id, write=True)
 
     # Keep existing API keys and detach their team scope before deleting the team.
+    team_keys = supabase.table("api_keys").select("id").eq("team_id", team_id).execute().data or []
     supabase.table("api_keys").update({"team_id": None}).eq("team_id", team_id).execute()
     supabase.table("teams").delete().eq("id", team_id).execute()
+    for key in team_keys:
+        invalidate_api_key(key.get("id"))
+    invalidate_team_policy(team_id)
+    invalidate_default_agent_index()
     return {"ok": True}
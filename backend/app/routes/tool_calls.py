@@ -5,11 +5,12 @@ from collections import defaultdict
 from datetime import datetime, timedelta, timezone
 
 from fastapi import APIRouter, HTTPException, Query, Request
-from supabase import create_client
 
 from app.core.auth import get_authenticated_user_id
 from app.core.authz import Role, get_authz_context, require_min_role
 from app.core.config import get_settings
+from app.core.db import get_supabase_client
+from app.core.quota import current_daily_usage, next_quota_reset_iso
 
 router = APIRouter(prefix="/api/tool-calls", tags=["tool-calls"])
 
@@ -379,8 +380,7 @@ async def list_tool_calls(
     to: str = Query(default=""),
 ):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
 
@@ -560,8 +560,7 @@ async def tool_calls_overview(
     team_id: int | None = Query(default=None),
 ):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
     scoped_user_ids, scoped_api_key_ids = _resolve_scope_filters(
@@ -618,6 +617,43 @@ async def tool_calls_overview(
     }
 
 
+@router.get("/usage")
+async def tool_calls_usage(request: Request):
+    user_id = await get_authenticated_user_id(request)
+    settings = get_settings()
+    supabase = get_supabase_client()
+    authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
+    require_min_role(authz_ctx, Role.MEMBER, method=request.method)
+
+    key_rows = (
+        supabase.table("api_keys")
+        .select("id,name,key_prefix")
+        .eq("user_id", user_id)
+        .eq("is_active", True)
+        .execute()
+    ).data or []
+    targets = [("user", user_id)] + [("api_key", row.get("id")) for row in key_rows]
+    day, usage = await current_daily_usage(supabase=supabase, targets=targets)
+
+    per_key_limit = max(0, int(getattr(settings, "mcp_quota_per_key_daily", 0)))
+    per_user_limit = max(0, int(getattr(settings, "mcp_quota_per_user_daily", 0)))
+    return {
+        "day": day,
+        "resets_at": next_quota_reset_iso(),
+        "user": {"used": usage[("user", str(user_id))], "limit": per_user_limit or None},
+        "api_keys": [
+            {
+                "api_key_id": row.get("id"),
+                "name": row.get("name"),
+                "key_prefix": row.get("key_prefix"),
+                "used": usage[("api_key", str(row.get("id")))],
+                "limit": per_key_limit or None,
+            }
+            for row in key_rows
+        ],
+    }
+
+
 @router.get("/trends")
 async def tool_calls_trends(
     request: Request,
@@ -628,8 +664,7 @@ async def tool_calls_trends(
     team_id: int | None = Query(default=None),
 ):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
 
@@ -715,8 +750,7 @@ async def tool_calls_failure_breakdown(
     team_id: int | None = Query(default=None),
 ):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
 
@@ -767,8 +801,7 @@ async def tool_calls_connectors(
     team_id: int | None = Query(default=None),
 ):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
 
@@ -825,8 +858,7 @@ async def tool_calls_agents(
     team_id: int | None = Query(default=None),
 ):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
 
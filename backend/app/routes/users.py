@@ -5,11 +5,10 @@ from typing import Any
 
 from fastapi import APIRouter, HTTPException, Query, Request
 from pydantic import BaseModel, Field
-from supabase import create_client
 
 from app.core.auth import get_authenticated_user_id
 from app.core.authz import Role, get_authz_context, require_min_role
-from app.core.config import get_settings
+from app.core.db import get_supabase_client
 
 router = APIRouter(prefix="/api/users/me", tags=["users"])
 
@@ -127,8 +126,7 @@ def _load_security_settings(*, supabase, user_id: str) -> dict[str, Any]:
 @router.get("/security")
 async def get_my_security(request: Request):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
 
@@ -138,8 +136,7 @@ async def get_my_security(request: Request):
 @router.patch("/security")
 async def update_my_security(request: Request, body: UserSecurityUpdateRequest):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
 
@@ -172,8 +169,7 @@ async def update_my_security(request: Request, body: UserSecurityUpdateRequest):
 @router.get("/requests")
 async def list_my_requests(request: Request, status: str | None = Query(default=None), request_type: str | None = Query(default=None)):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
 
@@ -212,8 +208,7 @@ async def list_my_requests(request: Request, status: str | None = Query(default=
 @router.get("/requests/{request_id}")
 async def get_my_request(request: Request, request_id: str):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
 
@@ -245,8 +240,7 @@ async def get_my_request(request: Request, request_id: str):
 @router.post("/requests")
 async def create_my_request(request: Request, body: UserRequestCreateRequest):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
 
@@ -285,8 +279,7 @@ async def create_my_request(request: Request, body: UserRequestCreateRequest):
 @router.post("/requests/{request_id}/cancel")
 async def cancel_my_request(request: Request, request_id: str, body: UserRequestCancelRequest | None = None):
     user_id = await get_authenticated_user_id(request)
-    settings = get_settings()
-    supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    supabase = get_supabase_client()
     authz_ctx = await get_authz_context(request, user_id=user_id, supabase=supabase)
     require_min_role(authz_ctx, Role.MEMBER, method=request.method)
 
@@ -7,7 +7,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from agent.registry import ToolSpecValidationError, validate_registry_on_startup
+from app.core.api_key_usage import start_last_used_writer, stop_last_used_writer
+from app.core.audit_writer import start_audit_writer, stop_audit_writer
 from app.core.config import get_settings
+from app.core.db import close_supabase_client
+from app.core.http_pool import close_upstream_clients
+from app.core.webhook_dispatcher import start_webhook_dispatcher, stop_webhook_dispatcher
 from app.routes.api_keys import router as api_keys_router
 from app.routes.agents import router as agents_router
 from app.routes.audit import router as audit_router
@@ -106,12 +111,32 @@ async def validate_tool_specs() -> None:
         raise RuntimeError(f"Tool spec validation failed: {exc}") from exc
 
 
+@app.on_event("startup")
+async def start_background_writers() -> None:
+    start_last_used_writer()
+    start_audit_writer()
+    start_webhook_dispatcher()
+
+
+@app.on_event("shutdown")
+async def close_shared_clients() -> None:
+    # Drain buffered writes before the shared Supabase client goes away.
+    await stop_webhook_dispatcher()
+    await stop_audit_writer()
+    await stop_last_used_writer()
+    close_supabase_client()
+    await close_upstream_clients()
+
+
 @app.middleware("http")
 async def add_request_id(request: Request, call_next):
     request_id = str(uuid.uuid4())
     request.state.request_id = request_id
     response = await call_next(request)
     response.headers["X-Request-ID"] = request_id
+    stage_timer = getattr(request.state, "stage_timer", None)
+    if stage_timer is not None:
+        response.headers["Server-Timing"] = stage_timer.server_timing()
     return response
 
 
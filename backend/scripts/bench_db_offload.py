@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Ensure `app` package is importable when executed as a script.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from app.core import db
+from app.core.db import close_supabase_client, execute_async
+
+
+class _SlowQuery:
+    """Stands in for a PostgREST query builder whose execute() blocks for a fixed latency."""
+
+    def __init__(self, latency_seconds: float):
+        self._latency_seconds = latency_seconds
+
+    def execute(self):
+        time.sleep(self._latency_seconds)
+        return {"data": []}
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def _call_inline(query: _SlowQuery, queries_per_call: int, arrived: float) -> float:
+    for _ in range(queries_per_call):
+        query.execute()
+    return (time.perf_counter() - arrived) * 1000
+
+
+async def _call_offloaded(query: _SlowQuery, queries_per_call: int, arrived: float) -> float:
+    for _ in range(queries_per_call):
+        await execute_async(query)
+    return (time.perf_counter() - arrived) * 1000
+
+
+async def _run_mode(mode: str, *, concurrency: int, latency_ms: float, queries_per_call: int) -> dict[str, float]:
+    query = _SlowQuery(latency_ms / 1000.0)
+    call = _call_inline if mode == "inline" else _call_offloaded
+    # Every call "arrives" at the same instant, so samples include time spent waiting on the loop.
+    wall_started = time.perf_counter()
+    samples = await asyncio.gather(*(call(query, queries_per_call, wall_started) for _ in range(concurrency)))
+    wall_ms = (time.perf_counter() - wall_started) * 1000
+    return {
+        "p50_ms": round(statistics.median(samples), 1),
+        "p99_ms": round(_percentile(list(samples), 99), 1),
+        "wall_ms": round(wall_ms, 1),
+    }
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Compare call_tool-style DB latency with blocking PostgREST calls inline vs on the offload pool."
+    )
+    parser.add_argument("--concurrency", type=int, default=100, help="Concurrent simulated MCP calls.")
+    parser.add_argument(
+        "--latency-ms",
+        type=str,
+        default="5,20,50",
+        help="Comma separated simulated PostgREST round-trip latencies.",
+    )
+    parser.add_argument("--queries-per-call", type=int, default=6, help="DB round-trips per simulated call.")
+    parser.add_argument(
+        "--workers",
+        type=str,
+        default="20,100",
+        help="Comma separated offload pool sizes to compare (overrides SUPABASE_DB_OFFLOAD_WORKERS).",
+    )
+    return parser
+
+
+async def _main(args: argparse.Namespace) -> int:
+    latencies = [float(item) for item in str(args.latency_ms).split(",") if item.strip()]
+    pool_sizes = [max(1, int(item)) for item in str(args.workers).split(",") if item.strip()]
+    concurrency = max(1, int(args.concurrency))
+    queries_per_call = max(1, int(args.queries_per_call))
+    report = []
+    for latency_ms in latencies:
+        row: dict[str, object] = {
+            "latency_ms": latency_ms,
+            "concurrency": concurrency,
+            "floor_ms": round(latency_ms * queries_per_call, 1),
+            "inline": await _run_mode("inline", concurrency=concurrency, latency_ms=latency_ms, queries_per_call=queries_per_call),
+        }
+        for workers in pool_sizes:
+            # Rebuild the offload pool at this width; the script runs without app settings.
+            close_supabase_client()
+            db._offload_workers = lambda workers=workers: workers
+            row[f"offload_{workers}"] = await _run_mode(
+                "offload", concurrency=concurrency, latency_ms=latency_ms, queries_per_call=queries_per_call
+            )
+        report.append(row)
+    close_supabase_client()
+    print(json.dumps({"queries_per_call": queries_per_call, "results": report}, ensure_ascii=False, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(_main(_build_parser().parse_args())))
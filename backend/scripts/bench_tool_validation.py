@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+# Ensure `agent` package is importable when executed as a script.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from agent.registry import ToolDefinition, build_payload_model, load_registry
+from agent.tool_runner import _build_path, _strip_path_params, _validate_payload_by_schema
+
+
+def _sample_value(spec: dict[str, Any]) -> Any:
+    enum_values = spec.get("enum")
+    if isinstance(enum_values, list) and enum_values:
+        return enum_values[0]
+    expected = spec.get("type")
+    if expected == "integer":
+        return int(spec.get("minimum") or 1)
+    if expected == "number":
+        return float(spec.get("minimum") or 1)
+    if expected == "boolean":
+        return True
+    if expected == "array":
+        return []
+    if expected == "object":
+        return {}
+    return "sample"
+
+
+def _sample_payload(tool: ToolDefinition) -> dict[str, Any]:
+    properties = (tool.input_schema or {}).get("properties", {})
+    payload = {key: _sample_value(spec if isinstance(spec, dict) else {}) for key, spec in properties.items()}
+    for key in tool.path_params:
+        payload.setdefault(key, "sample")
+    return payload
+
+
+def _legacy_call(tool: ToolDefinition, payload: dict[str, Any]) -> None:
+    # What every call paid before validators and path templates were compiled at registry load.
+    build_payload_model(tool.tool_name, tool.input_schema).model_validate(payload)
+    rendered = tool.path
+    for key in re.findall(r"{([a-zA-Z0-9_]+)}", tool.path):
+        rendered = rendered.replace(f"{{{key}}}", str(payload[key]))
+    used = set(re.findall(r"{([a-zA-Z0-9_]+)}", tool.path))
+    {k: v for k, v in payload.items() if k not in used}
+
+
+def _compiled_call(tool: ToolDefinition, payload: dict[str, Any]) -> None:
+    _validate_payload_by_schema(tool, payload)
+    _build_path(tool.path, payload)
+    _strip_path_params(tool.path, payload)
+
+
+def _per_call_us(call, tool: ToolDefinition, payload: dict[str, Any], iterations: int) -> float:
+    call(tool, payload)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call(tool, payload)
+    return (time.perf_counter() - started) / iterations * 1_000_000
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Compare per-call payload validation and path rendering cost: per-call create_model vs compiled at registry load."
+    )
+    parser.add_argument(
+        "--tools",
+        type=str,
+        default="notion_search,notion_retrieve_page_property_item,linear_create_issue",
+        help="Comma separated tool names from the registry.",
+    )
+    parser.add_argument("--iterations", type=int, default=2000, help="Calls per tool and mode.")
+    return parser
+
+
+def main(args: argparse.Namespace) -> int:
+    registry = load_registry()
+    iterations = max(1, int(args.iterations))
+    report = []
+    for tool_name in [item.strip() for item in str(args.tools).split(",") if item.strip()]:
+        tool = registry.get_tool(tool_name)
+        payload = _sample_payload(tool)
+        legacy_us = _per_call_us(_legacy_call, tool, payload, iterations)
+        compiled_us = _per_call_us(_compiled_call, tool, payload, iterations)
+        report.append(
+            {
+                "tool": tool_name,
+                "fields": len((tool.input_schema or {}).get("properties", {})),
+                "legacy_us_per_call": round(legacy_us, 2),
+                "compiled_us_per_call": round(compiled_us, 2),
+                "speedup": round(legacy_us / compiled_us, 1) if compiled_us else None,
+            }
+        )
+    print(json.dumps({"iterations": iterations, "results": report}, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(_build_parser().parse_args()))
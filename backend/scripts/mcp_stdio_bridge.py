@@ -120,23 +120,41 @@ def _ok_response(req_id: Any, result: dict[str, Any]) -> dict[str, Any]:
     return {"jsonrpc": "2.0", "id": req_id, "result": result}
 
 
-def _post_jsonrpc(*, base_url: str, api_key: str, endpoint: str, payload: dict[str, Any]) -> dict[str, Any]:
+# Last list_tools response and its ETag; the server answers 304 while it is still current.
+_LIST_TOOLS_CACHE: dict[str, Any] = {}
+
+
+def _post_jsonrpc(
+    *,
+    base_url: str,
+    api_key: str,
+    endpoint: str,
+    payload: dict[str, Any],
+    cache: dict[str, Any] | None = None,
+) -> dict[str, Any]:
     url = f"{base_url}{endpoint}"
     body = json.dumps(payload).encode("utf-8")
-    req = urlrequest.Request(
-        url,
-        data=body,
-        method="POST",
-        headers={
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-        },
-    )
-    with urlrequest.urlopen(req, timeout=30) as resp:
-        raw = resp.read()
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+    }
+    if cache and cache.get("etag") and "response" in cache:
+        headers["If-None-Match"] = cache["etag"]
+    req = urlrequest.Request(url, data=body, method="POST", headers=headers)
+    try:
+        with urlrequest.urlopen(req, timeout=30) as resp:
+            raw = resp.read()
+            etag = resp.headers.get("ETag")
+    except urlerror.HTTPError as exc:
+        if exc.code == 304 and cache and "response" in cache:
+            return cache["response"]
+        raise
     parsed = json.loads(raw.decode("utf-8"))
     if not isinstance(parsed, dict):
         raise ValueError("upstream_non_object_response")
+    if cache is not None and etag and "error" not in parsed:
+        cache["etag"] = etag
+        cache["response"] = parsed
     return parsed
 
 
@@ -159,6 +177,7 @@ def _handle_tools_list(*, req_id: Any, base_url: str, api_key: str) -> dict[str,
         api_key=api_key,
         endpoint="/mcp/list_tools",
         payload={"jsonrpc": "2.0", "id": "bridge-list-tools", "method": "list_tools"},
+        cache=_LIST_TOOLS_CACHE,
     )
     if "error" in upstream:
         error = upstream["error"]
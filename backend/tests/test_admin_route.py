@@ -68,13 +68,19 @@ def test_external_health_aggregates_connectors(monkeypatch):
 
     monkeypatch.setattr("app.routes.admin.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.admin.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.admin.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.admin.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.admin.get_supabase_client", lambda *_args, **_kwargs: _Client())
+    open_circuit = {"state": "open", "open_circuits": 1, "retry_after_ms": 12000, "trips": 1, "rejected": 4}
+    monkeypatch.setattr(
+        "app.routes.admin.get_circuit_breakers",
+        lambda: SimpleNamespace(snapshot=lambda: {"notion": open_circuit}),
+    )
 
     out = asyncio.run(external_health(_request("/api/admin/external-health"), days=1))
     assert out["window_days"] == 1
-    assert any(item["connector"] == "notion" for item in out["items"])
-    assert any(item["connector"] == "linear" for item in out["items"])
+    items = {item["connector"]: item for item in out["items"]}
+    assert items["notion"]["circuit"] == open_circuit
+    assert items["notion"]["status"] == "degraded"
+    assert items["linear"]["circuit"] is None
 
 
 @pytest.mark.parametrize(
@@ -96,8 +102,7 @@ def test_admin_read_endpoints_block_member(monkeypatch, path: str, callable_name
 
     monkeypatch.setattr("app.routes.admin.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.admin.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.admin.create_client", lambda *_args, **_kwargs: SimpleNamespace())
-    monkeypatch.setattr("app.routes.admin.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.admin.get_supabase_client", lambda *_args, **_kwargs: SimpleNamespace())
 
     fn_map = {
         "connector_diagnostics": lambda: connector_diagnostics(_request(path)),
@@ -144,8 +149,7 @@ def test_get_incident_banner_allows_member(monkeypatch):
 
     monkeypatch.setattr("app.routes.admin.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.admin.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.admin.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.admin.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.admin.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     out = asyncio.run(get_incident_banner(_request("/api/admin/incident-banner")))
     assert out["enabled"] is False
@@ -174,8 +178,7 @@ def test_get_incident_banner_defaults_when_missing(monkeypatch):
         return "user-1"
 
     monkeypatch.setattr("app.routes.admin.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.admin.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.admin.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.admin.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     out = asyncio.run(get_incident_banner(_request("/api/admin/incident-banner")))
     assert out["enabled"] is False
@@ -187,8 +190,7 @@ def test_update_incident_banner_rejects_invalid_severity(monkeypatch):
         return "user-1"
 
     monkeypatch.setattr("app.routes.admin.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.admin.create_client", lambda *_args, **_kwargs: SimpleNamespace())
-    monkeypatch.setattr("app.routes.admin.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.admin.get_supabase_client", lambda *_args, **_kwargs: SimpleNamespace())
 
     body = IncidentBannerUpdateRequest(enabled=True, message="x", severity="severe")
     try:
@@ -334,8 +336,7 @@ def test_create_incident_banner_revision_returns_item(monkeypatch):
         return "user-1"
 
     monkeypatch.setattr("app.routes.admin.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.admin.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.admin.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.admin.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     out = asyncio.run(
         create_incident_banner_revision(
@@ -352,8 +353,7 @@ def test_review_incident_banner_revision_rejects_invalid_decision(monkeypatch):
         return "user-1"
 
     monkeypatch.setattr("app.routes.admin.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.admin.create_client", lambda *_args, **_kwargs: SimpleNamespace())
-    monkeypatch.setattr("app.routes.admin.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.admin.get_supabase_client", lambda *_args, **_kwargs: SimpleNamespace())
 
     try:
         asyncio.run(
@@ -397,8 +397,7 @@ def test_review_incident_banner_revision_blocks_self_review(monkeypatch):
         return "user-1"
 
     monkeypatch.setattr("app.routes.admin.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.admin.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.admin.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.admin.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     try:
         asyncio.run(
@@ -0,0 +1,114 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import agent_index
+from app.core.agent_index import DefaultAgentIndex
+
+
+@pytest.fixture(autouse=True)
+def _reset_agent_index():
+    agent_index.reset_default_agent_index()
+    yield
+    agent_index.reset_default_agent_index()
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _Client:
+    def __init__(self, agents: list[dict], on_execute=None):
+        self.agents = agents
+        self.on_execute = on_execute
+        self.calls: list[tuple[str, str | None]] = []
+
+    def table(self, name: str):
+        client = self
+
+        class _Query:
+            def __init__(self):
+                self._team_id = None
+
+            def select(self, *_args, **_kwargs):
+                return self
+
+            def eq(self, column, value):
+                if column == "team_id":
+                    self._team_id = str(value)
+                return self
+
+            def order(self, *_args, **_kwargs):
+                return self
+
+            def limit(self, *_args, **_kwargs):
+                return self
+
+            def execute(self):
+                client.calls.append((name, self._team_id))
+                if client.on_execute is not None:
+                    client.on_execute()
+                rows = [row for row in client.agents if str(row["team_id"]) == self._team_id]
+                return SimpleNamespace(data=rows[:1])
+
+        return _Query()
+
+
+def test_index_loads_each_team_once_with_a_team_scoped_query():
+    client = _Client([{"id": 9, "team_id": 3}, {"id": 10, "team_id": 3}, {"id": 11, "team_id": 4}])
+    index = DefaultAgentIndex()
+    assert index.resolve(client, team_id=3) == 9
+    assert index.resolve(client, team_id="3") == 9
+    assert index.resolve(client, team_id=4) == 11
+    assert client.calls == [("agents", "3"), ("agents", "4")]
+    assert index.stats()["teams"] == 2
+    assert index.stats()["hits"] == 1
+
+
+def test_missing_team_skips_the_query_and_teams_without_agents_are_cached():
+    client = _Client([{"id": 9, "team_id": 3}])
+    index = DefaultAgentIndex()
+    assert index.resolve(client, team_id=None) is None
+    assert index.resolve(client, team_id=8) is None
+    assert index.resolve(client, team_id=8) is None
+    assert client.calls == [("agents", "8")]
+
+
+def test_entries_expire_after_ttl_and_lru_is_bounded():
+    clock = _Clock()
+    client = _Client([{"id": 9, "team_id": 3}, {"id": 11, "team_id": 4}])
+    index = DefaultAgentIndex(ttl_seconds=10, max_teams=1, clock=clock)
+    assert index.resolve(client, team_id=3) == 9
+    clock.now = 11
+    assert index.resolve(client, team_id=3) == 9
+    assert index.resolve(client, team_id=4) == 11
+    assert index.stats()["teams"] == 1
+    assert index.resolve(client, team_id=3) == 9
+    assert client.calls == [("agents", "3"), ("agents", "3"), ("agents", "4"), ("agents", "3")]
+
+
+def test_load_in_flight_during_invalidation_is_not_stored():
+    index = DefaultAgentIndex()
+    client = _Client([{"id": 9, "team_id": 3}], on_execute=index.invalidate_agents)
+    assert index.resolve(client, team_id=3) == 9
+    assert index.stats()["teams"] == 0
+
+    client.on_execute = None
+    client.agents = [{"id": 12, "team_id": 3}]
+    assert index.resolve(client, team_id=3) == 12
+    assert index.stats()["teams"] == 1
+
+
+def test_agent_changes_invalidate_through_the_channel():
+    client = _Client([{"id": 9, "team_id": 3}])
+    assert agent_index.resolve_default_agent_id(supabase=client, team_id=3) == 9
+
+    client.agents = [{"id": 12, "team_id": 3}]
+    assert agent_index.resolve_default_agent_id(supabase=client, team_id=3) == 9
+    agent_index.invalidate_team_agents()
+    assert agent_index.resolve_default_agent_id(supabase=client, team_id=3) == 12
+    assert len(client.calls) == 2
@@ -75,8 +75,7 @@ def _patch(monkeypatch, role: Role, org_ids: set[int], team_ids: set[int]):
 
     monkeypatch.setattr("app.routes.agents.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.agents.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.agents.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.agents.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.agents.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
 
 def test_list_agents_member_ok(monkeypatch):
@@ -0,0 +1,225 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from starlette.requests import Request
+
+from app.core import api_key_cache
+from app.core.api_key_cache import ApiKeyAuthCache, InMemoryInvalidationChannel
+from app.core.authz import AuthzContext, Role
+
+
+@pytest.fixture(autouse=True)
+def _reset_cache():
+    api_key_cache.reset_api_key_cache()
+    yield
+    api_key_cache.reset_api_key_cache()
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cache_expires_entries_after_ttl():
+    clock = _Clock()
+    cache = ApiKeyAuthCache(ttl_seconds=10, max_entries=4, clock=clock)
+    cache.put("hash-1", {"id": 1, "user_id": "user-1", "is_active": True})
+
+    assert cache.get("hash-1")["user_id"] == "user-1"
+    clock.now = 10.5
+    assert cache.get("hash-1") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_evicts_least_recently_used_entry():
+    cache = ApiKeyAuthCache(ttl_seconds=60, max_entries=2)
+    cache.put("hash-1", {"id": 1})
+    cache.put("hash-2", {"id": 2})
+    assert cache.get("hash-1") is not None
+    cache.put("hash-3", {"id": 3})
+
+    assert cache.get("hash-2") is None
+    assert cache.get("hash-1") is not None
+    assert cache.get("hash-3") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidation_is_broadcast_through_channel():
+    channel = InMemoryInvalidationChannel()
+    worker_a = ApiKeyAuthCache(ttl_seconds=60, max_entries=8)
+    worker_b = ApiKeyAuthCache(ttl_seconds=60, max_entries=8)
+    channel.subscribe(worker_a.invalidate_key_id)
+    channel.subscribe(worker_b.invalidate_key_id)
+    worker_a.put("hash-1", {"id": 7})
+    worker_b.put("hash-1", {"id": 7})
+
+    channel.publish("7")
+
+    assert worker_a.get("hash-1") is None
+    assert worker_b.get("hash-1") is None
+
+
+def test_row_loaded_across_an_invalidation_is_not_cached():
+    cache = ApiKeyAuthCache(ttl_seconds=60, max_entries=8)
+    row, generation = cache.lookup("hash-1")
+    assert row is None
+
+    # Revoke lands while the auth miss is still reading the (now stale) active row.
+    cache.invalidate_key_id(7)
+    cache.put("hash-1", {"id": 7, "is_active": True}, generation=generation)
+    assert cache.get("hash-1") is None
+
+    _, generation = cache.lookup("hash-1")
+    cache.put("hash-1", {"id": 7, "is_active": False}, generation=generation)
+    assert cache.get("hash-1")["is_active"] is False
+
+
+def test_authenticate_api_key_reuses_cached_row(monkeypatch):
+    from app.routes.mcp import _authenticate_api_key
+
+    calls = {"select": 0}
+
+    class _Query:
+        def __init__(self):
+            self._mode = ""
+
+        def select(self, *_args, **_kwargs):
+            self._mode = "select"
+            return self
+
+        def update(self, *_args, **_kwargs):
+            self._mode = "update"
+            return self
+
+        def eq(self, *_args, **_kwargs):
+            return self
+
+        def limit(self, *_args, **_kwargs):
+            return self
+
+        def execute(self):
+            if self._mode == "select":
+                calls["select"] += 1
+                return SimpleNamespace(data=[{"id": 1, "user_id": "user-1", "is_active": True}])
+            return SimpleNamespace(data=[])
+
+    class _Client:
+        def table(self, _name: str):
+            return _Query()
+
+    monkeypatch.setattr("app.routes.mcp.get_supabase_client", lambda: _Client())
+
+    first = asyncio.run(_authenticate_api_key("Bearer metel_cached"))
+    second = asyncio.run(_authenticate_api_key("Bearer metel_cached"))
+
+    assert first["user_id"] == second["user_id"] == "user-1"
+    assert calls["select"] == 1
+
+
+def test_revoke_api_key_invalidates_cached_row(monkeypatch):
+    from app.core.api_keys import hash_api_key
+    from app.routes.api_keys import revoke_api_key
+
+    class _Query:
+        def select(self, *_args, **_kwargs):
+            return self
+
+        def update(self, *_args, **_kwargs):
+            return self
+
+        def eq(self, *_args, **_kwargs):
+            return self
+
+        def limit(self, *_args, **_kwargs):
+            return self
+
+        def execute(self):
+            return SimpleNamespace(data=[{"id": 1}])
+
+    class _Client:
+        def table(self, _name: str):
+            return _Query()
+
+    async def _fake_user(_request: Request) -> str:
+        return "user-1"
+
+    async def _fake_authz(_request: Request, **_kwargs) -> AuthzContext:
+        return AuthzContext(user_id="user-1", role=Role.MEMBER, org_ids=set(), team_ids=set())
+
+    monkeypatch.setattr("app.routes.api_keys.get_authenticated_user_id", _fake_user)
+    monkeypatch.setattr("app.routes.api_keys.get_authz_context", _fake_authz)
+    monkeypatch.setattr("app.routes.api_keys.get_supabase_client", lambda: _Client())
+
+    cache = api_key_cache.get_api_key_cache()
+    key_hash = hash_api_key("metel_revoked")
+    cache.put(key_hash, {"id": 1, "user_id": "user-1", "is_active": True})
+
+    request = Request({"type": "http", "method": "DELETE", "path": "/api/api-keys/1", "headers": []})
+    assert asyncio.run(revoke_api_key(request, "1")) == {"ok": True}
+    assert cache.get(key_hash) is None
+
+
+def test_delete_team_invalidates_its_cached_keys(monkeypatch):
+    from app.core.api_keys import hash_api_key
+    from app.routes.teams import delete_team
+
+    class _Query:
+        def __init__(self, table_name: str):
+            self.table_name = table_name
+            self._mode = "select"
+
+        def select(self, *_args, **_kwargs):
+            self._mode = "select"
+            return self
+
+        def update(self, *_args, **_kwargs):
+            self._mode = "update"
+            return self
+
+        def delete(self):
+            self._mode = "delete"
+            return self
+
+        def eq(self, *_args, **_kwargs):
+            return self
+
+        def limit(self, *_args, **_kwargs):
+            return self
+
+        def execute(self):
+            if self._mode != "select":
+                return SimpleNamespace(data=[])
+            if self.table_name == "teams":
+                return SimpleNamespace(data=[{"id": 1, "organization_id": 1}])
+            if self.table_name == "api_keys":
+                return SimpleNamespace(data=[{"id": 1}, {"id": 2}])
+            return SimpleNamespace(data=[])
+
+    class _Client:
+        def table(self, name: str):
+            return _Query(name)
+
+    async def _fake_user(_request: Request) -> str:
+        return "user-1"
+
+    async def _fake_authz(_request: Request, **_kwargs) -> AuthzContext:
+        return AuthzContext(user_id="user-1", role=Role.ADMIN, org_ids={1}, team_ids={1})
+
+    monkeypatch.setattr("app.routes.teams.get_authenticated_user_id", _fake_user)
+    monkeypatch.setattr("app.routes.teams.get_authz_context", _fake_authz)
+    monkeypatch.setattr("app.routes.teams.get_supabase_client", lambda *_args, **_kwargs: _Client())
+
+    cache = api_key_cache.get_api_key_cache()
+    for key_id in (1, 2, 3):
+        cache.put(hash_api_key(f"metel_team_{key_id}"), {"id": key_id, "team_id": 1 if key_id < 3 else 2})
+
+    request = Request({"type": "http", "method": "DELETE", "path": "/api/teams/1", "headers": []})
+    assert asyncio.run(delete_team(request, "1")) == {"ok": True}
+    assert cache.get(hash_api_key("metel_team_1")) is None
+    assert cache.get(hash_api_key("metel_team_2")) is None
+    assert cache.get(hash_api_key("metel_team_3")) is not None
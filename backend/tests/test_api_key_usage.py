@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from app.core.api_key_usage import LastUsedWriteBehind
+
+
+class _Query:
+    def __init__(self, client):
+        self.client = client
+        self._payload = None
+
+    def update(self, payload):
+        self._payload = payload
+        return self
+
+    def in_(self, _field, values):
+        self._ids = list(values)
+        return self
+
+    def execute(self):
+        if self.client.fail:
+            raise RuntimeError("db down")
+        self.client.updates.append((self._payload["last_used_at"], sorted(self._ids)))
+        return SimpleNamespace(data=[])
+
+
+class _Client:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.updates: list[tuple[str, list[str]]] = []
+
+    def table(self, name):
+        assert name == "api_keys"
+        return _Query(self)
+
+
+def test_touches_are_coalesced_per_key_and_flushed_in_bulk():
+    writer = LastUsedWriteBehind()
+    base = datetime(2026, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+    writer.touch(1, base)
+    writer.touch(1, base + timedelta(seconds=3))
+    writer.touch(2, base + timedelta(seconds=3, milliseconds=400))
+    writer.touch(1, base + timedelta(seconds=1))
+
+    client = _Client()
+    assert writer.flush(client) == 2
+    assert client.updates == [(base.replace(second=3).isoformat(), ["1", "2"])]
+    stats = writer.stats()
+    assert stats["coalesced"] == 2
+    assert stats["flushed"] == 2
+    assert stats["pending"] == 0
+
+
+def test_failed_flush_requeues_until_final_flush_drops():
+    writer = LastUsedWriteBehind(max_pending=1)
+    writer.touch("1")
+    writer.touch("2")
+    assert writer.stats()["dropped"] == 1
+
+    assert writer.flush(_Client(fail=True)) == 0
+    assert writer.stats()["pending"] == 1
+    assert writer.flush(_Client(fail=True), final=True) == 0
+    stats = writer.stats()
+    assert stats["pending"] == 0
+    assert stats["dropped"] == 2
+    assert stats["flush_errors"] == 2
@@ -49,8 +49,7 @@ def test_api_key_drilldown_returns_summary(monkeypatch):
         return "user-1"
 
     monkeypatch.setattr("app.routes.api_keys.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.api_keys.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.api_keys.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.api_keys.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     out = asyncio.run(api_key_drilldown(_request(), key_id=1, days=7))
     assert out["api_key"]["id"] == 1
@@ -82,8 +81,7 @@ def test_api_key_drilldown_not_found(monkeypatch):
         return "user-1"
 
     monkeypatch.setattr("app.routes.api_keys.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.api_keys.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.api_keys.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.api_keys.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     try:
         asyncio.run(api_key_drilldown(_request(), key_id=1, days=7))
@@ -65,11 +65,7 @@ def test_update_api_key_updates_allowed_tools_and_name(monkeypatch):
         return "user-1"
 
     monkeypatch.setattr("app.routes.api_keys.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.api_keys.create_client", lambda *_args, **_kwargs: client)
-    monkeypatch.setattr(
-        "app.routes.api_keys.get_settings",
-        lambda: SimpleNamespace(supabase_url="https://example.supabase.co", supabase_service_role_key="service-role-key"),
-    )
+    monkeypatch.setattr("app.routes.api_keys.get_supabase_client", lambda *_args, **_kwargs: client)
     monkeypatch.setattr(
         "app.routes.api_keys.load_registry",
         lambda: SimpleNamespace(
@@ -128,11 +124,7 @@ def test_update_api_key_rejects_invalid_allowed_tool(monkeypatch):
         return "user-1"
 
     monkeypatch.setattr("app.routes.api_keys.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.api_keys.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr(
-        "app.routes.api_keys.get_settings",
-        lambda: SimpleNamespace(supabase_url="https://example.supabase.co", supabase_service_role_key="service-role-key"),
-    )
+    monkeypatch.setattr("app.routes.api_keys.get_supabase_client", lambda *_args, **_kwargs: _Client())
     monkeypatch.setattr(
         "app.routes.api_keys.load_registry",
         lambda: SimpleNamespace(
@@ -176,11 +168,7 @@ def test_update_api_key_not_found(monkeypatch):
         return "user-1"
 
     monkeypatch.setattr("app.routes.api_keys.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.api_keys.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr(
-        "app.routes.api_keys.get_settings",
-        lambda: SimpleNamespace(supabase_url="https://example.supabase.co", supabase_service_role_key="service-role-key"),
-    )
+    monkeypatch.setattr("app.routes.api_keys.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     try:
         asyncio.run(update_api_key(_request(), "999", UpdateApiKeyRequest(name="x")))
@@ -219,11 +207,7 @@ def test_update_api_key_rejects_invalid_allowed_service(monkeypatch):
         return "user-1"
 
     monkeypatch.setattr("app.routes.api_keys.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.api_keys.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr(
-        "app.routes.api_keys.get_settings",
-        lambda: SimpleNamespace(supabase_url="https://example.supabase.co", supabase_service_role_key="service-role-key"),
-    )
+    monkeypatch.setattr("app.routes.api_keys.get_supabase_client", lambda *_args, **_kwargs: _Client())
     monkeypatch.setattr(
         "app.routes.api_keys.load_registry",
         lambda: SimpleNamespace(
@@ -272,11 +256,7 @@ def test_update_api_key_rejects_policy_conflict_allowed_and_denied(monkeypatch):
         return "user-1"
 
     monkeypatch.setattr("app.routes.api_keys.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.api_keys.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr(
-        "app.routes.api_keys.get_settings",
-        lambda: SimpleNamespace(supabase_url="https://example.supabase.co", supabase_service_role_key="service-role-key"),
-    )
+    monkeypatch.setattr("app.routes.api_keys.get_supabase_client", lambda *_args, **_kwargs: _Client())
     monkeypatch.setattr(
         "app.routes.api_keys.load_registry",
         lambda: SimpleNamespace(
@@ -328,11 +308,7 @@ def test_update_api_key_rejects_policy_conflict_tool_outside_allowed_services(mo
         return "user-1"
 
     monkeypatch.setattr("app.routes.api_keys.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.api_keys.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr(
-        "app.routes.api_keys.get_settings",
-        lambda: SimpleNamespace(supabase_url="https://example.supabase.co", supabase_service_role_key="service-role-key"),
-    )
+    monkeypatch.setattr("app.routes.api_keys.get_supabase_client", lambda *_args, **_kwargs: _Client())
     monkeypatch.setattr(
         "app.routes.api_keys.load_registry",
         lambda: SimpleNamespace(
@@ -381,11 +357,7 @@ def test_update_api_key_rejects_invalid_linear_team_policy_type(monkeypatch):
         return "user-1"
 
     monkeypatch.setattr("app.routes.api_keys.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.api_keys.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr(
-        "app.routes.api_keys.get_settings",
-        lambda: SimpleNamespace(supabase_url="https://example.supabase.co", supabase_service_role_key="service-role-key"),
-    )
+    monkeypatch.setattr("app.routes.api_keys.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     body = UpdateApiKeyRequest(policy_json={"allowed_linear_team_ids": "team-a"})
     try:
@@ -425,11 +397,7 @@ def test_update_api_key_rejects_linear_team_policy_without_linear_service(monkey
         return "user-1"
 
     monkeypatch.setattr("app.routes.api_keys.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.api_keys.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr(
-        "app.routes.api_keys.get_settings",
-        lambda: SimpleNamespace(supabase_url="https://example.supabase.co", supabase_service_role_key="service-role-key"),
-    )
+    monkeypatch.setattr("app.routes.api_keys.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     body = UpdateApiKeyRequest(policy_json={"allowed_services": ["notion"], "allowed_linear_team_ids": ["team-a"]})
     try:
@@ -507,11 +475,7 @@ def test_rotate_api_key_creates_new_key_and_revokes_old(monkeypatch):
         return "user-1"
 
     monkeypatch.setattr("app.routes.api_keys.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.api_keys.create_client", lambda *_args, **_kwargs: client)
-    monkeypatch.setattr(
-        "app.routes.api_keys.get_settings",
-        lambda: SimpleNamespace(supabase_url="https://example.supabase.co", supabase_service_role_key="service-role-key"),
-    )
+    monkeypatch.setattr("app.routes.api_keys.get_supabase_client", lambda *_args, **_kwargs: client)
     monkeypatch.setattr("app.routes.api_keys.generate_api_key", lambda: "metel_rotated_abcdefghijklmnopqrstuvwxyz")
     monkeypatch.setattr("app.routes.api_keys.hash_api_key", lambda _value: "hash-value")
 
@@ -561,11 +525,7 @@ def test_create_api_key_allows_member_team_scope_when_team_is_valid(monkeypatch)
 
     monkeypatch.setattr("app.routes.api_keys.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.api_keys.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.api_keys.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr(
-        "app.routes.api_keys.get_settings",
-        lambda: SimpleNamespace(supabase_url="https://example.supabase.co", supabase_service_role_key="service-role-key"),
-    )
+    monkeypatch.setattr("app.routes.api_keys.get_supabase_client", lambda *_args, **_kwargs: _Client())
     monkeypatch.setattr("app.routes.api_keys.generate_api_key", lambda: "metel_member_abcdefghijklmnopqrstuvwxyz")
     monkeypatch.setattr("app.routes.api_keys.hash_api_key", lambda _value: "hash-value")
     monkeypatch.setattr("app.routes.api_keys._validate_team_id", lambda **_kwargs: 1)
@@ -612,11 +572,7 @@ def test_update_api_key_blocks_member_policy_key_outside_whitelist(monkeypatch):
 
     monkeypatch.setattr("app.routes.api_keys.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.api_keys.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.api_keys.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr(
-        "app.routes.api_keys.get_settings",
-        lambda: SimpleNamespace(supabase_url="https://example.supabase.co", supabase_service_role_key="service-role-key"),
-    )
+    monkeypatch.setattr("app.routes.api_keys.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     body = UpdateApiKeyRequest(policy_json={"allow_high_risk": True})
     try:
@@ -93,11 +93,7 @@ def test_list_audit_events_filters_and_maps_decisions(monkeypatch):
 
     monkeypatch.setattr("app.routes.audit.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.audit.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.audit.create_client", lambda *_args, **_kwargs: client)
-    monkeypatch.setattr(
-        "app.routes.audit.get_settings",
-        lambda: SimpleNamespace(supabase_url="https://example.supabase.co", supabase_service_role_key="service-role-key"),
-    )
+    monkeypatch.setattr("app.routes.audit.get_supabase_client", lambda *_args, **_kwargs: client)
 
     out = asyncio.run(
         list_audit_events(
@@ -138,11 +134,7 @@ def test_list_audit_events_invalid_datetime_raises(monkeypatch):
 
     monkeypatch.setattr("app.routes.audit.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.audit.get_authz_context", _fake_authz)
-    monkeypatch.setattr(
-        "app.routes.audit.get_settings",
-        lambda: SimpleNamespace(supabase_url="https://example.supabase.co", supabase_service_role_key="service-role-key"),
-    )
-    monkeypatch.setattr("app.routes.audit.create_client", lambda *_args, **_kwargs: SimpleNamespace(table=lambda _name: None))
+    monkeypatch.setattr("app.routes.audit.get_supabase_client", lambda *_args, **_kwargs: SimpleNamespace(table=lambda _name: None))
 
     try:
         asyncio.run(
@@ -219,11 +211,7 @@ def test_export_audit_events_jsonl(monkeypatch):
 
     monkeypatch.setattr("app.routes.audit.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.audit.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.audit.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr(
-        "app.routes.audit.get_settings",
-        lambda: SimpleNamespace(supabase_url="https://example.supabase.co", supabase_service_role_key="service-role-key"),
-    )
+    monkeypatch.setattr("app.routes.audit.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     response = asyncio.run(
         export_audit_events(
@@ -300,11 +288,7 @@ def test_export_audit_events_csv(monkeypatch):
 
     monkeypatch.setattr("app.routes.audit.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.audit.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.audit.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr(
-        "app.routes.audit.get_settings",
-        lambda: SimpleNamespace(supabase_url="https://example.supabase.co", supabase_service_role_key="service-role-key"),
-    )
+    monkeypatch.setattr("app.routes.audit.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     response = asyncio.run(
         export_audit_events(
@@ -335,11 +319,7 @@ def test_export_audit_events_invalid_format_raises(monkeypatch):
 
     monkeypatch.setattr("app.routes.audit.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.audit.get_authz_context", _fake_authz)
-    monkeypatch.setattr(
-        "app.routes.audit.get_settings",
-        lambda: SimpleNamespace(supabase_url="https://example.supabase.co", supabase_service_role_key="service-role-key"),
-    )
-    monkeypatch.setattr("app.routes.audit.create_client", lambda *_args, **_kwargs: SimpleNamespace(table=lambda _name: None))
+    monkeypatch.setattr("app.routes.audit.get_supabase_client", lambda *_args, **_kwargs: SimpleNamespace(table=lambda _name: None))
 
     try:
         asyncio.run(
@@ -398,11 +378,7 @@ def test_list_audit_events_team_filter_without_keys_returns_empty(monkeypatch):
 
     monkeypatch.setattr("app.routes.audit.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.audit.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.audit.create_client", lambda *_args, **_kwargs: client)
-    monkeypatch.setattr(
-        "app.routes.audit.get_settings",
-        lambda: SimpleNamespace(supabase_url="https://example.supabase.co", supabase_service_role_key="service-role-key"),
-    )
+    monkeypatch.setattr("app.routes.audit.get_supabase_client", lambda *_args, **_kwargs: client)
 
     out = asyncio.run(
         list_audit_events(
@@ -479,11 +455,7 @@ def test_list_audit_events_organization_filter_scopes_to_org_members(monkeypatch
 
     monkeypatch.setattr("app.routes.audit.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.audit.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.audit.create_client", lambda *_args, **_kwargs: client)
-    monkeypatch.setattr(
-        "app.routes.audit.get_settings",
-        lambda: SimpleNamespace(supabase_url="https://example.supabase.co", supabase_service_role_key="service-role-key"),
-    )
+    monkeypatch.setattr("app.routes.audit.get_supabase_client", lambda *_args, **_kwargs: client)
 
     out = asyncio.run(
         list_audit_events(
@@ -561,11 +533,7 @@ def test_get_audit_event_detail(monkeypatch):
 
     monkeypatch.setattr("app.routes.audit.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.audit.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.audit.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr(
-        "app.routes.audit.get_settings",
-        lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"),
-    )
+    monkeypatch.setattr("app.routes.audit.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     out = asyncio.run(get_audit_event_detail(_request(), event_id=7))
     assert out["id"] == 7
@@ -645,11 +613,7 @@ def test_get_audit_event_detail_admin_masks_sensitive_fields(monkeypatch):
 
     monkeypatch.setattr("app.routes.audit.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.audit.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.audit.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr(
-        "app.routes.audit.get_settings",
-        lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"),
-    )
+    monkeypatch.setattr("app.routes.audit.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     out = asyncio.run(get_audit_event_detail(_request(), event_id=8))
     assert out["execution"]["request_payload"]["token"] == "***"
@@ -39,8 +39,7 @@ def test_get_audit_settings_defaults(monkeypatch):
 
     monkeypatch.setattr("app.routes.audit.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.audit.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.audit.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.audit.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.audit.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     out = asyncio.run(get_audit_settings(_request("/api/audit/settings")))
     assert out["retention_days"] == 90
@@ -94,8 +93,7 @@ def test_update_audit_settings_upsert(monkeypatch):
 
     monkeypatch.setattr("app.routes.audit.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.audit.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.audit.create_client", lambda *_args, **_kwargs: client)
-    monkeypatch.setattr("app.routes.audit.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.audit.get_supabase_client", lambda *_args, **_kwargs: client)
 
     out = asyncio.run(
         update_audit_settings(
@@ -139,8 +137,7 @@ def test_export_audit_events_blocked_by_settings(monkeypatch):
 
     monkeypatch.setattr("app.routes.audit.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.audit.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.audit.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.audit.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.audit.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     try:
         asyncio.run(
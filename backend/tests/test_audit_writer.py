@@ -0,0 +1,186 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import agent_index, audit_writer
+from app.core.audit_writer import ToolCallAuditWriter, write_tool_call_rows
+
+
+class _Client:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.inserts: list[list[dict]] = []
+        self.lookups = 0
+        self.teams: list = []
+
+    def table(self, name: str):
+        client = self
+
+        class _Query:
+            def __init__(self):
+                self._rows = None
+
+            def insert(self, rows):
+                self._rows = rows if isinstance(rows, list) else [rows]
+                return self
+
+            def select(self, *_args, **_kwargs):
+                return self
+
+            def eq(self, column, value):
+                if column == "team_id":
+                    client.teams.append(value)
+                return self
+
+            def order(self, *_args, **_kwargs):
+                return self
+
+            def limit(self, *_args, **_kwargs):
+                return self
+
+            def execute(self):
+                if name == "tool_calls":
+                    if client.fail:
+                        raise RuntimeError("db slow")
+                    client.inserts.append([dict(row) for row in self._rows])
+                    return SimpleNamespace(data=self._rows)
+                client.lookups += 1
+                return SimpleNamespace(data=[{"id": 9}])
+
+        return _Query()
+
+
+@pytest.fixture(autouse=True)
+def _reset_agent_index():
+    agent_index.reset_default_agent_index()
+    yield
+    agent_index.reset_default_agent_index()
+
+
+def _row(idx: int, agent_id=None) -> dict:
+    return {"request_id": f"req-{idx}", "api_key_id": 1, "tool_name": "notion_search", "agent_id": agent_id}
+
+
+def test_write_tool_call_rows_resolves_agent_once_per_team():
+    client = _Client()
+    rows = [dict(_row(1), team_id=3), dict(_row(2), team_id=3), dict(_row(3, agent_id=4), team_id=3)]
+    write_tool_call_rows(client, rows)
+    assert len(client.inserts) == 1
+    assert [row["agent_id"] for row in client.inserts[0]] == [9, 9, 4]
+    assert all("team_id" not in row for row in client.inserts[0])
+    assert client.lookups == 1
+    assert client.teams == ["3"]
+    # Callers' rows keep team_id so a failed batch can be spilled and resolved again on replay.
+    assert all(row["team_id"] == 3 for row in rows)
+    assert rows[0]["agent_id"] is None
+
+
+def test_writer_batches_rows_and_drains_on_stop(monkeypatch, tmp_path):
+    client = _Client()
+    monkeypatch.setattr("app.core.audit_writer.get_supabase_client", lambda: client)
+    writer = ToolCallAuditWriter(batch_size=2, flush_seconds=60, max_queue=10, spill_path=str(tmp_path / "spill.jsonl"))
+
+    async def _run():
+        assert writer.submit(_row(0, agent_id=1)) is False
+        writer.start()
+        for idx in range(5):
+            assert writer.submit(_row(idx, agent_id=1)) is True
+        await asyncio.sleep(0.05)
+        await writer.stop()
+
+    asyncio.run(_run())
+    assert sum(len(batch) for batch in client.inserts) == 5
+    assert max(len(batch) for batch in client.inserts) <= 2
+    assert writer.stats()["written"] == 5
+    assert writer.stats()["queued"] == 0
+
+
+def test_writer_spills_when_db_fails_and_replays_later(monkeypatch, tmp_path):
+    client = _Client(fail=True)
+    monkeypatch.setattr("app.core.audit_writer.get_supabase_client", lambda: client)
+    spill_path = tmp_path / "spill.jsonl"
+    writer = ToolCallAuditWriter(batch_size=10, flush_seconds=60, max_queue=1, spill_path=str(spill_path))
+
+    async def _fail_then_recover():
+        writer.start()
+        writer.submit(_row(1, agent_id=1))
+        writer.submit(_row(2, agent_id=1))
+        await writer.stop()
+        assert spill_path.exists()
+        client.fail = False
+        writer.start()
+        writer.submit(_row(3, agent_id=1))
+        await writer.stop()
+
+    asyncio.run(_fail_then_recover())
+    stats = writer.stats()
+    assert stats["spilled"] == 2
+    assert stats["replayed"] == 2
+    assert sorted(row["request_id"] for batch in client.inserts for row in batch) == ["req-1", "req-2", "req-3"]
+    assert not spill_path.exists()
+
+
+def test_submit_tool_call_writes_inline_without_worker():
+    client = _Client()
+    audit_writer.submit_tool_call(client, _row(1, agent_id=2))
+    assert client.inserts == [[_row(1, agent_id=2)]]
+
+
+def test_replay_keeps_file_until_every_chunk_is_written_or_respilled(tmp_path):
+    spill_path = tmp_path / "spill.jsonl"
+    spill_path.write_text("".join(json.dumps(_row(idx, agent_id=1)) + "\n" for idx in range(4)), encoding="utf-8")
+    writer = ToolCallAuditWriter(batch_size=2, flush_seconds=60, max_queue=10, spill_path=str(spill_path))
+
+    class _FailSecondInsert(_Client):
+        def table(self, name: str):
+            if name == "tool_calls" and len(self.inserts) == 1:
+                self.fail = True
+            return super().table(name)
+
+    # The second chunk fails and re-spilling it fails too: the replay file must survive.
+    writer._spill = lambda rows: False
+    client = _FailSecondInsert()
+    writer._replay_spill(client)
+    replay_path = tmp_path / "spill.jsonl.replay"
+    assert replay_path.exists()
+    assert len(client.inserts) == 1
+
+    # The next drain finishes the interrupted replay first.
+    client = _Client()
+    writer._replay_spill(client)
+    assert not replay_path.exists()
+    assert sorted(row["request_id"] for batch in client.inserts for row in batch) == [f"req-{idx}" for idx in range(4)]
+
+
+def test_replay_sets_corrupt_lines_aside_and_replays_the_rest(tmp_path):
+    spill_path = tmp_path / "spill.jsonl"
+    spill_path.write_text(
+        json.dumps(_row(1, agent_id=1)) + "\n" + '{"request_id": "req-2", "api_k' + "\n" + json.dumps(_row(3, agent_id=1)) + "\n",
+        encoding="utf-8",
+    )
+    writer = ToolCallAuditWriter(batch_size=10, flush_seconds=60, max_queue=10, spill_path=str(spill_path))
+    client = _Client()
+
+    writer._replay_spill(client)
+
+    assert sorted(row["request_id"] for batch in client.inserts for row in batch) == ["req-1", "req-3"]
+    assert not (tmp_path / "spill.jsonl.replay").exists()
+    assert (tmp_path / "spill.jsonl.bad").read_text(encoding="utf-8") == '{"request_id": "req-2", "api_k\n'
+    assert writer.stats()["corrupt"] == 1
+    assert writer.stats()["replayed"] == 2
+
+
+def test_failed_batch_spills_rows_with_team_id_for_replay(tmp_path):
+    client = _Client(fail=True)
+    spill_path = tmp_path / "spill.jsonl"
+    writer = ToolCallAuditWriter(batch_size=10, flush_seconds=60, max_queue=10, spill_path=str(spill_path))
+
+    assert writer._write_batch(client, [dict(_row(1), team_id=3)]) is False
+    spilled = [json.loads(line) for line in spill_path.read_text(encoding="utf-8").splitlines()]
+    assert spilled[0]["team_id"] == 3
+
+    client.fail = False
+    writer._replay_spill(client)
+    assert client.inserts[-1] == [{"request_id": "req-1", "api_key_id": 1, "tool_name": "notion_search", "agent_id": 9}]
@@ -172,7 +172,7 @@ def test_canva_oauth_start_builds_pkce_url_and_persists_state(monkeypatch):
         return "user-1"
 
     monkeypatch.setattr("app.routes.canva.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.canva.create_client", lambda *_args, **_kwargs: client)
+    monkeypatch.setattr("app.routes.canva.get_supabase_client", lambda *_args, **_kwargs: client)
     monkeypatch.setattr(
         "app.routes.canva.get_settings",
         lambda: SimpleNamespace(
@@ -236,7 +236,7 @@ def test_canva_oauth_callback_persists_tokens_and_identity(monkeypatch):
         "expires_at": "2999-01-01T00:00:00+00:00",
     }
 
-    monkeypatch.setattr("app.routes.canva.create_client", lambda *_args, **_kwargs: client)
+    monkeypatch.setattr("app.routes.canva.get_supabase_client", lambda *_args, **_kwargs: client)
     monkeypatch.setattr(
         "app.routes.canva.get_settings",
         lambda: SimpleNamespace(
@@ -295,7 +295,7 @@ def test_canva_oauth_status_returns_connection(monkeypatch):
         return "user-1"
 
     monkeypatch.setattr("app.routes.canva.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.canva.create_client", lambda *_args, **_kwargs: client)
+    monkeypatch.setattr("app.routes.canva.get_supabase_client", lambda *_args, **_kwargs: client)
     monkeypatch.setattr(
         "app.routes.canva.get_settings",
         lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"),
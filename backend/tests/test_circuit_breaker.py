@@ -0,0 +1,136 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.core.circuit_breaker import (
+    SCOPE_USER,
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreakerConfig,
+    CircuitBreakers,
+    is_upstream_outage,
+)
+from app.core.upstream_errors import UpstreamError
+
+
+def _outage():
+    return UpstreamError(tool_name="notion_search", code="TOOL_FAILED", status=503)
+
+
+def _call(breakers, operation, *, user_id="user-1", service="notion"):
+    return asyncio.run(breakers.call(service=service, user_id=user_id, tool_name="notion_search", operation=operation))
+
+
+def _fail_with(exc):
+    async def _operation():
+        raise exc
+
+    return _operation
+
+
+async def _ok():
+    return {"ok": True}
+
+
+def _breakers(now, **overrides):
+    config = CircuitBreakerConfig(**{"window": 4, "min_calls": 4, "failure_ratio": 0.5, "open_seconds": 30, **overrides})
+    return CircuitBreakers(config, clock=lambda: now[0])
+
+
+def _trip(breakers, **kwargs):
+    for _ in range(4):
+        with pytest.raises(UpstreamError):
+            _call(breakers, _fail_with(_outage()), **kwargs)
+
+
+def test_opens_after_failure_ratio_and_fails_fast_with_hint():
+    now = [0.0]
+    breakers = _breakers(now)
+    _trip(breakers)
+    assert breakers.snapshot()["notion"]["state"] == STATE_OPEN
+
+    calls = {"count": 0}
+
+    async def _counting():
+        calls["count"] += 1
+        return {"ok": True}
+
+    now[0] = 10.0
+    with pytest.raises(UpstreamError) as exc_info:
+        _call(breakers, _counting)
+    assert calls["count"] == 0
+    assert exc_info.value.detail == "notion:CIRCUIT_OPEN|retry_after_ms=20000"
+    assert exc_info.value.retry_after_seconds == pytest.approx(20.0)
+    assert breakers.snapshot()["notion"]["rejected"] == 1
+
+
+def test_half_open_probe_closes_on_success_and_reopens_on_failure():
+    now = [0.0]
+    breakers = _breakers(now)
+    _trip(breakers)
+    now[0] = 31.0
+    assert breakers.snapshot()["notion"]["state"] == STATE_HALF_OPEN
+    with pytest.raises(UpstreamError):
+        _call(breakers, _fail_with(_outage()))
+    assert breakers.snapshot()["notion"]["state"] == STATE_OPEN
+    assert breakers.snapshot()["notion"]["trips"] == 2
+
+    now[0] = 62.0
+    assert _call(breakers, _ok) == {"ok": True}
+    assert breakers.snapshot()["notion"]["state"] == STATE_CLOSED
+
+
+def test_only_one_probe_while_half_open():
+    now = [0.0]
+    breakers = _breakers(now)
+    _trip(breakers)
+    now[0] = 31.0
+
+    async def _scenario():
+        release = asyncio.Event()
+
+        async def _slow_probe():
+            await release.wait()
+            return {"ok": True}
+
+        probe = asyncio.create_task(
+            breakers.call(service="notion", user_id="user-1", tool_name="notion_search", operation=_slow_probe)
+        )
+        await asyncio.sleep(0)
+        with pytest.raises(UpstreamError) as exc_info:
+            await breakers.call(service="notion", user_id="user-1", tool_name="notion_search", operation=_ok)
+        release.set()
+        return await probe, exc_info.value
+
+    result, rejected = asyncio.run(_scenario())
+    assert result == {"ok": True}
+    assert "CIRCUIT_OPEN" in str(rejected.detail)
+    assert breakers.snapshot()["notion"]["state"] == STATE_CLOSED
+
+
+def test_client_errors_and_local_failures_do_not_trip():
+    now = [0.0]
+    breakers = _breakers(now)
+    for exc in (
+        HTTPException(status_code=400, detail="notion_search:NOT_FOUND|status=404"),
+        HTTPException(status_code=503, detail="notion:QUEUE_TIMEOUT|waited_ms=10000"),
+    ):
+        for _ in range(4):
+            with pytest.raises(HTTPException):
+                _call(breakers, _fail_with(exc))
+    assert breakers.snapshot()["notion"]["state"] == STATE_CLOSED
+    assert is_upstream_outage(httpx.ConnectTimeout("timed out")) is True
+    assert is_upstream_outage(ValueError("bug")) is None
+
+
+def test_user_scope_isolates_circuits():
+    now = [0.0]
+    breakers = _breakers(now, scope=SCOPE_USER)
+    _trip(breakers, user_id="user-1")
+    assert _call(breakers, _ok, user_id="user-2") == {"ok": True}
+    snapshot = breakers.snapshot()["notion"]
+    assert snapshot["state"] == STATE_OPEN
+    assert snapshot["open_circuits"] == 1
@@ -0,0 +1,106 @@
+from types import SimpleNamespace
+
+import httpx
+
+from app.core import db
+
+
+def _settings() -> SimpleNamespace:
+    return SimpleNamespace(
+        supabase_url="https://example.supabase.co",
+        supabase_service_role_key="service-role-key",
+        supabase_http_max_connections=4,
+        supabase_http_max_keepalive_connections=2,
+        supabase_http_keepalive_expiry_seconds=30.0,
+        supabase_http_timeout_seconds=10.0,
+        supabase_http_pool_timeout_seconds=5.0,
+    )
+
+
+def test_get_supabase_client_is_shared_until_closed(monkeypatch):
+    created: list[dict] = []
+
+    def _fake_create_client(url, key, options=None):
+        created.append({"url": url, "key": key, "http_client": options.httpx_client})
+        return SimpleNamespace(id=len(created))
+
+    monkeypatch.setattr("app.core.db.get_settings", _settings)
+    monkeypatch.setattr("app.core.db.create_client", _fake_create_client)
+    db.close_supabase_client()
+
+    first = db.get_supabase_client()
+    second = db.get_supabase_client()
+    assert first is second
+    assert len(created) == 1
+    assert created[0]["url"] == "https://example.supabase.co"
+    assert isinstance(created[0]["http_client"], httpx.Client)
+
+    stats = db.supabase_pool_stats()
+    assert stats["initialized"] is True
+    assert stats["max_connections"] == 4
+
+    db.close_supabase_client()
+    assert db.supabase_pool_stats()["initialized"] is False
+    assert db.get_supabase_client() is not first
+    db.close_supabase_client()
+
+
+def test_pool_stats_transport_counts_requests_and_errors():
+    def _handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/boom":
+            raise httpx.ConnectError("boom", request=request)
+        return httpx.Response(200, json={"ok": True})
+
+    transport = db._PoolStatsTransport(httpx.MockTransport(_handler), max_connections=2)
+    with httpx.Client(transport=transport, base_url="https://example.supabase.co") as client:
+        assert client.get("/ok").status_code == 200
+        try:
+            client.get("/boom")
+        except httpx.ConnectError:
+            pass
+        else:
+            assert False, "expected ConnectError"
+
+    assert transport.requests_total == 2
+    assert transport.errors_total == 1
+    assert transport.in_flight == 0
+    assert transport.peak_in_flight == 1
+    assert transport.saturated_total == 0
+
+
+def test_run_db_offloads_blocking_calls_and_propagates_errors():
+    import asyncio
+    import threading
+
+    loop_thread = threading.get_ident()
+    seen_threads: list[int] = []
+
+    def _blocking(value, *, scale):
+        seen_threads.append(threading.get_ident())
+        return value * scale
+
+    def _boom():
+        raise RuntimeError("db down")
+
+    class _Query:
+        def execute(self):
+            return SimpleNamespace(data=[{"id": 1}])
+
+    async def _run():
+        results = await asyncio.gather(*(db.run_db(_blocking, idx, scale=2) for idx in range(5)))
+        rows = (await db.execute_async(_Query())).data
+        try:
+            await db.run_db(_boom)
+        except RuntimeError as exc:
+            error = str(exc)
+        else:
+            error = None
+        return results, rows, error
+
+    results, rows, error = asyncio.run(_run())
+    assert results == [0, 2, 4, 6, 8]
+    assert rows == [{"id": 1}]
+    assert error == "db down"
+    assert seen_threads and loop_thread not in seen_threads
+    assert db.supabase_pool_stats()["offload"]["pending"] == 0
+    db.close_supabase_client()
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.deadline import DeadlineScope, remaining_seconds, run_within_deadline, upstream_timeout
+from app.core.retry_policy import run_with_retry
+
+
+def test_scopes_only_shrink_and_restore_on_exit():
+    assert remaining_seconds() is None
+    assert upstream_timeout(20) == 20
+    with DeadlineScope(1000):
+        outer = remaining_seconds()
+        assert 0 < outer <= 1.0
+        assert upstream_timeout(20) <= 1.0
+        with DeadlineScope(60000):
+            assert remaining_seconds() <= outer
+        with DeadlineScope(100):
+            assert remaining_seconds() <= 0.1
+        with DeadlineScope(None):
+            assert remaining_seconds() <= outer
+    assert remaining_seconds() is None
+
+
+def test_run_within_deadline_cancels_slow_work():
+    cancelled = {"value": False}
+
+    async def _slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled["value"] = True
+            raise
+        return {"ok": True}
+
+    async def _scenario():
+        with DeadlineScope(30):
+            return await run_within_deadline("notion_search", _slow)
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(_scenario())
+    assert exc_info.value.status_code == 504
+    assert exc_info.value.detail == "notion_search:DEADLINE_EXCEEDED"
+    assert cancelled["value"] is True
+
+
+def test_run_within_deadline_without_scope_is_passthrough():
+    async def _fast():
+        return {"ok": True}
+
+    assert asyncio.run(run_within_deadline("notion_search", _fast)) == {"ok": True}
+
+
+def test_retry_is_skipped_when_backoff_would_outlast_deadline():
+    attempts = {"count": 0}
+
+    async def _failing():
+        attempts["count"] += 1
+        raise HTTPException(status_code=400, detail="linear_list_issues:TOOL_FAILED|status=503")
+
+    async def _scenario():
+        with DeadlineScope(50):
+            await run_with_retry(operation=_failing, max_retries=3, backoff_ms=200)
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(_scenario())
+    assert "status=503" in str(exc_info.value.detail)
+    assert attempts["count"] == 1
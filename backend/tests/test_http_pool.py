@@ -0,0 +1,90 @@
+import asyncio
+
+import httpx
+
+from app.core.deadline import DeadlineScope
+from app.core.http_pool import UpstreamClientPools, UpstreamPoolConfig, reset_upstream_client_pools, upstream_client
+
+
+def test_config_reads_spec_limits_with_defaults():
+    config = UpstreamPoolConfig.from_limits(
+        {"timeout_ms": 15000, "max_connections": 8, "max_keepalive_connections": 50, "keepalive_expiry_ms": 5000, "http2": False}
+    )
+    assert config.timeout_seconds == 15.0
+    assert config.max_connections == 8
+    # Keep-alive slots never exceed the connection cap.
+    assert config.max_keepalive_connections == 8
+    assert config.keepalive_expiry_seconds == 5.0
+    assert config.http2 is False
+    assert UpstreamPoolConfig.from_limits(None) == UpstreamPoolConfig()
+
+
+def test_leases_share_one_client_per_service_and_loop():
+    reset_upstream_client_pools()
+
+    async def _scenario():
+        async with upstream_client("notion", {"timeout_ms": 15000}) as first:
+            pass
+        async with upstream_client("notion", {"timeout_ms": 15000}) as second:
+            pass
+        async with upstream_client("linear") as other:
+            pass
+        return first, second, other
+
+    first, second, other = asyncio.run(_scenario())
+    assert first is second
+    assert first is not other
+    assert not first.is_closed
+    # A new event loop gets its own client.
+    again, _, _ = asyncio.run(_scenario())
+    assert again is not first
+    reset_upstream_client_pools()
+
+
+def test_request_hook_counts_requests_and_shrinks_timeout_to_deadline():
+    pools = UpstreamClientPools()
+    config = UpstreamPoolConfig(timeout_seconds=15.0)
+
+    async def _scenario():
+        client = pools.client("notion", config)
+        hook = client.event_hooks["request"][0]
+        relaxed = httpx.Request("GET", "https://api.notion.com/v1/users/me")
+        await hook(relaxed)
+        tight = httpx.Request("GET", "https://api.notion.com/v1/users/me")
+        with DeadlineScope(500):
+            await hook(tight)
+        await pools.aclose()
+        return relaxed, tight, client
+
+    relaxed, tight, client = asyncio.run(_scenario())
+    assert "timeout" not in relaxed.extensions
+    assert tight.extensions["timeout"]["read"] <= 0.5
+    assert callable(tight.extensions["trace"])
+    assert client.is_closed
+
+    stats = pools.stats()["notion"]
+    assert stats["requests"] == 2
+    assert stats["open"] is False
+
+
+def test_trace_events_drive_reuse_metrics():
+    pools = UpstreamClientPools()
+
+    async def _scenario():
+        client = pools.client("github", UpstreamPoolConfig())
+        hook = client.event_hooks["request"][0]
+        for index in range(4):
+            request = httpx.Request("GET", "https://api.github.com/user")
+            await hook(request)
+            trace = request.extensions["trace"]
+            if index == 0:
+                await trace("connection.connect_tcp.complete", {})
+            await trace("http2.send_request_headers.started", {})
+
+    asyncio.run(_scenario())
+    stats = pools.stats()["github"]
+    assert stats["requests"] == 4
+    assert stats["new_connections"] == 1
+    assert stats["reused_connections"] == 3
+    assert stats["reuse_ratio"] == 0.75
+    assert stats["http2_requests"] == 4
@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+
+from app.core.idempotency import (
+    OUTCOME_EXECUTED,
+    OUTCOME_JOINED,
+    OUTCOME_REPLAYED,
+    IdempotencyCache,
+    IdempotencyKeyReused,
+)
+
+
+def test_replays_cached_value_until_ttl_expires():
+    now = [0.0]
+    cache = IdempotencyCache(ttl_seconds=10, max_entries=10, clock=lambda: now[0])
+    calls = {"count": 0}
+
+    async def _operation():
+        calls["count"] += 1
+        return {"result": calls["count"]}
+
+    async def _scenario():
+        first = await cache.run("k", _operation)
+        second = await cache.run("k", _operation)
+        now[0] = 11.0
+        third = await cache.run("k", _operation)
+        return first, second, third
+
+    first, second, third = asyncio.run(_scenario())
+    assert first == ({"result": 1}, OUTCOME_EXECUTED)
+    assert second == ({"result": 1}, OUTCOME_REPLAYED)
+    assert third == ({"result": 2}, OUTCOME_EXECUTED)
+
+
+def test_concurrent_duplicates_share_one_execution():
+    cache = IdempotencyCache(ttl_seconds=10, max_entries=10)
+    calls = {"count": 0}
+
+    async def _operation():
+        calls["count"] += 1
+        await asyncio.sleep(0.01)
+        return {"result": "done"}
+
+    async def _scenario():
+        return await asyncio.gather(*(cache.run("k", _operation) for _ in range(3)))
+
+    results = asyncio.run(_scenario())
+    assert calls["count"] == 1
+    assert sorted(outcome for _value, outcome in results) == [OUTCOME_EXECUTED, OUTCOME_JOINED, OUTCOME_JOINED]
+    assert all(value == {"result": "done"} for value, _outcome in results)
+
+
+def test_uncacheable_results_and_errors_are_not_stored():
+    cache = IdempotencyCache(ttl_seconds=10, max_entries=10)
+
+    async def _error_response():
+        return {"error": {"code": 5031}}
+
+    async def _boom():
+        raise RuntimeError("upstream down")
+
+    async def _scenario():
+        await cache.run("k", _error_response, cacheable=lambda value: "result" in value)
+        _value, outcome = await cache.run("k", _error_response, cacheable=lambda value: "result" in value)
+        assert outcome == OUTCOME_EXECUTED
+        with pytest.raises(RuntimeError):
+            await cache.run("other", _boom)
+
+    asyncio.run(_scenario())
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["inflight"] == 0
+
+
+def test_reused_key_with_different_fingerprint_is_rejected():
+    cache = IdempotencyCache(ttl_seconds=10, max_entries=10)
+    calls = {"count": 0}
+
+    async def _operation():
+        calls["count"] += 1
+        await asyncio.sleep(0.01)
+        return {"result": "done"}
+
+    async def _scenario():
+        leader = asyncio.ensure_future(cache.run("k", _operation, fingerprint="args-a"))
+        await asyncio.sleep(0)
+        with pytest.raises(IdempotencyKeyReused):
+            await cache.run("k", _operation, fingerprint="args-b")
+        await leader
+        with pytest.raises(IdempotencyKeyReused):
+            await cache.run("k", _operation, fingerprint="args-b")
+        return await cache.run("k", _operation, fingerprint="args-a")
+
+    assert asyncio.run(_scenario()) == ({"result": "done"}, OUTCOME_REPLAYED)
+    assert calls["count"] == 1
+    assert cache.stats()["conflicts"] == 2
+
+
+def test_cancelled_leader_hands_over_to_a_waiting_duplicate():
+    cache = IdempotencyCache(ttl_seconds=10, max_entries=10)
+    calls = {"count": 0}
+
+    async def _operation():
+        calls["count"] += 1
+        await asyncio.sleep(0.01)
+        return {"result": calls["count"]}
+
+    async def _scenario():
+        leader = asyncio.ensure_future(cache.run("k", _operation))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(cache.run("k", _operation))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(_scenario()) == ({"result": 2}, OUTCOME_EXECUTED)
+    assert cache.stats()["inflight"] == 0
@@ -50,8 +50,7 @@ def test_api_key_drilldown_blocks_other_users_key(monkeypatch):
 
     monkeypatch.setattr("app.routes.api_keys.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.api_keys.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.api_keys.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.api_keys.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.api_keys.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     try:
         asyncio.run(api_key_drilldown(_request("/api/api-keys/999/drilldown"), key_id=999, days=7))
@@ -94,8 +93,7 @@ def test_update_team_blocks_other_owners_team(monkeypatch):
 
     monkeypatch.setattr("app.routes.teams.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.teams.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.teams.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.teams.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.teams.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     try:
         asyncio.run(update_team(_request("/api/teams/77", "PATCH"), "77", TeamUpdateRequest(name="x")))
@@ -138,7 +136,7 @@ def test_update_webhook_blocks_other_owners_webhook(monkeypatch):
 
     monkeypatch.setattr("app.routes.integrations.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.integrations.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.integrations.create_client", lambda *_args, **_kwargs: _Client())
+    monkeypatch.setattr("app.routes.integrations.get_supabase_client", lambda *_args, **_kwargs: _Client())
     monkeypatch.setattr("app.routes.integrations.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
 
     try:
@@ -210,8 +208,7 @@ def test_get_audit_event_detail_member_cannot_access_other_users_event(monkeypat
 
     monkeypatch.setattr("app.routes.audit.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.audit.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.audit.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.audit.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.audit.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     try:
         asyncio.run(get_audit_event_detail(_request("/api/audit/events/7"), event_id=7))
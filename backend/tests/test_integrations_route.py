@@ -32,7 +32,7 @@ def test_process_deliveries_calls_retry_processor(monkeypatch):
         return {"processed": 3, "succeeded": 2, "failed": 1, "skipped": 0}
 
     monkeypatch.setattr("app.routes.integrations.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.integrations.create_client", lambda *_args, **_kwargs: SimpleNamespace())
+    monkeypatch.setattr("app.routes.integrations.get_supabase_client", lambda *_args, **_kwargs: SimpleNamespace())
     monkeypatch.setattr(
         "app.routes.integrations.get_settings",
         lambda: SimpleNamespace(
@@ -67,7 +67,7 @@ def test_process_deliveries_sends_dead_letter_alert(monkeypatch):
         return True
 
     monkeypatch.setattr("app.routes.integrations.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.integrations.create_client", lambda *_args, **_kwargs: SimpleNamespace())
+    monkeypatch.setattr("app.routes.integrations.get_supabase_client", lambda *_args, **_kwargs: SimpleNamespace())
     monkeypatch.setattr(
         "app.routes.integrations.get_settings",
         lambda: SimpleNamespace(
@@ -98,7 +98,7 @@ def test_retry_delivery_not_found(monkeypatch):
         return None
 
     monkeypatch.setattr("app.routes.integrations.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.integrations.create_client", lambda *_args, **_kwargs: SimpleNamespace())
+    monkeypatch.setattr("app.routes.integrations.get_supabase_client", lambda *_args, **_kwargs: SimpleNamespace())
     monkeypatch.setattr(
         "app.routes.integrations.get_settings",
         lambda: SimpleNamespace(
@@ -134,7 +134,7 @@ def test_retry_delivery_sends_dead_letter_alert(monkeypatch):
         return True
 
     monkeypatch.setattr("app.routes.integrations.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.integrations.create_client", lambda *_args, **_kwargs: SimpleNamespace())
+    monkeypatch.setattr("app.routes.integrations.get_supabase_client", lambda *_args, **_kwargs: SimpleNamespace())
     monkeypatch.setattr(
         "app.routes.integrations.get_settings",
         lambda: SimpleNamespace(
@@ -205,7 +205,7 @@ def test_list_webhooks_applies_org_scope(monkeypatch):
     client = _Client()
     monkeypatch.setattr("app.routes.integrations.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.integrations.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.integrations.create_client", lambda *_args, **_kwargs: client)
+    monkeypatch.setattr("app.routes.integrations.get_supabase_client", lambda *_args, **_kwargs: client)
     monkeypatch.setattr("app.routes.integrations.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
 
     out = asyncio.run(list_webhooks(_request("/api/integrations/webhooks", "GET"), organization_id=1))
@@ -229,7 +229,7 @@ def test_list_deliveries_member_team_scope_forbidden(monkeypatch):
 
     monkeypatch.setattr("app.routes.integrations.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.integrations.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.integrations.create_client", lambda *_args, **_kwargs: _Client())
+    monkeypatch.setattr("app.routes.integrations.get_supabase_client", lambda *_args, **_kwargs: _Client())
     monkeypatch.setattr("app.routes.integrations.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
 
     try:
@@ -1,15 +1,37 @@
 import asyncio
+import json
 from types import SimpleNamespace
 
+import pytest
 from fastapi import HTTPException
 
+from app.core.idempotency import reset_idempotency_cache
+from app.core.rate_limit import RateLimitDecision
+from app.core.retry_policy import reset_retry_budgets
+from app.core.tool_visibility import reset_tool_visibility_cache
+from app.core.upstream_errors import UpstreamError
 from app.routes import mcp
 
+_RATE_OK = RateLimitDecision(allowed=True, limit=30, remaining=29)
+_RATE_LIMITED = RateLimitDecision(allowed=False, limit=30, remaining=0, retry_after_seconds=1.5)
+
+
+@pytest.fixture(autouse=True)
+def _reset_route_caches():
+    reset_tool_visibility_cache()
+    reset_idempotency_cache()
+    reset_retry_budgets()
+    yield
+    reset_tool_visibility_cache()
+    reset_idempotency_cache()
+    reset_retry_budgets()
+
 
 class _Request:
-    def __init__(self, body: dict):
+    def __init__(self, body: dict, headers: dict | None = None):
         self._body = body
         self.state = SimpleNamespace(request_id="req-1")
+        self.headers = headers or {}
 
     async def json(self):
         return self._body
@@ -82,7 +104,7 @@ def test_mcp_list_tools_success_filters_phase1(monkeypatch):
     monkeypatch.setattr("app.routes.mcp.load_registry", lambda: _Registry())
     monkeypatch.setattr("app.routes.mcp.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
     monkeypatch.setattr(
-        "app.routes.mcp.create_client",
+        "app.routes.mcp.get_supabase_client",
         lambda *_args, **_kwargs: _Supabase(
             oauth_rows=[
                 {"provider": "notion", "granted_scopes": ["insert_content"]},
@@ -94,8 +116,10 @@ def test_mcp_list_tools_success_filters_phase1(monkeypatch):
 
     req = _Request({"jsonrpc": "2.0", "id": "1", "method": "list_tools"})
     response = asyncio.run(mcp.mcp_list_tools(req, authorization="Bearer metel_xxx"))
-    assert isinstance(response, dict)
-    tools = response["result"]["tools"]
+    assert response.status_code == 200
+    payload = json.loads(response.body)
+    assert payload["id"] == "1"
+    tools = payload["result"]["tools"]
     names = [tool["name"] for tool in tools]
     assert "notion_search" in names
     assert "linear_list_issues" in names
@@ -108,9 +132,9 @@ def test_mcp_call_tool_rate_limited(monkeypatch):
         return {"id": 1, "user_id": "user-1", "is_active": True}
 
     monkeypatch.setattr("app.routes.mcp._authenticate_api_key", _fake_auth)
-    monkeypatch.setattr("app.routes.mcp._is_rate_limited", lambda **_kwargs: True)
+    monkeypatch.setattr("app.routes.mcp._check_rate_limit", lambda **_kwargs: _RATE_LIMITED)
     monkeypatch.setattr("app.routes.mcp.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
-    monkeypatch.setattr("app.routes.mcp.create_client", lambda *_args, **_kwargs: _Supabase())
+    monkeypatch.setattr("app.routes.mcp.get_supabase_client", lambda *_args, **_kwargs: _Supabase())
 
     req = _Request(
         {
@@ -122,8 +146,10 @@ def test_mcp_call_tool_rate_limited(monkeypatch):
     )
     response = asyncio.run(mcp.mcp_call_tool(req, authorization="Bearer metel_xxx"))
     assert response.status_code == 200
+    assert response.headers["retry-after"] == "2"
     payload = response.body.decode("utf-8")
     assert "rate_limit_exceeded" in payload
+    assert '"retry_after_seconds":1.5' in payload
 
 
 def test_mcp_call_tool_success(monkeypatch):
@@ -149,9 +175,9 @@ def test_mcp_call_tool_success(monkeypatch):
         captured["logged"] = True
 
     monkeypatch.setattr("app.routes.mcp._authenticate_api_key", _fake_auth)
-    monkeypatch.setattr("app.routes.mcp._is_rate_limited", lambda **_kwargs: False)
+    monkeypatch.setattr("app.routes.mcp._check_rate_limit", lambda **_kwargs: _RATE_OK)
     monkeypatch.setattr("app.routes.mcp.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
-    monkeypatch.setattr("app.routes.mcp.create_client", lambda *_args, **_kwargs: _Supabase())
+    monkeypatch.setattr("app.routes.mcp.get_supabase_client", lambda *_args, **_kwargs: _Supabase())
     monkeypatch.setattr("app.routes.mcp.load_registry", lambda: _Registry())
     monkeypatch.setattr("app.routes.mcp.execute_tool", _fake_execute_tool)
     monkeypatch.setattr("app.routes.mcp._log_tool_call", _fake_log_tool_call)
@@ -170,6 +196,208 @@ def test_mcp_call_tool_success(monkeypatch):
     assert captured["logged"] is True
 
 
+def test_mcp_call_tool_records_stage_timings(monkeypatch):
+    from app.core.stage_timing import get_stage_histograms, reset_stage_histograms
+
+    async def _fake_auth(_authorization: str | None):
+        return {"id": 11, "user_id": "user-1", "is_active": True}
+
+    class _Tool:
+        service = "linear"
+
+    class _Registry:
+        def get_tool(self, _name: str):
+            return _Tool()
+
+    attempts = {"count": 0}
+    logged: dict = {}
+
+    async def _fake_execute_tool(**_kwargs):
+        attempts["count"] += 1
+        if attempts["count"] == 1:
+            raise HTTPException(status_code=400, detail="linear_list_issues:TOOL_FAILED|status=503|message=temporary")
+        return {"ok": True}
+
+    def _fake_log_tool_call(**kwargs):
+        logged["stage_timings"] = kwargs["timer"].as_dict()
+
+    monkeypatch.setattr("app.routes.mcp._authenticate_api_key", _fake_auth)
+    monkeypatch.setattr("app.routes.mcp._check_rate_limit", lambda **_kwargs: _RATE_OK)
+    monkeypatch.setattr(
+        "app.routes.mcp.get_settings",
+        lambda: SimpleNamespace(mcp_retry_max_retries=1, mcp_retry_backoff_ms=0),
+    )
+    monkeypatch.setattr("app.routes.mcp.get_supabase_client", lambda *_args, **_kwargs: _Supabase())
+    monkeypatch.setattr("app.routes.mcp.load_registry", lambda: _Registry())
+    monkeypatch.setattr("app.routes.mcp.execute_tool", _fake_execute_tool)
+    monkeypatch.setattr("app.routes.mcp._log_tool_call", _fake_log_tool_call)
+    reset_stage_histograms()
+
+    req = _Request(
+        {
+            "jsonrpc": "2.0",
+            "id": "2",
+            "method": "call_tool",
+            "params": {"name": "linear_list_issues", "arguments": {"first": 3}},
+        }
+    )
+    response = asyncio.run(mcp.mcp_call_tool(req, authorization="Bearer metel_xxx"))
+
+    assert response["result"] == {"ok": True}
+    stages = set(logged["stage_timings"])
+    assert {"auth", "policy", "rate_limit", "quota", "authorize", "resolve", "upstream", "retry_wait", "total"} <= stages
+    header = req.state.stage_timer.server_timing()
+    assert "upstream;dur=" in header
+    assert header.split(", ")[-1].startswith("total;dur=")
+    snapshot = get_stage_histograms().snapshot()
+    assert snapshot["upstream"]["count"] == 1
+    assert snapshot["total"]["count"] == 1
+    reset_stage_histograms()
+
+
+def test_mcp_call_tool_replays_duplicate_idempotency_key(monkeypatch):
+    async def _fake_auth(_authorization: str | None):
+        return {"id": 11, "user_id": "user-1", "is_active": True}
+
+    class _Tool:
+        service = "linear"
+
+    class _Registry:
+        def get_tool(self, _name: str):
+            return _Tool()
+
+    executed: list[dict] = []
+    logged: list[dict] = []
+
+    async def _fake_execute_tool(*, user_id: str, tool_name: str, payload: dict):
+        executed.append(payload)
+        await asyncio.sleep(0.01)
+        return {"ok": True, "data": {"id": "issue-1"}}
+
+    monkeypatch.setattr("app.routes.mcp._authenticate_api_key", _fake_auth)
+    monkeypatch.setattr("app.routes.mcp._check_rate_limit", lambda **_kwargs: _RATE_OK)
+    monkeypatch.setattr("app.routes.mcp.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.mcp.get_supabase_client", lambda *_args, **_kwargs: _Supabase())
+    monkeypatch.setattr("app.routes.mcp.load_registry", lambda: _Registry())
+    monkeypatch.setattr("app.routes.mcp.execute_tool", _fake_execute_tool)
+    monkeypatch.setattr("app.routes.mcp._log_tool_call", lambda **kwargs: logged.append(kwargs))
+
+    def _request(req_id: str) -> _Request:
+        return _Request(
+            {
+                "jsonrpc": "2.0",
+                "id": req_id,
+                "method": "call_tool",
+                "params": {"name": "linear_create_issue", "arguments": {"title": "A", "idempotency_key": "idem-1"}},
+            }
+        )
+
+    async def _scenario():
+        concurrent = await asyncio.gather(
+            mcp.mcp_call_tool(_request("1"), authorization="Bearer metel_xxx"),
+            mcp.mcp_call_tool(_request("2"), authorization="Bearer metel_xxx"),
+        )
+        later = await mcp.mcp_call_tool(_request("3"), authorization="Bearer metel_xxx")
+        return [*concurrent, later]
+
+    responses = asyncio.run(_scenario())
+
+    assert len(executed) == 1
+    assert [response["id"] for response in responses] == ["1", "2", "3"]
+    assert all(response["result"] == {"ok": True, "data": {"id": "issue-1"}} for response in responses)
+    assert [item["error_code"] for item in logged].count("idempotent_replay") == 2
+    assert all(item["status"] == "success" for item in logged)
+
+
+def test_mcp_call_tool_rejects_idempotency_key_reused_with_other_arguments(monkeypatch):
+    async def _fake_auth(_authorization: str | None):
+        return {"id": 12, "user_id": "user-1", "is_active": True}
+
+    class _Tool:
+        service = "linear"
+
+    class _Registry:
+        def get_tool(self, _name: str):
+            return _Tool()
+
+    executed: list[dict] = []
+    logged: list[dict] = []
+
+    async def _fake_execute_tool(*, user_id: str, tool_name: str, payload: dict):
+        executed.append(payload)
+        return {"ok": True, "data": {"id": "issue-1"}}
+
+    monkeypatch.setattr("app.routes.mcp._authenticate_api_key", _fake_auth)
+    monkeypatch.setattr("app.routes.mcp._check_rate_limit", lambda **_kwargs: _RATE_OK)
+    monkeypatch.setattr("app.routes.mcp.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.mcp.get_supabase_client", lambda *_args, **_kwargs: _Supabase())
+    monkeypatch.setattr("app.routes.mcp.load_registry", lambda: _Registry())
+    monkeypatch.setattr("app.routes.mcp.execute_tool", _fake_execute_tool)
+    monkeypatch.setattr("app.routes.mcp._log_tool_call", lambda **kwargs: logged.append(kwargs))
+
+    def _request(req_id: str, title: str) -> _Request:
+        return _Request(
+            {
+                "jsonrpc": "2.0",
+                "id": req_id,
+                "method": "call_tool",
+                "params": {"name": "linear_create_issue", "arguments": {"title": title, "idempotency_key": "idem-2"}},
+            }
+        )
+
+    first = asyncio.run(mcp.mcp_call_tool(_request("1", "A"), authorization="Bearer metel_xxx"))
+    second = asyncio.run(mcp.mcp_call_tool(_request("2", "B"), authorization="Bearer metel_xxx"))
+
+    assert first["result"]["ok"] is True
+    assert len(executed) == 1
+    assert json.loads(second.body) == {
+        "jsonrpc": "2.0",
+        "id": "2",
+        "error": {"code": 4092, "message": "idempotency_key_reused"},
+    }
+    assert logged[-1]["error_code"] == "idempotency_key_reused"
+
+
+def test_mcp_call_tool_logs_result_cache_hits(monkeypatch):
+    from app.core.tool_result_cache import ToolResultCache
+
+    async def _fake_auth(_authorization: str | None):
+        return {"id": 11, "user_id": "user-1", "is_active": True}
+
+    class _Tool:
+        service = "linear"
+
+    class _Registry:
+        def get_tool(self, _name: str):
+            return _Tool()
+
+    cache = ToolResultCache(max_entries=10)
+    logged: list[dict] = []
+
+    async def _fake_execute_tool(*, user_id: str, tool_name: str, payload: dict):
+        async def _load():
+            return {"ok": True, "data": {"teams": ["t-1"]}}
+
+        return await cache.read_through(
+            user_id=user_id, service="linear", tool_name=tool_name, ttl_seconds=60, payload=payload, load=_load
+        )
+
+    monkeypatch.setattr("app.routes.mcp._authenticate_api_key", _fake_auth)
+    monkeypatch.setattr("app.routes.mcp._check_rate_limit", lambda **_kwargs: _RATE_OK)
+    monkeypatch.setattr("app.routes.mcp.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.mcp.get_supabase_client", lambda *_args, **_kwargs: _Supabase())
+    monkeypatch.setattr("app.routes.mcp.load_registry", lambda: _Registry())
+    monkeypatch.setattr("app.routes.mcp.execute_tool", _fake_execute_tool)
+    monkeypatch.setattr("app.routes.mcp._log_tool_call", lambda **kwargs: logged.append(kwargs))
+
+    req = {"jsonrpc": "2.0", "id": "1", "method": "call_tool", "params": {"name": "linear_list_teams", "arguments": {}}}
+    asyncio.run(mcp.mcp_call_tool(_Request(req), authorization="Bearer metel_xxx"))
+    response = asyncio.run(mcp.mcp_call_tool(_Request(req), authorization="Bearer metel_xxx"))
+
+    assert response["result"]["data"] == {"teams": ["t-1"]}
+    assert [item["error_code"] for item in logged] == [None, "result_cache_hit"]
+
+
 def test_mcp_call_tool_not_available_in_phase1(monkeypatch):
     async def _fake_auth(_authorization: str | None):
         return {"id": 12, "user_id": "user-1", "is_active": True}
@@ -182,9 +410,9 @@ def test_mcp_call_tool_not_available_in_phase1(monkeypatch):
             return _Tool()
 
     monkeypatch.setattr("app.routes.mcp._authenticate_api_key", _fake_auth)
-    monkeypatch.setattr("app.routes.mcp._is_rate_limited", lambda **_kwargs: False)
+    monkeypatch.setattr("app.routes.mcp._check_rate_limit", lambda **_kwargs: _RATE_OK)
     monkeypatch.setattr("app.routes.mcp.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
-    monkeypatch.setattr("app.routes.mcp.create_client", lambda *_args, **_kwargs: _Supabase())
+    monkeypatch.setattr("app.routes.mcp.get_supabase_client", lambda *_args, **_kwargs: _Supabase())
     monkeypatch.setattr("app.routes.mcp.load_registry", lambda: _Registry())
 
     req = _Request(
@@ -217,9 +445,9 @@ def test_mcp_call_tool_denied_by_api_key_allowed_tools(monkeypatch):
         captured["error_code"] = kwargs.get("error_code")
 
     monkeypatch.setattr("app.routes.mcp._authenticate_api_key", _fake_auth)
-    monkeypatch.setattr("app.routes.mcp._is_rate_limited", lambda **_kwargs: False)
+    monkeypatch.setattr("app.routes.mcp._check_rate_limit", lambda **_kwargs: _RATE_OK)
     monkeypatch.setattr("app.routes.mcp.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
-    monkeypatch.setattr("app.routes.mcp.create_client", lambda *_args, **_kwargs: _Supabase())
+    monkeypatch.setattr("app.routes.mcp.get_supabase_client", lambda *_args, **_kwargs: _Supabase())
     monkeypatch.setattr("app.routes.mcp.load_registry", lambda: _Registry())
     monkeypatch.setattr("app.routes.mcp._log_tool_call", _fake_log_tool_call)
 
@@ -257,9 +485,9 @@ def test_mcp_call_tool_maps_validation_error(monkeypatch):
         captured["error_code"] = kwargs.get("error_code")
 
     monkeypatch.setattr("app.routes.mcp._authenticate_api_key", _fake_auth)
-    monkeypatch.setattr("app.routes.mcp._is_rate_limited", lambda **_kwargs: False)
+    monkeypatch.setattr("app.routes.mcp._check_rate_limit", lambda **_kwargs: _RATE_OK)
     monkeypatch.setattr("app.routes.mcp.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
-    monkeypatch.setattr("app.routes.mcp.create_client", lambda *_args, **_kwargs: _Supabase())
+    monkeypatch.setattr("app.routes.mcp.get_supabase_client", lambda *_args, **_kwargs: _Supabase())
     monkeypatch.setattr("app.routes.mcp.load_registry", lambda: _Registry())
     monkeypatch.setattr("app.routes.mcp.execute_tool", _fake_execute_tool)
     monkeypatch.setattr("app.routes.mcp._log_tool_call", _fake_log_tool_call)
@@ -295,9 +523,9 @@ def test_mcp_call_tool_policy_blocked_high_risk_tool(monkeypatch):
         captured["error_code"] = kwargs.get("error_code")
 
     monkeypatch.setattr("app.routes.mcp._authenticate_api_key", _fake_auth)
-    monkeypatch.setattr("app.routes.mcp._is_rate_limited", lambda **_kwargs: False)
+    monkeypatch.setattr("app.routes.mcp._check_rate_limit", lambda **_kwargs: _RATE_OK)
     monkeypatch.setattr("app.routes.mcp.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
-    monkeypatch.setattr("app.routes.mcp.create_client", lambda *_args, **_kwargs: _Supabase())
+    monkeypatch.setattr("app.routes.mcp.get_supabase_client", lambda *_args, **_kwargs: _Supabase())
     monkeypatch.setattr("app.routes.mcp.load_registry", lambda: _Registry())
     monkeypatch.setattr("app.routes.mcp._log_tool_call", _fake_log_tool_call)
 
@@ -333,9 +561,9 @@ def test_mcp_call_tool_policy_blocked_archive_payload(monkeypatch):
         captured["error_code"] = kwargs.get("error_code")
 
     monkeypatch.setattr("app.routes.mcp._authenticate_api_key", _fake_auth)
-    monkeypatch.setattr("app.routes.mcp._is_rate_limited", lambda **_kwargs: False)
+    monkeypatch.setattr("app.routes.mcp._check_rate_limit", lambda **_kwargs: _RATE_OK)
     monkeypatch.setattr("app.routes.mcp.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
-    monkeypatch.setattr("app.routes.mcp.create_client", lambda *_args, **_kwargs: _Supabase())
+    monkeypatch.setattr("app.routes.mcp.get_supabase_client", lambda *_args, **_kwargs: _Supabase())
     monkeypatch.setattr("app.routes.mcp.load_registry", lambda: _Registry())
     monkeypatch.setattr("app.routes.mcp._log_tool_call", _fake_log_tool_call)
 
@@ -383,9 +611,9 @@ def test_mcp_call_tool_policy_allows_high_risk_when_enabled(monkeypatch):
         captured["error_code"] = kwargs.get("error_code")
 
     monkeypatch.setattr("app.routes.mcp._authenticate_api_key", _fake_auth)
-    monkeypatch.setattr("app.routes.mcp._is_rate_limited", lambda **_kwargs: False)
+    monkeypatch.setattr("app.routes.mcp._check_rate_limit", lambda **_kwargs: _RATE_OK)
     monkeypatch.setattr("app.routes.mcp.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
-    monkeypatch.setattr("app.routes.mcp.create_client", lambda *_args, **_kwargs: _Supabase())
+    monkeypatch.setattr("app.routes.mcp.get_supabase_client", lambda *_args, **_kwargs: _Supabase())
     monkeypatch.setattr("app.routes.mcp.load_registry", lambda: _Registry())
     monkeypatch.setattr("app.routes.mcp.execute_tool", _fake_execute_tool)
     monkeypatch.setattr("app.routes.mcp._log_tool_call", _fake_log_tool_call)
@@ -446,9 +674,9 @@ def test_mcp_call_tool_resolves_notion_page_title(monkeypatch):
         captured["logged"] = True
 
     monkeypatch.setattr("app.routes.mcp._authenticate_api_key", _fake_auth)
-    monkeypatch.setattr("app.routes.mcp._is_rate_limited", lambda **_kwargs: False)
+    monkeypatch.setattr("app.routes.mcp._check_rate_limit", lambda **_kwargs: _RATE_OK)
     monkeypatch.setattr("app.routes.mcp.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
-    monkeypatch.setattr("app.routes.mcp.create_client", lambda *_args, **_kwargs: _Supabase())
+    monkeypatch.setattr("app.routes.mcp.get_supabase_client", lambda *_args, **_kwargs: _Supabase())
     monkeypatch.setattr("app.routes.mcp.load_registry", lambda: _Registry())
     monkeypatch.setattr("app.routes.mcp.execute_tool", _fake_execute_tool)
     monkeypatch.setattr("app.routes.mcp._log_tool_call", _fake_log_tool_call)
@@ -498,9 +726,9 @@ def test_mcp_call_tool_resolver_ambiguous(monkeypatch):
         captured["error_code"] = kwargs.get("error_code")
 
     monkeypatch.setattr("app.routes.mcp._authenticate_api_key", _fake_auth)
-    monkeypatch.setattr("app.routes.mcp._is_rate_limited", lambda **_kwargs: False)
+    monkeypatch.setattr("app.routes.mcp._check_rate_limit", lambda **_kwargs: _RATE_OK)
     monkeypatch.setattr("app.routes.mcp.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
-    monkeypatch.setattr("app.routes.mcp.create_client", lambda *_args, **_kwargs: _Supabase())
+    monkeypatch.setattr("app.routes.mcp.get_supabase_client", lambda *_args, **_kwargs: _Supabase())
     monkeypatch.setattr("app.routes.mcp.load_registry", lambda: _Registry())
     monkeypatch.setattr("app.routes.mcp.execute_tool", _fake_execute_tool)
     monkeypatch.setattr("app.routes.mcp._log_tool_call", _fake_log_tool_call)
@@ -541,7 +769,7 @@ def test_mcp_call_tool_retries_temporary_failure_then_success(monkeypatch):
         return {"ok": True, "data": {"items": []}}
 
     monkeypatch.setattr("app.routes.mcp._authenticate_api_key", _fake_auth)
-    monkeypatch.setattr("app.routes.mcp._is_rate_limited", lambda **_kwargs: False)
+    monkeypatch.setattr("app.routes.mcp._check_rate_limit", lambda **_kwargs: _RATE_OK)
     monkeypatch.setattr(
         "app.routes.mcp.get_settings",
         lambda: SimpleNamespace(
@@ -551,7 +779,7 @@ def test_mcp_call_tool_retries_temporary_failure_then_success(monkeypatch):
             mcp_retry_backoff_ms=0,
         ),
     )
-    monkeypatch.setattr("app.routes.mcp.create_client", lambda *_args, **_kwargs: _Supabase())
+    monkeypatch.setattr("app.routes.mcp.get_supabase_client", lambda *_args, **_kwargs: _Supabase())
     monkeypatch.setattr("app.routes.mcp.load_registry", lambda: _Registry())
     monkeypatch.setattr("app.routes.mcp.execute_tool", _fake_execute_tool)
     monkeypatch.setattr("app.routes.mcp._log_tool_call", lambda **_kwargs: None)
@@ -590,7 +818,7 @@ def test_mcp_call_tool_does_not_retry_validation_error(monkeypatch):
         raise HTTPException(status_code=400, detail="notion_search:VALIDATION_REQUIRED:query")
 
     monkeypatch.setattr("app.routes.mcp._authenticate_api_key", _fake_auth)
-    monkeypatch.setattr("app.routes.mcp._is_rate_limited", lambda **_kwargs: False)
+    monkeypatch.setattr("app.routes.mcp._check_rate_limit", lambda **_kwargs: _RATE_OK)
     monkeypatch.setattr(
         "app.routes.mcp.get_settings",
         lambda: SimpleNamespace(
@@ -600,7 +828,7 @@ def test_mcp_call_tool_does_not_retry_validation_error(monkeypatch):
             mcp_retry_backoff_ms=0,
         ),
     )
-    monkeypatch.setattr("app.routes.mcp.create_client", lambda *_args, **_kwargs: _Supabase())
+    monkeypatch.setattr("app.routes.mcp.get_supabase_client", lambda *_args, **_kwargs: _Supabase())
     monkeypatch.setattr("app.routes.mcp.load_registry", lambda: _Registry())
     monkeypatch.setattr("app.routes.mcp.execute_tool", _fake_execute_tool)
     monkeypatch.setattr("app.routes.mcp._log_tool_call", lambda **_kwargs: None)
@@ -629,13 +857,13 @@ def test_mcp_call_tool_quota_exceeded(monkeypatch):
         captured["error_code"] = kwargs.get("error_code")
 
     monkeypatch.setattr("app.routes.mcp._authenticate_api_key", _fake_auth)
-    monkeypatch.setattr("app.routes.mcp._is_rate_limited", lambda **_kwargs: False)
-    monkeypatch.setattr(
-        "app.routes.mcp.evaluate_daily_quota",
-        lambda **_kwargs: SimpleNamespace(exceeded=True, scope="api_key", limit=100, used=100),
-    )
+    monkeypatch.setattr("app.routes.mcp._check_rate_limit", lambda **_kwargs: _RATE_OK)
+    async def _fake_quota(**_kwargs):
+        return SimpleNamespace(exceeded=True, scope="api_key", limit=100, used=100)
+
+    monkeypatch.setattr("app.routes.mcp.evaluate_daily_quota", _fake_quota)
     monkeypatch.setattr("app.routes.mcp.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
-    monkeypatch.setattr("app.routes.mcp.create_client", lambda *_args, **_kwargs: _Supabase())
+    monkeypatch.setattr("app.routes.mcp.get_supabase_client", lambda *_args, **_kwargs: _Supabase())
     monkeypatch.setattr("app.routes.mcp._log_tool_call", _fake_log_tool_call)
 
     req = _Request(
@@ -675,7 +903,7 @@ def test_mcp_call_tool_maps_upstream_temporary_failure(monkeypatch):
         captured["error_code"] = kwargs.get("error_code")
 
     monkeypatch.setattr("app.routes.mcp._authenticate_api_key", _fake_auth)
-    monkeypatch.setattr("app.routes.mcp._is_rate_limited", lambda **_kwargs: False)
+    monkeypatch.setattr("app.routes.mcp._check_rate_limit", lambda **_kwargs: _RATE_OK)
     monkeypatch.setattr(
         "app.routes.mcp.get_settings",
         lambda: SimpleNamespace(
@@ -685,7 +913,7 @@ def test_mcp_call_tool_maps_upstream_temporary_failure(monkeypatch):
             mcp_retry_backoff_ms=0,
         ),
     )
-    monkeypatch.setattr("app.routes.mcp.create_client", lambda *_args, **_kwargs: _Supabase())
+    monkeypatch.setattr("app.routes.mcp.get_supabase_client", lambda *_args, **_kwargs: _Supabase())
     monkeypatch.setattr("app.routes.mcp.load_registry", lambda: _Registry())
     monkeypatch.setattr("app.routes.mcp.execute_tool", _fake_execute_tool)
     monkeypatch.setattr("app.routes.mcp._log_tool_call", _fake_log_tool_call)
@@ -734,19 +962,79 @@ def test_mcp_list_tools_applies_policy_filters(monkeypatch):
     monkeypatch.setattr("app.routes.mcp.load_registry", lambda: _Registry())
     monkeypatch.setattr("app.routes.mcp.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
     monkeypatch.setattr(
-        "app.routes.mcp.create_client",
+        "app.routes.mcp.get_supabase_client",
         lambda *_args, **_kwargs: _Supabase(oauth_rows=[{"provider": "notion", "granted_scopes": ["read_content"]}]),
     )
 
     req = _Request({"jsonrpc": "2.0", "id": "1", "method": "list_tools"})
     response = asyncio.run(mcp.mcp_list_tools(req, authorization="Bearer metel_xxx"))
-    assert isinstance(response, dict)
-    names = [tool["name"] for tool in response["result"]["tools"]]
+    names = [tool["name"] for tool in json.loads(response.body)["result"]["tools"]]
     assert "notion_retrieve_bot_user" in names
     assert "notion_search" not in names
     assert "linear_get_viewer" not in names
 
 
+def test_mcp_list_tools_etag_revalidation_and_connection_invalidation(monkeypatch):
+    from app.core.tool_visibility import invalidate_user_connections
+
+    async def _fake_auth(_authorization: str | None):
+        return {"id": 52, "user_id": "user-1", "is_active": True}
+
+    class _Tool:
+        def __init__(self, service: str, name: str):
+            self.service = service
+            self._name = name
+
+        def to_llm_tool(self):
+            return {"name": self._name, "description": "", "input_schema": {"type": "object"}}
+
+    class _Registry:
+        def list_available_tools(self, *, connected_services, **_kwargs):
+            tools = [_Tool("notion", "notion_search"), _Tool("linear", "linear_list_issues")]
+            return [tool for tool in tools if tool.service in connected_services]
+
+    supabase = _Supabase(oauth_rows=[{"provider": "notion", "granted_scopes": ["read_content"]}])
+    oauth_reads: list[str] = []
+    original_table = supabase.table
+
+    def _table(name: str):
+        if name == "oauth_tokens":
+            oauth_reads.append(name)
+        return original_table(name)
+
+    supabase.table = _table
+    monkeypatch.setattr("app.routes.mcp._authenticate_api_key", _fake_auth)
+    monkeypatch.setattr("app.routes.mcp.load_registry", lambda: _Registry())
+    monkeypatch.setattr("app.routes.mcp.get_supabase_client", lambda *_args, **_kwargs: supabase)
+
+    first = asyncio.run(mcp.mcp_list_tools(_Request({"id": "1", "method": "list_tools"}), authorization="Bearer metel_xxx"))
+    etag = first.headers["etag"]
+    assert [tool["name"] for tool in json.loads(first.body)["result"]["tools"]] == ["notion_search"]
+
+    revalidated = asyncio.run(
+        mcp.mcp_list_tools(
+            _Request({"id": "2", "method": "list_tools"}, headers={"if-none-match": etag}),
+            authorization="Bearer metel_xxx",
+        )
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == etag
+    assert len(oauth_reads) == 1
+
+    supabase._oauth_rows.append({"provider": "linear", "granted_scopes": ["read"]})
+    invalidate_user_connections("user-1")
+    changed = asyncio.run(
+        mcp.mcp_list_tools(
+            _Request({"id": "3", "method": "list_tools"}, headers={"if-none-match": etag}),
+            authorization="Bearer metel_xxx",
+        )
+    )
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert [tool["name"] for tool in json.loads(changed.body)["result"]["tools"]] == ["notion_search", "linear_list_issues"]
+    assert len(oauth_reads) == 2
+
+
 def test_mcp_call_tool_denied_by_policy_deny_tools(monkeypatch):
     async def _fake_auth(_authorization: str | None):
         return {
@@ -769,9 +1057,9 @@ def test_mcp_call_tool_denied_by_policy_deny_tools(monkeypatch):
         captured["error_code"] = kwargs.get("error_code")
 
     monkeypatch.setattr("app.routes.mcp._authenticate_api_key", _fake_auth)
-    monkeypatch.setattr("app.routes.mcp._is_rate_limited", lambda **_kwargs: False)
+    monkeypatch.setattr("app.routes.mcp._check_rate_limit", lambda **_kwargs: _RATE_OK)
     monkeypatch.setattr("app.routes.mcp.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
-    monkeypatch.setattr("app.routes.mcp.create_client", lambda *_args, **_kwargs: _Supabase())
+    monkeypatch.setattr("app.routes.mcp.get_supabase_client", lambda *_args, **_kwargs: _Supabase())
     monkeypatch.setattr("app.routes.mcp.load_registry", lambda: _Registry())
     monkeypatch.setattr("app.routes.mcp._log_tool_call", _fake_log_tool_call)
 
@@ -811,9 +1099,9 @@ def test_mcp_call_tool_denied_by_policy_allowed_services(monkeypatch):
         captured["error_code"] = kwargs.get("error_code")
 
     monkeypatch.setattr("app.routes.mcp._authenticate_api_key", _fake_auth)
-    monkeypatch.setattr("app.routes.mcp._is_rate_limited", lambda **_kwargs: False)
+    monkeypatch.setattr("app.routes.mcp._check_rate_limit", lambda **_kwargs: _RATE_OK)
     monkeypatch.setattr("app.routes.mcp.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
-    monkeypatch.setattr("app.routes.mcp.create_client", lambda *_args, **_kwargs: _Supabase())
+    monkeypatch.setattr("app.routes.mcp.get_supabase_client", lambda *_args, **_kwargs: _Supabase())
     monkeypatch.setattr("app.routes.mcp.load_registry", lambda: _Registry())
     monkeypatch.setattr("app.routes.mcp._log_tool_call", _fake_log_tool_call)
 
@@ -848,12 +1136,12 @@ def test_mcp_call_tool_denied_by_policy_allowed_linear_team_ids(monkeypatch):
             return _Tool()
 
     monkeypatch.setattr("app.routes.mcp._authenticate_api_key", _fake_auth)
-    monkeypatch.setattr("app.routes.mcp._is_rate_limited", lambda **_kwargs: False)
+    monkeypatch.setattr("app.routes.mcp._check_rate_limit", lambda **_kwargs: _RATE_OK)
     monkeypatch.setattr(
         "app.routes.mcp.get_settings",
         lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y", mcp_retry_max_retries=0, mcp_retry_backoff_ms=0),
     )
-    monkeypatch.setattr("app.routes.mcp.create_client", lambda *_args, **_kwargs: _Supabase())
+    monkeypatch.setattr("app.routes.mcp.get_supabase_client", lambda *_args, **_kwargs: _Supabase())
     monkeypatch.setattr("app.routes.mcp.load_registry", lambda: _Registry())
 
     req = _Request(
@@ -914,15 +1202,15 @@ def test_mcp_call_tool_emits_webhook_events_on_success(monkeypatch):
         return {"ok": True, "data": {"items": []}}
 
     monkeypatch.setattr("app.routes.mcp._authenticate_api_key", _fake_auth)
-    monkeypatch.setattr("app.routes.mcp._is_rate_limited", lambda **_kwargs: False)
+    monkeypatch.setattr("app.routes.mcp._check_rate_limit", lambda **_kwargs: _RATE_OK)
     monkeypatch.setattr(
         "app.routes.mcp.get_settings",
         lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y", mcp_retry_max_retries=0, mcp_retry_backoff_ms=0),
     )
-    monkeypatch.setattr("app.routes.mcp.create_client", lambda *_args, **_kwargs: _Supabase())
+    monkeypatch.setattr("app.routes.mcp.get_supabase_client", lambda *_args, **_kwargs: _Supabase())
     monkeypatch.setattr("app.routes.mcp.load_registry", lambda: _Registry())
     monkeypatch.setattr("app.routes.mcp.execute_tool", _fake_execute_tool)
-    monkeypatch.setattr("app.routes.mcp.emit_webhook_event", _fake_emit)
+    monkeypatch.setattr("app.routes.mcp.dispatch_webhook_event", _fake_emit)
     monkeypatch.setattr("app.routes.mcp._log_tool_call", lambda **_kwargs: None)
 
     req = _Request(
@@ -956,11 +1244,11 @@ def test_mcp_call_tool_emits_policy_blocked_event(monkeypatch):
         emitted.append(str(kwargs.get("event_type") or ""))
 
     monkeypatch.setattr("app.routes.mcp._authenticate_api_key", _fake_auth)
-    monkeypatch.setattr("app.routes.mcp._is_rate_limited", lambda **_kwargs: False)
+    monkeypatch.setattr("app.routes.mcp._check_rate_limit", lambda **_kwargs: _RATE_OK)
     monkeypatch.setattr("app.routes.mcp.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
-    monkeypatch.setattr("app.routes.mcp.create_client", lambda *_args, **_kwargs: _Supabase())
+    monkeypatch.setattr("app.routes.mcp.get_supabase_client", lambda *_args, **_kwargs: _Supabase())
     monkeypatch.setattr("app.routes.mcp.load_registry", lambda: _Registry())
-    monkeypatch.setattr("app.routes.mcp.emit_webhook_event", _fake_emit)
+    monkeypatch.setattr("app.routes.mcp.dispatch_webhook_event", _fake_emit)
     monkeypatch.setattr("app.routes.mcp._log_tool_call", lambda **_kwargs: None)
 
     req = _Request(
@@ -975,3 +1263,276 @@ def test_mcp_call_tool_emits_policy_blocked_event(monkeypatch):
     payload = response.body.decode("utf-8")
     assert "policy_blocked" in payload
     assert emitted == ["tool_called", "policy_blocked"]
+
+
+def test_mcp_batch_call_tool_runs_items_concurrently_with_per_item_errors(monkeypatch):
+    auth_calls: list[str | None] = []
+
+    async def _fake_auth(authorization: str | None):
+        auth_calls.append(authorization)
+        return {"id": 71, "user_id": "user-1", "is_active": True}
+
+    class _Tool:
+        def __init__(self, service: str):
+            self.service = service
+
+    class _Registry:
+        def get_tool(self, name: str):
+            return _Tool(name.split("_", 1)[0])
+
+    active = {"now": 0, "peak": 0}
+    logged: list[tuple[str, str]] = []
+
+    async def _fake_execute_tool(*, user_id: str, tool_name: str, payload: dict):
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(0.01)
+        active["now"] -= 1
+        if tool_name == "github_get_me":
+            raise HTTPException(status_code=400, detail="github_not_connected")
+        return {"ok": True, "data": {"tool": tool_name}}
+
+    def _fake_log_tool_call(**kwargs):
+        logged.append((kwargs["request_id"], kwargs["status"]))
+
+    monkeypatch.setattr("app.routes.mcp._authenticate_api_key", _fake_auth)
+    monkeypatch.setattr("app.routes.mcp._check_rate_limit", lambda **_kwargs: _RATE_OK)
+    monkeypatch.setattr(
+        "app.routes.mcp.get_settings",
+        lambda: SimpleNamespace(mcp_retry_max_retries=0, mcp_retry_backoff_ms=0, mcp_batch_per_service_concurrency=2),
+    )
+    monkeypatch.setattr("app.routes.mcp.get_supabase_client", lambda *_args, **_kwargs: _Supabase())
+    monkeypatch.setattr("app.routes.mcp.load_registry", lambda: _Registry())
+    monkeypatch.setattr("app.routes.mcp.execute_tool", _fake_execute_tool)
+    monkeypatch.setattr("app.routes.mcp._log_tool_call", _fake_log_tool_call)
+
+    def _call(req_id: str, name: str) -> dict:
+        return {"jsonrpc": "2.0", "id": req_id, "method": "call_tool", "params": {"name": name, "arguments": {}}}
+
+    req = _Request(
+        [
+            _call("a", "notion_search"),
+            _call("b", "notion_search"),
+            _call("c", "notion_search"),
+            _call("d", "github_get_me"),
+            {"jsonrpc": "2.0", "id": "e", "method": "call_tool", "params": {"arguments": {}}},
+        ]
+    )
+    response = asyncio.run(mcp.mcp_batch_call_tool(req, authorization="Bearer metel_xxx"))
+    assert auth_calls == ["Bearer metel_xxx"]
+    assert [item["id"] for item in response] == ["a", "b", "c", "d", "e"]
+    assert [item["result"]["ok"] for item in response[:3]] == [True, True, True]
+    assert response[3]["error"] == {"code": 4003, "message": "oauth_not_connected", "data": {"provider": "github"}}
+    assert response[4]["error"]["message"] == "missing_tool_name"
+    # Two notion calls plus the github call may overlap; the third notion call waits for a slot.
+    assert active["peak"] == 3
+    assert sorted(logged) == [("req-1:0", "success"), ("req-1:1", "success"), ("req-1:2", "success"), ("req-1:3", "fail")]
+
+
+def test_mcp_batch_call_tool_caps_concurrency_per_registry_service(monkeypatch):
+    async def _fake_auth(_authorization: str | None):
+        return {"id": 73, "user_id": "user-1", "is_active": True}
+
+    class _Tool:
+        def __init__(self, service: str):
+            self.service = service
+
+    class _Registry:
+        def get_tool(self, name: str):
+            return _Tool(name.split("_", 1)[0])
+
+    active: dict[str, int] = {}
+    peak: dict[str, int] = {}
+
+    async def _fake_call_idempotent(*, req_id, tool_name, **_kwargs):
+        service = tool_name.split("_", 1)[0]
+        active[service] = active.get(service, 0) + 1
+        peak[service] = max(peak.get(service, 0), active[service])
+        peak["total"] = max(peak.get("total", 0), sum(active.values()))
+        await asyncio.sleep(0.01)
+        active[service] -= 1
+        return {"jsonrpc": "2.0", "id": req_id, "result": {"ok": True}}
+
+    monkeypatch.setattr("app.routes.mcp._authenticate_api_key", _fake_auth)
+    monkeypatch.setattr("app.routes.mcp.get_settings", lambda: SimpleNamespace(mcp_batch_per_service_concurrency=1))
+    monkeypatch.setattr("app.routes.mcp.get_supabase_client", lambda *_args, **_kwargs: _Supabase())
+    monkeypatch.setattr("app.routes.mcp.load_registry", lambda: _Registry())
+    monkeypatch.setattr("app.routes.mcp._call_idempotent", _fake_call_idempotent)
+
+    names = ["google_calendar_list_events", "google_calendar_list_events", "canva_list_designs", "canva_list_designs"]
+    req = _Request(
+        [
+            {"jsonrpc": "2.0", "id": str(idx), "method": "call_tool", "params": {"name": name, "arguments": {}}}
+            for idx, name in enumerate(names)
+        ]
+    )
+    response = asyncio.run(mcp.mcp_batch_call_tool(req, authorization="Bearer metel_xxx"))
+
+    assert [item["result"]["ok"] for item in response] == [True, True, True, True]
+    # google and canva each get their own slot instead of sharing one "other" bucket.
+    assert peak == {"google": 1, "canva": 1, "total": 2}
+
+
+def test_mcp_batch_call_tool_maps_unexpected_item_failure_to_internal_error(monkeypatch):
+    async def _fake_auth(_authorization: str | None):
+        return {"id": 72, "user_id": "user-1", "is_active": True}
+
+    async def _fake_call_idempotent(*, req_id, tool_name, **_kwargs):
+        if tool_name == "notion_broken":
+            raise RuntimeError("boom")
+        return {"jsonrpc": "2.0", "id": req_id, "result": {"ok": True}}
+
+    monkeypatch.setattr("app.routes.mcp._authenticate_api_key", _fake_auth)
+    monkeypatch.setattr("app.routes.mcp.get_settings", lambda: SimpleNamespace())
+    monkeypatch.setattr("app.routes.mcp.get_supabase_client", lambda *_args, **_kwargs: _Supabase())
+    monkeypatch.setattr("app.routes.mcp._call_idempotent", _fake_call_idempotent)
+
+    req = _Request(
+        [
+            {"jsonrpc": "2.0", "id": "a", "method": "call_tool", "params": {"name": "notion_search", "arguments": {}}},
+            {"jsonrpc": "2.0", "id": "b", "method": "call_tool", "params": {"name": "notion_broken", "arguments": {}}},
+        ]
+    )
+    response = asyncio.run(mcp.mcp_batch_call_tool(req, authorization="Bearer metel_xxx"))
+    assert response[0] == {"jsonrpc": "2.0", "id": "a", "result": {"ok": True}}
+    assert response[1] == {
+        "jsonrpc": "2.0",
+        "id": "b",
+        "error": {"code": -32603, "message": "internal_error", "data": {"index": 1}},
+    }
+
+
+def test_mcp_batch_call_tool_rejects_oversized_batch(monkeypatch):
+    monkeypatch.setattr("app.routes.mcp.get_settings", lambda: SimpleNamespace(mcp_batch_max_items=2))
+    req = _Request([{"id": str(idx)} for idx in range(3)])
+    response = asyncio.run(mcp.mcp_batch_call_tool(req, authorization="Bearer metel_xxx"))
+    assert "batch_too_large" in response.body.decode("utf-8")
+
+
+def _collect_stream(response) -> list[str]:
+    async def _read():
+        return [chunk async for chunk in response.body_iterator]
+
+    return asyncio.run(_read())
+
+
+def test_mcp_call_tool_streams_notion_pages_as_ndjson(monkeypatch):
+    async def _fake_auth(_authorization: str | None):
+        return {"id": 81, "user_id": "user-1", "is_active": True}
+
+    class _Tool:
+        service = "notion"
+
+    class _Registry:
+        def get_tool(self, _name: str):
+            return _Tool()
+
+    cursors: list[str | None] = []
+    logged: list[dict] = []
+
+    async def _fake_execute_tool(*, user_id: str, tool_name: str, payload: dict):
+        cursor = payload.get("start_cursor")
+        cursors.append(cursor)
+        if cursor is None:
+            return {"ok": True, "data": {"results": [1, 2], "has_more": True, "next_cursor": "c2"}}
+        return {"ok": True, "data": {"results": [3], "has_more": False, "next_cursor": None}}
+
+    def _fake_next_page(_tool_name: str, payload: dict, result: dict):
+        data = result["data"]
+        return {**payload, "start_cursor": data["next_cursor"]} if data["has_more"] else None
+
+    monkeypatch.setattr("app.routes.mcp._authenticate_api_key", _fake_auth)
+    monkeypatch.setattr("app.routes.mcp._check_rate_limit", lambda **_kwargs: _RATE_OK)
+    monkeypatch.setattr("app.routes.mcp.get_settings", lambda: SimpleNamespace(mcp_retry_max_retries=0, mcp_retry_backoff_ms=0))
+    monkeypatch.setattr("app.routes.mcp.get_supabase_client", lambda *_args, **_kwargs: _Supabase())
+    monkeypatch.setattr("app.routes.mcp.load_registry", lambda: _Registry())
+    monkeypatch.setattr("app.routes.mcp.execute_tool", _fake_execute_tool)
+    monkeypatch.setattr("app.routes.mcp.next_page_payload", _fake_next_page)
+    monkeypatch.setattr("app.routes.mcp._log_tool_call", lambda **kwargs: logged.append(kwargs))
+
+    req = _Request(
+        {
+            "jsonrpc": "2.0",
+            "id": "s1",
+            "method": "call_tool",
+            "params": {"name": "notion_query_database", "arguments": {"database_id": "db"}},
+        },
+        headers={"accept": "application/x-ndjson, application/json"},
+    )
+    response = asyncio.run(mcp.mcp_call_tool(req, authorization="Bearer metel_xxx"))
+    assert response.media_type == "application/x-ndjson"
+    messages = [json.loads(line) for line in _collect_stream(response)]
+    assert [item["params"]["result"]["data"]["results"] for item in messages[:2]] == [[1, 2], [3]]
+    assert messages[2] == {"jsonrpc": "2.0", "id": "s1", "result": {"ok": True, "streamed": True, "pages": 2, "has_more": False}}
+    assert cursors == [None, "c2"]
+    assert [(item["status"], item["error_code"]) for item in logged] == [("success", None)]
+
+
+def test_negotiate_stream_format_respects_accept_order():
+    assert mcp._negotiate_stream_format(None) is None
+    assert mcp._negotiate_stream_format("application/json, text/event-stream") is None
+    assert mcp._negotiate_stream_format("text/event-stream;q=1, application/json") == "sse"
+    assert mcp._negotiate_stream_format("application/x-ndjson") == "ndjson"
+
+
+def test_map_tool_error_treats_queue_timeout_as_retryable_temporary_failure():
+    code, message, data = mcp._map_tool_error(
+        HTTPException(status_code=503, detail="notion:QUEUE_TIMEOUT|waited_ms=10004")
+    )
+    assert code == mcp.CODE_UPSTREAM_TEMPORARY_FAILURE
+    assert message == mcp.ERR_UPSTREAM_TEMPORARY_FAILURE
+    assert data == {"status": None, "retryable": True, "reason": "queue_timeout"}
+
+
+def test_map_tool_error_surfaces_upstream_retry_hint_and_request_id():
+    exc = UpstreamError(
+        tool_name="notion_search",
+        code="RATE_LIMITED",
+        status=429,
+        request_id="req-abc",
+        retry_after_seconds=2.5,
+    )
+    code, message, data = mcp._map_tool_error(exc)
+    assert code == mcp.CODE_UPSTREAM_TEMPORARY_FAILURE
+    assert message == mcp.ERR_UPSTREAM_TEMPORARY_FAILURE
+    assert data == {"status": 429, "retryable": True, "retry_after_ms": 2500, "upstream_request_id": "req-abc"}
+
+
+def test_map_tool_error_fast_fails_open_circuit_with_retry_hint():
+    exc = UpstreamError(
+        tool_name="linear_list_issues",
+        code="CIRCUIT_OPEN",
+        status=None,
+        retry_after_seconds=12.5,
+        detail="linear:CIRCUIT_OPEN|retry_after_ms=12500",
+    )
+    code, message, data = mcp._map_tool_error(exc)
+    assert code == mcp.CODE_UPSTREAM_TEMPORARY_FAILURE
+    assert message == mcp.ERR_UPSTREAM_TEMPORARY_FAILURE
+    assert data == {"status": None, "retryable": True, "reason": "circuit_open", "retry_after_ms": 12500}
+
+
+def test_deadline_ms_prefers_capped_client_header_then_tool_default(monkeypatch):
+    class _Registry:
+        def get_tool(self, _name: str):
+            return SimpleNamespace(deadline_ms=8000)
+
+    monkeypatch.setattr(
+        "app.routes.mcp.get_settings",
+        lambda: SimpleNamespace(mcp_default_deadline_ms=30000, mcp_max_deadline_ms=60000),
+    )
+    monkeypatch.setattr("app.routes.mcp.load_registry", lambda: _Registry())
+    assert mcp._deadline_ms("notion_search", "2500") == 2500
+    assert mcp._deadline_ms("notion_search", "999999") == 60000
+    assert mcp._deadline_ms("notion_search", "soon") == 8000
+    assert mcp._deadline_ms("notion_search", None) == 8000
+
+    monkeypatch.setattr("app.routes.mcp.load_registry", lambda: SimpleNamespace(get_tool=lambda _name: SimpleNamespace(deadline_ms=0)))
+    assert mcp._deadline_ms("notion_search", None) == 30000
+
+
+def test_map_tool_error_reports_deadline_exceeded():
+    code, message, data = mcp._map_tool_error(HTTPException(status_code=504, detail="notion_search:DEADLINE_EXCEEDED"))
+    assert code == 5041
+    assert message == "deadline_exceeded"
+    assert data is None
@@ -21,7 +21,7 @@ def test_get_my_permissions_owner(monkeypatch):
 
     monkeypatch.setattr("app.routes.me.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.me.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.me.create_client", lambda *_args, **_kwargs: SimpleNamespace())
+    monkeypatch.setattr("app.routes.me.get_supabase_client", lambda *_args, **_kwargs: SimpleNamespace())
     monkeypatch.setattr(
         "app.routes.me.get_settings",
         lambda: SimpleNamespace(
@@ -56,7 +56,7 @@ def test_get_my_permissions_member(monkeypatch):
 
     monkeypatch.setattr("app.routes.me.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.me.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.me.create_client", lambda *_args, **_kwargs: SimpleNamespace())
+    monkeypatch.setattr("app.routes.me.get_supabase_client", lambda *_args, **_kwargs: SimpleNamespace())
     monkeypatch.setattr(
         "app.routes.me.get_settings",
         lambda: SimpleNamespace(
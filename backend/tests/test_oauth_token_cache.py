@@ -0,0 +1,152 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from agent import tool_runner
+from app.core.api_key_cache import InMemoryInvalidationChannel
+from app.core.oauth_token_cache import (
+    OAuthTokenCache,
+    get_oauth_token_cache,
+    invalidate_oauth_token,
+    reset_oauth_token_cache,
+    set_oauth_token_invalidation_channel,
+)
+
+
+class _Query:
+    def __init__(self, rows: list[dict]):
+        self._rows = rows
+
+    def select(self, *_args, **_kwargs):
+        return self
+
+    def eq(self, *_args, **_kwargs):
+        return self
+
+    def order(self, *_args, **_kwargs):
+        return self
+
+    def limit(self, *_args, **_kwargs):
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=self._rows)
+
+
+class _Supabase:
+    def __init__(self, rows: list[dict]):
+        self.rows = rows
+        self.reads = 0
+
+    def table(self, _name: str):
+        self.reads += 1
+        return _Query(list(self.rows))
+
+
+def test_tokens_cached_until_ttl_and_scoped_by_provider():
+    now = [100.0]
+    cache = OAuthTokenCache(ttl_seconds=60, max_entries=10, clock=lambda: now[0])
+    loads: list[str] = []
+
+    def _load(token: str):
+        def _inner():
+            loads.append(token)
+            return token
+
+        return _inner
+
+    assert cache.get_or_load("user-1", "notion", _load("n1")) == "n1"
+    assert cache.get_or_load("user-1", "notion", _load("n2")) == "n1"
+    assert cache.get_or_load("user-1", "linear", _load("l1")) == "l1"
+    assert loads == ["n1", "l1"]
+
+    now[0] += 61
+    assert cache.get_or_load("user-1", "notion", _load("n3")) == "n3"
+    assert cache.stats() == {"entries": 2, "ttl_seconds": 60.0, "hits": 1, "misses": 3, "invalidations": 0}
+
+
+def test_invalidate_drops_provider_or_all_user_tokens():
+    cache = OAuthTokenCache(ttl_seconds=60, max_entries=10)
+    cache.get_or_load("user-1", "notion", lambda: "n1")
+    cache.get_or_load("user-1", "github", lambda: "g1")
+    cache.get_or_load("user-2", "notion", lambda: "other")
+
+    cache.invalidate("user-1", "notion")
+    assert cache.get_or_load("user-1", "notion", lambda: "n2") == "n2"
+    assert cache.get_or_load("user-1", "github", lambda: "g2") == "g1"
+
+    cache.invalidate("user-1")
+    assert cache.get_or_load("user-1", "github", lambda: "g3") == "g3"
+    assert cache.get_or_load("user-2", "notion", lambda: "unused") == "other"
+
+
+def test_load_racing_an_invalidation_is_not_stored():
+    cache = OAuthTokenCache(ttl_seconds=60, max_entries=10)
+
+    def _load_then_disconnect():
+        # The user disconnects while the old row is still being decrypted.
+        cache.invalidate("user-1", "notion")
+        return "revoked"
+
+    assert cache.get_or_load("user-1", "notion", _load_then_disconnect) == "revoked"
+    assert cache.get_or_load("user-1", "notion", lambda: "fresh") == "fresh"
+
+
+def test_store_respects_shorter_ttl_and_max_entries():
+    cache = OAuthTokenCache(ttl_seconds=60, max_entries=2)
+    _token, generation = cache.lookup("user-1", "canva")
+    cache.store("user-1", "canva", "expired", generation=generation, ttl_seconds=-5)
+    assert cache.lookup("user-1", "canva")[0] is None
+
+    for user_id in ("a", "b", "c"):
+        cache.get_or_load(user_id, "notion", lambda: f"token-{user_id}")
+    assert cache.stats()["entries"] == 2
+    assert cache.lookup("a", "notion")[0] is None
+
+
+def test_token_material_never_appears_in_repr_or_stats():
+    cache = OAuthTokenCache(ttl_seconds=60, max_entries=10)
+    cache.get_or_load("user-1", "notion", lambda: "secret-token-value")
+
+    assert "secret-token-value" not in repr(cache._entries)
+    assert "secret-token-value" not in str(cache.stats())
+
+
+def test_invalidation_channel_fans_out_to_cache():
+    reset_oauth_token_cache()
+    try:
+        channel = InMemoryInvalidationChannel()
+        set_oauth_token_invalidation_channel(channel)
+        cache = get_oauth_token_cache()
+        cache.get_or_load("user-1", "linear", lambda: "l1")
+
+        invalidate_oauth_token("user-1", "linear")
+        assert cache.lookup("user-1", "linear")[0] is None
+        invalidate_oauth_token(None)
+        assert cache.stats()["invalidations"] == 1
+    finally:
+        reset_oauth_token_cache()
+
+
+def test_load_oauth_access_token_reads_through_cache(monkeypatch):
+    reset_oauth_token_cache()
+    supabase = _Supabase([{"access_token_encrypted": "plain-token"}])
+    monkeypatch.setattr(tool_runner, "get_supabase_client", lambda: supabase)
+    monkeypatch.setattr(tool_runner, "get_settings", lambda: SimpleNamespace(notion_token_encryption_key=None))
+    try:
+        assert tool_runner._load_oauth_access_token(user_id="user-1", provider="notion") == "plain-token"
+        assert tool_runner._load_oauth_access_token(user_id="user-1", provider="notion") == "plain-token"
+        assert supabase.reads == 1
+
+        supabase.rows = [{"access_token_encrypted": "reconnected-token"}]
+        assert tool_runner._reload_oauth_access_token(user_id="user-1", provider="notion") == "reconnected-token"
+        assert supabase.reads == 2
+
+        invalidate_oauth_token("user-1", "notion")
+        supabase.rows = []
+        with pytest.raises(HTTPException) as exc_info:
+            tool_runner._load_oauth_access_token(user_id="user-1", provider="notion")
+        assert exc_info.value.detail == "notion_not_connected"
+    finally:
+        reset_oauth_token_cache()
@@ -82,8 +82,7 @@ def test_list_organizations_returns_memberships(monkeypatch):
         return "user-1"
 
     monkeypatch.setattr("app.routes.organizations.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.organizations.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.organizations.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.organizations.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     out = asyncio.run(list_organizations(_request()))
     assert out["count"] == 1
@@ -136,8 +135,7 @@ def test_create_organization_inserts_owner_membership(monkeypatch):
         return "user-1"
 
     monkeypatch.setattr("app.routes.organizations.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.organizations.create_client", lambda *_args, **_kwargs: client)
-    monkeypatch.setattr("app.routes.organizations.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.organizations.get_supabase_client", lambda *_args, **_kwargs: client)
 
     out = asyncio.run(create_organization(_request(method="POST"), OrganizationCreateRequest(name="Core")))
     assert out["item"]["id"] == 10
@@ -168,8 +166,7 @@ def test_list_organization_members_requires_membership(monkeypatch):
         return "user-1"
 
     monkeypatch.setattr("app.routes.organizations.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.organizations.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.organizations.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.organizations.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     try:
         asyncio.run(list_organization_members(_request("/api/organizations/1/members"), "1"))
@@ -202,8 +199,7 @@ def test_upsert_organization_member_rejects_invalid_role(monkeypatch):
         return "user-1"
 
     monkeypatch.setattr("app.routes.organizations.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.organizations.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.organizations.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.organizations.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     try:
         asyncio.run(
@@ -245,8 +241,7 @@ def test_update_organization_requires_owner(monkeypatch):
         return "user-1"
 
     monkeypatch.setattr("app.routes.organizations.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.organizations.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.organizations.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.organizations.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     try:
         asyncio.run(update_organization(_request("/api/organizations/1", "PATCH"), "1", body=OrganizationUpdateRequest(name="Renamed")))
@@ -282,8 +277,7 @@ def test_delete_organization_requires_owner(monkeypatch):
         return "user-1"
 
     monkeypatch.setattr("app.routes.organizations.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.organizations.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.organizations.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.organizations.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     try:
         asyncio.run(delete_organization(_request("/api/organizations/1", "DELETE"), "1"))
@@ -336,8 +330,7 @@ def test_delete_organization_deletes_row(monkeypatch):
         return "owner-user"
 
     monkeypatch.setattr("app.routes.organizations.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.organizations.create_client", lambda *_args, **_kwargs: client)
-    monkeypatch.setattr("app.routes.organizations.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.organizations.get_supabase_client", lambda *_args, **_kwargs: client)
 
     out = asyncio.run(delete_organization(_request("/api/organizations/1", "DELETE"), "1"))
     assert out["ok"] is True
@@ -368,8 +361,7 @@ def test_delete_organization_member_blocks_owner_self_removal(monkeypatch):
         return "owner-user"
 
     monkeypatch.setattr("app.routes.organizations.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.organizations.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.organizations.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.organizations.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     try:
         asyncio.run(delete_organization_member(_request("/api/organizations/1/members/owner-user", "DELETE"), "1", "owner-user"))
@@ -402,8 +394,7 @@ def test_create_organization_invite_requires_owner(monkeypatch):
         return "user-1"
 
     monkeypatch.setattr("app.routes.organizations.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.organizations.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.organizations.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.organizations.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     try:
         asyncio.run(create_organization_invite(_request("/api/organizations/1/invites", "POST"), "1", OrganizationInviteCreateRequest(role="member")))
@@ -469,8 +460,7 @@ def test_review_role_request_approve_updates_membership(monkeypatch):
         return "owner-user"
 
     monkeypatch.setattr("app.routes.organizations.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.organizations.create_client", lambda *_args, **_kwargs: client)
-    monkeypatch.setattr("app.routes.organizations.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.organizations.get_supabase_client", lambda *_args, **_kwargs: client)
 
     out = asyncio.run(
         review_organization_role_request(
@@ -531,8 +521,7 @@ def test_create_role_request_blocks_admin_requesting_owner(monkeypatch):
         return "admin-user"
 
     monkeypatch.setattr("app.routes.organizations.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.organizations.create_client", lambda *_args, **_kwargs: client)
-    monkeypatch.setattr("app.routes.organizations.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.organizations.get_supabase_client", lambda *_args, **_kwargs: client)
 
     try:
         asyncio.run(
@@ -579,8 +568,7 @@ def test_review_role_request_blocks_self_review(monkeypatch):
         return "owner-user"
 
     monkeypatch.setattr("app.routes.organizations.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.organizations.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.organizations.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.organizations.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     try:
         asyncio.run(
@@ -651,8 +639,7 @@ def test_revoke_and_reissue_organization_invite(monkeypatch):
         return "owner-user"
 
     monkeypatch.setattr("app.routes.organizations.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.organizations.create_client", lambda *_args, **_kwargs: client)
-    monkeypatch.setattr("app.routes.organizations.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.organizations.get_supabase_client", lambda *_args, **_kwargs: client)
 
     revoked = asyncio.run(revoke_organization_invite(_request("/api/organizations/1/invites/8/revoke", "POST"), "1", "8"))
     assert revoked["ok"] is True
@@ -700,8 +687,7 @@ def test_list_role_requests_filters_to_self_for_member(monkeypatch):
 
     monkeypatch.setattr("app.routes.organizations.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.organizations.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.organizations.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.organizations.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.organizations.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     out = asyncio.run(list_organization_role_requests(_request("/api/organizations/1/role-requests"), "1"))
     assert out["count"] == 1
@@ -752,8 +738,7 @@ def test_get_organization_oauth_policy_masks_sensitive_fields_for_member(monkeyp
 
     monkeypatch.setattr("app.routes.organizations.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.organizations.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.organizations.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.organizations.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.organizations.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     out = asyncio.run(get_organization_oauth_policy(_request("/api/organizations/1/oauth-policy"), "1"))
     policy = out["item"]["policy_json"]
@@ -802,8 +787,7 @@ def test_update_organization_policy_upserts_for_admin(monkeypatch):
 
     monkeypatch.setattr("app.routes.organizations.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.organizations.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.organizations.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.organizations.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.organizations.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     out = asyncio.run(
         update_organization_policy(
@@ -843,8 +827,7 @@ def test_update_oauth_policy_rejects_required_not_in_allowed(monkeypatch):
         return "owner-user"
 
     monkeypatch.setattr("app.routes.organizations.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.organizations.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.organizations.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.organizations.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     try:
         asyncio.run(
@@ -897,8 +880,7 @@ def test_get_organization_policy_returns_empty_default(monkeypatch):
 
     monkeypatch.setattr("app.routes.organizations.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.organizations.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.organizations.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.organizations.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.organizations.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     out = asyncio.run(get_organization_policy(_request("/api/organizations/1/policy"), "1"))
     assert out["item"]["policy_json"] == {}
@@ -50,11 +50,7 @@ def test_simulate_policy_blocks_by_deny_tools(monkeypatch):
 
     monkeypatch.setattr("app.routes.policies.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.policies.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.policies.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr(
-        "app.routes.policies.get_settings",
-        lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"),
-    )
+    monkeypatch.setattr("app.routes.policies.get_supabase_client", lambda *_args, **_kwargs: _Client())
     monkeypatch.setattr(
         "app.routes.policies.load_registry",
         lambda: SimpleNamespace(get_tool=lambda _name: SimpleNamespace(service="linear")),
@@ -96,11 +92,7 @@ def test_simulate_policy_allows_safe_request(monkeypatch):
 
     monkeypatch.setattr("app.routes.policies.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.policies.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.policies.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr(
-        "app.routes.policies.get_settings",
-        lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"),
-    )
+    monkeypatch.setattr("app.routes.policies.get_supabase_client", lambda *_args, **_kwargs: _Client())
     monkeypatch.setattr(
         "app.routes.policies.load_registry",
         lambda: SimpleNamespace(get_tool=lambda _name: SimpleNamespace(service="notion")),
@@ -141,11 +133,7 @@ def test_simulate_policy_blocks_member_organization_scope(monkeypatch):
 
     monkeypatch.setattr("app.routes.policies.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.policies.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.policies.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr(
-        "app.routes.policies.get_settings",
-        lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"),
-    )
+    monkeypatch.setattr("app.routes.policies.get_supabase_client", lambda *_args, **_kwargs: _Client())
     monkeypatch.setattr(
         "app.routes.policies.load_registry",
         lambda: SimpleNamespace(get_tool=lambda _name: SimpleNamespace(service="notion")),
@@ -192,11 +180,7 @@ def test_simulate_policy_blocks_member_team_scope_mismatch(monkeypatch):
 
     monkeypatch.setattr("app.routes.policies.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.policies.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.policies.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr(
-        "app.routes.policies.get_settings",
-        lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"),
-    )
+    monkeypatch.setattr("app.routes.policies.get_supabase_client", lambda *_args, **_kwargs: _Client())
     monkeypatch.setattr(
         "app.routes.policies.load_registry",
         lambda: SimpleNamespace(get_tool=lambda _name: SimpleNamespace(service="linear")),
@@ -243,11 +227,7 @@ def test_simulate_policy_returns_400_for_unknown_tool(monkeypatch):
 
     monkeypatch.setattr("app.routes.policies.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.policies.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.policies.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr(
-        "app.routes.policies.get_settings",
-        lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"),
-    )
+    monkeypatch.setattr("app.routes.policies.get_supabase_client", lambda *_args, **_kwargs: _Client())
     monkeypatch.setattr(
         "app.routes.policies.load_registry",
         lambda: SimpleNamespace(
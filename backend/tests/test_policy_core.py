@@ -0,0 +1,133 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import policy as policy_core
+from app.core.policy import EffectivePolicyCache, compile_policy
+
+
+@pytest.fixture(autouse=True)
+def _reset_policy_cache():
+    policy_core.reset_policy_cache()
+    yield
+    policy_core.reset_policy_cache()
+
+
+class _Client:
+    def __init__(self, policy_json: dict, updated_at: str = "2026-01-01T00:00:00+00:00"):
+        self.policy_json = policy_json
+        self.updated_at = updated_at
+        self.loads = 0
+
+    def table(self, name: str):
+        assert name == "team_policies"
+        client = self
+
+        class _Query:
+            def select(self, *_args, **_kwargs):
+                return self
+
+            def eq(self, *_args, **_kwargs):
+                return self
+
+            def limit(self, *_args, **_kwargs):
+                return self
+
+            def execute(self):
+                client.loads += 1
+                return SimpleNamespace(data=[{"policy_json": client.policy_json, "updated_at": client.updated_at}])
+
+        return _Query()
+
+
+def test_compile_policy_merges_into_frozensets():
+    compiled = compile_policy(
+        {"allowed_services": ["Notion", "linear"], "deny_tools": ["linear_list_issues"], "allow_high_risk": True},
+        {"allowed_services": ["linear"], "deny_tools": ["notion_search"], "allow_high_risk": False},
+    )
+    assert compiled.allowed_services == frozenset({"linear"})
+    assert compiled.deny_tools == frozenset({"linear_list_issues", "notion_search"})
+    assert compiled.allow_high_risk is False
+    assert compiled.allows_service("linear") and not compiled.allows_service("notion")
+    assert compiled.policy_json["deny_tools"] == ["linear_list_issues", "notion_search"]
+
+
+def test_disjoint_allowlists_are_treated_as_unrestricted():
+    compiled = compile_policy({"allowed_services": ["notion"]}, {"allowed_services": ["linear"]})
+    assert compiled.policy_json["allowed_services"] == []
+    assert compiled.allows_service("github")
+
+
+def test_cache_reuses_compiled_policy_until_team_invalidated():
+    cache = EffectivePolicyCache(ttl_seconds=60, max_entries=16)
+    client = _Client({"deny_tools": ["notion_search"]})
+    api_key = {"id": 7, "team_id": 3, "policy_json": {"allowed_services": ["notion"]}}
+
+    first = cache.resolve(client, api_key=api_key)
+    second = cache.resolve(client, api_key=dict(api_key))
+    assert first is second
+    assert client.loads == 1
+
+    client.policy_json = {"deny_tools": ["notion_create_page"]}
+    client.updated_at = "2026-01-02T00:00:00+00:00"
+    cache.invalidate_team(3)
+    third = cache.resolve(client, api_key=api_key)
+    assert client.loads == 2
+    assert third.deny_tools == frozenset({"notion_create_page"})
+
+
+def test_team_policy_loaded_across_an_invalidation_is_not_cached():
+    cache = EffectivePolicyCache(ttl_seconds=60, max_entries=16)
+    api_key = {"id": 7, "team_id": 3, "policy_json": None}
+
+    class _RacingClient(_Client):
+        def table(self, name: str):
+            query = super().table(name)
+            execute = query.execute
+
+            def _execute():
+                result = execute()
+                # update_team commits the new policy and invalidates while this read is returning the old row.
+                client.policy_json = {"deny_tools": ["notion_create_page"]}
+                client.updated_at = "2026-01-02T00:00:00+00:00"
+                cache.invalidate_team(3)
+                return result
+
+            query.execute = _execute
+            return query
+
+    client = _RacingClient({"deny_tools": ["notion_search"]})
+    stale = cache.resolve(client, api_key=api_key)
+    assert stale.deny_tools == frozenset({"notion_search"})
+    assert cache.stats()["teams"] == 0
+    assert cache.stats()["compiled"] == 0
+
+    fresh = cache.resolve(_Client(client.policy_json, client.updated_at), api_key=api_key)
+    assert fresh.deny_tools == frozenset({"notion_create_page"})
+
+
+def test_cache_recompiles_when_key_policy_changes():
+    cache = EffectivePolicyCache(ttl_seconds=60, max_entries=16)
+    client = _Client({})
+    first = cache.resolve(client, api_key={"id": 7, "team_id": 3, "policy_json": {"deny_tools": ["a"]}})
+    second = cache.resolve(client, api_key={"id": 7, "team_id": 3, "policy_json": {"deny_tools": ["b"]}})
+    assert first.deny_tools == frozenset({"a"})
+    assert second.deny_tools == frozenset({"b"})
+
+
+def test_invalidate_team_policy_reaches_shared_cache():
+    client = _Client({"deny_tools": ["notion_search"]})
+    api_key = {"id": 1, "team_id": 5, "policy_json": None}
+    policy_core.resolve_effective_policy(client, api_key=api_key)
+    policy_core.resolve_effective_policy(client, api_key=api_key)
+    assert client.loads == 1
+
+    policy_core.invalidate_team_policy(5)
+    policy_core.resolve_effective_policy(client, api_key=api_key)
+    assert client.loads == 2
+
+
+def test_rate_limit_takes_stricter_of_team_and_key():
+    assert compile_policy({"rate_limit_per_minute": 60}, {"rate_limit_per_minute": 10}).rate_limit_per_minute == 10
+    assert compile_policy({"rate_limit_per_minute": 5}, {"deny_tools": ["a"]}).rate_limit_per_minute == 5
+    assert compile_policy({"rate_limit_per_minute": 0}, None).rate_limit_per_minute is None
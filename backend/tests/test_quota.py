@@ -0,0 +1,121 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import quota
+from app.core.quota import DailyUsageCounters
+
+
+@pytest.fixture(autouse=True)
+def _reset_usage_counters():
+    quota.reset_usage_counters()
+    yield
+    quota.reset_usage_counters()
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+        self.wall = datetime(2026, 3, 1, 23, 59, tzinfo=timezone.utc)
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _CountClient:
+    def __init__(self, counts: dict[str, int]):
+        self.counts = counts
+        self.queries: list[tuple[str, object]] = []
+
+    def table(self, name: str):
+        assert name == "tool_calls"
+        client = self
+
+        class _Query:
+            def __init__(self):
+                self.filter = None
+
+            def select(self, *_args, **_kwargs):
+                return self
+
+            def eq(self, field, value):
+                self.filter = (field, value)
+                return self
+
+            def gte(self, *_args, **_kwargs):
+                return self
+
+            def limit(self, *_args, **_kwargs):
+                return self
+
+            def execute(self):
+                client.queries.append(self.filter)
+                return SimpleNamespace(data=[], count=client.counts.get(self.filter[0], 0))
+
+        return _Query()
+
+
+def test_admit_counts_all_scopes_or_none():
+    counters = DailyUsageCounters(reconcile_seconds=60)
+    checks = [("api_key", 1, 2), ("user", "u1", 3)]
+    assert counters.admit(checks).exceeded is False
+    assert counters.admit(checks).exceeded is False
+    blocked = counters.admit(checks)
+    assert (blocked.exceeded, blocked.scope, blocked.used) == (True, "api_key", 2)
+    # The rejected call did not count against the user scope.
+    assert counters.used("user", "u1") == 2
+
+
+def test_counters_roll_over_at_utc_midnight_and_never_move_backwards():
+    clock = _Clock()
+    counters = DailyUsageCounters(reconcile_seconds=60, clock=clock, now=lambda: clock.wall)
+    counters.reconcile("user", "u1", day=counters.today(), db_count=5)
+    counters.admit([("user", "u1", 10)])
+    counters.reconcile("user", "u1", day=counters.today(), db_count=4)
+    assert counters.used("user", "u1") == 6
+    assert counters.needs_reconcile("user", "u1") is False
+
+    clock.wall = datetime(2026, 3, 2, 0, 0, 1, tzinfo=timezone.utc)
+    assert counters.used("user", "u1") == 0
+    assert counters.needs_reconcile("user", "u1") is True
+    assert counters.day_start_iso() == "2026-03-02T00:00:00+00:00"
+
+
+def test_evaluate_daily_quota_seeds_once_then_counts_in_memory():
+    client = _CountClient({"api_key_id": 1, "user_id": 7})
+
+    async def _run():
+        decisions = []
+        for _ in range(3):
+            decisions.append(
+                await quota.evaluate_daily_quota(
+                    supabase=client, user_id="u1", api_key_id=9, per_key_daily_limit=3, per_user_daily_limit=100
+                )
+            )
+        return decisions
+
+    decisions = asyncio.run(_run())
+    assert [item.exceeded for item in decisions] == [False, False, True]
+    assert decisions[2].scope == "api_key" and decisions[2].used == 3
+    assert sorted(client.queries) == [("api_key_id", 9), ("user_id", "u1")]
+
+
+def test_evaluate_daily_quota_without_limits_skips_counting():
+    client = _CountClient({})
+    decision = asyncio.run(
+        quota.evaluate_daily_quota(supabase=client, user_id="u1", api_key_id=9, per_key_daily_limit=0, per_user_daily_limit=0)
+    )
+    assert decision.exceeded is False
+    assert client.queries == []
+
+
+def test_current_daily_usage_reports_the_counters_day(monkeypatch):
+    clock = _Clock()
+    counters = DailyUsageCounters(reconcile_seconds=60, clock=clock, now=lambda: clock.wall)
+    monkeypatch.setattr(quota, "get_usage_counters", lambda: counters)
+    client = _CountClient({"user_id": 3})
+
+    day, usage = asyncio.run(quota.current_daily_usage(supabase=client, targets=[("user", "u1")]))
+    assert (day, usage) == ("2026-03-01", {("user", "u1"): 3})
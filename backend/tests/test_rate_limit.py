@@ -0,0 +1,59 @@
+import pytest
+
+from app.core import rate_limit
+from app.core.rate_limit import InMemoryRateLimitBackend, RateLimitDecision
+
+
+@pytest.fixture(autouse=True)
+def _reset_rate_limiter():
+    rate_limit.reset_rate_limiter()
+    yield
+    rate_limit.reset_rate_limiter()
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_bucket_allows_burst_then_reports_retry_after():
+    clock = _Clock()
+    backend = InMemoryRateLimitBackend(clock=clock)
+    decisions = [backend.acquire("k1", limit=3, window_seconds=60) for _ in range(4)]
+    assert [item.allowed for item in decisions] == [True, True, True, False]
+    assert decisions[2].remaining == 0
+    assert decisions[3].retry_after_seconds == pytest.approx(20.0)
+    assert decisions[3].retry_after_header == "20"
+
+    clock.now += 20
+    assert backend.acquire("k1", limit=3, window_seconds=60).allowed is True
+    assert backend.acquire("k2", limit=3, window_seconds=60).allowed is True
+
+
+def test_backend_evicts_least_recently_used_keys():
+    backend = InMemoryRateLimitBackend(max_keys=2, clock=_Clock())
+    backend.acquire("a", limit=1, window_seconds=60)
+    backend.acquire("b", limit=1, window_seconds=60)
+    backend.acquire("c", limit=1, window_seconds=60)
+    # "a" was evicted, so it starts with a full bucket again.
+    assert backend.acquire("a", limit=1, window_seconds=60).allowed is True
+    assert backend.acquire("c", limit=1, window_seconds=60).allowed is False
+
+
+def test_check_rate_limit_uses_pluggable_backend():
+    calls: list[tuple[str, int]] = []
+
+    class _SharedBackend:
+        def acquire(self, key: str, *, limit: int, window_seconds: float) -> RateLimitDecision:
+            calls.append((key, limit))
+            return RateLimitDecision(allowed=False, limit=limit, remaining=0, retry_after_seconds=0.2)
+
+    rate_limit.set_rate_limit_backend(_SharedBackend())
+    decision = rate_limit.check_rate_limit("api_key:7", limit=10)
+    assert calls == [("api_key:7", 10)]
+    assert decision.retry_after_header == "1"
+    assert rate_limit.check_rate_limit("api_key:7", limit=0).allowed is True
+    assert len(calls) == 1
@@ -97,8 +97,8 @@ def _patch_authz(monkeypatch, role: Role):
     for module in modules:
         monkeypatch.setattr(f"{module}.get_authenticated_user_id", _fake_user)
         monkeypatch.setattr(f"{module}.get_authz_context", _fake_authz)
-        monkeypatch.setattr(f"{module}.create_client", lambda *_args, **_kwargs: _Client())
-        monkeypatch.setattr(f"{module}.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+        monkeypatch.setattr(f"{module}.get_supabase_client", lambda *_args, **_kwargs: _Client())
+    monkeypatch.setattr("app.routes.integrations.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
 
 
 _ROLE_RANK = {
@@ -1,10 +1,12 @@
 import json
 
-from agent.registry import ToolRegistry
+import pytest
 
+from agent.registry import ToolRegistry, ToolSpecValidationError, path_template
 
-def test_registry_loads_new_service_from_specs_dir(tmp_path):
-    spec = {
+
+def _mock_spec(*, path: str = "/v1/items", properties: dict | None = None) -> dict:
+    return {
         "service": "mockdocs",
         "version": "1.0.0",
         "base_url": "https://api.mockdocs.local",
@@ -14,16 +16,19 @@ def test_registry_loads_new_service_from_specs_dir(tmp_path):
                 "tool_name": "mockdocs_list_items",
                 "description": "List mock items",
                 "method": "GET",
-                "path": "/v1/items",
+                "path": path,
                 "adapter_function": "mockdocs_list_items",
-                "input_schema": {"type": "object", "properties": {}, "required": []},
+                "input_schema": {"type": "object", "properties": properties or {}, "required": []},
                 "required_scopes": [],
                 "idempotency_key_policy": "none",
                 "error_map": {"401": "AUTH_ERROR"},
             }
         ],
     }
-    (tmp_path / "mockdocs.json").write_text(json.dumps(spec), encoding="utf-8")
+
+
+def test_registry_loads_new_service_from_specs_dir(tmp_path):
+    (tmp_path / "mockdocs.json").write_text(json.dumps(_mock_spec()), encoding="utf-8")
 
     registry = ToolRegistry.load_from_dir(tmp_path)
     services = registry.list_services()
@@ -31,3 +36,34 @@ def test_registry_loads_new_service_from_specs_dir(tmp_path):
     tool = registry.get_tool("mockdocs_list_items")
     assert tool.service == "mockdocs"
     assert tool.method == "GET"
+
+
+def test_registry_compiles_validator_and_path_template_once(tmp_path):
+    spec = _mock_spec(path="/v1/items/{item_id}/links/{link_id}", properties={"item_id": {"type": "string"}})
+    (tmp_path / "mockdocs.json").write_text(json.dumps(spec), encoding="utf-8")
+
+    tool = ToolRegistry.load_from_dir(tmp_path).get_tool("mockdocs_list_items")
+
+    assert tool.path_params == ("item_id", "link_id")
+    assert tool.path_template is path_template("/v1/items/{item_id}/links/{link_id}")
+    assert tool.path_template.parts == (("/v1/items/", "item_id"), ("/links/", "link_id"), ("", ""))
+    assert tool.payload_model is tool.payload_model
+    assert "item_id" in tool.payload_model.model_fields
+
+
+def test_registry_rejects_schema_that_cannot_compile(tmp_path):
+    spec = _mock_spec(properties={"_private": {"type": "string"}})
+    (tmp_path / "mockdocs.json").write_text(json.dumps(spec), encoding="utf-8")
+
+    with pytest.raises(ToolSpecValidationError, match="mockdocs_list_items"):
+        ToolRegistry.load_from_dir(tmp_path)
+
+
+@pytest.mark.parametrize("key", ["max_connections", "fanout_concurrency", "max_response_bytes"])
+def test_registry_rejects_pool_limits_below_one(tmp_path, key):
+    spec = _mock_spec()
+    spec["limits"] = {key: 0}
+    (tmp_path / "mockdocs.json").write_text(json.dumps(spec), encoding="utf-8")
+
+    with pytest.raises(ToolSpecValidationError, match=f"limits.{key}' must be at least 1"):
+        ToolRegistry.load_from_dir(tmp_path)
@@ -0,0 +1,109 @@
+import asyncio
+import random
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import retry_policy
+from app.core.retry_policy import (
+    RetryBudget,
+    get_retry_budget,
+    next_backoff_ms,
+    reset_retry_budgets,
+    run_with_retry,
+    should_retry_http_exception,
+)
+from app.core.upstream_errors import UpstreamError, retry_after_seconds
+
+
+@pytest.fixture(autouse=True)
+def _reset_budgets():
+    reset_retry_budgets()
+    yield
+    reset_retry_budgets()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    recorded: list[float] = []
+
+    async def _fake_sleep(seconds: float):
+        recorded.append(seconds)
+
+    monkeypatch.setattr(retry_policy.asyncio, "sleep", _fake_sleep)
+    return recorded
+
+
+def _flaky(errors):
+    attempts = {"count": 0}
+
+    async def _operation():
+        attempts["count"] += 1
+        if errors:
+            raise errors.pop(0)
+        return {"ok": True}
+
+    return _operation, attempts
+
+
+def test_decorrelated_jitter_stays_between_base_and_cap():
+    rng = random.Random(7)
+    previous = 100.0
+    for _ in range(50):
+        wait = next_backoff_ms(base_ms=100, previous_ms=previous, max_backoff_ms=2000, rng=rng)
+        assert 100 <= wait <= min(2000, max(100, previous * 3))
+        previous = wait
+    assert next_backoff_ms(base_ms=0, previous_ms=500, max_backoff_ms=2000) == 0.0
+
+
+def test_retry_after_hint_replaces_jitter(sleeps):
+    error = UpstreamError(tool_name="notion_search", code="RATE_LIMITED", status=429, retry_after_seconds=1.5)
+    operation, attempts = _flaky([error])
+    result = asyncio.run(run_with_retry(operation=operation, max_retries=2, backoff_ms=0))
+    assert result.retry_count == 1
+    assert attempts["count"] == 2
+    assert sleeps == [1.5]
+
+
+def test_hint_longer_than_cap_fails_fast(sleeps):
+    error = UpstreamError(tool_name="github_list_repos", code="RATE_LIMITED", status=429, retry_after_seconds=60)
+    operation, attempts = _flaky([error])
+    with pytest.raises(UpstreamError):
+        asyncio.run(run_with_retry(operation=operation, max_retries=3, backoff_ms=100, max_backoff_ms=5000))
+    assert attempts["count"] == 1
+    assert sleeps == []
+
+
+def test_structured_status_drives_retry_without_detail_parsing(sleeps):
+    error = UpstreamError(tool_name="google_calendar_list_events", code="TOOL_FAILED", status=503, detail="x:TOOL_FAILED")
+    assert should_retry_http_exception(error) is True
+    assert should_retry_http_exception(HTTPException(status_code=400, detail="x:TOOL_FAILED|status=404")) is False
+    assert should_retry_http_exception(HTTPException(status_code=400, detail="x:TOOL_FAILED|status=502")) is True
+
+
+def test_retry_budget_stops_retries_under_sustained_failures(sleeps):
+    budget = RetryBudget(ratio=0.5, max_tokens=1)
+    assert budget.try_spend() is True
+    assert budget.try_spend() is False
+    budget.record_call()
+    budget.record_call()
+    assert budget.try_spend() is True
+    assert budget.stats()["denied"] == 1
+
+    service_budget = get_retry_budget("linear")
+    service_budget._tokens = 0.0
+    service_budget.ratio = 0.0
+    operation, attempts = _flaky([HTTPException(status_code=400, detail="linear_list_issues:RATE_LIMITED|status=429")])
+    with pytest.raises(HTTPException):
+        asyncio.run(run_with_retry(operation=operation, max_retries=2, backoff_ms=0, service="linear"))
+    assert attempts["count"] == 1
+    assert get_retry_budget("linear").stats()["denied"] == 1
+
+
+def test_retry_after_parses_seconds_dates_and_reset_headers():
+    assert retry_after_seconds({"Retry-After": "3"}) == 3.0
+    assert retry_after_seconds({"retry-after": "Wed, 21 Oct 2015 07:28:05 GMT"}, now=1445412480.0) == pytest.approx(5.0)
+    assert retry_after_seconds({"x-ratelimit-reset": "1000"}, now=990.0) == 10.0
+    assert retry_after_seconds({"X-RateLimit-Requests-Reset": "1002000"}, now=1000.0) == 2.0
+    assert retry_after_seconds({"x-ratelimit-reset": "1000"}, include_reset=False, now=990.0) is None
+    assert retry_after_seconds({}) is None
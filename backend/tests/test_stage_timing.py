@@ -0,0 +1,67 @@
+from app.core.stage_timing import StageLatencyHistograms, StageTimer, get_stage_histograms, reset_stage_histograms
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_stage_timer_accumulates_stages_and_laps():
+    clock = _Clock()
+    timer = StageTimer(clock=clock)
+
+    with timer.stage("auth"):
+        clock.now += 0.004
+    clock.now += 0.010
+    timer.lap("authorize")
+    with timer.stage("upstream"):
+        clock.now += 0.100
+    with timer.stage("upstream"):
+        clock.now += 0.050
+
+    assert timer.as_dict() == {"auth": 4.0, "authorize": 10.0, "upstream": 150.0, "total": 164.0}
+    assert timer.server_timing() == "auth;dur=4.0, authorize;dur=10.0, upstream;dur=150.0, total;dur=164.0"
+
+
+def test_stage_timer_records_stage_when_block_raises():
+    clock = _Clock()
+    timer = StageTimer(clock=clock)
+    try:
+        with timer.stage("upstream"):
+            clock.now += 0.02
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    assert timer.get("upstream") == 20.0
+
+
+def test_finish_freezes_timings_and_observes_histograms_once():
+    reset_stage_histograms()
+    clock = _Clock()
+    timer = StageTimer(clock=clock)
+    with timer.stage("quota"):
+        clock.now += 0.003
+
+    frozen = timer.finish()
+    clock.now += 1.0
+    assert timer.finish() == frozen
+    assert timer.as_dict()["total"] == 3.0
+
+    snapshot = get_stage_histograms().snapshot()
+    assert snapshot["quota"]["count"] == 1
+    assert snapshot["total"]["sum_ms"] == 3.0
+    reset_stage_histograms()
+
+
+def test_histogram_buckets_are_cumulative():
+    histograms = StageLatencyHistograms(buckets_ms=(10, 100))
+    for value in (5, 50, 500, 7):
+        histograms.observe("upstream", value)
+
+    snapshot = histograms.snapshot()["upstream"]
+    assert snapshot["buckets"] == {"10": 2, "100": 3, "+Inf": 4}
+    assert snapshot["count"] == 4
+    assert snapshot["sum_ms"] == 562.0
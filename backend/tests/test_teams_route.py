@@ -67,8 +67,7 @@ def test_delete_team_member_success(monkeypatch):
         return "user-1"
 
     monkeypatch.setattr("app.routes.teams.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.teams.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.teams.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.teams.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     out = asyncio.run(delete_team_member(_request("/api/teams/1/members/10"), "1", "10"))
     assert out["ok"] is True
@@ -103,8 +102,7 @@ def test_delete_team_member_not_found(monkeypatch):
         return "user-1"
 
     monkeypatch.setattr("app.routes.teams.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.teams.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.teams.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.teams.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     try:
         asyncio.run(delete_team_member(_request("/api/teams/1/members/99"), "1", "99"))
@@ -152,8 +150,7 @@ def test_update_team_policy_rejects_weaker_than_org_baseline(monkeypatch):
         return "user-1"
 
     monkeypatch.setattr("app.routes.teams.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.teams.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.teams.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.teams.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     try:
         asyncio.run(
@@ -224,8 +221,7 @@ def test_update_team_policy_allows_service_permitted_by_org_oauth_policy(monkeyp
         return "user-1"
 
     monkeypatch.setattr("app.routes.teams.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.teams.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.teams.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.teams.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     out = asyncio.run(
         update_team(
@@ -288,8 +284,7 @@ def test_add_team_member_resolves_email_to_user_id(monkeypatch):
 
     client = _Client()
     monkeypatch.setattr("app.routes.teams.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.teams.create_client", lambda *_args, **_kwargs: client)
-    monkeypatch.setattr("app.routes.teams.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.teams.get_supabase_client", lambda *_args, **_kwargs: client)
 
     out = asyncio.run(
         add_team_member(
@@ -336,8 +331,7 @@ def test_add_team_member_email_not_found(monkeypatch):
         return "user-1"
 
     monkeypatch.setattr("app.routes.teams.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.teams.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.teams.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.teams.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     with pytest.raises(HTTPException) as exc_info:
         asyncio.run(
@@ -390,8 +384,7 @@ def test_delete_team_success(monkeypatch):
         return "user-1"
 
     monkeypatch.setattr("app.routes.teams.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.teams.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.teams.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.teams.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     out = asyncio.run(delete_team(_request("/api/teams/1", "DELETE"), "1"))
     assert out["ok"] is True
@@ -422,8 +415,7 @@ def test_delete_team_not_found(monkeypatch):
         return "user-1"
 
     monkeypatch.setattr("app.routes.teams.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.teams.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr("app.routes.teams.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.teams.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     with pytest.raises(HTTPException) as exc_info:
         asyncio.run(delete_team(_request("/api/teams/999", "DELETE"), "999"))
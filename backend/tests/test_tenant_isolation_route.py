@@ -48,11 +48,7 @@ def test_list_api_keys_enforces_user_scope(monkeypatch):
         return "user-a"
 
     monkeypatch.setattr("app.routes.api_keys.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.api_keys.create_client", lambda *_args, **_kwargs: client)
-    monkeypatch.setattr(
-        "app.routes.api_keys.get_settings",
-        lambda: SimpleNamespace(supabase_url="https://example.supabase.co", supabase_service_role_key="service-role-key"),
-    )
+    monkeypatch.setattr("app.routes.api_keys.get_supabase_client", lambda *_args, **_kwargs: client)
 
     out = asyncio.run(list_api_keys(_request("/api/api-keys")))
     assert out["count"] == 0
@@ -106,11 +102,7 @@ def test_list_tool_calls_enforces_user_scope(monkeypatch):
         return "user-a"
 
     monkeypatch.setattr("app.routes.tool_calls.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.tool_calls.create_client", lambda *_args, **_kwargs: client)
-    monkeypatch.setattr(
-        "app.routes.tool_calls.get_settings",
-        lambda: SimpleNamespace(supabase_url="https://example.supabase.co", supabase_service_role_key="service-role-key"),
-    )
+    monkeypatch.setattr("app.routes.tool_calls.get_supabase_client", lambda *_args, **_kwargs: client)
 
     out = asyncio.run(
         list_tool_calls(
@@ -181,11 +173,7 @@ def test_list_audit_events_enforces_user_scope(monkeypatch):
 
     monkeypatch.setattr("app.routes.audit.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.audit.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.audit.create_client", lambda *_args, **_kwargs: client)
-    monkeypatch.setattr(
-        "app.routes.audit.get_settings",
-        lambda: SimpleNamespace(supabase_url="https://example.supabase.co", supabase_service_role_key="service-role-key"),
-    )
+    monkeypatch.setattr("app.routes.audit.get_supabase_client", lambda *_args, **_kwargs: client)
 
     out = asyncio.run(
         list_audit_events(
@@ -257,11 +245,7 @@ def test_export_audit_events_enforces_user_scope(monkeypatch):
 
     monkeypatch.setattr("app.routes.audit.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.audit.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.audit.create_client", lambda *_args, **_kwargs: client)
-    monkeypatch.setattr(
-        "app.routes.audit.get_settings",
-        lambda: SimpleNamespace(supabase_url="https://example.supabase.co", supabase_service_role_key="service-role-key"),
-    )
+    monkeypatch.setattr("app.routes.audit.get_supabase_client", lambda *_args, **_kwargs: client)
 
     response = asyncio.run(
         export_audit_events(
@@ -338,11 +322,7 @@ def test_list_audit_events_member_ignores_team_org_filters(monkeypatch):
 
     monkeypatch.setattr("app.routes.audit.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.audit.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.audit.create_client", lambda *_args, **_kwargs: client)
-    monkeypatch.setattr(
-        "app.routes.audit.get_settings",
-        lambda: SimpleNamespace(supabase_url="https://example.supabase.co", supabase_service_role_key="service-role-key"),
-    )
+    monkeypatch.setattr("app.routes.audit.get_supabase_client", lambda *_args, **_kwargs: client)
 
     out = asyncio.run(
         list_audit_events(
@@ -422,11 +402,7 @@ def test_export_audit_events_admin_blocks_out_of_scope_org_filter(monkeypatch):
 
     monkeypatch.setattr("app.routes.audit.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.audit.get_authz_context", _fake_authz)
-    monkeypatch.setattr("app.routes.audit.create_client", lambda *_args, **_kwargs: client)
-    monkeypatch.setattr(
-        "app.routes.audit.get_settings",
-        lambda: SimpleNamespace(supabase_url="https://example.supabase.co", supabase_service_role_key="service-role-key"),
-    )
+    monkeypatch.setattr("app.routes.audit.get_supabase_client", lambda *_args, **_kwargs: client)
 
     response = asyncio.run(
         export_audit_events(
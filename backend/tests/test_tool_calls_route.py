@@ -11,6 +11,7 @@ from app.routes.tool_calls import (
     tool_calls_failure_breakdown,
     tool_calls_overview,
     tool_calls_trends,
+    tool_calls_usage,
 )
 
 
@@ -92,11 +93,7 @@ def test_list_tool_calls_applies_filters(monkeypatch):
         return "user-1"
 
     monkeypatch.setattr("app.routes.tool_calls.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.tool_calls.create_client", lambda *_args, **_kwargs: client)
-    monkeypatch.setattr(
-        "app.routes.tool_calls.get_settings",
-        lambda: SimpleNamespace(supabase_url="https://example.supabase.co", supabase_service_role_key="service-role-key"),
-    )
+    monkeypatch.setattr("app.routes.tool_calls.get_supabase_client", lambda *_args, **_kwargs: client)
 
     out = asyncio.run(
         list_tool_calls(
@@ -140,11 +137,7 @@ def test_list_tool_calls_invalid_datetime_raises(monkeypatch):
         return "user-1"
 
     monkeypatch.setattr("app.routes.tool_calls.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr(
-        "app.routes.tool_calls.get_settings",
-        lambda: SimpleNamespace(supabase_url="https://example.supabase.co", supabase_service_role_key="service-role-key"),
-    )
-    monkeypatch.setattr("app.routes.tool_calls.create_client", lambda *_args, **_kwargs: SimpleNamespace(table=lambda _name: None))
+    monkeypatch.setattr("app.routes.tool_calls.get_supabase_client", lambda *_args, **_kwargs: SimpleNamespace(table=lambda _name: None))
 
     try:
         asyncio.run(
@@ -248,11 +241,7 @@ def test_tool_calls_overview_and_breakdown(monkeypatch):
         return "user-1"
 
     monkeypatch.setattr("app.routes.tool_calls.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.tool_calls.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr(
-        "app.routes.tool_calls.get_settings",
-        lambda: SimpleNamespace(supabase_url="https://example.supabase.co", supabase_service_role_key="service-role-key"),
-    )
+    monkeypatch.setattr("app.routes.tool_calls.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     overview = asyncio.run(tool_calls_overview(_request(), hours=24))
     assert overview["kpis"]["total_calls"] == 3
@@ -285,11 +274,7 @@ def test_tool_calls_overview_member_org_scope_forbidden(monkeypatch):
 
     monkeypatch.setattr("app.routes.tool_calls.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.tool_calls.get_authz_context", _fake_authz_ctx)
-    monkeypatch.setattr("app.routes.tool_calls.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr(
-        "app.routes.tool_calls.get_settings",
-        lambda: SimpleNamespace(supabase_url="https://example.supabase.co", supabase_service_role_key="service-role-key"),
-    )
+    monkeypatch.setattr("app.routes.tool_calls.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     try:
         asyncio.run(tool_calls_overview(_request(), hours=24, organization_id=1))
@@ -316,11 +301,7 @@ def test_list_tool_calls_member_team_scope_forbidden(monkeypatch):
 
     monkeypatch.setattr("app.routes.tool_calls.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.tool_calls.get_authz_context", _fake_authz_ctx)
-    monkeypatch.setattr("app.routes.tool_calls.create_client", lambda *_args, **_kwargs: _Client())
-    monkeypatch.setattr(
-        "app.routes.tool_calls.get_settings",
-        lambda: SimpleNamespace(supabase_url="https://example.supabase.co", supabase_service_role_key="service-role-key"),
-    )
+    monkeypatch.setattr("app.routes.tool_calls.get_supabase_client", lambda *_args, **_kwargs: _Client())
 
     try:
         asyncio.run(
@@ -368,11 +349,7 @@ def test_tool_calls_trends_scope_filters_forwarded(monkeypatch):
 
     monkeypatch.setattr("app.routes.tool_calls.get_authenticated_user_id", _fake_user)
     monkeypatch.setattr("app.routes.tool_calls.get_authz_context", _fake_authz_ctx)
-    monkeypatch.setattr("app.routes.tool_calls.create_client", lambda *_args, **_kwargs: SimpleNamespace())
-    monkeypatch.setattr(
-        "app.routes.tool_calls.get_settings",
-        lambda: SimpleNamespace(supabase_url="https://example.supabase.co", supabase_service_role_key="service-role-key"),
-    )
+    monkeypatch.setattr("app.routes.tool_calls.get_supabase_client", lambda *_args, **_kwargs: SimpleNamespace())
     monkeypatch.setattr("app.routes.tool_calls._resolve_scope_filters", _fake_resolve_scope_filters)
     monkeypatch.setattr("app.routes.tool_calls._query_tool_call_rows", _fake_query_tool_call_rows)
 
@@ -383,3 +360,44 @@ def test_tool_calls_trends_scope_filters_forwarded(monkeypatch):
     assert captured["team_id"] == 11
     assert captured["user_ids"] == ["user-1", "user-2"]
     assert captured["api_key_ids"] == [101, 102]
+
+
+def test_tool_calls_usage_reads_daily_counters(monkeypatch):
+    class _Query:
+        def select(self, *_args, **_kwargs):
+            return self
+
+        def eq(self, *_args, **_kwargs):
+            return self
+
+        def execute(self):
+            return SimpleNamespace(data=[{"id": 5, "name": "ci", "key_prefix": "metel_ab"}])
+
+    class _Client:
+        def table(self, name: str):
+            assert name == "api_keys"
+            return _Query()
+
+    async def _fake_user(_request: Request) -> str:
+        return "user-1"
+
+    async def _fake_authz_ctx(_request: Request, *, user_id: str, supabase):
+        return AuthzContext(user_id=user_id, role=Role.MEMBER, org_ids=set(), team_ids=set())
+
+    async def _fake_usage(*, supabase, targets):
+        assert targets == [("user", "user-1"), ("api_key", 5)]
+        return "2026-03-01", {("user", "user-1"): 12, ("api_key", "5"): 4}
+
+    monkeypatch.setattr("app.routes.tool_calls.get_authenticated_user_id", _fake_user)
+    monkeypatch.setattr("app.routes.tool_calls.get_authz_context", _fake_authz_ctx)
+    monkeypatch.setattr("app.routes.tool_calls.get_supabase_client", lambda *_args, **_kwargs: _Client())
+    monkeypatch.setattr("app.routes.tool_calls.current_daily_usage", _fake_usage)
+    monkeypatch.setattr(
+        "app.routes.tool_calls.get_settings",
+        lambda: SimpleNamespace(mcp_quota_per_key_daily=50, mcp_quota_per_user_daily=0),
+    )
+
+    result = asyncio.run(tool_calls_usage(_request()))
+    assert result["day"] == "2026-03-01"
+    assert result["user"] == {"used": 12, "limit": None}
+    assert result["api_keys"] == [{"api_key_id": 5, "name": "ci", "key_prefix": "metel_ab", "used": 4, "limit": 50}]
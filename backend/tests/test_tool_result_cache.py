@@ -0,0 +1,178 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from agent.registry import ToolDefinition
+from agent.tool_runner import execute_tool
+from app.core.tool_result_cache import (
+    CACHE_HIT,
+    CACHE_MISS,
+    ToolResultCache,
+    last_result_cache_status,
+    reset_tool_result_cache,
+)
+
+
+def _read(cache: ToolResultCache, load, *, payload=None, ttl=30):
+    return cache.read_through(
+        user_id="user-1",
+        service="notion",
+        tool_name="notion_search",
+        ttl_seconds=ttl,
+        payload=payload or {"query": "roadmap"},
+        load=load,
+    )
+
+
+def test_hit_returns_copy_and_expires_after_ttl():
+    now = [0.0]
+    cache = ToolResultCache(max_entries=10, clock=lambda: now[0])
+    calls = {"count": 0}
+
+    async def _load():
+        calls["count"] += 1
+        return {"ok": True, "data": {"results": [calls["count"]]}}
+
+    async def _scenario():
+        first = await _read(cache, _load)
+        assert last_result_cache_status() == CACHE_MISS
+        first["data"]["results"].append("mutated by caller")
+        second = await _read(cache, _load)
+        assert last_result_cache_status() == CACHE_HIT
+        now[0] = 31.0
+        third = await _read(cache, _load)
+        return second, third
+
+    second, third = asyncio.run(_scenario())
+    assert second == {"ok": True, "data": {"results": [1]}}
+    assert third == {"ok": True, "data": {"results": [2]}}
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["tools"]["notion_search"] == {"hit": 1, "miss": 2}
+
+
+def test_read_in_flight_during_invalidation_is_not_stored():
+    cache = ToolResultCache(max_entries=10)
+
+    async def _scenario():
+        async def _slow_load():
+            cache.invalidate(user_id="user-1", service="notion")
+            return {"ok": True, "data": "stale"}
+
+        await _read(cache, _slow_load)
+        await _read(cache, _slow_load)
+
+    asyncio.run(_scenario())
+    assert cache.stats()["hits"] == 0
+    assert cache.stats()["entries"] == 0
+
+
+def test_failed_results_and_zero_ttl_bypass_cache():
+    cache = ToolResultCache(max_entries=10)
+
+    async def _failed():
+        return {"ok": False, "error": "upstream"}
+
+    async def _scenario():
+        await _read(cache, _failed)
+        await _read(cache, _failed)
+        await _read(cache, _failed, ttl=0)
+        assert last_result_cache_status() is None
+
+    asyncio.run(_scenario())
+    assert cache.stats()["hits"] == 0
+    assert cache.stats()["misses"] == 2
+
+
+def test_generations_stay_bounded_without_dropping_live_entries():
+    cache = ToolResultCache(max_entries=2)
+
+    async def _load():
+        return {"ok": True, "data": "cached"}
+
+    async def _scenario():
+        await _read(cache, _load)
+        for idx in range(50):
+            cache.invalidate(user_id=f"user-{idx + 2}", service="notion")
+        assert len(cache._generations) <= 4
+        await _read(cache, _load)
+        assert last_result_cache_status() == CACHE_HIT
+
+        async def _load_racing_invalidation():
+            for idx in range(10):
+                cache.invalidate(user_id=f"other-{idx}", service="notion")
+            cache.invalidate(user_id="user-1", service="notion")
+            return {"ok": True, "data": "stale"}
+
+        await _read(cache, _load_racing_invalidation, payload={"query": "other"})
+        assert await _read(cache, _load, payload={"query": "other"}) == {"ok": True, "data": "cached"}
+        assert last_result_cache_status() == CACHE_MISS
+
+    asyncio.run(_scenario())
+
+
+def test_oauth_disconnect_drops_cached_reads_for_that_service(monkeypatch):
+    from app.routes.google import google_oauth_disconnect
+
+    reset_tool_result_cache()
+    tool = ToolDefinition(
+        service="google",
+        base_url="https://www.googleapis.com/calendar/v3",
+        tool_name="google_calendar_list_calendars",
+        description="list calendars",
+        method="GET",
+        path="/users/me/calendarList",
+        adapter_function="google_calendar_list_calendars",
+        input_schema={"type": "object", "properties": {}, "required": []},
+        required_scopes=(),
+        idempotency_key_policy="none",
+        error_map={},
+        read_only=True,
+        cache_ttl_seconds=300,
+    )
+    connected = {"google": True}
+
+    async def _fake_generic_http(*, user_id: str, tool: ToolDefinition, payload: dict):
+        if not connected["google"]:
+            raise HTTPException(status_code=400, detail="google_not_connected")
+        return {"ok": True, "data": {"items": [{"id": "primary"}]}}
+
+    class _Query:
+        def delete(self):
+            return self
+
+        def eq(self, *_args, **_kwargs):
+            return self
+
+        def execute(self):
+            connected["google"] = False
+            return SimpleNamespace(data=[])
+
+    async def _fake_user(_request: Request) -> str:
+        return "user-1"
+
+    monkeypatch.setattr("agent.tool_runner.load_registry", lambda: SimpleNamespace(get_tool=lambda _name: tool))
+    monkeypatch.setattr("agent.tool_runner._execute_generic_http", _fake_generic_http)
+    monkeypatch.setattr("app.routes.google.get_authenticated_user_id", _fake_user)
+    monkeypatch.setattr("app.routes.google.get_supabase_client", lambda: SimpleNamespace(table=lambda _name: _Query()))
+
+    async def _scenario():
+        await execute_tool(user_id="user-1", tool_name="google_calendar_list_calendars", payload={})
+        assert last_result_cache_status() == CACHE_MISS
+        await execute_tool(user_id="user-1", tool_name="google_calendar_list_calendars", payload={})
+        assert last_result_cache_status() == CACHE_HIT
+
+        request = Request({"type": "http", "method": "DELETE", "path": "/api/oauth/google/disconnect", "headers": []})
+        assert await google_oauth_disconnect(request) == {"ok": True, "connected": False}
+        with pytest.raises(HTTPException) as exc_info:
+            await execute_tool(user_id="user-1", tool_name="google_calendar_list_calendars", payload={})
+        assert exc_info.value.detail == "google_not_connected"
+
+    try:
+        asyncio.run(_scenario())
+    finally:
+        reset_tool_result_cache()
@@ -1,3 +1,4 @@
+import pytest
 from fastapi import HTTPException
 
 from agent.registry import ToolDefinition
@@ -5,9 +6,33 @@ from agent.tool_runner import _build_path, _extract_path_params, _strip_path_par
 from agent.tool_runner import _linear_query_and_variables
 from agent.tool_runner import _GOOGLE_QUERY_KEY_MAP
 from agent.tool_runner import _validate_payload_by_schema
+from agent.tool_runner import next_page_payload
 import asyncio
 from types import SimpleNamespace
 
+from app.core.circuit_breaker import reset_circuit_breakers
+from app.core.deadline import DeadlineScope
+from app.core.http_pool import reset_upstream_client_pools
+from app.core.oauth_token_cache import reset_oauth_token_cache
+from app.core.tool_result_cache import get_tool_result_cache, reset_tool_result_cache
+from app.core.upstream_bulkhead import reset_upstream_bulkheads
+from app.core.upstream_errors import UpstreamError
+
+
+@pytest.fixture(autouse=True)
+def _reset_result_cache():
+    reset_tool_result_cache()
+    reset_upstream_bulkheads()
+    reset_circuit_breakers()
+    reset_upstream_client_pools()
+    reset_oauth_token_cache()
+    yield
+    reset_tool_result_cache()
+    reset_upstream_bulkheads()
+    reset_circuit_breakers()
+    reset_upstream_client_pools()
+    reset_oauth_token_cache()
+
 
 def test_extract_path_params():
     params = _extract_path_params("/v1/blocks/{block_id}/children")
@@ -19,6 +44,12 @@ def test_build_path():
     assert path == "/v1/pages/p1/properties/title"
 
 
+def test_build_path_repeated_and_missing_params():
+    assert _build_path("/v1/{id}/copy/{id}", {"id": "x"}) == "/v1/x/copy/x"
+    with pytest.raises(HTTPException, match="missing_path_param:page_id"):
+        _build_path("/v1/pages/{page_id}", {"page_id": ""})
+
+
 def test_strip_path_params():
     payload = {"block_id": "b1", "page_size": 20}
     stripped = _strip_path_params("/v1/blocks/{block_id}/children", payload)
@@ -168,6 +199,52 @@ def test_execute_tool_generic_adapter_maps_http_error(monkeypatch):
         assert False, "expected HTTPException"
 
 
+def test_execute_tool_raises_structured_upstream_error_with_retry_hint(monkeypatch):
+    tool = ToolDefinition(
+        service="mockdocs",
+        base_url="https://api.mockdocs.local",
+        tool_name="mockdocs_list_items",
+        description="list items",
+        method="GET",
+        path="/v1/items",
+        adapter_function="mockdocs_list_items",
+        input_schema={"type": "object", "properties": {}, "required": []},
+        required_scopes=(),
+        idempotency_key_policy="none",
+        error_map={"429": "RATE_LIMITED"},
+    )
+
+    class _Registry:
+        def get_tool(self, _tool_name: str):
+            return tool
+
+    class _FakeResponse:
+        status_code = 429
+        text = "slow down"
+        headers = {"Retry-After": "2", "X-Request-Id": "req-42"}
+
+    class _FakeClient:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, exc_type, exc, tb):
+            return False
+
+        async def get(self, url, headers=None, params=None):
+            return _FakeResponse()
+
+    monkeypatch.setattr("agent.tool_runner.load_registry", lambda: _Registry())
+    monkeypatch.setattr("agent.tool_runner.httpx.AsyncClient", lambda *args, **kwargs: _FakeClient())
+
+    with pytest.raises(UpstreamError) as exc_info:
+        asyncio.run(execute_tool("user-1", "mockdocs_list_items", {}))
+    exc = exc_info.value
+    assert exc.detail == "mockdocs_list_items:RATE_LIMITED"
+    assert exc.status == 429
+    assert exc.retry_after_seconds == 2.0
+    assert exc.request_id == "req-42"
+
+
 def test_execute_tool_canva_uses_refreshable_token_loader(monkeypatch):
     tool = ToolDefinition(
         service="canva",
@@ -459,6 +536,110 @@ def test_execute_tool_google_primary_fallback_reads_selected_secondary_calendar(
     assert any(url.endswith("/calendars/my-calendar-id/events") for url in calls)
 
 
+def _google_fanout_tool(**limits) -> ToolDefinition:
+    return ToolDefinition(
+        service="google",
+        base_url="https://www.googleapis.com/calendar/v3",
+        tool_name="google_calendar_list_events",
+        description="list events",
+        method="GET",
+        path="/calendars/{calendar_id}/events",
+        adapter_function="google_calendar_list_events",
+        input_schema={
+            "type": "object",
+            "properties": {"calendar_id": {"type": "string"}},
+            "required": ["calendar_id"],
+        },
+        required_scopes=("https://www.googleapis.com/auth/calendar.readonly",),
+        idempotency_key_policy="none",
+        error_map={},
+        read_only=True,
+        limits=limits,
+    )
+
+
+def _patch_google_fanout(monkeypatch, tool: ToolDefinition, calendar_delays: dict[str, float]) -> dict:
+    state = {"calls": [], "in_flight": 0, "max_in_flight": 0}
+
+    class _Registry:
+        def get_tool(self, tool_name: str):
+            return tool
+
+    class _Response:
+        def __init__(self, payload: dict):
+            self.status_code = 200
+            self._payload = payload
+            self.text = str(payload)
+
+        def json(self):
+            return self._payload
+
+    class _FakeClient:
+        async def get(self, url, headers=None, params=None):
+            state["calls"].append(url)
+            if url.endswith("/calendars/primary/events"):
+                return _Response({"items": []})
+            if url.endswith("/users/me/calendarList"):
+                return _Response({"items": [{"id": cal_id} for cal_id in calendar_delays]})
+            cal_id = url.split("/calendars/")[1].split("/")[0]
+            state["in_flight"] += 1
+            state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+            try:
+                await asyncio.sleep(calendar_delays[cal_id])
+            finally:
+                state["in_flight"] -= 1
+            return _Response({"items": [{"id": f"evt-{cal_id}", "start": {"dateTime": "2026-02-25T10:00:00+09:00"}}]})
+
+        async def aclose(self):
+            return None
+
+    monkeypatch.setattr("agent.tool_runner.load_registry", lambda: _Registry())
+    monkeypatch.setattr("agent.tool_runner._load_oauth_access_token", lambda user_id, provider: "google-token")
+    monkeypatch.setattr("agent.tool_runner.httpx.AsyncClient", lambda *args, **kwargs: _FakeClient())
+    return state
+
+
+_GOOGLE_TODAY_PAYLOAD = {
+    "calendar_id": "primary",
+    "time_min": "2026-02-24T15:00:00Z",
+    "time_max": "2026-02-25T15:00:00Z",
+    "time_zone": "Asia/Seoul",
+}
+
+
+def test_google_primary_fallback_fans_out_concurrently_and_caches_calendar_list(monkeypatch):
+    calendars = {f"cal-{index}": 0.02 for index in range(6)}
+    state = _patch_google_fanout(monkeypatch, _google_fanout_tool(fanout_concurrency=3), calendars)
+
+    async def _run_twice():
+        first = await execute_tool("user-1", "google_calendar_list_events", dict(_GOOGLE_TODAY_PAYLOAD))
+        second = await execute_tool("user-1", "google_calendar_list_events", dict(_GOOGLE_TODAY_PAYLOAD))
+        return first, second
+
+    first, second = asyncio.run(_run_twice())
+
+    assert [item["id"] for item in first["data"]["items"]] == [f"evt-cal-{index}" for index in range(6)]
+    assert second["data"]["items"] == first["data"]["items"]
+    assert state["max_in_flight"] == 3
+    assert sum(url.endswith("/users/me/calendarList") for url in state["calls"]) == 1
+    cached_names = get_tool_result_cache().stats()["tools"]
+    assert cached_names["_internal.google_calendar_fallback_calendar_list"] == {"hit": 1, "miss": 1}
+    assert "google_calendar_list_calendars" not in cached_names
+
+
+def test_google_primary_fallback_drops_calendar_past_fanout_timeout(monkeypatch):
+    state = _patch_google_fanout(
+        monkeypatch,
+        _google_fanout_tool(fanout_timeout_ms=50),
+        {"fast": 0.0, "stuck": 5.0},
+    )
+
+    result = asyncio.run(execute_tool("user-1", "google_calendar_list_events", dict(_GOOGLE_TODAY_PAYLOAD)))
+
+    assert [item["id"] for item in result["data"]["items"]] == ["evt-fast"]
+    assert state["in_flight"] == 0
+
+
 def test_linear_query_and_variables_list_teams():
     query, variables = _linear_query_and_variables("linear_list_teams", {"first": 7})
     assert "query Teams" in query
@@ -527,8 +708,8 @@ def test_linear_query_and_variables_list_issues_with_due_date_filter():
     assert variables["filter"] == {"dueDate": {"eq": "2026-02-27"}}
 
 
-def test_execute_tool_web_fetch_url_text_extracts_plain_text(monkeypatch):
-    tool = ToolDefinition(
+def _web_fetch_tool(**limits) -> ToolDefinition:
+    return ToolDefinition(
         service="web",
         base_url="",
         tool_name="http_fetch_url_text",
@@ -547,37 +728,93 @@ def test_execute_tool_web_fetch_url_text_extracts_plain_text(monkeypatch):
         required_scopes=(),
         idempotency_key_policy="none",
         error_map={},
+        limits=limits,
     )
 
+
+def _patch_web_transport(monkeypatch, tool: ToolDefinition, handler) -> None:
+    import httpx
+
+    real_client = httpx.AsyncClient
+
     class _Registry:
         def get_tool(self, tool_name: str):
             assert tool_name == "http_fetch_url_text"
             return tool
 
-    class _FakeResponse:
-        status_code = 200
-        text = "<html><head><title>Hello</title></head><body><h1>Hi</h1><p>World</p></body></html>"
-        headers = {"content-type": "text/html; charset=utf-8"}
-        url = "https://example.com/article"
-
-    class _FakeClient:
-        async def __aenter__(self):
-            return self
+    monkeypatch.setattr("agent.tool_runner.load_registry", lambda: _Registry())
+    monkeypatch.setattr(
+        "agent.tool_runner.httpx.AsyncClient",
+        lambda *args, **kwargs: real_client(transport=httpx.MockTransport(handler), follow_redirects=True),
+    )
 
-        async def __aexit__(self, exc_type, exc, tb):
-            return False
 
-        async def get(self, url, headers=None):
-            assert url == "https://example.com/article"
-            return _FakeResponse()
+def test_execute_tool_web_fetch_url_text_extracts_plain_text(monkeypatch):
+    import httpx
+
+    def _handler(request):
+        assert str(request.url) == "https://example.com/article"
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/html; charset=utf-8"},
+            content=b"<html><head><title>Hello</title></head><body><h1>Hi</h1><p>World</p></body></html>",
+        )
 
-    monkeypatch.setattr("agent.tool_runner.load_registry", lambda: _Registry())
-    monkeypatch.setattr("agent.tool_runner.httpx.AsyncClient", lambda *args, **kwargs: _FakeClient())
+    _patch_web_transport(monkeypatch, _web_fetch_tool(), _handler)
 
     result = asyncio.run(execute_tool("user-1", "http_fetch_url_text", {"url": "https://example.com/article"}))
     assert result["ok"] is True
     assert result["data"]["title"] == "Hello"
     assert "Hi World" in result["data"]["text"]
+    assert result["data"]["truncated"] is False
+
+
+def test_execute_tool_web_fetch_stops_reading_once_text_is_collected(monkeypatch):
+    import httpx
+
+    sent = {"chunks": 0}
+
+    async def _body():
+        yield b"<html><head><title>Long</title><script>skip()</script></head><body>"
+        for _ in range(1000):
+            sent["chunks"] += 1
+            yield b"<p>" + b"word " * 200 + b"</p>"
+
+    _patch_web_transport(
+        monkeypatch,
+        _web_fetch_tool(),
+        lambda request: httpx.Response(200, headers={"content-type": "text/html"}, content=_body()),
+    )
+
+    result = asyncio.run(execute_tool("user-1", "http_fetch_url_text", {"url": "https://example.com/big", "max_chars": 500}))
+    data = result["data"]
+    assert data["title"] == "Long"
+    assert data["text"].startswith("Long word word")
+    assert "skip" not in data["text"]
+    assert len(data["text"]) == 500
+    assert data["truncated"] is True
+    assert sent["chunks"] < 5
+
+
+def test_execute_tool_web_fetch_caps_bytes_and_skips_binaries(monkeypatch):
+    import httpx
+
+    def _handler(request):
+        if request.url.path == "/image":
+            return httpx.Response(200, headers={"content-type": "image/png"}, content=b"\x89PNG" + b"\x00" * 64)
+        if request.url.path == "/download":
+            return httpx.Response(200, headers={"content-type": "application/octet-stream"}, content=b"%PDF-1.7 ...")
+        return httpx.Response(200, headers={"content-type": "text/plain"}, content=b"abcdefghij" * 100)
+
+    _patch_web_transport(monkeypatch, _web_fetch_tool(max_response_bytes=25), _handler)
+
+    for path in ("/image", "/download"):
+        with pytest.raises(HTTPException, match="unsupported_content_type"):
+            asyncio.run(execute_tool("user-1", "http_fetch_url_text", {"url": f"https://example.com{path}"}))
+
+    result = asyncio.run(execute_tool("user-1", "http_fetch_url_text", {"url": "https://example.com/notes.txt"}))
+    assert result["data"]["text"] == "abcdefghijabcdefghijabcde"
+    assert result["data"]["truncated"] is True
 
 
 def test_execute_tool_linear_graphql_error_contains_message_and_code(monkeypatch):
@@ -866,3 +1103,98 @@ def test_execute_tool_github_get_me_uses_github_headers(monkeypatch):
     assert captured["headers"]["Authorization"] == "Bearer github-token"
     assert captured["headers"]["Accept"] == "application/vnd.github+json"
     assert captured["headers"]["X-GitHub-Api-Version"] == "2022-11-28"
+
+
+def test_next_page_payload_follows_notion_cursor_only():
+    more = {"ok": True, "data": {"results": [], "has_more": True, "next_cursor": "abc"}}
+    assert next_page_payload("notion_query_database", {"database_id": "db"}, more) == {"database_id": "db", "start_cursor": "abc"}
+    last = {"ok": True, "data": {"results": [], "has_more": False, "next_cursor": None}}
+    assert next_page_payload("notion_query_database", {"database_id": "db"}, last) is None
+    assert next_page_payload("github_list_issues", {"owner": "o", "repo": "r"}, more) is None
+
+
+def test_execute_tool_caches_read_only_results_until_mutation(monkeypatch):
+    def _tool(name: str, method: str, *, read_only: bool, ttl: int = 0) -> ToolDefinition:
+        return ToolDefinition(
+            service="mocksecure",
+            base_url="https://api.mocksecure.local",
+            tool_name=name,
+            description=name,
+            method=method,
+            path="/v1/items",
+            adapter_function=name,
+            input_schema={"type": "object", "properties": {"q": {"type": "string"}}, "required": []},
+            required_scopes=(),
+            idempotency_key_policy="none",
+            error_map={},
+            read_only=read_only,
+            cache_ttl_seconds=ttl,
+        )
+
+    tools = {
+        "mocksecure_list_items": _tool("mocksecure_list_items", "GET", read_only=True, ttl=60),
+        "mocksecure_create_item": _tool("mocksecure_create_item", "POST", read_only=False),
+    }
+    calls: list[tuple[str, dict]] = []
+
+    async def _fake_generic_http(*, user_id: str, tool: ToolDefinition, payload: dict):
+        calls.append((tool.tool_name, payload))
+        return {"ok": True, "data": {"call": len(calls)}}
+
+    monkeypatch.setattr("agent.tool_runner.load_registry", lambda: SimpleNamespace(get_tool=lambda name: tools[name]))
+    monkeypatch.setattr("agent.tool_runner._execute_generic_http", _fake_generic_http)
+
+    async def _scenario():
+        first = await execute_tool(user_id="user-1", tool_name="mocksecure_list_items", payload={"q": "a"})
+        second = await execute_tool(user_id="user-1", tool_name="mocksecure_list_items", payload={"q": "a"})
+        other_user = await execute_tool(user_id="user-2", tool_name="mocksecure_list_items", payload={"q": "a"})
+        await execute_tool(user_id="user-1", tool_name="mocksecure_create_item", payload={"q": "new"})
+        after_write = await execute_tool(user_id="user-1", tool_name="mocksecure_list_items", payload={"q": "a"})
+        return first, second, other_user, after_write
+
+    first, second, other_user, after_write = asyncio.run(_scenario())
+    assert first == second == {"ok": True, "data": {"call": 1}}
+    assert other_user["data"]["call"] == 2
+    assert after_write["data"]["call"] == 4
+    assert [name for name, _payload in calls].count("mocksecure_list_items") == 3
+
+
+def test_execute_tool_cancels_upstream_call_at_request_deadline(monkeypatch):
+    tool = ToolDefinition(
+        service="mockdocs",
+        base_url="https://api.mockdocs.local",
+        tool_name="mockdocs_list_items",
+        description="list items",
+        method="GET",
+        path="/v1/items",
+        adapter_function="mockdocs_list_items",
+        input_schema={"type": "object", "properties": {}, "required": []},
+        required_scopes=(),
+        idempotency_key_policy="none",
+        error_map={},
+    )
+    seen = {}
+
+    class _Registry:
+        def get_tool(self, _tool_name: str):
+            return tool
+
+    class _FakeClient:
+        def __init__(self, *args, **kwargs):
+            seen["requests"] = 0
+
+        async def get(self, url, headers=None, params=None):
+            seen["requests"] += 1
+            await asyncio.sleep(5)
+
+    monkeypatch.setattr("agent.tool_runner.load_registry", lambda: _Registry())
+    monkeypatch.setattr("agent.tool_runner.httpx.AsyncClient", _FakeClient)
+
+    async def _scenario():
+        with DeadlineScope(50):
+            return await execute_tool("user-1", "mockdocs_list_items", {})
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(_scenario())
+    assert exc_info.value.detail == "mockdocs_list_items:DEADLINE_EXCEEDED"
+    assert seen["requests"] == 1
@@ -0,0 +1,124 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.core.tool_visibility import ToolVisibilityCache, UserConnections, visibility_key
+
+
+class _Query:
+    def __init__(self, rows: list[dict]):
+        self._rows = rows
+
+    def select(self, *_args, **_kwargs):
+        return self
+
+    def eq(self, *_args, **_kwargs):
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=self._rows)
+
+
+class _Supabase:
+    def __init__(self, rows: list[dict]):
+        self.rows = rows
+        self.reads = 0
+
+    def table(self, _name: str):
+        self.reads += 1
+        return _Query(list(self.rows))
+
+
+def test_visibility_key_is_stable_and_tracks_policy_and_scopes():
+    connections = UserConnections(services=("notion",), scopes={"notion": frozenset({"read_content"})})
+    base = visibility_key(connections=connections, policy_json={"deny_tools": ["a"]}, allowed_tools=None)
+
+    assert base == visibility_key(connections=connections, policy_json={"deny_tools": ["a"]}, allowed_tools=None)
+    assert base != visibility_key(connections=connections, policy_json={"deny_tools": ["b"]}, allowed_tools=None)
+    assert base != visibility_key(connections=connections, policy_json={"deny_tools": ["a"]}, allowed_tools=["x"])
+    wider = UserConnections(services=("notion",), scopes={"notion": frozenset({"read_content", "insert_content"})})
+    assert base != visibility_key(connections=wider, policy_json={"deny_tools": ["a"]}, allowed_tools=None)
+
+
+def test_connections_cached_until_ttl_or_invalidation():
+    now = [100.0]
+    cache = ToolVisibilityCache(ttl_seconds=60, max_entries=10, clock=lambda: now[0])
+    supabase = _Supabase([{"provider": "Notion", "granted_scopes": ["read_content", " "]}])
+
+    first = asyncio.run(cache.connections(supabase, user_id="user-1"))
+    asyncio.run(cache.connections(supabase, user_id="user-1"))
+    assert first.services == ("notion",)
+    assert first.scopes == {"notion": frozenset({"read_content"})}
+    assert supabase.reads == 1
+
+    supabase.rows.append({"provider": "github", "granted_scopes": ["repo"]})
+    cache.invalidate_user("user-1")
+    second = asyncio.run(cache.connections(supabase, user_id="user-1"))
+    assert second.services == ("github", "notion")
+    assert supabase.reads == 2
+
+    now[0] += 61
+    asyncio.run(cache.connections(supabase, user_id="user-1"))
+    assert supabase.reads == 3
+
+
+def test_connections_loaded_across_an_invalidation_are_not_cached():
+    cache = ToolVisibilityCache(ttl_seconds=60, max_entries=10)
+
+    class _RacingSupabase(_Supabase):
+        def table(self, name: str):
+            # OAuth disconnect lands while this read is still in flight.
+            cache.invalidate_user("user-1")
+            return super().table(name)
+
+    racing = _RacingSupabase([{"provider": "notion", "granted_scopes": []}])
+    stale = asyncio.run(cache.connections(racing, user_id="user-1"))
+    assert stale.services == ("notion",)
+    assert cache.stats()["users"] == 0
+
+    fresh = _Supabase([])
+    assert asyncio.run(cache.connections(fresh, user_id="user-1")).services == ()
+    asyncio.run(cache.connections(fresh, user_id="user-1"))
+    assert fresh.reads == 1
+
+
+def test_generations_stay_bounded_and_still_guard_in_flight_loads():
+    cache = ToolVisibilityCache(ttl_seconds=60, max_entries=2)
+    for idx in range(50):
+        cache.invalidate_user(f"user-{idx}")
+    assert len(cache._generations) <= 4
+
+    class _RacingSupabase(_Supabase):
+        def table(self, name: str):
+            # The invalidation also prunes the generation map while this read is in flight.
+            for idx in range(10):
+                cache.invalidate_user(f"other-{idx}")
+            cache.invalidate_user("user-1")
+            return super().table(name)
+
+    asyncio.run(cache.connections(_RacingSupabase([{"provider": "notion"}]), user_id="user-1"))
+    assert cache.stats()["users"] == 0
+    asyncio.run(cache.connections(_Supabase([]), user_id="user-1"))
+    assert cache.stats()["users"] == 1
+
+
+def test_get_or_build_serializes_once_per_key_and_bounds_entries():
+    cache = ToolVisibilityCache(ttl_seconds=60, max_entries=1)
+    builds: list[str] = []
+
+    def _build(name: str):
+        def _inner():
+            builds.append(name)
+            return [{"name": name}]
+
+        return _inner
+
+    first = cache.get_or_build("k1", _build("a"))
+    again = cache.get_or_build("k1", _build("a"))
+    assert again is first
+    assert first.body == b'[{"name":"a"}]'
+    assert first.etag.startswith('"') and first.etag.endswith('"')
+
+    cache.get_or_build("k2", _build("b"))
+    cache.get_or_build("k1", _build("a"))
+    assert builds == ["a", "b", "a"]
+    assert cache.stats()["tool_lists"] == 1
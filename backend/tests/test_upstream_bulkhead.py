@@ -0,0 +1,131 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.upstream_bulkhead import UpstreamBulkheads, UpstreamLimits
+
+
+def test_concurrency_cap_queues_excess_calls():
+    bulkheads = UpstreamBulkheads()
+    limits = UpstreamLimits(max_concurrency=2, queue_timeout_ms=2000)
+    state = {"active": 0, "peak": 0}
+
+    async def _call():
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        await asyncio.sleep(0.02)
+        state["active"] -= 1
+        return {"ok": True}
+
+    async def _scenario():
+        return await asyncio.gather(
+            *[bulkheads.run(user_id="user-1", service="notion", limits=limits, operation=_call) for _ in range(6)]
+        )
+
+    results = asyncio.run(_scenario())
+    assert results == [{"ok": True}] * 6
+    assert state["peak"] == 2
+    stats = bulkheads.stats()["notion"]
+    assert stats["admitted"] == 6
+    assert stats["in_flight"] == 0
+    assert stats["queue_depth"] == 0
+    assert stats["waited"] >= 4
+
+
+def test_lanes_are_per_user():
+    bulkheads = UpstreamBulkheads()
+    limits = UpstreamLimits(max_concurrency=1, queue_timeout_ms=2000)
+    state = {"active": 0, "peak": 0}
+
+    async def _call():
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        await asyncio.sleep(0.02)
+        state["active"] -= 1
+        return {"ok": True}
+
+    async def _scenario():
+        await asyncio.gather(
+            bulkheads.run(user_id="user-1", service="linear", limits=limits, operation=_call),
+            bulkheads.run(user_id="user-2", service="linear", limits=limits, operation=_call),
+        )
+
+    asyncio.run(_scenario())
+    assert state["peak"] == 2
+
+
+def test_token_bucket_paces_after_burst():
+    bulkheads = UpstreamBulkheads()
+    limits = UpstreamLimits(requests_per_second=20, burst=2, queue_timeout_ms=2000)
+
+    async def _call():
+        return time.monotonic()
+
+    async def _scenario():
+        started = time.monotonic()
+        stamps = await asyncio.gather(
+            *[bulkheads.run(user_id="user-1", service="github", limits=limits, operation=_call) for _ in range(4)]
+        )
+        return [stamp - started for stamp in stamps]
+
+    offsets = sorted(asyncio.run(_scenario()))
+    assert offsets[1] < 0.03
+    # Two calls beyond the burst are spaced 1/20s apart.
+    assert offsets[3] >= 0.09
+
+
+def test_queue_timeout_raises_marker_and_counts():
+    bulkheads = UpstreamBulkheads()
+    limits = UpstreamLimits(max_concurrency=1, queue_timeout_ms=20)
+
+    async def _slow():
+        await asyncio.sleep(0.2)
+        return {"ok": True}
+
+    async def _scenario():
+        return await asyncio.gather(
+            bulkheads.run(user_id="user-1", service="canva", limits=limits, operation=_slow),
+            bulkheads.run(user_id="user-1", service="canva", limits=limits, operation=_slow),
+            return_exceptions=True,
+        )
+
+    first, second = asyncio.run(_scenario())
+    assert first == {"ok": True}
+    assert isinstance(second, HTTPException)
+    assert second.status_code == 503
+    assert str(second.detail).startswith("canva:QUEUE_TIMEOUT|waited_ms=")
+    stats = bulkheads.stats()["canva"]
+    assert stats["timeouts"] == 1
+    assert stats["queue_depth"] == 0
+
+
+def test_rate_wait_beyond_deadline_times_out_without_sleeping():
+    now = [0.0]
+    bulkheads = UpstreamBulkheads(clock=lambda: now[0])
+    limits = UpstreamLimits(requests_per_second=1, burst=1, queue_timeout_ms=500)
+
+    async def _call():
+        return {"ok": True}
+
+    async def _scenario():
+        await bulkheads.run(user_id="user-1", service="linear", limits=limits, operation=_call)
+        with pytest.raises(HTTPException) as exc_info:
+            await bulkheads.run(user_id="user-1", service="linear", limits=limits, operation=_call)
+        return exc_info.value
+
+    exc = asyncio.run(_scenario())
+    assert "linear:QUEUE_TIMEOUT" in str(exc.detail)
+
+
+def test_disabled_limits_call_through():
+    bulkheads = UpstreamBulkheads()
+
+    async def _call():
+        return {"ok": True}
+
+    assert asyncio.run(bulkheads.run(user_id="u", service="web", limits=UpstreamLimits(), operation=_call)) == {
+        "ok": True
+    }
+    assert bulkheads.stats() == {}
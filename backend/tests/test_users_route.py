@@ -179,8 +179,7 @@ def _client(monkeypatch):
         return "member-user"
 
     monkeypatch.setattr("app.routes.users.get_authenticated_user_id", _fake_user)
-    monkeypatch.setattr("app.routes.users.create_client", lambda *_args, **_kwargs: client)
-    monkeypatch.setattr("app.routes.users.get_settings", lambda: SimpleNamespace(supabase_url="x", supabase_service_role_key="y"))
+    monkeypatch.setattr("app.routes.users.get_supabase_client", lambda *_args, **_kwargs: client)
     return client
 
 
@@ -0,0 +1,191 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.core import webhook_dispatcher
+from app.core.event_hooks import process_pending_webhook_retries
+from app.core.webhook_dispatcher import WebhookDispatcher
+
+
+def _event(idx: int) -> dict:
+    return {"supabase": object(), "event_type": "tool_called", "pending": [{"delivery_id": idx}]}
+
+
+def test_submit_returns_false_without_workers():
+    dispatcher = WebhookDispatcher(workers=2, max_queue=10, drain_seconds=1)
+    assert dispatcher.submit(_event(1)) is False
+
+
+def test_workers_deliver_off_the_caller(monkeypatch):
+    delivered: list[int] = []
+    gates: list[asyncio.Event] = []
+
+    async def _fake_deliver(*, pending, **_kwargs):
+        await gates[0].wait()
+        delivered.extend(item["delivery_id"] for item in pending)
+
+    monkeypatch.setattr("app.core.webhook_dispatcher.deliver_recorded_webhooks", _fake_deliver)
+    dispatcher = WebhookDispatcher(workers=2, max_queue=10, drain_seconds=1)
+
+    async def _run():
+        gates.append(asyncio.Event())
+        dispatcher.start()
+        for idx in range(3):
+            assert dispatcher.submit(_event(idx)) is True
+        await asyncio.sleep(0.01)
+        # Subscribers are still blocked, yet every submit already returned.
+        assert delivered == []
+        gates[0].set()
+        await dispatcher.stop()
+
+    asyncio.run(_run())
+    assert sorted(delivered) == [0, 1, 2]
+    assert dispatcher.stats()["delivered"] == 3
+    assert dispatcher.running is False
+
+
+def test_stop_leaves_queued_deliveries_pending(monkeypatch):
+    async def _hang(**_kwargs):
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr("app.core.webhook_dispatcher.deliver_recorded_webhooks", _hang)
+    dispatcher = WebhookDispatcher(workers=1, max_queue=10, drain_seconds=0.01)
+
+    async def _run():
+        dispatcher.start()
+        for idx in range(3):
+            dispatcher.submit(_event(idx))
+        await asyncio.sleep(0.01)
+        await dispatcher.stop()
+
+    asyncio.run(_run())
+    assert dispatcher.stats()["recorded_only"] == 2
+    assert dispatcher.stats()["queued"] == 0
+
+
+def test_dispatch_records_outbox_rows_before_queueing(monkeypatch):
+    order: list[str] = []
+
+    async def _fake_record(**kwargs):
+        order.append("record")
+        return [{"delivery_id": 7, "subscription": {}, "payload": kwargs["payload"]}]
+
+    async def _fake_deliver(*, pending, **_kwargs):
+        order.append(f"deliver:{pending[0]['delivery_id']}")
+
+    monkeypatch.setattr("app.core.webhook_dispatcher.record_webhook_event", _fake_record)
+    monkeypatch.setattr("app.core.webhook_dispatcher.deliver_recorded_webhooks", _fake_deliver)
+    dispatcher = WebhookDispatcher(workers=1, max_queue=1, drain_seconds=1)
+    monkeypatch.setattr(webhook_dispatcher, "_dispatcher", dispatcher)
+
+    async def _run():
+        dispatcher.start()
+        await webhook_dispatcher.dispatch_webhook_event(
+            supabase=object(), user_id="user-1", event_type="tool_called", payload={"request_id": "r1"}
+        )
+        # The outbox row exists as soon as the request path returns.
+        assert order == ["record"]
+        await dispatcher.stop()
+
+    asyncio.run(_run())
+    assert order == ["record", "deliver:7"]
+
+
+def test_dispatch_delivers_inline_when_dispatcher_not_running(monkeypatch):
+    calls: list[dict] = []
+
+    async def _fake_emit(**kwargs):
+        calls.append(kwargs)
+
+    monkeypatch.setattr("app.core.webhook_dispatcher.emit_webhook_event", _fake_emit)
+    asyncio.run(
+        webhook_dispatcher.dispatch_webhook_event(
+            supabase=object(), user_id="user-1", event_type="tool_called", payload={"request_id": "r1"}
+        )
+    )
+    assert len(calls) == 1
+    assert calls[0]["event_type"] == "tool_called"
+    assert calls[0]["max_retries"] >= 0
+
+
+class _OutboxClient:
+    """In-memory webhook_subscriptions / webhook_deliveries with just the query surface the outbox uses."""
+
+    def __init__(self):
+        self.subscriptions = [{"id": 1, "endpoint_url": "https://hooks.example", "secret": "s", "event_types": [], "is_active": True}]
+        self.deliveries: list[dict] = []
+
+    def table(self, name: str):
+        client = self
+
+        class _Query:
+            def __init__(self):
+                self._insert = None
+
+            def select(self, *_args, **_kwargs):
+                return self
+
+            def insert(self, row):
+                self._insert = row
+                return self
+
+            def eq(self, *_args, **_kwargs):
+                return self
+
+            def in_(self, *_args, **_kwargs):
+                return self
+
+            def order(self, *_args, **_kwargs):
+                return self
+
+            def limit(self, *_args, **_kwargs):
+                return self
+
+            def execute(self):
+                if name == "webhook_subscriptions":
+                    return SimpleNamespace(data=list(client.subscriptions))
+                if self._insert is not None:
+                    row = {"id": len(client.deliveries) + 1, **self._insert}
+                    client.deliveries.append(row)
+                    return SimpleNamespace(data=[row])
+                return SimpleNamespace(data=list(client.deliveries))
+
+        return _Query()
+
+
+def test_retry_processor_skips_deliveries_still_queued_for_dispatch(monkeypatch):
+    gate = asyncio.Event()
+    delivered: list[int] = []
+    retried: list = []
+
+    async def _slow_deliver(*, pending, **_kwargs):
+        await gate.wait()
+        delivered.extend(item["delivery_id"] for item in pending)
+
+    async def _fake_retry(**kwargs):
+        retried.append(kwargs["delivery_id"])
+        return {"status": "success"}
+
+    monkeypatch.setattr("app.core.webhook_dispatcher.deliver_recorded_webhooks", _slow_deliver)
+    monkeypatch.setattr("app.core.event_hooks.retry_webhook_delivery", _fake_retry)
+    dispatcher = WebhookDispatcher(workers=1, max_queue=10, drain_seconds=1, lease_seconds=60)
+    monkeypatch.setattr(webhook_dispatcher, "_dispatcher", dispatcher)
+    client = _OutboxClient()
+
+    async def _run():
+        dispatcher.start()
+        await webhook_dispatcher.dispatch_webhook_event(
+            supabase=client, user_id="user-1", event_type="tool_called", payload={"request_id": "r1"}
+        )
+        # A scheduled retry run lands while the worker still holds the delivery.
+        result = await process_pending_webhook_retries(supabase=client)
+        gate.set()
+        await dispatcher.stop()
+        return result
+
+    result = asyncio.run(_run())
+    assert client.deliveries[0]["status"] == "pending"
+    assert client.deliveries[0]["next_retry_at"] is not None
+    assert result["processed"] == 0
+    assert result["skipped"] == 1
+    assert retried == []
+    assert delivered == [1]
@@ -237,7 +237,8 @@ CREATE TABLE "public"."tool_calls" (
     "retry_count" integer NOT NULL DEFAULT 0,
     "backoff_ms" integer NOT NULL DEFAULT 0,
     "masked_fields" ARRAY,
-    "agent_id" bigint
+    "agent_id" bigint,
+    "stage_timings" jsonb
 );
 
 CREATE TABLE "public"."user_security_settings" (